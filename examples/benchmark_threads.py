@@ -0,0 +1,36 @@
+# scaling of the thread-pool evaluator from 1 to N threads
+import os
+import time
+
+from compas.geometry import Box, Frame, Point, Sphere
+from compas_vol.combinations import Intersection, SmoothUnion
+from compas_vol.engine import Grid, ThreadEvaluator
+from compas_vol.microstructures import TPMS
+from compas_vol.modifications import Shell
+from compas_vol.primitives import VolBox, VolSphere
+
+# CSG tree
+vb = VolBox(Box(Frame.worldXY(), 40, 30, 20), 2.5)
+vs = VolSphere(Sphere(Point(15, 10, 5), 12))
+part = SmoothUnion(vb, vs, 4.0)
+tree = Intersection(Shell(part, 1.5, 0.5), TPMS(0, 6.0))
+
+# workspace
+grid = Grid([(-35, 35), (-35, 35), (-35, 35)], resolution=256, dtype='float32')
+out = grid.empty()
+
+counts = [1]
+while counts[-1] * 2 <= os.cpu_count():
+    counts.append(counts[-1] * 2)
+if counts[-1] != os.cpu_count():
+    counts.append(os.cpu_count())
+
+baseline = None
+for n in counts:
+    with ThreadEvaluator(n) as evaluator:
+        evaluator.evaluate(tree, grid, out=out)  # warm up
+        t = time.perf_counter()
+        evaluator.evaluate(tree, grid, out=out)
+        elapsed = time.perf_counter() - t
+    baseline = baseline or elapsed
+    print('{:3d} threads: {:.3f} s, speedup {:.2f}'.format(n, elapsed, baseline / elapsed))
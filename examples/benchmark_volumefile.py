@@ -0,0 +1,36 @@
+# size and save time of a narrow-band volume file against a dense .npy
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from compas.geometry import Point, Sphere
+from compas_vol.meshing import SparseGrid, save_volume
+from compas_vol.primitives import VolSphere
+
+# narrow-band field of a sphere
+sphere = VolSphere(Sphere(Point(0, 0, 0), 30))
+sparse = SparseGrid(sphere, [(-40, 40), (-40, 40), (-40, 40)], 0.25, dtype='float32').build()
+dense = sparse.to_dense()
+
+
+def best(save, repeat=5):
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        save()
+        times.append(time.perf_counter() - t)
+    return min(times)
+
+
+files = [
+    ('dense.npy', lambda filename: np.save(filename, dense)),
+    ('sparse.cvol', lambda filename: save_volume(filename, sparse)),
+    ('compressed.cvol', lambda filename: save_volume(filename, sparse, compression=True)),
+]
+with tempfile.TemporaryDirectory() as folder:
+    for name, save in files:
+        filename = os.path.join(folder, name)
+        elapsed = best(lambda: save(filename))
+        print('{:16s} {:8.1f} MB {:.3f} s'.format(name, os.path.getsize(filename) / 1e6, elapsed))
@@ -14,6 +14,7 @@ compas_vol
     compas_vol.modifications
     compas_vol.microstructures
     compas_vol.analysis
+    compas_vol.engine
 
 """
 
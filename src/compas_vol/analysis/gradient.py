@@ -76,7 +76,31 @@ class Gradient(object):
         d2 = self.o.get_distance_numpy(x - self.e, y + self.e, z - self.e)
         d3 = self.o.get_distance_numpy(x + self.e, y + self.e, z + self.e)
         
-        v = k0 * d0 + k1 * d1 + k2 * d2 + k3 * d3
+        v = k0 * d0[..., newaxis] + k1 * d1[..., newaxis] + k2 * d2[..., newaxis] + k3 * d3[..., newaxis]
 
-        return v / np.linalg.norm(v, axis=3) #[..., newaxis]
+        return v / np.linalg.norm(v, axis=-1)[..., newaxis]
+
+    def get_gradient_points(self, points):
+        """
+        vectorized tetrahedron difference method for gradients at an array of points
+
+        Parameters
+        ----------
+        points: numpy array of floats, shape (n, 3)
+            The points to query, evaluated in chunks by :func:`compas_vol.engine.evaluate_points`.
+        Returns
+        -------
+        numpy array of floats, shape (n, 3)
+            The unit gradients, or zero vectors where the gradient vanishes.
+        """
+        import numpy as np
+        from compas_vol.engine import evaluate_points
+
+        points = np.asarray(points, dtype=float)
+        v = np.zeros(points.shape)
+        for k in (self.k0, self.k1, self.k2, self.k3):
+            k = np.array(k)
+            v += evaluate_points(self.o, points + k * self.e)[:, newaxis] * k
+        norm = np.linalg.norm(v, axis=-1)[:, newaxis]
+        return np.divide(v, norm, out=np.zeros_like(v), where=norm > 0)
         
\ No newline at end of file
@@ -39,7 +39,7 @@ __all__ = [
     'Intersection',
     'Subtraction',
     'SmoothUnion',
-    'SmoothUnionList'
+    'SmoothUnionList',
     'SmoothIntersection',
     'SmoothSubtraction',
     'Morph',
@@ -1,4 +1,15 @@
-class Addition(object):
+from compas_vol.utilities import Interval
+from compas_vol.utilities import Observable
+from compas_vol.utilities import culling
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_buffer
+from compas_vol.utilities import distance_interval
+from compas_vol.utilities import distance_into
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import tree_to_data
+
+
+class Addition(Observable):
     """
     The addition of two or more scalar fields defined by volumetric objects.
 
@@ -16,10 +27,28 @@ class Addition(object):
         else:
             self.objs = [a, b]
     
+    @property
+    def data(self):
+        return {'objs': self.objs}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(list(data['objs']))
+
     def __repr__(self) -> str:
         obj_strings = [str(o) for o in self.objs]
         return 'Addition([{}])'.format(', '.join(obj_strings))
     
+    def get_distance_interval(self, box):
+        """
+        sum of the intervals of the objects
+        """
+        return tuple(sum((distance_interval(o, box) for o in self.objs), Interval(0)))
+
     def get_distance(self, point):
         """
         single point distance function
@@ -27,11 +56,22 @@ class Addition(object):
         ds = [o.get_distance(point) for o in self.objs]
         return sum(ds)
 
-    def get_distance_numpy(self, x, y, z):
+    get_distance_points = distance_points
+
+    def get_distance_numpy(self, x, y, z, out=None):
         """
         vectorized distance function
+
+        The children are evaluated one at a time and reduced in place, into ``out`` if given,
+        so that only two arrays of distances are held whatever the number of children.
+        Inside :func:`compas_vol.utilities.culling`, culling is switched off for the children.
         """
         import numpy as np
 
-        distances = ([o.get_distance_numpy(x, y, z) for o in self.objs])
-        return np.sum(distances, axis=0)
\ No newline at end of file
+        with culling(None):
+            out = distance_into(self.objs[0], x, y, z, distance_buffer(x, y, z, out))
+            if len(self.objs) > 1:
+                scratch = distance_buffer(x, y, z)
+                for o in self.objs[1:]:
+                    np.add(out, distance_into(o, x, y, z, scratch), out=out)
+        return out
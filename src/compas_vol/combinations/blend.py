@@ -1,7 +1,19 @@
 from compas import PRECISION
 
+from compas_vol.utilities import Observable
+from compas_vol.utilities import bounding_box
+from compas_vol.utilities import culling
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_buffer
+from compas_vol.utilities import distance_interval
+from compas_vol.utilities import distance_into
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import tree_to_data
+from compas_vol.utilities import union_box
+from compas_vol.utilities import widened
 
-class Blend(object):
+
+class Blend(Observable):
     def __init__(self, a=None, b=None, c=None, r=1.0, t=0):
         self.a = a
         self.b = b
@@ -9,8 +21,40 @@ class Blend(object):
         self.r = r
         self.t = t
 
+    @property
+    def data(self):
+        return {'a': self.a, 'b': self.b, 'c': self.c, 'r': self.r, 't': self.t}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['a'], data['b'], data['c'], data['r'], data['t'])
+
     def __repr__(self):
-        return "Blend({0},{1},{2},{3:.{3}f})".format(str(self.a), str(self.b), str(self.c), self.r, PRECISION[:1])
+        return "Blend({0},{1},{2},{3:.{4}f})".format(str(self.a), str(self.b), str(self.c), self.r, PRECISION[:1])
+
+    def get_bounding_box(self):
+        """
+        union of the boxes of a and b, as the blend lies between their distances
+        """
+        return union_box([bounding_box(self.a), bounding_box(self.b)])
+
+    def get_distance_interval(self, box):
+        """
+        interpolation of the intervals of a and b at the bounds of the blending factor over the box
+        """
+        da = distance_interval(self.a, box)
+        db = distance_interval(self.b, box)
+        f = (distance_interval(self.c, box) / self.r + 0.5).clip(0, 1)
+        factors = list(f)
+        if self.t == 1:
+            factors = [2 * v * v if v < 0.5 else 1 - 2 * (1 - v) ** 2 for v in factors]
+        # the blend is linear in the increasing factor, so that it is bounded at its bounds
+        ends = [da * (1 - v) + db * v for v in factors]
+        return min(d.lo for d in ends), max(d.hi for d in ends)
 
     def get_distance(self, point):
         """
@@ -31,31 +75,37 @@ class Blend(object):
                 qf = 2 * f**2 if f < 0.5 else 1 - pow(-2 * f + 2, 2) / 2
                 return (1 - qf) * da + qf * db
     
-    def get_distance_numpy(self, x, y, z):
+    get_distance_points = distance_points
+
+    def get_distance_numpy(self, x, y, z, out=None):
         """
         vectorized distance function
+
+        The result is computed in place, into ``out`` if given.
+        Inside :func:`compas_vol.utilities.culling`, culling is switched off for the objects to blend,
+        and the margin is grown by r/2 for the object of the blend factor.
         """
         import numpy as np
 
-        d = np.empty((x.shape[0], y.shape[1], z.shape[2]))
-
-        da = self.a.get_distance_numpy(x, y, z)
-        db = self.b.get_distance_numpy(x, y, z)
-        dc = self.c.get_distance_numpy(x, y, z)
-        f = dc / self.r + 0.5
-
-        cond1 = dc < -self.r/2
-        cond2 = dc > self.r/2
-        cond3 = ~cond1 * ~cond2
-        cond4 = f < 0.5
-
-        d[cond1] = da[cond1]
-        d[cond2] = db[cond2]
-        if self.t == 0:
-            d[cond3] = (1 - f[cond3]) * da[cond3] + f[cond3] * db[cond3]
-        elif self.t == 1:
-            qf = np.empty((x.shape[0], y.shape[1], z.shape[2]))
-            qf[cond3*cond4] = 2 * f[cond3*cond4]**2
-            qf[cond3*~cond4] = 1 - ((-2 * f[cond3*~cond4] + 2)**2)/2
-            d[cond3] = (1 - qf[cond3]) * da[cond3] + qf[cond3] * db[cond3]
-        return d
\ No newline at end of file
+        with culling(None):
+            d = distance_into(self.a, x, y, z, distance_buffer(x, y, z, out))
+            db = distance_into(self.b, x, y, z, distance_buffer(x, y, z))
+        with widened(self.r / 2.0):
+            f = distance_into(self.c, x, y, z, distance_buffer(x, y, z))
+        # the blend factor is 0 below -r/2 and 1 above r/2, where the result is da or db
+        f /= self.r
+        f += 0.5
+        np.clip(f, 0, 1, out=f)
+        if self.t == 1:
+            # quadratic ease in and out: 2 f^2 below 0.5, 1 - 2 (1 - f)^2 above
+            lower = f < 0.5
+            f -= 0.5
+            np.abs(f, out=f)
+            np.subtract(0.5, f, out=f)
+            np.square(f, out=f)
+            f *= 2
+            np.subtract(1, f, out=f, where=~lower)
+        db -= d
+        db *= f
+        d += db
+        return d
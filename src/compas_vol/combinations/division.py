@@ -1,4 +1,14 @@
-class Division(object):
+from compas_vol.utilities import Observable
+from compas_vol.utilities import culling
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_buffer
+from compas_vol.utilities import distance_interval
+from compas_vol.utilities import distance_into
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import tree_to_data
+
+
+class Division(Observable):
     """
     The division of two or more scalar fields defined by volumetric objects.
 
@@ -14,10 +24,27 @@ class Division(object):
         self.a = a
         self.b = b
     
+    @property
+    def data(self):
+        return {'a': self.a, 'b': self.b}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['a'], data['b'])
+
     def __repr__(self) -> str:
-        obj_strings = [str(o) for o in self.objs]
-        return 'Division([{}])'.format(', '.join(obj_strings))
+        return 'Division({},{})'.format(str(self.a), str(self.b))
     
+    def get_distance_interval(self, box):
+        """
+        quotient of the intervals of a and b, unbounded if the interval of b contains zero
+        """
+        return tuple(distance_interval(self.a, box) / distance_interval(self.b, box))
+
     def get_distance(self, point):
         """
         single point distance function
@@ -26,12 +53,18 @@ class Division(object):
         db = self.b.get_distance(point)
         return da/db
 
-    def get_distance_numpy(self, x, y, z):
+    get_distance_points = distance_points
+
+    def get_distance_numpy(self, x, y, z, out=None):
         """
         vectorized distance function
+
+        The result is computed in place, into ``out`` if given.
+        Inside :func:`compas_vol.utilities.culling`, culling is switched off for the children.
         """
         import numpy as np
 
-        da = self.a.get_distance_numpy(x,y,z)
-        db = self.b.get_distance_numpy(x,y,z)
-        return np.divide(da, db)
\ No newline at end of file
+        with culling(None):
+            da = distance_into(self.a, x, y, z, distance_buffer(x, y, z, out))
+            db = distance_into(self.b, x, y, z, distance_buffer(x, y, z))
+        return np.divide(da, db, out=da)
@@ -1,4 +1,17 @@
-class Intersection(object):
+from compas_vol.utilities import Observable
+from compas_vol.utilities import bounding_box
+from compas_vol.utilities import cull_intersection
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_buffer
+from compas_vol.utilities import distance_interval
+from compas_vol.utilities import distance_into
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import intersection_box
+from compas_vol.utilities import interval_max
+from compas_vol.utilities import tree_to_data
+
+
+class Intersection(Observable):
     """The Boolean intersection between two or more volumetric objects.
 
     Parameters
@@ -22,10 +35,34 @@ class Intersection(object):
         else:
             self.objs = [a, b]
 
+    @property
+    def data(self):
+        return {'objs': self.objs}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(list(data['objs']))
+
     def __repr__(self):
         obj_strings = [str(o) for o in self.objs]
         return 'Intersection([{}])'.format(', '.join(obj_strings))
 
+    def get_bounding_box(self):
+        """
+        overlap of the boxes of the bounded objects, or None if none is bounded or the boxes do not overlap
+        """
+        return intersection_box([bounding_box(o) for o in self.objs])
+
+    def get_distance_interval(self, box):
+        """
+        maximum of the intervals of the objects
+        """
+        return tuple(interval_max(*(distance_interval(o, box) for o in self.objs)))
+
     def get_distance(self, point):
         """
         single point distance function
@@ -33,11 +70,28 @@ class Intersection(object):
         ds = [o.get_distance(point) for o in self.objs]
         return max(ds)
 
-    def get_distance_numpy(self, x, y, z):
+    get_distance_points = distance_points
+
+    def get_distance_numpy(self, x, y, z, out=None):
         """
         vectorized distance function
+
+        The children are evaluated one at a time and reduced in place, into ``out`` if given,
+        so that only two arrays of distances are held whatever the number of children.
+        Inside :func:`compas_vol.utilities.culling`, they are evaluated only near the overlap of their bounding boxes.
         """
         import numpy as np
 
-        distances = ([o.get_distance_numpy(x, y, z) for o in self.objs])
-        return np.maximum.reduce(distances)
+        out = distance_buffer(x, y, z, out)
+        culled = cull_intersection(self.objs, x, y, z, out)
+        if culled is not None:
+            block, coordinates = culled
+            if coordinates is not None:
+                self.get_distance_numpy(*coordinates, out=out[block])
+            return out
+        out = distance_into(self.objs[0], x, y, z, distance_buffer(x, y, z, out))
+        if len(self.objs) > 1:
+            scratch = distance_buffer(x, y, z)
+            for o in self.objs[1:]:
+                np.maximum(out, distance_into(o, x, y, z, scratch), out=out)
+        return out
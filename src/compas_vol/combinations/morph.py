@@ -1,4 +1,16 @@
-class Morph(object):
+from compas_vol.utilities import Observable
+from compas_vol.utilities import bounding_box
+from compas_vol.utilities import culling
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_buffer
+from compas_vol.utilities import distance_interval
+from compas_vol.utilities import distance_into
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import tree_to_data
+from compas_vol.utilities import union_box
+
+
+class Morph(Observable):
     """The morphed object at factor `f` between two volumetric objects.
 
     Parameters
@@ -23,9 +35,33 @@ class Morph(object):
         self.b = b
         self.f = max(min(f, 1), 0)
 
+    @property
+    def data(self):
+        return {'a': self.a, 'b': self.b, 'f': self.f}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['a'], data['b'], data['f'])
+
     def __repr__(self):
         return 'Morph({},{},{})'.format(str(self.a), str(self.b), self.f)
 
+    def get_bounding_box(self):
+        """
+        union of the boxes of a and b, as the morph lies between their distances
+        """
+        return union_box([bounding_box(self.a), bounding_box(self.b)])
+
+    def get_distance_interval(self, box):
+        """
+        intervals of a and b weighted by the morphing factor
+        """
+        return tuple(distance_interval(self.a, box) * (1.0 - self.f) + distance_interval(self.b, box) * self.f)
+
     def get_distance(self, point):
         """
         single point distance function
@@ -34,10 +70,19 @@ class Morph(object):
         db = self.b.get_distance(point)
         return (1.0 - self.f) * da + self.f * db
 
-    def get_distance_numpy(self, x, y, z):
+    get_distance_points = distance_points
+
+    def get_distance_numpy(self, x, y, z, out=None):
         """
         vectorized distance function
+
+        The result is computed in place, into ``out`` if given.
+        Inside :func:`compas_vol.utilities.culling`, culling is switched off for the children.
         """
-        da = self.a.get_distance_numpy(x, y, z)
-        db = self.b.get_distance_numpy(x, y, z)
-        return (1.0 - self.f) * da + self.f * db
+        with culling(None):
+            da = distance_into(self.a, x, y, z, distance_buffer(x, y, z, out))
+            db = distance_into(self.b, x, y, z, distance_buffer(x, y, z))
+        da *= 1.0 - self.f
+        db *= self.f
+        da += db
+        return da
@@ -1,7 +1,20 @@
 from compas import PRECISION
 
+from compas_vol.utilities import Observable
+from compas_vol.utilities import bounding_box
+from compas_vol.utilities import cull_intersection
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_buffer
+from compas_vol.utilities import distance_interval
+from compas_vol.utilities import distance_into
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import intersection_box
+from compas_vol.utilities import interval_max
+from compas_vol.utilities import tree_to_data
+from compas_vol.utilities import widened
 
-class SmoothIntersection(object):
+
+class SmoothIntersection(Observable):
     """The smooth union between two volumetric objects.
 
     Parameters
@@ -26,9 +39,35 @@ class SmoothIntersection(object):
         self.b = b
         self.r = r
 
+    @property
+    def data(self):
+        return {'a': self.a, 'b': self.b, 'r': self.r}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['a'], data['b'], data['r'])
+
     def __repr__(self):
         return 'SmoothIntersection({0},{1},{2:.{3}f})'.format(str(self.a), str(self.b), self.r, PRECISION[:1])
 
+    def get_bounding_box(self):
+        """
+        overlap of the boxes of a and b, as the smooth intersection is no less than the intersection
+        """
+        return intersection_box([bounding_box(self.a), bounding_box(self.b)])
+
+    def get_distance_interval(self, box):
+        """
+        maximum of the intervals of a and b, with the upper bound raised by r / 4,
+        the most the smooth intersection exceeds the intersection
+        """
+        d = interval_max(distance_interval(self.a, box), distance_interval(self.b, box))
+        return d.lo, d.hi + abs(self.r) / 4.0
+
     def get_distance(self, point):
         """
         single point distance function
@@ -39,13 +78,38 @@ class SmoothIntersection(object):
         h = min(max(0.5 - 0.5 * (db - da) / k, 0), 1)
         return (db * (1 - h) + h * da) + k * h * (1 - h)
 
-    def get_distance_numpy(self, x, y, z):
+    get_distance_points = distance_points
+
+    def get_distance_numpy(self, x, y, z, out=None):
         """
         vectorized distance function
+
+        The result is computed in place, into ``out`` if given.
+        Inside :func:`compas_vol.utilities.culling`, it is computed only near the overlap of the bounding boxes.
         """
         import numpy as np
 
-        da = self.a.get_distance_numpy(x, y, z)
-        db = self.b.get_distance_numpy(x, y, z)
-        h = np.minimum(np.maximum(0.5 - 0.5 * (db - da)/self.r, 0), 1)
-        return (db * (1 - h) + h * da) + self.r * h * (1 - h)
+        out = distance_buffer(x, y, z, out)
+        culled = cull_intersection([self.a, self.b], x, y, z, out)
+        if culled is not None:
+            block, coordinates = culled
+            if coordinates is not None:
+                self.get_distance_numpy(*coordinates, out=out[block])
+            return out
+        with widened(self.r):
+            da = distance_into(self.a, x, y, z, out)
+            db = distance_into(self.b, x, y, z, distance_buffer(x, y, z))
+        # h = clip(0.5 - 0.5 * (db - da) / r, 0, 1)
+        h = np.subtract(db, da)
+        h *= -0.5 / self.r
+        h += 0.5
+        np.clip(h, 0, 1, out=h)
+        # db * (1 - h) + h * da + r * h * (1 - h)
+        da -= db
+        da *= h
+        da += db
+        np.subtract(1, h, out=db)
+        db *= h
+        db *= self.r
+        da += db
+        return da
@@ -1,7 +1,20 @@
 from compas import PRECISION
 
+from compas_vol.utilities import Observable
+from compas_vol.utilities import bounding_box
+from compas_vol.utilities import cull_block
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_buffer
+from compas_vol.utilities import distance_interval
+from compas_vol.utilities import distance_into
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import expand_box
+from compas_vol.utilities import interval_max
+from compas_vol.utilities import tree_to_data
+from compas_vol.utilities import widened
 
-class SmoothSubtraction(object):
+
+class SmoothSubtraction(Observable):
     """The smooth union between two volumetric objects.
 
     Parameters
@@ -26,9 +39,35 @@ class SmoothSubtraction(object):
         self.b = b
         self.r = r
 
+    @property
+    def data(self):
+        return {'a': self.a, 'b': self.b, 'r': self.r}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['a'], data['b'], data['r'])
+
     def __repr__(self):
         return 'SmoothSubtraction({0},{1},{2:.{3}f})'.format(str(self.a), str(self.b), self.r, PRECISION[:1])
 
+    def get_bounding_box(self):
+        """
+        box of a, as the smooth subtraction is no less than the distances of a
+        """
+        return bounding_box(self.a)
+
+    def get_distance_interval(self, box):
+        """
+        interval of the subtraction of b from a, with the upper bound raised by r / 4,
+        the most the smooth subtraction exceeds the subtraction
+        """
+        d = interval_max(distance_interval(self.a, box), -distance_interval(self.b, box))
+        return d.lo, d.hi + abs(self.r) / 4.0
+
     def get_distance(self, point):
         """
         single point distance function
@@ -39,13 +78,36 @@ class SmoothSubtraction(object):
         h = min(max(0.5 - 0.5 * (da + db) / k, 0), 1)
         return (da * (1 - h) + h * -db) + k * h * (1 - h)
 
-    def get_distance_numpy(self, x, y, z):
+    get_distance_points = distance_points
+
+    def get_distance_numpy(self, x, y, z, out=None):
         """
         vectorized distance function
+
+        The result is computed in place, into ``out`` if given.
+        Inside :func:`compas_vol.utilities.culling`, the object to subtract is evaluated only within r of its
+        bounding box, and elsewhere the distances of the first object are kept as a lower bound.
         """
         import numpy as np
 
-        da = self.a.get_distance_numpy(x, y, z)
-        db = self.b.get_distance_numpy(x, y, z)
-        h = np.minimum(np.maximum(0.5 - 0.5 * (da + db)/self.r, 0), 1)
-        return (da * (1 - h) + h * -db) + self.r * h * (1 - h)
+        with widened(self.r):
+            out = distance_into(self.a, x, y, z, distance_buffer(x, y, z, out))
+            box = expand_box(bounding_box(self.b), self.r)
+            block, coordinates = cull_block(box, None, x, y, z, out) or (Ellipsis, (x, y, z))
+            if coordinates is None:
+                return out
+            da = out[block]
+            db = distance_into(self.b, *coordinates, out=distance_buffer(*coordinates))
+        # h = clip(0.5 - 0.5 * (da + db) / r, 0, 1)
+        db += da
+        h = np.multiply(db, -0.5 / self.r)
+        h += 0.5
+        np.clip(h, 0, 1, out=h)
+        # da * (1 - h) - h * db + r * h * (1 - h) = da - h * (da + db) + r * h * (1 - h)
+        db *= h
+        da -= db
+        np.subtract(1, h, out=db)
+        db *= h
+        db *= self.r
+        da += db
+        return out
@@ -1,7 +1,21 @@
 from compas import PRECISION
 
+from compas_vol.utilities import Observable
+from compas_vol.utilities import bounding_box
+from compas_vol.utilities import cull_block
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_buffer
+from compas_vol.utilities import distance_interval
+from compas_vol.utilities import distance_into
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import expand_box
+from compas_vol.utilities import interval_min
+from compas_vol.utilities import tree_to_data
+from compas_vol.utilities import union_box
+from compas_vol.utilities import widened
 
-class SmoothUnion(object):
+
+class SmoothUnion(Observable):
     """The smooth union between two volumetric objects.
 
     Parameters
@@ -26,6 +40,18 @@ class SmoothUnion(object):
         self.b = b
         self.r = r
 
+    @property
+    def data(self):
+        return {'a': self.a, 'b': self.b, 'r': self.r}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['a'], data['b'], data['r'])
+
     def __repr__(self):
         return 'SmoothUnion({0},{1},{2:.{3}f})'.format(str(self.a), str(self.b), self.r, PRECISION[:1])
 
@@ -35,6 +61,19 @@ class SmoothUnion(object):
         e = max(self.r - abs(da - db), 0)
         return min(da, db) - e**2 * 0.25 / self.r
 
+    def get_bounding_box(self):
+        """
+        union of the boxes of a and b, grown by r / 4, the most the smooth union falls below the union
+        """
+        return expand_box(union_box([bounding_box(self.a), bounding_box(self.b)]), self.r / 4.0)
+
+    def get_distance_interval(self, box):
+        """
+        minimum of the intervals of a and b, with the lower bound lowered by r / 4
+        """
+        d = interval_min(distance_interval(self.a, box), distance_interval(self.b, box))
+        return d.lo - abs(self.r) / 4.0, d.hi
+
     def get_distance(self, point):
         """
         single point distance function
@@ -45,13 +84,40 @@ class SmoothUnion(object):
         h = min(max(0.5 + 0.5 * (db - da) / k, 0), 1)
         return (db * (1 - h) + h * da) - k * h * (1 - h)
 
-    def get_distance_numpy(self, x, y, z):
+    get_distance_points = distance_points
+
+    def get_distance_numpy(self, x, y, z, out=None):
         """
         vectorized distance function
+
+        The result is computed in place, into ``out`` if given.
+        Inside :func:`compas_vol.utilities.culling`, it is computed only within r of the bounding boxes.
         """
         import numpy as np
 
-        da = self.a.get_distance_numpy(x, y, z)
-        db = self.b.get_distance_numpy(x, y, z)
-        h = np.minimum(np.maximum(0.5 + 0.5 * (db - da)/self.r, 0), 1)
-        return (db * (1 - h) + h * da) - self.r * h * (1 - h)
+        out = distance_buffer(x, y, z, out)
+        box = union_box([bounding_box(self.a), bounding_box(self.b)])
+        # away from both objects, the smooth union is at most r / 4 below the distance to the boxes
+        culled = cull_block(expand_box(box, self.r), [box], x, y, z, out, -0.25 * self.r)
+        if culled is not None:
+            block, coordinates = culled
+            if coordinates is not None:
+                self.get_distance_numpy(*coordinates, out=out[block])
+            return out
+        with widened(self.r):
+            da = distance_into(self.a, x, y, z, out)
+            db = distance_into(self.b, x, y, z, distance_buffer(x, y, z))
+        # h = clip(0.5 + 0.5 * (db - da) / r, 0, 1)
+        h = np.subtract(db, da)
+        h *= 0.5 / self.r
+        h += 0.5
+        np.clip(h, 0, 1, out=h)
+        # db * (1 - h) + h * da - r * h * (1 - h)
+        da -= db
+        da *= h
+        da += db
+        np.subtract(1, h, out=db)
+        db *= h
+        db *= self.r
+        da -= db
+        return da
@@ -2,7 +2,20 @@ from compas import PRECISION
 from math import log
 from compas.geometry import Point
 
-class SmoothUnionList(object):
+from compas_vol.utilities import Interval
+from compas_vol.utilities import Observable
+from compas_vol.utilities import bounding_box
+from compas_vol.utilities import culling
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_buffer
+from compas_vol.utilities import distance_interval
+from compas_vol.utilities import distance_into
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import expand_box
+from compas_vol.utilities import tree_to_data
+from compas_vol.utilities import union_box
+
+class SmoothUnionList(Observable):
     """The smooth union of a list of volumetric objects.
 
     Parameters
@@ -19,9 +32,37 @@ class SmoothUnionList(object):
         self.distance_objects = a
         self.k = k
 
+    @property
+    def data(self):
+        return {'distance_objects': self.distance_objects, 'k': self.k}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(list(data['distance_objects']), data['k'])
+
     def __repr__(self):
-        return ''
+        obj_strings = [str(o) for o in self.distance_objects]
+        return 'SmoothUnionList([{0}],{1:.{2}f})'.format(', '.join(obj_strings), self.k, PRECISION[:1])
     
+    def get_bounding_box(self):
+        """
+        union of the boxes of the objects, grown by log2(n) / k,
+        the most the smooth union of n objects falls below their union
+        """
+        box = union_box(bounding_box(o) for o in self.distance_objects)
+        return expand_box(box, log(len(self.distance_objects), 2) / self.k)
+
+    def get_distance_interval(self, box):
+        """
+        smooth union of the bounds of the intervals of the objects, as it increases with every distance
+        """
+        s = sum(((distance_interval(o, box) * -self.k).exp2() for o in self.distance_objects), Interval(0))
+        return tuple(s.log2() * (-1.0 / self.k))
+
     def get_distance(self, point):
         """
         single point distance function
@@ -37,9 +78,27 @@ class SmoothUnionList(object):
             res += pow(2, -self.k * d)
         return -log(res, 2) / self.k
 
-    def get_distance_numpy(self, x, y, z):
+    get_distance_points = distance_points
+
+    def get_distance_numpy(self, x, y, z, out=None):
+        """
+        vectorized distance function
+
+        The result is computed in place, into ``out`` if given.
+        Inside :func:`compas_vol.utilities.culling`, culling is switched off for the children.
+        """
         import numpy as np
 
-        distances = np.array([o.get_distance_numpy(x, y, z) for o in self.distance_objects]).T
-        res = np.sum(np.power(2, np.full((distances.shape), -self.k) * distances), axis=3)
-        return -np.log2(res)/self.k
+        with culling(None):
+            out = distance_into(self.distance_objects[0], x, y, z, distance_buffer(x, y, z, out))
+            out *= -self.k
+            np.exp2(out, out=out)
+            if len(self.distance_objects) > 1:
+                scratch = distance_buffer(x, y, z)
+                for o in self.distance_objects[1:]:
+                    distance_into(o, x, y, z, scratch)
+                    scratch *= -self.k
+                    out += np.exp2(scratch, out=scratch)
+        np.log2(out, out=out)
+        out *= -1.0 / self.k
+        return out
@@ -1,4 +1,16 @@
-class Subtraction(object):
+from compas_vol.utilities import Observable
+from compas_vol.utilities import bounding_box
+from compas_vol.utilities import cull_block
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_buffer
+from compas_vol.utilities import distance_interval
+from compas_vol.utilities import distance_into
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import interval_max
+from compas_vol.utilities import tree_to_data
+
+
+class Subtraction(Observable):
     """The Boolean subtraction of one volumetric object from another volumetric object.
 
     Parameters
@@ -20,9 +32,33 @@ class Subtraction(object):
         self.a = a
         self.b = b
 
+    @property
+    def data(self):
+        return {'a': self.a, 'b': self.b}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['a'], data['b'])
+
     def __repr__(self):
         return 'Subtraction({},{})'.format(str(self.a), str(self.b))
 
+    def get_bounding_box(self):
+        """
+        box of a, as the subtraction is no less than the distances of a
+        """
+        return bounding_box(self.a)
+
+    def get_distance_interval(self, box):
+        """
+        maximum of the interval of a and the negated interval of b
+        """
+        return tuple(interval_max(distance_interval(self.a, box), -distance_interval(self.b, box)))
+
     def get_distance(self, point):
         """
         single point distance function
@@ -31,12 +67,23 @@ class Subtraction(object):
         db = self.b.get_distance(point)
         return max(da, -db)
 
-    def get_distance_numpy(self, x, y, z):
+    get_distance_points = distance_points
+
+    def get_distance_numpy(self, x, y, z, out=None):
         """
         vectorized distance function
+
+        The result is computed in place, into ``out`` if given.
+        Inside :func:`compas_vol.utilities.culling`, the object to subtract is evaluated only near its bounding box,
+        and elsewhere the distances of the first object are kept as a lower bound.
         """
         import numpy as np
 
-        da = self.a.get_distance_numpy(x, y, z)
-        db = self.b.get_distance_numpy(x, y, z)
-        return np.maximum(da, -db)
+        out = distance_into(self.a, x, y, z, distance_buffer(x, y, z, out))
+        block, coordinates = cull_block(bounding_box(self.b), None, x, y, z, out) or (Ellipsis, (x, y, z))
+        if coordinates is None:
+            return out
+        db = distance_into(self.b, *coordinates, out=distance_buffer(*coordinates))
+        np.negative(db, out=db)
+        np.maximum(out[block], db, out=out[block])
+        return out
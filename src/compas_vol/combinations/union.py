@@ -1,4 +1,17 @@
-class Union(object):
+from compas_vol.utilities import Observable
+from compas_vol.utilities import bounding_box
+from compas_vol.utilities import cull_union
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_buffer
+from compas_vol.utilities import distance_interval
+from compas_vol.utilities import distance_into
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import interval_min
+from compas_vol.utilities import tree_to_data
+from compas_vol.utilities import union_box
+
+
+class Union(Observable):
     """The Boolean union between two or more volumetric objects.
 
     Parameters
@@ -28,10 +41,34 @@ class Union(object):
         """
         self.objs.append(o)
 
+    @property
+    def data(self):
+        return {'objs': self.objs}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(list(data['objs']))
+
     def __repr__(self):
         obj_strings = [str(o) for o in self.objs]
         return 'Union([{}])'.format(', '.join(obj_strings))
 
+    def get_bounding_box(self):
+        """
+        union of the boxes of the objects, or None if any of them is unbounded
+        """
+        return union_box(bounding_box(o) for o in self.objs)
+
+    def get_distance_interval(self, box):
+        """
+        minimum of the intervals of the objects
+        """
+        return tuple(interval_min(*(distance_interval(o, box) for o in self.objs)))
+
     def get_distance(self, point):
         """
         single point distance function
@@ -39,13 +76,24 @@ class Union(object):
         ds = [o.get_distance(point) for o in self.objs]
         return min(ds)
 
-    def get_distance_numpy(self, x, y, z):
+    get_distance_points = distance_points
+
+    def get_distance_numpy(self, x, y, z, out=None):
         """
         vectorized distance function
+
+        The children are evaluated one at a time and reduced in place, into ``out`` if given,
+        so that only two arrays of distances are held whatever the number of children.
+        Inside :func:`compas_vol.utilities.culling`, each child is evaluated only near its bounding box.
         """
         import numpy as np
 
-        distances = ([o.get_distance_numpy(x, y, z) for o in self.objs])
-        return np.minimum.reduce(distances)
-        # alternative:
-        # d = np.asarray([o.get_distance_numpy(x, y, z) for o in self.objs]).min(axis=0)
+        out = distance_buffer(x, y, z, out)
+        if cull_union(self.objs, x, y, z, out) is not None:
+            return out
+        out = distance_into(self.objs[0], x, y, z, distance_buffer(x, y, z, out))
+        if len(self.objs) > 1:
+            scratch = distance_buffer(x, y, z)
+            for o in self.objs[1:]:
+                np.minimum(out, distance_into(o, x, y, z, scratch), out=out)
+        return out
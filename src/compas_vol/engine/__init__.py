@@ -0,0 +1,58 @@
+"""
+********************************************************************************
+compas_vol.engine
+********************************************************************************
+
+.. currentmodule:: compas_vol.engine
+
+.. autosummary::
+    :toctree: generated/
+    :nosignatures:
+
+    caching
+    compile
+    compile_points
+    evaluate_points
+    get_cache
+    Grid
+    GridCache
+    IncrementalEvaluator
+    Kernel
+    PointKernel
+    ProcessEvaluator
+    set_cache
+    SharedArray
+    ThreadEvaluator
+
+"""
+from .cache import caching
+from .cache import get_cache
+from .cache import GridCache
+from .cache import set_cache
+from .compiler import compile
+from .compiler import Kernel
+from .grid import Grid
+from .incremental import IncrementalEvaluator
+from .jit import compile_points
+from .jit import PointKernel
+from .points import evaluate_points
+from .processes import ProcessEvaluator
+from .processes import SharedArray
+from .threads import ThreadEvaluator
+
+__all__ = [
+    'caching',
+    'compile',
+    'compile_points',
+    'evaluate_points',
+    'get_cache',
+    'Grid',
+    'GridCache',
+    'IncrementalEvaluator',
+    'Kernel',
+    'PointKernel',
+    'ProcessEvaluator',
+    'set_cache',
+    'SharedArray',
+    'ThreadEvaluator'
+]
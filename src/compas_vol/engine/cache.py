@@ -0,0 +1,273 @@
+from __future__ import division
+
+import hashlib
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+
+from compas_vol.utilities.structure import structural_key
+
+
+__all__ = [
+    'GridCache',
+    'caching',
+    'get_cache',
+    'set_cache'
+]
+
+
+#: The version of the keys, to be increased when the evaluated distances of a tree change.
+CACHE_VERSION = 1
+
+_DEFAULT = [None]
+_LOCAL = threading.local()
+
+
+class GridCache(object):
+    """A content-addressed cache of evaluated grids in a directory, shared between sessions and processes.
+
+    Each entry is a ``.npy`` file named by the SHA-256 hash of the :func:`compas_vol.utilities.structural_key`
+    of the tree, the bounds, the number of samples and the type of the grid, and whether it was culled.
+    Hits are opened as copy-on-write memory maps, so that they are paged in as they are read and
+    callers may write into them without changing the entry. New entries are evaluated into a
+    temporary memory-mapped file that is renamed into place when it is complete, so that concurrent
+    processes never see partial entries; two processes that miss the same key both evaluate it, and the
+    last rename wins. Hits update the modification time of their file, and the least recently used
+    entries are removed when the size of the directory exceeds ``max_bytes``.
+
+    Parameters
+    ----------
+    directory : str, optional
+        The directory of the entries, created if it does not exist. Defaults to the
+        environment variable ``COMPAS_VOL_CACHE``, or ``~/.cache/compas_vol``.
+    max_bytes : int, optional
+        The size of the directory above which entries are evicted.
+
+    Examples
+    --------
+    >>> import tempfile
+    >>> from compas.geometry import Point, Sphere
+    >>> from compas_vol.engine import Grid
+    >>> from compas_vol.primitives import VolSphere
+    >>> cache = GridCache(tempfile.mkdtemp())
+    >>> grid = Grid([(-5, 5), (-5, 5), (-5, 5)], resolution=50)
+    >>> with caching(cache):
+    ...     a = grid.evaluate(VolSphere(Sphere(Point(0, 0, 0), 3)))
+    ...     b = grid.evaluate(VolSphere(Sphere(Point(0, 0, 0), 3)))
+    >>> len(cache), cache.hits, cache.misses
+    (1, 1, 1)
+    """
+
+    def __init__(self, directory=None, max_bytes=1 << 32):
+        if directory is None:
+            directory = os.environ.get('COMPAS_VOL_CACHE') or os.path.join(os.path.expanduser('~'), '.cache', 'compas_vol')
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory, exist_ok=True)
+
+    def __repr__(self):
+        return 'GridCache({!r}, max_bytes={})'.format(self.directory, self.max_bytes)
+
+    def __len__(self):
+        return len(self._entries())
+
+    @property
+    def nbytes(self):
+        """int : The size of the entries in bytes."""
+        return sum(size for _, size, _ in self._entries())
+
+    def key(self, tree, grid, cull=False):
+        """The hexadecimal key of the distances of a tree over a grid.
+
+        Parameters
+        ----------
+        tree : volumetric object
+            The object.
+        grid : :class:`compas_vol.engine.Grid`
+            The grid.
+        cull : bool, optional
+            Whether the distances are evaluated with culling, which makes them approximate away from the surface.
+
+        Returns
+        -------
+        str
+            The key.
+        """
+        import numpy as np
+
+        parts = (CACHE_VERSION, structural_key(tree), grid.min, grid.max, grid.shape, np.dtype(grid.dtype).name, grid.cull_margin if cull else None)
+        return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        """The path of the file of an entry."""
+        return os.path.join(self.directory, key + '.npy')
+
+    # ==========================================================================
+    # entries
+    # ==========================================================================
+
+    def get(self, tree, grid, cull=False):
+        """The cached distances of a tree over a grid.
+
+        Returns
+        -------
+        numpy memmap or None
+            A copy-on-write memory map of the distances, or None if they are not cached.
+        """
+        import numpy as np
+        from numpy.lib.format import open_memmap
+
+        path = self.path(self.key(tree, grid, cull))
+        try:
+            out = open_memmap(path, mode='c')
+            os.utime(path, None)
+        except (IOError, OSError, ValueError):
+            return None
+        if tuple(out.shape) != grid.shape or out.dtype != np.dtype(grid.dtype):
+            return None
+        return out
+
+    def evaluate(self, tree, grid, evaluate=None, cull=False):
+        """The distances of a tree over a grid, from the cache or evaluated into it.
+
+        Parameters
+        ----------
+        tree : volumetric object
+            The object.
+        grid : :class:`compas_vol.engine.Grid`
+            The grid.
+        evaluate : callable, optional
+            A function evaluating the distances into the array it is passed.
+            Defaults to :meth:`compas_vol.engine.Grid.evaluate`.
+        cull : bool, optional
+            Whether the distances are evaluated with culling.
+
+        Returns
+        -------
+        numpy memmap
+            A copy-on-write memory map of the distances.
+        """
+        from numpy.lib.format import open_memmap
+
+        out = self.get(tree, grid, cull)
+        if out is not None:
+            self.hits += 1
+            return out
+        self.misses += 1
+        if evaluate is None:
+            def evaluate(out):
+                return grid.evaluate(tree, out=out, cull=cull)
+
+        key = self.key(tree, grid, cull)
+        temporary = os.path.join(self.directory, '.{}.{}.npy'.format(key, uuid.uuid4().hex))
+        try:
+            out = grid.memmap(temporary)
+            evaluate(out)
+            out.flush()
+            del out
+            os.replace(temporary, self.path(key))
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        # mapped before any eviction, so that the entry stays readable if another process removes it
+        out = open_memmap(self.path(key), mode='c')
+        self.evict(keep=key)
+        return out
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.startswith('.') or not name.endswith('.npy'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name[:-4]))
+        return entries
+
+    def evict(self, keep=None):
+        """Remove the least recently used entries until the entries fit in :attr:`max_bytes`.
+
+        Parameters
+        ----------
+        keep : str, optional
+            The key of an entry that is not removed.
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                # removed by another process, or still mapped on platforms that forbid it
+                continue
+            total -= size
+
+    def clear(self):
+        """Remove all entries."""
+        for _, _, key in self._entries():
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass
+
+
+# ==============================================================================
+# the active cache
+# ==============================================================================
+
+
+def get_cache():
+    """The cache that evaluations of grids read from and write to.
+
+    Returns
+    -------
+    :class:`GridCache` or None
+        The cache of the current thread set with :func:`caching`, or the default set with :func:`set_cache`.
+    """
+    cache = getattr(_LOCAL, 'cache', None)
+    return _DEFAULT[0] if cache is None else cache
+
+
+def set_cache(cache):
+    """Set the default cache of all threads.
+
+    Parameters
+    ----------
+    cache : :class:`GridCache` or str or None
+        The cache, the directory of a new cache, or None to disable caching.
+    """
+    _DEFAULT[0] = GridCache(cache) if isinstance(cache, str) else cache
+
+
+@contextmanager
+def caching(cache=None):
+    """Context manager caching the grids evaluated by the current thread.
+
+    Inside the context, :meth:`compas_vol.engine.Grid.evaluate` and :meth:`compas_vol.engine.ThreadEvaluator.evaluate`
+    without an output array, :func:`compas_vol.meshing.chunked_marching_cubes` of a tree, and the functions built on them,
+    such as :func:`compas_vol.utilities.get_iso_vfs`, return the distances from the cache if they are in it,
+    and add them to it otherwise.
+
+    Parameters
+    ----------
+    cache : :class:`GridCache` or str, optional
+        The cache, or the directory of a new cache. Defaults to a cache in the default directory.
+    """
+    if not isinstance(cache, GridCache):
+        cache = GridCache(cache)
+    previous = getattr(_LOCAL, 'cache', None)
+    _LOCAL.cache = cache
+    try:
+        yield cache
+    finally:
+        _LOCAL.cache = previous
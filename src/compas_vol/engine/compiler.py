@@ -0,0 +1,839 @@
+import threading
+import weakref
+
+from compas_vol.combinations import Addition
+from compas_vol.combinations import Blend
+from compas_vol.combinations import Division
+from compas_vol.combinations import Intersection
+from compas_vol.combinations import Morph
+from compas_vol.combinations import Multiplication
+from compas_vol.combinations import SmoothIntersection
+from compas_vol.combinations import SmoothSubtraction
+from compas_vol.combinations import SmoothUnion
+from compas_vol.combinations import SmoothUnionList
+from compas_vol.combinations import Subtraction
+from compas_vol.combinations import Union
+from compas_vol.modifications import Factor
+from compas_vol.modifications import MultiShell
+from compas_vol.modifications import Overlay
+from compas_vol.modifications import Shell
+from compas_vol.modifications import Sine
+from compas_vol.modifications.transformation import VolTransformation
+from compas_vol.primitives import VolBox
+from compas_vol.primitives import VolCapsule
+from compas_vol.primitives import VolCone
+from compas_vol.primitives import VolCylinder
+from compas_vol.primitives import VolEgg
+from compas_vol.primitives import VolEllipsoid
+from compas_vol.primitives import VolPlane
+from compas_vol.primitives import VolPolyhedron
+from compas_vol.primitives import VolSphere
+from compas_vol.primitives import VolTorus
+
+
+__all__ = [
+    'compile',
+    'Kernel'
+]
+
+
+_KERNELS = {}
+_LOWERINGS = {}
+
+
+def lowering(*classes):
+    """Register the decorated function as the lowering rule of one or more node classes."""
+    def decorator(func):
+        for cls in classes:
+            _LOWERINGS[cls] = func
+        return func
+    return decorator
+
+
+def compile(tree):
+    """Compile a tree of distance objects into a fused NumPy kernel.
+
+    Compiled kernels are cached per tree. A cached kernel is reused as long as
+    none of the parameters of the nodes in the tree have changed since it was compiled.
+
+    Parameters
+    ----------
+    tree : volumetric object
+        The root of the tree of distance objects.
+
+    Returns
+    -------
+    :class:`compas_vol.engine.Kernel`
+        The compiled kernel.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from compas.geometry import Point, Sphere
+    >>> from compas_vol.primitives import VolSphere
+    >>> from compas_vol.combinations import Union
+    >>> u = Union(VolSphere(Sphere(Point(0, 0, 0), 3)), VolSphere(Sphere(Point(2, 0, 0), 3)))
+    >>> x, y, z = np.ogrid[-5:5:20j, -5:5:20j, -5:5:20j]
+    >>> kernel = compile(u)
+    >>> np.allclose(kernel(x, y, z), u.get_distance_numpy(x, y, z))
+    True
+    """
+    key = id(tree)
+    entry = _KERNELS.get(key)
+    if entry is not None:
+        ref, kernel = entry
+        if ref() is tree and kernel.fingerprint == fingerprint(tree):
+            return kernel
+    kernel = Kernel(tree)
+    _KERNELS[key] = (weakref.ref(tree, lambda _, key=key, kernels=_KERNELS: kernels.pop(key, None)), kernel)
+    return kernel
+
+
+def fingerprint(obj):
+    """Snapshot of all parameters of a tree of distance objects, used to detect changes."""
+    if isinstance(obj, (int, float, str, bool)) or obj is None:
+        return obj
+    if isinstance(obj, (list, tuple)):
+        return tuple(fingerprint(o) for o in obj)
+    if isinstance(obj, dict):
+        return tuple((k, fingerprint(v)) for k, v in sorted(obj.items()))
+    if hasattr(obj, 'get_distance_numpy'):
+        return (obj.__class__.__name__, id(obj), fingerprint(vars(obj)))
+    if hasattr(obj, 'tobytes'):
+        return (obj.__class__.__name__, getattr(obj, 'shape', None), obj.tobytes())
+    if hasattr(obj, 'data'):
+        return (obj.__class__.__name__, fingerprint(obj.data))
+    return repr(obj)
+
+
+class Kernel(object):
+    """A fused evaluation kernel of a tree of distance objects.
+
+    The tree is walked once and lowered into a flat program of in-place NumPy operations
+    on a set of registers. Registers are full-size scratch buffers that are handed back to
+    a pool as soon as their last consumer is done, so that the number of buffers needed grows
+    with the depth of the tree and not with the number of its nodes.
+    Nodes without a lowering rule are evaluated with their own ``get_distance_numpy``.
+
+    Parameters
+    ----------
+    tree : volumetric object
+        The root of the tree of distance objects.
+
+    Attributes
+    ----------
+    tree : volumetric object
+        The root of the tree of distance objects. The kernel only holds a weak reference to it.
+    program : list
+        The flat list of operations.
+    nbuffers : int
+        The number of full-size scratch buffers needed to run the program, including the result.
+    cache_buffers : bool
+        If True, the scratch buffers are kept between calls with the same shape and dtype.
+        Defaults to False, so that no grid-sized memory outlives a call.
+    """
+
+    cache_buffers = False
+
+    def __init__(self, tree):
+        self._tree = weakref.ref(tree)
+        self.name = tree.__class__.__name__
+        self.fingerprint = fingerprint(tree)
+        self.program = []
+        self._registers = 3
+        self._pooled = []
+        self._free = []
+        self._pool = None
+        self._lock = threading.Lock()
+        self.result = self.lower(tree, (0, 1, 2))
+
+    def __repr__(self):
+        return 'Kernel({}, {} operations, {} buffers)'.format(self.name, len(self.program), self.nbuffers)
+
+    @property
+    def tree(self):
+        return self._tree()
+
+    @property
+    def nbuffers(self):
+        return len(self._pooled)
+
+    # ==========================================================================
+    # lowering
+    # ==========================================================================
+
+    def alloc(self):
+        """Allocate a full-size register."""
+        if self._free:
+            return self._free.pop()
+        index = self._registers
+        self._registers += 1
+        self._pooled.append(index)
+        return index
+
+    def free(self, *registers):
+        """Hand registers back to the pool."""
+        for r in registers:
+            if r in self._pooled and r not in self._free:
+                self._free.append(r)
+
+    def virtual(self):
+        """Allocate a register that is assigned during execution instead of being backed by a pooled buffer."""
+        index = self._registers
+        self._registers += 1
+        return index
+
+    def emit(self, op):
+        self.program.append(op)
+
+    def lower(self, node, c):
+        """Lower a node evaluated at the coordinate registers ``c`` and return the register of its result."""
+        rule = _LOWERINGS.get(type(node), _lower_fallback)
+        return rule(node, self, c)
+
+    def transform(self, matrix, c):
+        """Lower an affine transformation of the coordinate registers ``c``.
+
+        Returns
+        -------
+        tuple
+            The transformed coordinate registers and whether they are full-size registers owned by the caller.
+        """
+        m = [[float(v) for v in row] for row in matrix[:3]]
+        rotation = [row[:3] for row in m]
+        translation = [row[3] for row in m]
+        if rotation == [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]:
+            if translation == [0.0, 0.0, 0.0]:
+                return c, False
+            t = (self.virtual(), self.virtual(), self.virtual())
+
+            def op(r):
+                for i in range(3):
+                    r[t[i]] = r[c[i]] + translation[i]
+            self.emit(op)
+            return t, False
+
+        import numpy as np
+
+        t = (self.alloc(), self.alloc(), self.alloc())
+
+        def op(r):
+            x, y, z = r[c[0]], r[c[1]], r[c[2]]
+            for i in range(3):
+                a, b, d, e = m[i]
+                buf = r[t[i]]
+                np.multiply(x, a, out=buf)
+                buf += y * b
+                buf += z * d
+                buf += e
+        self.emit(op)
+        return t, True
+
+    # ==========================================================================
+    # execution
+    # ==========================================================================
+
+    def __call__(self, x, y, z, out=None):
+        """Evaluate the kernel.
+
+        Parameters
+        ----------
+        x,y,z: `numpy arrays, np.ogrid[]`
+            The coordinates of all the points in R:sup:`3` space to query for their distances.
+            The shapes are ``x: (nx, 1, 1), y: (1, ny, 1), z: (1, 1, nz)``
+        out : numpy array, optional
+            Array of the broadcast shape of ``x, y, z`` to write the result into.
+
+        Returns
+        -------
+        numpy array of floats, shape (nx, ny, nz)
+            The distances from the query points to the surface of the object.
+        """
+        import numpy as np
+
+        x, y, z = np.asarray(x), np.asarray(y), np.asarray(z)
+        shape = np.broadcast(x, y, z).shape
+        dtype = np.result_type(x, y, z, np.float32)
+        if out is None:
+            out = np.empty(shape, dtype=dtype)
+        pool = self._acquire(shape, dtype)
+        r = [None] * self._registers
+        r[0], r[1], r[2] = x, y, z
+        for index, buf in zip(self._pooled, pool):
+            r[index] = buf
+        r[self.result] = out
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for op in self.program:
+                op(r)
+        self._release(shape, dtype, pool)
+        return out
+
+    def _acquire(self, shape, dtype):
+        import numpy as np
+
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is None or pool[0] != (shape, dtype):
+            return [np.empty(shape, dtype=dtype) for _ in self._pooled]
+        return pool[1]
+
+    def _release(self, shape, dtype, pool):
+        if not self.cache_buffers:
+            return
+        with self._lock:
+            self._pool = ((shape, dtype), pool)
+
+    def clear(self):
+        """Release the cached scratch buffers."""
+        with self._lock:
+            self._pool = None
+
+
+# ==============================================================================
+# fallback
+# ==============================================================================
+
+
+def _lower_fallback(node, k, c):
+    import numpy as np
+
+    d = k.alloc()
+    # a weak reference, so that cached kernels don't keep their tree alive
+    ref = weakref.ref(node)
+
+    def op(r):
+        obj = ref()
+        if obj is None:
+            raise ReferenceError('The {} evaluated by this kernel no longer exists.'.format(k.name))
+        np.copyto(r[d], obj.get_distance_numpy(r[c[0]], r[c[1]], r[c[2]]))
+    k.emit(op)
+    return d
+
+
+# ==============================================================================
+# primitives
+# ==============================================================================
+
+
+def _squared_difference(out, a, b):
+    import numpy as np
+
+    np.subtract(a, b, out=out)
+    np.multiply(out, out, out=out)
+
+
+@lowering(VolSphere)
+def _lower_sphere(node, k, c):
+    import numpy as np
+
+    cx, cy, cz = (float(v) for v in node.sphere.center)
+    radius = float(node.sphere.radius)
+    d, s = k.alloc(), k.alloc()
+
+    def op(r):
+        _squared_difference(r[d], r[c[0]], cx)
+        _squared_difference(r[s], r[c[1]], cy)
+        r[d] += r[s]
+        _squared_difference(r[s], r[c[2]], cz)
+        r[d] += r[s]
+        np.sqrt(r[d], out=r[d])
+        r[d] -= radius
+    k.emit(op)
+    k.free(s)
+    return d
+
+
+@lowering(VolBox)
+def _lower_box(node, k, c):
+    import numpy as np
+
+    radius = node.radius
+    ex = node.box.xsize / 2.0 - radius
+    ey = node.box.ysize / 2.0 - radius
+    ez = node.box.zsize / 2.0 - radius
+    t, owned = k.transform(node.inversetransform, c)
+    w = t if owned else (k.alloc(), k.alloc(), k.alloc())
+    m = k.alloc()
+
+    def op(r):
+        dx, dy, dz = r[w[0]], r[w[1]], r[w[2]]
+        np.abs(r[t[0]], out=dx)
+        dx -= ex
+        np.abs(r[t[1]], out=dy)
+        dy -= ey
+        np.abs(r[t[2]], out=dz)
+        dz -= ez
+        np.maximum(dx, dy, out=r[m])
+        np.maximum(r[m], dz, out=r[m])
+        np.minimum(r[m], 0, out=r[m])
+        for b in (dx, dy, dz):
+            np.maximum(b, 0, out=b)
+            np.multiply(b, b, out=b)
+        dx += dy
+        dx += dz
+        np.sqrt(dx, out=dx)
+        dx += r[m]
+        dx -= radius
+    k.emit(op)
+    k.free(w[1], w[2], m)
+    return w[0]
+
+
+@lowering(VolCylinder)
+def _lower_cylinder(node, k, c):
+    import numpy as np
+
+    radius = node.cylinder.radius
+    height = node.cylinder.height / 2.0
+    t = k.transform(node.inversetransform, c)[0]
+    d, s = k.alloc(), k.alloc()
+
+    def op(r):
+        np.multiply(r[t[0]], r[t[0]], out=r[d])
+        np.multiply(r[t[1]], r[t[1]], out=r[s])
+        r[d] += r[s]
+        np.sqrt(r[d], out=r[d])
+        r[d] -= radius
+        np.abs(r[t[2]], out=r[s])
+        r[s] -= height
+        np.maximum(r[d], r[s], out=r[d])
+    k.emit(op)
+    k.free(s, *t)
+    return d
+
+
+@lowering(VolTorus)
+def _lower_torus(node, k, c):
+    import numpy as np
+
+    radius_axis = node.torus.radius_axis
+    radius_pipe = node.torus.radius_pipe
+    t = k.transform(node.inversetransform, c)[0]
+    d, s = k.alloc(), k.alloc()
+
+    def op(r):
+        np.multiply(r[t[0]], r[t[0]], out=r[d])
+        np.multiply(r[t[1]], r[t[1]], out=r[s])
+        r[d] += r[s]
+        np.sqrt(r[d], out=r[d])
+        r[d] -= radius_axis
+        np.multiply(r[d], r[d], out=r[d])
+        np.multiply(r[t[2]], r[t[2]], out=r[s])
+        r[d] += r[s]
+        np.sqrt(r[d], out=r[d])
+        r[d] -= radius_pipe
+    k.emit(op)
+    k.free(s, *t)
+    return d
+
+
+@lowering(VolCone)
+def _lower_cone(node, k, c):
+    import numpy as np
+
+    radius = node.cone.radius
+    height = node.cone.height
+    t = k.transform(node.inversedmatrix, c)[0]
+    d, s = k.alloc(), k.alloc()
+
+    def op(r):
+        np.multiply(r[t[0]], r[t[0]], out=r[d])
+        np.multiply(r[t[1]], r[t[1]], out=r[s])
+        r[d] += r[s]
+        np.sqrt(r[d], out=r[d])
+        np.add(r[t[2]], height / 2, out=r[s])
+        r[s] /= height
+        r[s] *= radius
+        np.subtract(radius, r[s], out=r[s])
+        r[d] -= r[s]
+        np.abs(r[t[2]], out=r[s])
+        r[s] -= height / 2
+        np.maximum(r[d], r[s], out=r[d])
+    k.emit(op)
+    k.free(s, *t)
+    return d
+
+
+@lowering(VolEllipsoid)
+def _lower_ellipsoid(node, k, c):
+    import numpy as np
+
+    rx, ry, rz = node.radiusX, node.radiusY, node.radiusZ
+    t = k.transform(node.inversetransform, c)[0]
+    k0, k1, s = k.alloc(), k.alloc(), k.alloc()
+
+    def op(r):
+        for acc, ex in ((k0, 1), (k1, 2)):
+            np.divide(r[t[0]], rx ** ex, out=r[acc])
+            np.multiply(r[acc], r[acc], out=r[acc])
+            for i, radius in ((1, ry), (2, rz)):
+                np.divide(r[t[i]], radius ** ex, out=r[s])
+                np.multiply(r[s], r[s], out=r[s])
+                r[acc] += r[s]
+            np.sqrt(r[acc], out=r[acc])
+        np.subtract(r[k0], 1.0, out=r[s])
+        np.multiply(r[k0], r[s], out=r[k0])
+        zero = r[k1] == 0
+        r[k0] /= r[k1]
+        np.copyto(r[k0], -1, where=zero)
+    k.emit(op)
+    k.free(k1, s, *t)
+    return k0
+
+
+@lowering(VolEgg)
+def _lower_egg(node, k, c):
+    import numpy as np
+
+    ra, rb, f = node.ra, node.rb, node.k
+    t = k.transform(node.inversedmatrix, c)[0]
+    d, s = k.alloc(), k.alloc()
+
+    def op(r):
+        xt, yt, zt = r[t[0]], r[t[1]], r[t[2]]
+        np.multiply(zt, zt, out=r[d])
+        r[d] /= rb * rb
+        np.multiply(yt, yt, out=r[s])
+        r[s] /= ra * ra
+        r[d] += r[s]
+        np.multiply(xt, xt, out=r[s])
+        r[s] /= ra * ra
+        r[s] *= 1 + f * zt
+        r[d] += r[s]
+        r[d] -= 1
+    k.emit(op)
+    k.free(s, *t)
+    return d
+
+
+@lowering(VolCapsule)
+def _lower_capsule(node, k, c):
+    import numpy as np
+
+    a = [float(v) for v in node.segment[0]]
+    b = [float(v) for v in node.segment[1]]
+    ba = [b[i] - a[i] for i in range(3)]
+    baba = sum(v * v for v in ba)
+    radius = node.radius
+    h, d, s = k.alloc(), k.alloc(), k.alloc()
+
+    def op(r):
+        r[h].fill(0)
+        for i in range(3):
+            np.subtract(r[c[i]], a[i], out=r[s])
+            r[s] *= ba[i]
+            r[h] += r[s]
+        r[h] /= baba
+        np.clip(r[h], 0, 1, out=r[h])
+        r[d].fill(0)
+        for i in range(3):
+            np.multiply(r[h], ba[i], out=r[s])
+            np.subtract(r[c[i]], r[s], out=r[s])
+            r[s] -= a[i]
+            np.multiply(r[s], r[s], out=r[s])
+            r[d] += r[s]
+        np.sqrt(r[d], out=r[d])
+        r[d] -= radius
+    k.emit(op)
+    k.free(h, s)
+    return d
+
+
+@lowering(VolPlane)
+def _lower_plane(node, k, c):
+    import numpy as np
+
+    base, normal = node.plane
+    base = [float(v) for v in base]
+    normal = [float(v) for v in normal]
+    d, s = k.alloc(), k.alloc()
+
+    def op(r):
+        np.subtract(r[c[0]], base[0], out=r[d])
+        r[d] *= normal[0]
+        for i in (1, 2):
+            np.subtract(r[c[i]], base[i], out=r[s])
+            r[s] *= normal[i]
+            r[d] += r[s]
+    k.emit(op)
+    k.free(s)
+    return d
+
+
+@lowering(VolPolyhedron)
+def _lower_polyhedron(node, k, c):
+    return _lower_reduction(node.planes, k, c, 'maximum')
+
+
+# ==============================================================================
+# combinations
+# ==============================================================================
+
+
+def _lower_reduction(objs, k, c, ufunc):
+    import numpy as np
+
+    func = getattr(np, ufunc)
+    d = k.lower(objs[0], c)
+    for o in objs[1:]:
+        s = k.lower(o, c)
+
+        def op(r, s=s):
+            func(r[d], r[s], out=r[d])
+        k.emit(op)
+        k.free(s)
+    return d
+
+
+@lowering(Union)
+def _lower_union(node, k, c):
+    return _lower_reduction(node.objs, k, c, 'minimum')
+
+
+@lowering(Intersection)
+def _lower_intersection(node, k, c):
+    return _lower_reduction(node.objs, k, c, 'maximum')
+
+
+@lowering(Addition)
+def _lower_addition(node, k, c):
+    return _lower_reduction(node.objs, k, c, 'add')
+
+
+@lowering(Multiplication)
+def _lower_multiplication(node, k, c):
+    return _lower_reduction([node.a, node.b], k, c, 'multiply')
+
+
+@lowering(Division)
+def _lower_division(node, k, c):
+    return _lower_reduction([node.a, node.b], k, c, 'divide')
+
+
+@lowering(Subtraction)
+def _lower_subtraction(node, k, c):
+    import numpy as np
+
+    da = k.lower(node.a, c)
+    db = k.lower(node.b, c)
+
+    def op(r):
+        np.negative(r[db], out=r[db])
+        np.maximum(r[da], r[db], out=r[da])
+    k.emit(op)
+    k.free(db)
+    return da
+
+
+@lowering(SmoothUnion, SmoothIntersection, SmoothSubtraction)
+def _lower_smooth_combination(node, k, c):
+    import numpy as np
+
+    radius = node.r
+    union = isinstance(node, SmoothUnion)
+    subtraction = isinstance(node, SmoothSubtraction)
+    da = k.lower(node.a, c)
+    db = k.lower(node.b, c)
+    h, g = k.alloc(), k.alloc()
+
+    def op(r):
+        a, b = r[da], r[db]
+        # h = min(max(0.5 +/- 0.5 * (db -/+ da) / r, 0), 1)
+        if subtraction:
+            np.add(a, b, out=r[h])
+        else:
+            np.subtract(b, a, out=r[h])
+        r[h] *= 0.5
+        r[h] /= radius
+        if union:
+            r[h] += 0.5
+        else:
+            np.subtract(0.5, r[h], out=r[h])
+        np.maximum(r[h], 0, out=r[h])
+        np.minimum(r[h], 1, out=r[h])
+        np.subtract(1, r[h], out=r[g])
+        # (first * (1 - h) + h * second) -/+ r * h * (1 - h)
+        if subtraction:
+            first, second = a, b
+            np.negative(second, out=second)
+        else:
+            first, second = b, a
+        first *= r[g]
+        second *= r[h]
+        first += second
+        np.multiply(r[h], radius, out=second)
+        second *= r[g]
+        if union:
+            first -= second
+        else:
+            first += second
+    k.emit(op)
+    if subtraction:
+        k.free(db, h, g)
+        return da
+    k.free(da, h, g)
+    return db
+
+
+@lowering(Morph)
+def _lower_morph(node, k, c):
+    f = node.f
+    da = k.lower(node.a, c)
+    db = k.lower(node.b, c)
+
+    def op(r):
+        r[da] *= 1.0 - f
+        r[db] *= f
+        r[da] += r[db]
+    k.emit(op)
+    k.free(db)
+    return da
+
+
+@lowering(Blend)
+def _lower_blend(node, k, c):
+    import numpy as np
+
+    radius, t = node.r, node.t
+    da = k.lower(node.a, c)
+    db = k.lower(node.b, c)
+    dc = k.lower(node.c, c)
+    s = k.alloc() if t == 1 else None
+
+    def op(r):
+        f = r[dc]
+        f /= radius
+        f += 0.5
+        np.clip(f, 0, 1, out=f)
+        if t == 1:
+            # qf = 2 * f**2 if f < 0.5 else 1 - (-2 * f + 2)**2 / 2
+            low = f < 0.5
+            q = np.multiply(f, f, out=r[s])
+            q *= 2
+            np.multiply(f, -2, out=f)
+            f += 2
+            np.multiply(f, f, out=f)
+            f /= 2
+            np.subtract(1, f, out=f)
+            np.copyto(f, q, where=low)
+        r[db] *= f
+        np.subtract(1, f, out=f)
+        r[da] *= f
+        r[da] += r[db]
+    k.emit(op)
+    k.free(db, dc, s)
+    return da
+
+
+@lowering(SmoothUnionList)
+def _lower_smoothunionlist(node, k, c):
+    import numpy as np
+
+    factor = node.k
+    objs = node.distance_objects
+    d = None
+    for o in objs:
+        s = k.lower(o, c)
+
+        def op(r, s=s, first=d is None):
+            r[s] *= -factor
+            np.power(2.0, r[s], out=r[s])
+            if not first:
+                r[d] += r[s]
+        k.emit(op)
+        if d is None:
+            d = s
+        else:
+            k.free(s)
+
+    def op(r):
+        np.log2(r[d], out=r[d])
+        r[d] /= -factor
+    k.emit(op)
+    return d
+
+
+# ==============================================================================
+# modifications
+# ==============================================================================
+
+
+@lowering(Shell)
+def _lower_shell(node, k, c):
+    import numpy as np
+
+    offset = (node.side - 0.5) * node.thickness
+    half = node.thickness / 2.0
+    d = k.lower(node.o, c)
+
+    def op(r):
+        r[d] += offset
+        np.abs(r[d], out=r[d])
+        r[d] -= half
+    k.emit(op)
+    return d
+
+
+@lowering(MultiShell)
+def _lower_multishell(node, k, c):
+    import numpy as np
+
+    distance = node.distance
+    half = node.thickness / 2
+    d = k.lower(node.o, c)
+    s = k.alloc()
+
+    def op(r):
+        np.remainder(r[d], distance, out=r[d])
+        np.subtract(distance, r[d], out=r[s])
+        np.minimum(r[d], r[s], out=r[d])
+        r[d] -= half
+    k.emit(op)
+    k.free(s)
+    return d
+
+
+@lowering(Factor)
+def _lower_factor(node, k, c):
+    f = node.f
+    d = k.lower(node.o, c)
+
+    def op(r):
+        r[d] *= f
+    k.emit(op)
+    return d
+
+
+@lowering(Sine)
+def _lower_sine(node, k, c):
+    import numpy as np
+
+    d = k.lower(node.o, c)
+
+    def op(r):
+        np.sin(r[d], out=r[d])
+    k.emit(op)
+    return d
+
+
+@lowering(Overlay)
+def _lower_overlay(node, k, c):
+    f = node.f
+    da = k.lower(node.a, c)
+    db = k.lower(node.b, c)
+
+    def op(r):
+        r[db] *= f
+        r[da] += r[db]
+    k.emit(op)
+    k.free(db)
+    return da
+
+
+@lowering(VolTransformation)
+def _lower_transformation(node, k, c):
+    t, owned = k.transform(node.inversetransform, c)
+    d = k.lower(node.distobj, t)
+    if owned:
+        k.free(*t)
+    return d
@@ -0,0 +1,379 @@
+from __future__ import division
+
+import itertools
+import math
+import mmap
+
+from compas_vol.utilities.bounds import culling
+from compas_vol.utilities.buffers import distance_into
+from compas_vol.utilities.precision import get_precision
+from compas_vol.utilities.structure import children
+from compas_vol.utilities.structure import shared_subtrees
+from compas_vol.utilities.transforms import shared_transforms
+
+from .cache import get_cache
+
+
+__all__ = [
+    'Grid',
+    'temporaries'
+]
+
+
+def temporaries(tree):
+    """Estimate the peak number of grid-sized arrays ``tree.get_distance_numpy`` allocates.
+
+    A leaf is counted as :attr:`Grid.temporaries` arrays. Nodes that hold a list of
+    seed points or segments, such as a Voronoi or an extrusion, are counted per item.
+    A combination reduces its children in place into its output and at most two scratch
+    arrays, whatever the number of children, while one child is evaluated at a time.
+    The estimate is a heuristic, not a bound.
+
+    Parameters
+    ----------
+    tree : volumetric object
+        The root of the tree of distance objects.
+
+    Returns
+    -------
+    int
+        The estimated number of arrays.
+    """
+    nodes = list(children(tree))
+    if not nodes:
+        items = getattr(tree, 'points', None) or getattr(tree, 'polyline', None) or ()
+        return Grid.temporaries + 16 * len(items)
+    return 3 + max(temporaries(node) for node in nodes)
+
+
+class Grid(object):
+    """A regular grid of sample points over an axis-aligned bounding box.
+
+    Parameters
+    ----------
+    bounds : list of tuple
+        The bounds of the grid along x, y and z as ``(min, max)`` pairs,
+        or as ``(min, max, num)`` triples as used by :func:`compas_vol.utilities.get_iso_mesh`.
+    resolution : int or tuple of int, optional
+        The number of samples along each axis. Overrides the counts given in ``bounds``.
+    spacing : float or tuple of float, optional
+        The distance between samples along each axis, as an alternative to ``resolution``.
+        The upper bounds are moved down to the last sample that fits.
+    dtype : str or numpy dtype, optional
+        The data type of the evaluated distances. Defaults to the precision set with
+        :func:`compas_vol.utilities.precision`. The coordinates are sampled in single
+        precision for ``'float32'`` grids and in double precision otherwise.
+
+    Attributes
+    ----------
+    shape : tuple of int
+        The number of samples along x, y and z.
+
+    Examples
+    --------
+    >>> from compas.geometry import Point, Sphere
+    >>> from compas_vol.primitives import VolSphere
+    >>> grid = Grid([(-5, 5), (-5, 5), (-5, 5)], resolution=50)
+    >>> d = grid.evaluate(VolSphere(Sphere(Point(0, 0, 0), 3)), chunk_shape=(10, 50, 50))
+    >>> d.shape
+    (50, 50, 50)
+    """
+
+    #: Estimated number of grid-sized temporaries a ``get_distance_numpy`` call of a leaf allocates.
+    temporaries = 8
+
+    #: Memory budget in bytes used to pick the chunk shape if none is given.
+    memory_budget = 1 << 28
+
+    #: The margin of culled evaluations, in samples.
+    cull_samples = 2
+
+    def __init__(self, bounds, resolution=None, spacing=None, dtype=None):
+        if resolution is not None and spacing is not None:
+            raise ValueError('Specify either resolution or spacing, not both.')
+        self.min = tuple(float(b[0]) for b in bounds)
+        self.max = tuple(float(b[1]) for b in bounds)
+        if resolution is not None:
+            if not hasattr(resolution, '__len__'):
+                resolution = (resolution, resolution, resolution)
+            self.shape = tuple(int(n) for n in resolution)
+        elif spacing is not None:
+            if not hasattr(spacing, '__len__'):
+                spacing = (spacing, spacing, spacing)
+            self.shape = tuple(int((b - a) / s + 1e-9) + 1 for a, b, s in zip(self.min, self.max, spacing))
+            self.max = tuple(a + (n - 1) * s for a, n, s in zip(self.min, self.shape, spacing))
+        elif all(len(b) == 3 for b in bounds):
+            self.shape = tuple(int(b[2]) for b in bounds)
+        else:
+            raise ValueError('Specify the number of samples in the bounds, or a resolution or spacing.')
+        if any(n < 2 for n in self.shape):
+            raise ValueError('A grid needs at least two samples along each axis: {}'.format(self.shape))
+        self.dtype = dtype or get_precision()
+
+    def __repr__(self):
+        return 'Grid({}, resolution={}, dtype={})'.format(list(zip(self.min, self.max)), self.shape, self.dtype)
+
+    @property
+    def bounds(self):
+        """list of tuple : The bounds as ``(min, max, num)`` triples."""
+        return [(a, b, n) for a, b, n in zip(self.min, self.max, self.shape)]
+
+    @property
+    def spacing(self):
+        """tuple of float : The distance between samples along x, y and z."""
+        return tuple((b - a) / (n - 1) for a, b, n in zip(self.min, self.max, self.shape))
+
+    @property
+    def size(self):
+        """int : The total number of samples."""
+        nx, ny, nz = self.shape
+        return nx * ny * nz
+
+    @property
+    def coordinate_type(self):
+        """str : The floating point type of the sample coordinates."""
+        import numpy as np
+
+        return 'float32' if np.dtype(self.dtype) == np.float32 else 'float64'
+
+    @property
+    def nbytes(self):
+        """int : The size of the evaluated distances in bytes."""
+        import numpy as np
+
+        return self.size * np.dtype(self.dtype).itemsize
+
+    def axes(self):
+        """The sample coordinates along each axis.
+
+        Returns
+        -------
+        tuple of numpy array
+            The x, y and z coordinates, identical to those of the equivalent :func:`numpy.ogrid`,
+            in the type :attr:`coordinate_type`.
+        """
+        import numpy as np
+
+        dtype = self.coordinate_type
+        return tuple(np.linspace(a, b, n).astype(dtype, copy=False) for a, b, n in zip(self.min, self.max, self.shape))
+
+    def ogrid(self, block=None):
+        """The open mesh of coordinates of the grid, or of a block of it.
+
+        Parameters
+        ----------
+        block : tuple of slice, optional
+            The block of the grid, as returned by :meth:`chunks`.
+
+        Returns
+        -------
+        tuple of numpy array
+            The x, y and z coordinates, of shape (nx, 1, 1), (1, ny, 1) and (1, 1, nz).
+        """
+        x, y, z = self.axes()
+        if block is not None:
+            x, y, z = x[block[0]], y[block[1]], z[block[2]]
+        return x[:, None, None], y[None, :, None], z[None, None, :]
+
+    def chunk_shape(self, memory_budget=None, tree=None):
+        """Pick the largest chunk shape whose evaluation fits in a memory budget.
+
+        Chunks span whole yz-slabs where possible, so that each chunk is a
+        contiguous block of a C-ordered output array.
+
+        Parameters
+        ----------
+        memory_budget : int, optional
+            The number of bytes the evaluation of a single chunk may use.
+            Defaults to :attr:`Grid.memory_budget`.
+        tree : volumetric object, optional
+            The object that will be evaluated, to estimate the memory used per sample
+            with :func:`temporaries`. By default a single leaf is assumed.
+
+        Returns
+        -------
+        tuple of int
+            The chunk shape.
+        """
+        import numpy as np
+
+        if memory_budget is None:
+            memory_budget = self.memory_budget
+        count = self.temporaries if tree is None else temporaries(tree)
+        itemsize = np.dtype(self.coordinate_type).itemsize
+        voxels = max(1, int(memory_budget) // (itemsize * count))
+        nx, ny, nz = self.shape
+        if voxels >= ny * nz:
+            return min(nx, voxels // (ny * nz)), ny, nz
+        if voxels >= nz:
+            return 1, min(ny, voxels // nz), nz
+        return 1, 1, min(nz, voxels)
+
+    def slab_shape(self, count, memory_budget=None, tree=None):
+        """Pick the shape of the slabs along x to split the grid into about ``count`` parts.
+
+        Parameters
+        ----------
+        count : int
+            The number of slabs to aim for, e.g. a few per worker.
+        memory_budget : int, optional
+            The number of bytes the evaluation of a single slab may use.
+            If a whole yz-slab does not fit, smaller blocks are returned.
+        tree : volumetric object, optional
+            The object that will be evaluated, to estimate its memory use.
+
+        Returns
+        -------
+        tuple of int
+            The shape of the slabs.
+        """
+        nx, ny, nz = self.chunk_shape(memory_budget, tree)
+        if (ny, nz) != self.shape[1:]:
+            return nx, ny, nz
+        return min(nx, max(1, -(-self.shape[0] // count))), ny, nz
+
+    def page_aligned(self, chunk_shape, page_size=None):
+        """Round a chunk shape down so that the blocks of a C-ordered array of the grid span whole pages.
+
+        Slabs of whole yz-planes, and rows of whole z-lines within a plane, are rounded to a multiple
+        of the number of planes or lines that fill a memory page, where the chunk is large enough.
+        The blocks of a memory-mapped output then start on page boundaries of its data, so that
+        each page is written by one block, and the blocks follow each other in the file.
+
+        Parameters
+        ----------
+        chunk_shape : tuple of int
+            The chunk shape, e.g. from :meth:`chunk_shape` or :meth:`slab_shape`.
+        page_size : int, optional
+            The size of a memory page in bytes. Defaults to :data:`mmap.PAGESIZE`.
+
+        Returns
+        -------
+        tuple of int
+            The aligned chunk shape.
+        """
+        import numpy as np
+
+        if page_size is None:
+            page_size = mmap.PAGESIZE
+        nx, ny, nz = chunk_shape
+        itemsize = np.dtype(self.dtype).itemsize
+        if (ny, nz) == self.shape[1:]:
+            step = page_size // math.gcd(page_size, ny * nz * itemsize)
+            return (nx - nx % step if nx >= step else nx), ny, nz
+        if nx == 1 and nz == self.shape[2]:
+            step = page_size // math.gcd(page_size, nz * itemsize)
+            return 1, (ny - ny % step if ny >= step else ny), nz
+        return nx, ny, nz
+
+    def chunks(self, chunk_shape=None, memory_budget=None, tree=None):
+        """Iterate over the blocks of the grid.
+
+        Parameters
+        ----------
+        chunk_shape : tuple of int, optional
+            The shape of the blocks. Blocks at the upper bounds may be smaller.
+        memory_budget : int, optional
+            Used to pick the chunk shape if none is given.
+        tree : volumetric object, optional
+            Used to pick the chunk shape if none is given.
+
+        Yields
+        ------
+        tuple of slice
+            The index of the block into the grid.
+        """
+        if chunk_shape is None:
+            chunk_shape = self.chunk_shape(memory_budget, tree)
+        ranges = [range(0, n, c) for n, c in zip(self.shape, chunk_shape)]
+        for start in itertools.product(*ranges):
+            yield tuple(slice(i, min(i + c, n)) for i, c, n in zip(start, chunk_shape, self.shape))
+
+    def empty(self):
+        """Allocate an uninitialised array for the distances over the grid."""
+        import numpy as np
+
+        return np.empty(self.shape, dtype=self.dtype)
+
+    def memmap(self, filename, mode='w+'):
+        """Open a memory-mapped ``.npy`` file for the distances over the grid.
+
+        Parameters
+        ----------
+        filename : str
+            The path of the file.
+        mode : {'w+', 'r+', 'r'}, optional
+            The mode to open the file with. Existing files are opened with their own dtype and shape.
+
+        Returns
+        -------
+        numpy memmap
+            The memory-mapped array.
+        """
+        from numpy.lib.format import open_memmap
+
+        if mode == 'w+':
+            return open_memmap(filename, mode=mode, dtype=self.dtype, shape=self.shape)
+        return open_memmap(filename, mode=mode)
+
+    @property
+    def cull_margin(self):
+        """float : The margin of culled evaluations, :attr:`cull_samples` times the largest spacing."""
+        return self.cull_samples * max(self.spacing)
+
+    def evaluate(self, tree, chunk_shape=None, out=None, memory_budget=None, cull=False):
+        """Evaluate the distance function of a tree over the grid, block by block.
+
+        Each block is evaluated with ``tree.get_distance_numpy`` on the open mesh of
+        its coordinates, so peak memory is bounded by the size of a block rather than the grid.
+        If the output has the type of the coordinates, the distances are written into it directly.
+
+        Parameters
+        ----------
+        tree : volumetric object
+            The object to evaluate.
+        chunk_shape : tuple of int, optional
+            The shape of the blocks.
+        out : numpy array, optional
+            A preallocated or memory-mapped array of :attr:`shape` to write the distances into.
+            The blocks of a :class:`numpy.memmap` are aligned to pages with :meth:`page_aligned`.
+        memory_budget : int, optional
+            The number of bytes the evaluation of a single block may use.
+            Used to pick the chunk shape if none is given, with the memory use
+            of the tree estimated by :func:`temporaries`.
+        cull : bool, optional
+            If True, the children of combinations are evaluated only near their bounding boxes,
+            see :func:`compas_vol.utilities.culling`, with a margin of :attr:`cull_margin`.
+            Distances away from the surface are then approximate.
+
+        Returns
+        -------
+        numpy array
+            The distances, of shape :attr:`shape`. Inside :func:`compas_vol.engine.caching`,
+            a copy-on-write memory map of the cached distances if no output is given.
+        """
+        import numpy as np
+
+        if out is None:
+            cache = get_cache()
+            if cache is not None:
+                return cache.evaluate(tree, self, lambda out: self.evaluate(tree, chunk_shape, out, memory_budget, cull), cull)
+            out = self.empty()
+        elif tuple(out.shape) != self.shape:
+            raise ValueError('Output of shape {} does not match the grid shape {}.'.format(out.shape, self.shape))
+        if chunk_shape is None and isinstance(out, np.memmap):
+            chunk_shape = self.page_aligned(self.chunk_shape(memory_budget, tree))
+        x, y, z = self.axes()
+        inplace = out.dtype == x.dtype
+        margin = self.cull_margin if cull else None
+        for block in self.chunks(chunk_shape, memory_budget, tree):
+            bx, by, bz = block
+            xb, yb, zb = x[bx, None, None], y[None, by, None], z[None, None, bz]
+            with shared_transforms(), shared_subtrees(tree), culling(margin):
+                if inplace:
+                    distance_into(tree, xb, yb, zb, out[block])
+                else:
+                    out[block] = tree.get_distance_numpy(xb, yb, zb)
+        if hasattr(out, 'flush'):
+            out.flush()
+        return out
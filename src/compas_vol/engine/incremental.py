@@ -0,0 +1,217 @@
+from __future__ import division
+
+from compas_vol.utilities.buffers import distance_into
+from compas_vol.utilities.memo import subtree_caching
+from compas_vol.utilities.structure import children
+from compas_vol.utilities.tracking import observe
+from compas_vol.utilities.tracking import unobserve
+from compas_vol.utilities.transforms import shared_transforms
+
+
+__all__ = [
+    'IncrementalEvaluator'
+]
+
+
+class IncrementalEvaluator(object):
+    """Evaluate a tree over a grid again after changes, recomputing only the changed nodes and their ancestors.
+
+    The evaluator keeps the distances of every node of the tree over the grid, and a graph from
+    each node to its parents. Assigning an attribute of a node, such as ``shell.thickness = 2.0``,
+    notifies the evaluator through :func:`compas_vol.utilities.notify_change`, which marks the node
+    and all its ancestors dirty. The next :meth:`evaluate` recomputes only the dirty nodes, block by block,
+    and copies the distances of the clean children from the kept grids.
+
+    Changes that do not assign an attribute of a node, such as changing the radius of the sphere
+    of a :class:`compas_vol.primitives.VolSphere` or appending to the list of a :class:`compas_vol.combinations.Union`,
+    have to be reported with :meth:`touch`. The children of nodes that transform their coordinates,
+    such as a :class:`compas_vol.modifications.Twist`, are evaluated at other coordinates than the grid
+    and are recomputed with their parent. The kept grids take the memory of one grid per node
+    evaluated at the coordinates of the grid.
+
+    Parameters
+    ----------
+    tree : volumetric object
+        The root of the tree.
+    grid : :class:`compas_vol.engine.Grid`
+        The grid.
+    chunk_shape : tuple of int, optional
+        The shape of the blocks the grid is evaluated in.
+
+    Attributes
+    ----------
+    evaluated : int
+        The number of nodes evaluated by the last :meth:`evaluate`.
+    reused : int
+        The number of nodes copied from their kept grids by the last :meth:`evaluate`.
+
+    Examples
+    --------
+    >>> from compas.geometry import Box, Frame, Point, Sphere
+    >>> from compas_vol.combinations import Union
+    >>> from compas_vol.engine import Grid
+    >>> from compas_vol.modifications import Shell
+    >>> from compas_vol.primitives import VolBox, VolSphere
+    >>> shell = Shell(Union(VolSphere(Sphere(Point(5, 6, 0), 9)), VolBox(Box(Frame.worldXY(), 20, 15, 10), 2.5)), 1.0)
+    >>> evaluator = IncrementalEvaluator(shell, Grid([(-15, 15), (-15, 15), (-15, 15)], resolution=40))
+    >>> d = evaluator.evaluate()
+    >>> shell.thickness = 2.0
+    >>> d = evaluator.evaluate()
+    >>> evaluator.evaluated, evaluator.reused
+    (1, 1)
+    """
+
+    def __init__(self, tree, grid, chunk_shape=None):
+        self.tree = tree
+        self.grid = grid
+        self.chunk_shape = chunk_shape
+        self.evaluated = 0
+        self.reused = 0
+        self._grids = {}
+        self._valid = set()
+        self._parents = {}
+        self._dirty = set()
+        self._block = None
+        self._axes = None
+        self._evaluated = set()
+        self._reused = set()
+        self._computed = set()
+        self._written = set()
+        self._graph()
+        observe(self)
+
+    def __repr__(self):
+        return 'IncrementalEvaluator({!r}, {!r})'.format(self.tree, self.grid)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Stop observing changes and release the kept grids."""
+        unobserve(self)
+        self._grids.clear()
+        self._valid.clear()
+
+    @property
+    def nbytes(self):
+        """int : The memory of the kept grids."""
+        return sum(a.nbytes for a in self._grids.values())
+
+    def _graph(self):
+        self._nodes = {}
+        self._parents = {}
+        stack = [self.tree]
+        while stack:
+            node = stack.pop()
+            if id(node) in self._nodes:
+                continue
+            self._nodes[id(node)] = node
+            for child in children(node):
+                self._parents.setdefault(id(child), []).append(node)
+                stack.append(child)
+
+    # ==========================================================================
+    # changes
+    # ==========================================================================
+
+    def changed(self, node, name):
+        """Mark a node of the tree and its ancestors dirty, called by :func:`compas_vol.utilities.notify_change`."""
+        if id(node) in self._nodes and self._nodes[id(node)] is node:
+            self.touch(node)
+
+    def touch(self, node=None):
+        """Mark a node and its ancestors dirty.
+
+        Parameters
+        ----------
+        node : volumetric object, optional
+            The node that changed. Defaults to the root, so that the whole tree is evaluated again.
+        """
+        if node is None:
+            self._valid.clear()
+            node = self.tree
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if id(node) in self._dirty:
+                continue
+            self._dirty.add(id(node))
+            stack.extend(self._parents.get(id(node), ()))
+
+    # ==========================================================================
+    # evaluation
+    # ==========================================================================
+
+    def evaluate(self):
+        """The distances of the tree over the grid, evaluating only the dirty nodes.
+
+        Returns
+        -------
+        numpy array
+            The distances of the root, kept by the evaluator until the next call.
+        """
+        root = id(self.tree)
+        self.evaluated = self.reused = 0
+        if root in self._valid and not self._dirty:
+            return self._grids[root]
+        # children may have been replaced, so that the graph is built again
+        self._graph()
+        self._valid -= self._dirty
+        self._valid &= set(self._nodes)
+        for key in list(self._grids):
+            if key not in self._nodes:
+                del self._grids[key]
+
+        x, y, z = self.grid.axes()
+        self._evaluated, self._reused = set(), set()
+        complete = None
+        try:
+            for block in self.grid.chunks(self.chunk_shape, tree=self.tree):
+                bx, by, bz = block
+                self._block = block
+                self._axes = (x[bx, None, None], y[None, by, None], z[None, None, bz])
+                self._computed, self._written = set(), set()
+                with shared_transforms(), subtree_caching(self):
+                    distance_into(self.tree, *(self._axes + (self._grid(root)[block],)))
+                complete = self._written if complete is None else complete & self._written
+        finally:
+            self._block = self._axes = None
+        self.evaluated, self.reused = len(self._evaluated), len(self._reused)
+        # the kept grids of nodes written in every block are complete
+        self._valid = complete
+        self._dirty.clear()
+        return self._grids[root]
+
+    def _grid(self, key):
+        import numpy as np
+
+        target = self._grids.get(key)
+        if target is None and key in self._nodes:
+            target = self._grids[key] = np.empty(self.grid.shape, dtype=self.grid.dtype)
+        return target
+
+    def into(self, obj, x, y, z, out, evaluate):
+        """Evaluate a node into an array, from its kept grid if it is clean, see :func:`compas_vol.utilities.subtree_caching`."""
+        key = id(obj)
+        axes = self._axes
+        if axes is None or x is not axes[0] or y is not axes[1] or z is not axes[2] or self._nodes.get(key) is not obj:
+            # evaluated at transformed coordinates, or not a node of the tree
+            return evaluate(obj, x, y, z, out)
+        view = self._grid(key)[self._block]
+        if key in self._valid or key in self._computed:
+            # clean, or a node that occurs more than once and was evaluated for this block
+            if out is not view:
+                out[...] = view
+            if key in self._valid:
+                self._reused.add(key)
+        else:
+            out = evaluate(obj, x, y, z, out)
+            if out is not view:
+                view[...] = out
+            self._computed.add(key)
+            self._evaluated.add(key)
+        self._written.add(key)
+        return out
@@ -0,0 +1,988 @@
+import math
+import weakref
+
+from compas_vol.combinations import Addition
+from compas_vol.combinations import Blend
+from compas_vol.combinations import Division
+from compas_vol.combinations import Intersection
+from compas_vol.combinations import Morph
+from compas_vol.combinations import Multiplication
+from compas_vol.combinations import SmoothIntersection
+from compas_vol.combinations import SmoothSubtraction
+from compas_vol.combinations import SmoothUnion
+from compas_vol.combinations import SmoothUnionList
+from compas_vol.combinations import Subtraction
+from compas_vol.combinations import Union
+from compas_vol.microstructures import Lattice
+from compas_vol.microstructures import LatticePolar
+from compas_vol.microstructures import TPMS
+from compas_vol.microstructures import TPMSPolar
+from compas_vol.microstructures import Voronoi
+from compas_vol.modifications import Factor
+from compas_vol.modifications import MultiShell
+from compas_vol.modifications import Overlay
+from compas_vol.modifications import Shell
+from compas_vol.modifications import Sine
+from compas_vol.modifications import Twist
+from compas_vol.modifications.transformation import VolTransformation
+from compas_vol.primitives import Heart
+from compas_vol.primitives import PlatonicSolid
+from compas_vol.primitives import VolBox
+from compas_vol.primitives import VolCapsule
+from compas_vol.primitives import VolCone
+from compas_vol.primitives import VolCylinder
+from compas_vol.primitives import VolEgg
+from compas_vol.primitives import VolEllipsoid
+from compas_vol.primitives import VolExtrusion
+from compas_vol.primitives import VolPlane
+from compas_vol.primitives import VolPolyhedron
+from compas_vol.primitives import VolSphere
+from compas_vol.primitives import VolTorus
+from compas_vol.utilities.structure import children
+
+from .compiler import _LOWERINGS as _NUMPY_LOWERINGS
+from .compiler import compile
+from .compiler import fingerprint
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+__all__ = [
+    'compile_points',
+    'PointKernel'
+]
+
+
+_KERNELS = {}
+_LOWERINGS = {}
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def lowering(*classes):
+    """Register the decorated function as the point lowering rule of one or more node classes.
+
+    A rule ``rule(node, program)`` appends the instructions of the node to a :class:`_Program`.
+    """
+    def decorator(func):
+        for cls in classes:
+            _LOWERINGS[cls] = func
+        return func
+    return decorator
+
+
+def compile_points(tree, backend=None):
+    """Compile a tree of distance objects into a kernel over an array of points.
+
+    With Numba installed, the tree is lowered into a flat program of instructions, with the parameters
+    of its nodes in an array, that a single ``@njit(parallel=True)`` interpreter runs over blocks of points, one instruction at a time.
+    The interpreter is compiled once for all trees, and cached on disk, so that neither the size of a tree
+    nor changes to its parameters or structure cause any compilation.
+    Without Numba, or if the tree contains nodes that cannot be lowered, the kernel falls back to the fused
+    NumPy kernel of :func:`compas_vol.engine.compile` if all nodes of the tree have a vectorized lowering,
+    and to the ``get_distance_numpy`` of the tree, with :func:`compas_vol.engine.evaluate_points`, otherwise.
+
+    Parameters
+    ----------
+    tree : volumetric object
+        The root of the tree of distance objects.
+    backend : {None, 'numba', 'numpy'}, optional
+        Force a backend. By default Numba is used if it is available.
+
+    Returns
+    -------
+    :class:`compas_vol.engine.PointKernel`
+        The compiled kernel.
+    """
+    key = id(tree), backend
+    entry = _KERNELS.get(key)
+    if entry is not None:
+        ref, kernel = entry
+        if ref() is tree and kernel.fingerprint == fingerprint(tree):
+            return kernel
+    kernel = PointKernel(tree, backend)
+    _KERNELS[key] = (weakref.ref(tree, lambda _, key=key, kernels=_KERNELS: kernels.pop(key, None)), kernel)
+    return kernel
+
+
+class PointKernel(object):
+    """A kernel evaluating the distance function of a tree at an array of points.
+
+    Parameters
+    ----------
+    tree : volumetric object
+        The root of the tree of distance objects.
+    backend : {None, 'numba', 'numpy'}, optional
+        Force a backend. By default Numba is used if it is available.
+
+    Attributes
+    ----------
+    tree : volumetric object
+        The root of the tree of distance objects. The kernel only holds a weak reference to it.
+    backend : str
+        The backend in use: ``'numba'`` or ``'numpy'``.
+    code : numpy array of int, shape (m, 3)
+        The instructions of the program run by the Numba backend, as rows of an operation,
+        the offset of its parameters and a count, or None for the NumPy backend.
+    params : numpy array of float
+        The parameters of the instructions, or None for the NumPy backend.
+    """
+
+    chunksize = 1 << 20
+
+    def __init__(self, tree, backend=None):
+        import numpy as np
+
+        if backend not in (None, 'numba', 'numpy'):
+            raise ValueError('Unknown backend: {}'.format(backend))
+        if backend == 'numba' and numba is None:
+            raise ImportError('The numba backend requires numba to be installed.')
+        self._tree = weakref.ref(tree)
+        self.name = tree.__class__.__name__
+        self.fingerprint = fingerprint(tree)
+        self.backend = 'numpy'
+        self.code = self.params = None
+        if backend != 'numpy' and numba is not None:
+            try:
+                program = _Program()
+                program.lower(tree)
+            except (_Unsupported, RecursionError):
+                if backend == 'numba':
+                    raise
+            else:
+                self.code = np.array(program.code, dtype=np.int64).reshape(-1, 3)
+                self.params = np.array(program.params, dtype=np.float64)
+                self._depths = program.max_depth, program.max_frames
+                self.backend = 'numba'
+
+    def __repr__(self):
+        return 'PointKernel({}, {})'.format(self.name, self.backend)
+
+    @property
+    def tree(self):
+        return self._tree()
+
+    def __call__(self, points, out=None):
+        """Evaluate the kernel.
+
+        Parameters
+        ----------
+        points : numpy array of floats, shape (n, 3)
+            The points in R:sup:`3` space to query for their distances.
+        out : numpy array of floats, shape (n,), optional
+            Array to write the result into.
+
+        Returns
+        -------
+        numpy array of floats, shape (n,)
+            The distances from the query points to the surface of the object.
+        """
+        import numpy as np
+
+        points = np.asarray(points, dtype=float).reshape((-1, 3))
+        if out is None:
+            out = np.empty(len(points))
+        if self.backend == 'numba':
+            # the stacks of the interpreter, one per block of points run by a thread
+            blocks = -(-len(points) // _BLOCK)
+            values = np.empty((blocks, self._depths[0], _BLOCK))
+            frames = np.empty((blocks, self._depths[1], 3, _BLOCK))
+            _kernel(self.code, self.params, np.ascontiguousarray(points), out, values, frames)
+            return out
+        tree = self.tree
+        if tree is None:
+            raise ReferenceError('The {} evaluated by this kernel no longer exists.'.format(self.name))
+        if not _vectorized(tree):
+            from .points import evaluate_points
+
+            return evaluate_points(tree, points, out=out)
+        kernel = compile(tree)
+        for start in range(0, len(points), self.chunksize):
+            chunk = points[start:start + self.chunksize]
+            kernel(chunk[:, 0], chunk[:, 1], chunk[:, 2], out=out[start:start + self.chunksize])
+        return out
+
+
+def _vectorized(node):
+    """Whether all nodes of a tree have an elementwise lowering in :func:`compas_vol.engine.compile`."""
+    if type(node) not in _NUMPY_LOWERINGS:
+        return False
+    return all(_vectorized(child) for child in children(node))
+
+
+# ==============================================================================
+# program
+# ==============================================================================
+
+
+# operations that push a frame of local coordinates, or pop it
+_AFFINE, _TWIST, _POP = 0, 1, 2
+# operations that push the distance of a leaf at the current coordinates
+_SPHERE, _BOX, _CAPSULE, _CYLINDER, _TORUS, _CONE, _ELLIPSOID, _EGG, _PLANE = 3, 4, 5, 6, 7, 8, 9, 10, 11
+_HEART, _PLATONIC, _EXTRUSION, _LATTICE, _LATTICE_POLAR, _TPMS, _TPMS_POLAR, _VORONOI = 12, 13, 14, 15, 16, 17, 18, 19
+# operations that replace the two distances on top of the stack by their combination
+_MIN, _MAX, _ADD, _SUBTRACT, _MULTIPLY, _DIVIDE = 20, 21, 22, 23, 24, 25
+_SMOOTH_UNION, _SMOOTH_INTERSECTION, _SMOOTH_SUBTRACTION, _MORPH, _OVERLAY = 26, 27, 28, 29, 30
+# the blend of three distances
+_BLEND = 31
+# operations that modify the distance on top of the stack
+_SHELL, _MULTISHELL, _FACTOR, _SINE, _EXP2, _LOG2 = 32, 33, 34, 35, 36, 37
+
+# the number of points per block, which get their own stacks
+_BLOCK = 256
+
+
+class _Program(object):
+    """The instructions of a tree for the point interpreter, with the depths of its stacks.
+
+    Each instruction is an operation, the offset of its parameters in :attr:`params` and a count,
+    e.g. of the struts of a lattice. Leaves push their distance onto a stack of values,
+    and combinations and modifications replace the distances on top of it,
+    so that a node follows the instructions of its children.
+    Nodes in a frame push their local coordinates onto a stack of frames before, and pop them after.
+    """
+
+    def __init__(self):
+        self.code = []
+        self.params = []
+        self.depth = 0
+        self.max_depth = 1
+        self.frames = 1
+        self.max_frames = 1
+
+    def lower(self, node):
+        rule = _LOWERINGS.get(type(node))
+        if rule is None:
+            raise _Unsupported(node.__class__.__name__)
+        rule(node, self)
+
+    def emit(self, op, params=(), count=0, inputs=0):
+        """Append an instruction that replaces ``inputs`` distances on top of the stack by one."""
+        self.code.extend((op, len(self.params), count))
+        self.params.extend(float(p) for p in params)
+        self.depth += 1 - inputs
+        self.max_depth = max(self.max_depth, self.depth)
+
+    def push(self, op, params):
+        self.code.extend((op, len(self.params), 0))
+        self.params.extend(float(p) for p in params)
+        self.frames += 1
+        self.max_frames = max(self.max_frames, self.frames)
+
+    def pop(self):
+        self.code.extend((_POP, 0, 0))
+        self.frames -= 1
+
+    def in_frame(self, matrix, lower):
+        """Lower a node in the local coordinates of a transformation matrix."""
+        self.push(_AFFINE, (v for row in matrix[:3] for v in row))
+        lower()
+        self.pop()
+
+    def fold(self, objs, op, params=()):
+        """Lower nodes combined pairwise from the left, which keeps the stack two deep."""
+        self.lower(objs[0])
+        for o in objs[1:]:
+            self.lower(o)
+            self.emit(op, params, inputs=2)
+
+
+def _njit(func):
+    if numba is None:
+        return func
+    return numba.njit(cache=True, error_model='numpy')(func)
+
+
+# ==============================================================================
+# interpreter
+# ==============================================================================
+
+
+@_njit
+def _affine(p, o, x, y, z):
+    return (p[o] * x + p[o + 1] * y + p[o + 2] * z + p[o + 3],
+            p[o + 4] * x + p[o + 5] * y + p[o + 6] * z + p[o + 7],
+            p[o + 8] * x + p[o + 9] * y + p[o + 10] * z + p[o + 11])
+
+
+@_njit
+def _twist(p, o, x, y, z):
+    ox, oy, oz, nx, ny, nz = p[o], p[o + 1], p[o + 2], p[o + 3], p[o + 4], p[o + 5]
+    px, py, pz = x - ox, y - oy, z - oz
+    angle = (px * nx + py * ny + pz * nz) / 10
+    c, s = math.cos(angle), math.sin(angle)
+    d = (nx * px + ny * py + nz * pz) * (1 - c)
+    rx = px * c + (ny * pz - nz * py) * s + nx * d
+    ry = py * c + (nz * px - nx * pz) * s + ny * d
+    rz = pz * c + (nx * py - ny * px) * s + nz * d
+    return rx + ox, ry + oy, rz + oz
+
+
+@_njit
+def _leaves(op, p, o, n, x, y, z, out):
+    """Write the distances of a leaf at arrays of local coordinates into ``out``."""
+    if op == _SPHERE:
+        for j in range(out.shape[0]):
+            out[j] = _sphere(p, o, n, x[j], y[j], z[j])
+    elif op == _BOX:
+        for j in range(out.shape[0]):
+            out[j] = _box(p, o, n, x[j], y[j], z[j])
+    elif op == _CAPSULE:
+        for j in range(out.shape[0]):
+            out[j] = _capsule(p, o, n, x[j], y[j], z[j])
+    elif op == _CYLINDER:
+        for j in range(out.shape[0]):
+            out[j] = _cylinder(p, o, n, x[j], y[j], z[j])
+    elif op == _TORUS:
+        for j in range(out.shape[0]):
+            out[j] = _torus(p, o, n, x[j], y[j], z[j])
+    elif op == _CONE:
+        for j in range(out.shape[0]):
+            out[j] = _cone(p, o, n, x[j], y[j], z[j])
+    elif op == _ELLIPSOID:
+        for j in range(out.shape[0]):
+            out[j] = _ellipsoid(p, o, n, x[j], y[j], z[j])
+    elif op == _EGG:
+        for j in range(out.shape[0]):
+            out[j] = _egg(p, o, n, x[j], y[j], z[j])
+    elif op == _PLANE:
+        for j in range(out.shape[0]):
+            out[j] = _plane(p, o, n, x[j], y[j], z[j])
+    elif op == _HEART:
+        for j in range(out.shape[0]):
+            out[j] = _heart(p, o, n, x[j], y[j], z[j])
+    elif op == _PLATONIC:
+        for j in range(out.shape[0]):
+            out[j] = _platonic(p, o, n, x[j], y[j], z[j])
+    elif op == _EXTRUSION:
+        for j in range(out.shape[0]):
+            out[j] = _extrusion(p, o, n, x[j], y[j], z[j])
+    elif op == _LATTICE:
+        for j in range(out.shape[0]):
+            out[j] = _lattice(p, o, n, x[j], y[j], z[j])
+    elif op == _LATTICE_POLAR:
+        for j in range(out.shape[0]):
+            out[j] = _lattice_polar(p, o, n, x[j], y[j], z[j])
+    elif op == _TPMS:
+        for j in range(out.shape[0]):
+            out[j] = _tpms_cartesian(p, o, n, x[j], y[j], z[j])
+    elif op == _TPMS_POLAR:
+        for j in range(out.shape[0]):
+            out[j] = _tpms_polar(p, o, n, x[j], y[j], z[j])
+    elif op == _VORONOI:
+        for j in range(out.shape[0]):
+            out[j] = _voronoi(p, o, n, x[j], y[j], z[j])
+
+
+@_njit
+def _combine(op, p, o, a, b):
+    """Combine the distances of two children, writing the result into the first."""
+    if op == _MIN:
+        for j in range(a.shape[0]):
+            a[j] = min(a[j], b[j])
+    elif op == _MAX:
+        for j in range(a.shape[0]):
+            a[j] = max(a[j], b[j])
+    elif op == _ADD:
+        for j in range(a.shape[0]):
+            a[j] += b[j]
+    elif op == _SUBTRACT:
+        for j in range(a.shape[0]):
+            a[j] = max(a[j], -b[j])
+    elif op == _MULTIPLY:
+        for j in range(a.shape[0]):
+            a[j] *= b[j]
+    elif op == _DIVIDE:
+        for j in range(a.shape[0]):
+            a[j] /= b[j]
+    elif op == _SMOOTH_UNION:
+        for j in range(a.shape[0]):
+            a[j] = _smooth_union(p[o], a[j], b[j])
+    elif op == _SMOOTH_INTERSECTION:
+        for j in range(a.shape[0]):
+            a[j] = _smooth_intersection(p[o], a[j], b[j])
+    elif op == _SMOOTH_SUBTRACTION:
+        for j in range(a.shape[0]):
+            a[j] = _smooth_subtraction(p[o], a[j], b[j])
+    elif op == _MORPH:
+        t = p[o]
+        for j in range(a.shape[0]):
+            a[j] = (1.0 - t) * a[j] + t * b[j]
+    elif op == _OVERLAY:
+        f = p[o]
+        for j in range(a.shape[0]):
+            a[j] += f * b[j]
+
+
+@_njit
+def _modify(op, p, o, d):
+    """Modify the distances of a child in place."""
+    if op == _SHELL:
+        for j in range(d.shape[0]):
+            d[j] = abs(d[j] + p[o]) - p[o + 1]
+    elif op == _MULTISHELL:
+        for j in range(d.shape[0]):
+            d[j] = _multishell(p[o], p[o + 1], d[j])
+    elif op == _FACTOR:
+        f = p[o]
+        for j in range(d.shape[0]):
+            d[j] *= f
+    elif op == _SINE:
+        for j in range(d.shape[0]):
+            d[j] = math.sin(d[j])
+    elif op == _EXP2:
+        k = p[o]
+        for j in range(d.shape[0]):
+            d[j] = 2.0 ** (-k * d[j])
+    elif op == _LOG2:
+        k = p[o]
+        for j in range(d.shape[0]):
+            d[j] = -math.log2(d[j]) / k
+
+
+@_njit
+def _run(code, p, points, out, values, frames):
+    """Run a program at a block of points, each instruction for all points in turn.
+
+    The stacks of values and frames hold a row per point of the block,
+    and are at least as deep as the program needs.
+    """
+    n = points.shape[0]
+    for j in range(n):
+        frames[0, 0, j], frames[0, 1, j], frames[0, 2, j] = points[j, 0], points[j, 1], points[j, 2]
+    sp = 0
+    fp = 0
+    for i in range(code.shape[0]):
+        op, o, c = code[i, 0], code[i, 1], code[i, 2]
+        if op >= _SHELL:
+            _modify(op, p, o, values[sp - 1, :n])
+        elif op == _BLEND:
+            sp -= 2
+            for j in range(n):
+                values[sp - 1, j] = _blend(p, o, c, values[sp - 1, j], values[sp, j], values[sp + 1, j])
+        elif op >= _MIN:
+            sp -= 1
+            _combine(op, p, o, values[sp - 1, :n], values[sp, :n])
+        elif op >= _SPHERE:
+            _leaves(op, p, o, c, frames[fp, 0, :n], frames[fp, 1, :n], frames[fp, 2, :n], values[sp, :n])
+            sp += 1
+        elif op == _POP:
+            fp -= 1
+        elif op == _AFFINE:
+            for j in range(n):
+                frames[fp + 1, 0, j], frames[fp + 1, 1, j], frames[fp + 1, 2, j] = _affine(p, o, frames[fp, 0, j], frames[fp, 1, j], frames[fp, 2, j])
+            fp += 1
+        else:
+            for j in range(n):
+                frames[fp + 1, 0, j], frames[fp + 1, 1, j], frames[fp + 1, 2, j] = _twist(p, o, frames[fp, 0, j], frames[fp, 1, j], frames[fp, 2, j])
+            fp += 1
+    for j in range(n):
+        out[j] = values[0, j]
+
+
+def _evaluate(code, p, points, out, values, frames):
+    for b in numba.prange(values.shape[0]):
+        start, stop = b * _BLOCK, min(points.shape[0], (b + 1) * _BLOCK)
+        _run(code, p, points[start:stop], out[start:stop], values[b], frames[b])
+
+
+_kernel = numba.njit(parallel=True, cache=True, error_model='numpy')(_evaluate) if numba is not None else None
+
+
+# ==============================================================================
+# primitives
+# ==============================================================================
+
+
+@_njit
+def _sphere(p, o, n, x, y, z):
+    return math.sqrt((x - p[o]) ** 2 + (y - p[o + 1]) ** 2 + (z - p[o + 2]) ** 2) - p[o + 3]
+
+
+@lowering(VolSphere)
+def _lower_sphere(node, program):
+    program.emit(_SPHERE, tuple(node.sphere.center) + (node.sphere.radius,))
+
+
+@_njit
+def _box(p, o, n, x, y, z):
+    radius = p[o + 3]
+    dx = abs(x) - p[o]
+    dy = abs(y) - p[o + 1]
+    dz = abs(z) - p[o + 2]
+    inside = max(dx, max(dy, dz)) - radius
+    if inside + radius < 0:
+        return inside
+    dx = max(dx, 0.0)
+    dy = max(dy, 0.0)
+    dz = max(dz, 0.0)
+    return math.sqrt(dx * dx + dy * dy + dz * dz) - radius
+
+
+@lowering(VolBox)
+def _lower_box(node, program):
+    radius = node.radius
+    extents = (node.box.xsize / 2.0 - radius, node.box.ysize / 2.0 - radius, node.box.zsize / 2.0 - radius, radius)
+    program.in_frame(node.inversetransform, lambda: program.emit(_BOX, extents))
+
+
+@_njit
+def _capsule(p, o, n, x, y, z):
+    ax, ay, az, vx, vy, vz, vv = p[o], p[o + 1], p[o + 2], p[o + 3], p[o + 4], p[o + 5], p[o + 6]
+    t = ((x - ax) * vx + (y - ay) * vy + (z - az) * vz) / vv
+    t = min(max(t, 0.0), 1.0)
+    return math.sqrt((x - ax - t * vx) ** 2 + (y - ay - t * vy) ** 2 + (z - az - t * vz) ** 2) - p[o + 7]
+
+
+@lowering(VolCapsule)
+def _lower_capsule(node, program):
+    ax, ay, az = (float(v) for v in node.segment[0])
+    bx, by, bz = (float(v) for v in node.segment[1])
+    vx, vy, vz = bx - ax, by - ay, bz - az
+    program.emit(_CAPSULE, (ax, ay, az, vx, vy, vz, vx * vx + vy * vy + vz * vz, node.radius))
+
+
+@_njit
+def _cylinder(p, o, n, x, y, z):
+    return max(math.sqrt(x * x + y * y) - p[o], abs(z) - p[o + 1])
+
+
+@lowering(VolCylinder)
+def _lower_cylinder(node, program):
+    params = node.cylinder.radius, node.cylinder.height / 2.0
+    program.in_frame(node.inversetransform, lambda: program.emit(_CYLINDER, params))
+
+
+@_njit
+def _torus(p, o, n, x, y, z):
+    d = math.sqrt(x * x + y * y) - p[o]
+    return math.sqrt(d * d + z * z) - p[o + 1]
+
+
+@lowering(VolTorus)
+def _lower_torus(node, program):
+    params = node.torus.radius_axis, node.torus.radius_pipe
+    program.in_frame(node.inversetransform, lambda: program.emit(_TORUS, params))
+
+
+@_njit
+def _cone(p, o, n, x, y, z):
+    radius, height = p[o], p[o + 1]
+    f = (z + height / 2) / height
+    temprad = radius - f * radius
+    return max(math.sqrt(x * x + y * y) - temprad, abs(z) - height / 2)
+
+
+@lowering(VolCone)
+def _lower_cone(node, program):
+    params = node.cone.radius, node.cone.height
+    program.in_frame(node.inversedmatrix, lambda: program.emit(_CONE, params))
+
+
+@_njit
+def _ellipsoid(p, o, n, x, y, z):
+    rx, ry, rz = p[o], p[o + 1], p[o + 2]
+    k0 = math.sqrt((x / rx) ** 2 + (y / ry) ** 2 + (z / rz) ** 2)
+    k1 = math.sqrt((x / rx ** 2) ** 2 + (y / ry ** 2) ** 2 + (z / rz ** 2) ** 2)
+    if k1 == 0:
+        return -1.0
+    return k0 * (k0 - 1.0) / k1
+
+
+@lowering(VolEllipsoid)
+def _lower_ellipsoid(node, program):
+    params = node.radiusX, node.radiusY, node.radiusZ
+    program.in_frame(node.inversetransform, lambda: program.emit(_ELLIPSOID, params))
+
+
+@_njit
+def _egg(p, o, n, x, y, z):
+    ra, rb, k = p[o], p[o + 1], p[o + 2]
+    return (z * z) / (rb * rb) + (y * y) / (ra * ra) + (x * x) / (ra * ra) * (1 + k * z) - 1
+
+
+@lowering(VolEgg)
+def _lower_egg(node, program):
+    params = node.ra, node.rb, node.k
+    program.in_frame(node.inversedmatrix, lambda: program.emit(_EGG, params))
+
+
+@_njit
+def _plane(p, o, n, x, y, z):
+    return (x - p[o]) * p[o + 3] + (y - p[o + 1]) * p[o + 4] + (z - p[o + 2]) * p[o + 5]
+
+
+@lowering(VolPlane)
+def _lower_plane(node, program):
+    base, normal = node.plane
+    program.emit(_PLANE, tuple(base) + tuple(normal))
+
+
+@lowering(VolPolyhedron)
+def _lower_polyhedron(node, program):
+    program.fold(node.planes, _MAX)
+
+
+@_njit
+def _heart(p, o, n, x, y, z):
+    s = p[o]
+    x, y, z = x / s, y / s, z / s
+    return 320 * ((-x ** 2 * z ** 3 - 9 * y ** 2 * z ** 3 / 80) + (x ** 2 + 9 * y ** 2 / 4 + z ** 2 - 1) ** 3)
+
+
+@lowering(Heart)
+def _lower_heart(node, program):
+    program.in_frame(node.inversetransform, lambda: program.emit(_HEART, (node.size * 0.43,)))
+
+
+@_njit
+def _platonic(p, o, solid, x, y, z):
+    radius = p[o]
+    if solid == 0:
+        return (max(abs(x + y) - z, abs(x - y) + z) - radius) / math.sqrt(3)
+    if solid == 1:
+        return (abs(x) + abs(y) + abs(z) - radius) * math.tan(math.pi / 6)
+    if solid == 2 or solid == 3:
+        scale, vx, vy, vz = p[o + 1], p[o + 2], p[o + 3], p[o + 4]
+        px, py, pz = abs(x / scale), abs(y / scale), abs(z / scale)
+        a = px * vx + py * vy + pz * vz
+        b = px * vz + py * vx + pz * vy
+        c = px * vy + py * vz + pz * vx
+        q = max(max(a, b), c) - vx
+        if solid == 3:
+            q = max(q, (px + py + pz) * math.sqrt(3) / 3 - vx)
+        return q * scale
+    return 0.0
+
+
+@lowering(PlatonicSolid)
+def _lower_platonic(node, program):
+    radius = float(node.radius)
+    if node.type == 2:
+        scale = radius
+        vx, vy, vz = (1 + math.sqrt(5)) / 2, 1.0, 0.0
+    else:
+        scale = radius * 0.8506507174597755
+        vx, vy, vz = (math.sqrt(5) + 3) / 2, 1.0, 0.0
+    length = math.sqrt(vx * vx + vy * vy + vz * vz)
+    params = radius, scale, vx / length, vy / length, vz / length
+    program.in_frame(node.inversetransform, lambda: program.emit(_PLATONIC, params, node.type))
+
+
+@_njit
+def _extrusion(p, o, n, x, y, z):
+    # the height, the number of corners of the polygon, the n points of the polyline and the corners
+    height, m = p[o], int(p[o + 1])
+    line, polygon = o + 2, o + 2 + 2 * n
+    dmin = 1e300
+    for i in range(n - 1):
+        ax, ay = p[line + 2 * i], p[line + 2 * i + 1]
+        vx, vy = p[line + 2 * i + 2] - ax, p[line + 2 * i + 3] - ay
+        vv = vx * vx + vy * vy
+        t = 0.0
+        if vv > 0:
+            t = min(max(((x - ax) * vx + (y - ay) * vy) / vv, 0.0), 1.0)
+        dmin = min(dmin, (x - ax - t * vx) ** 2 + (y - ay - t * vy) ** 2)
+    d = math.sqrt(dmin)
+    inside = False
+    for i in range(-1, m - 1):
+        j = i % m
+        x1, y1 = p[polygon + 2 * j], p[polygon + 2 * j + 1]
+        x2, y2 = p[polygon + 2 * i + 2], p[polygon + 2 * i + 3]
+        if min(y1, y2) < y <= max(y1, y2) and x <= max(x1, x2):
+            if x1 == x2 or x <= (y - y1) * (x2 - x1) / (y2 - y1) + x1:
+                inside = not inside
+    if inside:
+        d = -d
+    return max(d, abs(z) - height / 2.0)
+
+
+@lowering(VolExtrusion)
+def _lower_extrusion(node, program):
+    polyline = [(float(p[0]), float(p[1])) for p in node.polyline]
+    polygon = polyline[:-1] if len(polyline) > 1 and polyline[0] == polyline[-1] else polyline
+    params = [node.height, len(polygon)] + [c for p in polyline + polygon for c in p]
+    program.in_frame(node.inversetransform, lambda: program.emit(_EXTRUSION, params, len(polyline)))
+
+
+# ==============================================================================
+# microstructures
+# ==============================================================================
+
+
+def _struts(node):
+    return [c * node.unitcell for a, b in node.ltypes[node.ltype] for c in tuple(node.pointlist[a]) + tuple(node.pointlist[b])]
+
+
+@_njit
+def _strut_distance(p, o, n, thickness, ux, uy, uz):
+    dmin = 1e300
+    for i in range(o, o + 6 * n, 6):
+        sx, sy, sz = p[i], p[i + 1], p[i + 2]
+        vx, vy, vz = p[i + 3] - sx, p[i + 4] - sy, p[i + 5] - sz
+        b = ((ux - sx) * vx + (uy - sy) * vy + (uz - sz) * vz) / (vx * vx + vy * vy + vz * vz)
+        dmin = min(dmin, (ux - sx - b * vx) ** 2 + (uy - sy - b * vy) ** 2 + (uz - sz - b * vz) ** 2)
+    return math.sqrt(dmin) - thickness / 2.0
+
+
+@_njit
+def _lattice(p, o, n, x, y, z):
+    unitcell = p[o]
+    half = unitcell / 2
+    return _strut_distance(p, o + 2, n, p[o + 1], abs(x % unitcell - half), abs(y % unitcell - half), abs(z % unitcell - half))
+
+
+@lowering(Lattice)
+def _lower_lattice(node, program):
+    struts = _struts(node)
+    params = [node.unitcell, node.thickness] + struts
+    program.in_frame(node.inversetransform, lambda: program.emit(_LATTICE, params, len(struts) // 6))
+
+
+@_njit
+def _lattice_polar(p, o, n, x, y, z):
+    unitcell, polarnumber = p[o], p[o + 2]
+    radius = math.sqrt(x * x + y * y)
+    polx = abs((radius % unitcell) - unitcell / 2)
+    angle = (math.atan2(y, x) + math.pi) / (2 * math.pi)
+    poly = abs(((angle * polarnumber) % 1 - 0.5) * unitcell)
+    polz = abs((z % unitcell) - unitcell / 2)
+    return _strut_distance(p, o + 3, n, p[o + 1], polx, poly, polz)
+
+
+@lowering(LatticePolar)
+def _lower_lattice_polar(node, program):
+    struts = _struts(node)
+    params = [node.unitcell, node.thickness, node.polarnumber] + struts
+    program.in_frame(node.inversetransform, lambda: program.emit(_LATTICE_POLAR, params, len(struts) // 6))
+
+
+@_njit
+def _tpms(tpmstype, px, py, pz):
+    sin, cos = math.sin, math.cos
+    if tpmstype == 0:
+        return sin(px) * cos(py) + sin(py) * cos(pz) + sin(pz) * cos(px)
+    if tpmstype == 1:
+        return cos(px) + cos(py) + cos(pz)
+    if tpmstype == 2:
+        return (sin(px) * sin(py) * sin(pz) + sin(px) * cos(py) * cos(pz) +
+                cos(px) * sin(py) * cos(pz) + cos(px) * cos(py) * sin(pz))
+    if tpmstype == 3:
+        return 3 * cos(px) + cos(py) + cos(pz) + 4 * cos(px) * cos(py) * cos(pz)
+    if tpmstype == 4:
+        return (0.5 * (sin(2 * px) * cos(py) * sin(pz) + sin(2 * py) * cos(py) * sin(px) + sin(2 * pz) * cos(px) * sin(pz)) -
+                0.5 * (cos(2 * px) * cos(2 * py) + cos(2 * py) * cos(2 * pz) + cos(2 * pz) * cos(2 * px)) + 0.15)
+    if tpmstype == 5:
+        return cos(2 * px) * sin(py) * cos(pz) + cos(2 * py) * sin(pz) * cos(px) + cos(2 * pz) * sin(px) * cos(py)
+    return 0.0
+
+
+@_njit
+def _tpms_cartesian(p, o, n, x, y, z):
+    factor = p[o]
+    return _tpms(n, x / factor, y / factor, z / factor)
+
+
+@lowering(TPMS)
+def _lower_tpms(node, program):
+    program.emit(_TPMS, (node._factor,), node.tpmstype)
+
+
+@_njit
+def _tpms_polar(p, o, n, x, y, z):
+    return _tpms(n, math.sqrt(x * x + y * y), math.atan2(y, x) * p[o], z) - p[o + 1] / 2.0
+
+
+@lowering(TPMSPolar)
+def _lower_tpms_polar(node, program):
+    program.emit(_TPMS_POLAR, (node.polar, node.thickness), node.TPMStype)
+
+
+@_njit
+def _voronoi(p, o, n, x, y, z):
+    first, second = -1, -1
+    d1, d2 = 1e300, 1e300
+    for i in range(n):
+        j = o + 1 + 3 * i
+        d = (x - p[j]) ** 2 + (y - p[j + 1]) ** 2 + (z - p[j + 2]) ** 2
+        if d < d1:
+            second, d2 = first, d1
+            first, d1 = i, d
+        elif d < d2:
+            second, d2 = i, d
+    c, s = o + 1 + 3 * first, o + 1 + 3 * second
+    cx, cy, cz = p[c], p[c + 1], p[c + 2]
+    sx, sy, sz = p[s], p[s + 1], p[s + 2]
+    vx, vy, vz = sx - cx, sy - cy, sz - cz
+    length = math.sqrt(vx * vx + vy * vy + vz * vz)
+    dc = cx * cx + cy * cy + cz * cz
+    ds = ((x - (cx + sx) / 2) * vx + (y - (cy + sy) / 2) * vy + (z - (cz + sz) / 2) * vz) / length
+    return abs(min(dc, ds)) - p[o] / 2
+
+
+@lowering(Voronoi)
+def _lower_voronoi(node, program):
+    points = [float(c) for p in node.points for c in (p[0], p[1], p[2])]
+    program.emit(_VORONOI, [node.thickness] + points, len(points) // 3)
+
+
+# ==============================================================================
+# combinations
+# ==============================================================================
+
+
+@lowering(Union)
+def _lower_union(node, program):
+    program.fold(node.objs, _MIN)
+
+
+@lowering(Intersection)
+def _lower_intersection(node, program):
+    program.fold(node.objs, _MAX)
+
+
+@lowering(Addition)
+def _lower_addition(node, program):
+    program.fold(node.objs, _ADD)
+
+
+@lowering(Subtraction)
+def _lower_subtraction(node, program):
+    program.fold([node.a, node.b], _SUBTRACT)
+
+
+@lowering(Multiplication)
+def _lower_multiplication(node, program):
+    program.fold([node.a, node.b], _MULTIPLY)
+
+
+@lowering(Division)
+def _lower_division(node, program):
+    program.fold([node.a, node.b], _DIVIDE)
+
+
+@_njit
+def _smooth_union(k, a, b):
+    h = min(max(0.5 + 0.5 * (b - a) / k, 0.0), 1.0)
+    return (b * (1 - h) + h * a) - k * h * (1 - h)
+
+
+@_njit
+def _smooth_intersection(k, a, b):
+    h = min(max(0.5 - 0.5 * (b - a) / k, 0.0), 1.0)
+    return (b * (1 - h) + h * a) + k * h * (1 - h)
+
+
+@_njit
+def _smooth_subtraction(k, a, b):
+    h = min(max(0.5 - 0.5 * (a + b) / k, 0.0), 1.0)
+    return (a * (1 - h) + h * -b) + k * h * (1 - h)
+
+
+@lowering(SmoothUnion)
+def _lower_smooth_union(node, program):
+    program.fold([node.a, node.b], _SMOOTH_UNION, (node.r,))
+
+
+@lowering(SmoothIntersection)
+def _lower_smooth_intersection(node, program):
+    program.fold([node.a, node.b], _SMOOTH_INTERSECTION, (node.r,))
+
+
+@lowering(SmoothSubtraction)
+def _lower_smooth_subtraction(node, program):
+    program.fold([node.a, node.b], _SMOOTH_SUBTRACTION, (node.r,))
+
+
+@lowering(SmoothUnionList)
+def _lower_smooth_union_list(node, program):
+    # -log2(sum(2 ** (-k * d))) / k
+    k = (node.k,)
+    for i, o in enumerate(node.distance_objects):
+        program.lower(o)
+        program.emit(_EXP2, k, inputs=1)
+        if i:
+            program.emit(_ADD, inputs=2)
+    program.emit(_LOG2, k, inputs=1)
+
+
+@lowering(Morph)
+def _lower_morph(node, program):
+    program.fold([node.a, node.b], _MORPH, (node.f,))
+
+
+@_njit
+def _blend(p, o, n, a, b, c):
+    r = p[o]
+    if c < -r / 2:
+        return a
+    if c > r / 2:
+        return b
+    s = c / r + 0.5
+    if n == 1:
+        s = 2 * s ** 2 if s < 0.5 else 1 - (-2 * s + 2) ** 2 / 2
+    return (1 - s) * a + s * b
+
+
+@lowering(Blend)
+def _lower_blend(node, program):
+    for o in (node.a, node.b, node.c):
+        program.lower(o)
+    program.emit(_BLEND, (node.r,), node.t, inputs=3)
+
+
+# ==============================================================================
+# modifications
+# ==============================================================================
+
+
+@lowering(Shell)
+def _lower_shell(node, program):
+    program.lower(node.o)
+    program.emit(_SHELL, ((node.side - 0.5) * node.thickness, node.thickness / 2.0), inputs=1)
+
+
+@_njit
+def _multishell(distance, half, d):
+    remainder = d % distance
+    return min(remainder, distance - remainder) - half
+
+
+@lowering(MultiShell)
+def _lower_multishell(node, program):
+    program.lower(node.o)
+    program.emit(_MULTISHELL, (node.distance, node.thickness / 2), inputs=1)
+
+
+@lowering(Factor)
+def _lower_factor(node, program):
+    program.lower(node.o)
+    program.emit(_FACTOR, (node.f,), inputs=1)
+
+
+@lowering(Sine)
+def _lower_sine(node, program):
+    program.lower(node.o)
+    program.emit(_SINE, inputs=1)
+
+
+@lowering(Overlay)
+def _lower_overlay(node, program):
+    program.fold([node.a, node.b], _OVERLAY, (node.f,))
+
+
+@lowering(VolTransformation)
+def _lower_transformation(node, program):
+    program.in_frame(node.inversetransform, lambda: program.lower(node.distobj))
+
+
+@lowering(Twist)
+def _lower_twist(node, program):
+    program.push(_TWIST, tuple(node.frame.point) + tuple(node.frame.normal))
+    program.lower(node.obj)
+    program.pop()
@@ -0,0 +1,100 @@
+from __future__ import division
+
+from compas_vol.utilities.buffers import distance_into
+from compas_vol.utilities.precision import float_type
+from compas_vol.utilities.structure import shared_subtrees
+from compas_vol.utilities.transforms import shared_transforms
+
+from .grid import Grid
+from .grid import temporaries
+
+
+__all__ = [
+    'evaluate_points'
+]
+
+
+def point_chunk_size(tree, dtype='float64', memory_budget=None):
+    """The number of points whose evaluation fits in a memory budget.
+
+    Parameters
+    ----------
+    tree : volumetric object
+        The object that will be evaluated, to estimate the memory used per point with :func:`temporaries`.
+    dtype : str or numpy dtype, optional
+        The floating point type of the coordinates.
+    memory_budget : int, optional
+        The number of bytes the evaluation of a chunk may use. Defaults to :attr:`Grid.memory_budget`.
+
+    Returns
+    -------
+    int
+        The number of points.
+    """
+    import numpy as np
+
+    if memory_budget is None:
+        memory_budget = Grid.memory_budget
+    # the three coordinates of a point come on top of the temporaries of the evaluation
+    return max(1, int(memory_budget) // (np.dtype(dtype).itemsize * (temporaries(tree) + 3)))
+
+
+def evaluate_points(tree, points, out=None, chunk_size=None, memory_budget=None):
+    """Evaluate the distance function of a tree at an unstructured array of points.
+
+    The points are evaluated in chunks with ``tree.get_distance_numpy`` on flat arrays of
+    coordinates, so that peak memory is bounded by the chunk size rather than the number of points,
+    and points and distances may be memory-mapped arrays larger than memory.
+
+    Parameters
+    ----------
+    tree : volumetric object
+        The object to evaluate.
+    points : numpy array of floats, shape (n, 3)
+        The points to query.
+    out : numpy array, optional
+        A preallocated or memory-mapped array of shape (n,) to write the distances into.
+    chunk_size : int, optional
+        The number of points evaluated at once.
+    memory_budget : int, optional
+        The number of bytes the evaluation of a chunk may use.
+        Used to pick the chunk size if none is given.
+
+    Returns
+    -------
+    numpy array of floats, shape (n,)
+        The distances, in single precision for single precision points and in double precision otherwise.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from compas.geometry import Point, Sphere
+    >>> from compas_vol.primitives import VolSphere
+    >>> points = np.array([[0.0, 0.0, 0.0], [5.0, 0.0, 0.0]])
+    >>> evaluate_points(VolSphere(Sphere(Point(0, 0, 0), 3)), points)
+    array([-3.,  2.])
+    """
+    import numpy as np
+
+    if points.ndim != 2 or points.shape[1] != 3:
+        raise ValueError('Expected an array of points of shape (n, 3), got {}.'.format(points.shape))
+    n = points.shape[0]
+    dtype = float_type(points)
+    if out is None:
+        out = np.empty(n, dtype=dtype)
+    elif tuple(out.shape) != (n,):
+        raise ValueError('Output of shape {} does not match the number of points {}.'.format(out.shape, n))
+    if chunk_size is None:
+        chunk_size = point_chunk_size(tree, dtype, memory_budget)
+    inplace = out.dtype == dtype
+    for start in range(0, n, chunk_size):
+        chunk = points[start:start + chunk_size]
+        x, y, z = (np.array(chunk[:, i], dtype=dtype) for i in range(3))
+        with shared_transforms(), shared_subtrees(tree):
+            if inplace:
+                distance_into(tree, x, y, z, out[start:start + chunk_size])
+            else:
+                out[start:start + chunk_size] = tree.get_distance_numpy(x, y, z)
+    if hasattr(out, 'flush'):
+        out.flush()
+    return out
@@ -0,0 +1,254 @@
+from __future__ import division
+
+import hashlib
+import multiprocessing
+import os
+import pickle
+
+from compas_vol.utilities.buffers import distance_into
+from compas_vol.utilities.structure import shared_subtrees
+from compas_vol.utilities.transforms import shared_transforms
+
+
+__all__ = [
+    'ProcessEvaluator',
+    'SharedArray'
+]
+
+
+def _shared_memory():
+    """The class of blocks of shared memory, of :mod:`multiprocessing.shared_memory`, new in Python 3.8."""
+    try:
+        from multiprocessing.shared_memory import SharedMemory
+    except ImportError:
+        raise ImportError('ProcessEvaluator and SharedArray require Python 3.8 or later, for multiprocessing.shared_memory.')
+    return SharedMemory
+
+
+class SharedArray(object):
+    """A numpy array in a block of shared memory that other processes can attach to by name.
+
+    Parameters
+    ----------
+    shape : tuple of int
+        The shape of the array.
+    dtype : str or numpy dtype, optional
+        The data type of the array.
+    name : str, optional
+        The name of an existing block of shared memory to attach to.
+        By default a new block is created.
+
+    Attributes
+    ----------
+    array : numpy array
+        The array viewing the shared memory.
+    name : str
+        The name of the block of shared memory.
+
+    Notes
+    -----
+    The block of shared memory is released by :meth:`close`, or on leaving a ``with`` block.
+    No views of :attr:`array` may be alive at that point.
+    Shared memory requires Python 3.8 or later, and an ImportError is raised on older versions.
+    """
+
+    def __init__(self, shape, dtype='float64', name=None):
+        import numpy as np
+
+        SharedMemory = _shared_memory()
+
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        size = max(1, int(np.prod(self.shape)) * self.dtype.itemsize)
+        if name is None:
+            self._shm = SharedMemory(create=True, size=size)
+            self._owner = True
+        else:
+            self._shm = SharedMemory(name=name)
+            self._owner = False
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf)
+
+    def __repr__(self):
+        return 'SharedArray({}, {}, name={!r})'.format(self.shape, self.dtype, self.name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None:
+            return self.array
+        return self.array.astype(dtype)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def close(self):
+        """Detach from the shared memory, and free it if this array created it."""
+        if self._shm is None:
+            return
+        self.array = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
+
+
+# ==============================================================================
+# workers
+# ==============================================================================
+
+
+_TREE = [None, None]
+
+
+def _load(key, name, size):
+    """Unpickle a tree from shared memory once per worker and evaluation."""
+    if _TREE[0] != key:
+        shm = _shared_memory()(name=name)
+        try:
+            tree = pickle.loads(bytes(shm.buf[:size]))
+        finally:
+            shm.close()
+        _TREE[:] = key, tree
+    return _TREE[1]
+
+
+def _evaluate_block(task):
+    key, source, size, grid, name, block = task
+    tree = _load(key, source, size)
+    out = SharedArray(grid.shape, grid.dtype, name=name)
+    try:
+        x, y, z = grid.ogrid(block)
+        with shared_transforms(), shared_subtrees(tree):
+            if out.dtype == x.dtype:
+                distance_into(tree, x, y, z, out.array[block])
+            else:
+                out.array[block] = tree.get_distance_numpy(x, y, z)
+    finally:
+        out.close()
+
+
+class ProcessEvaluator(object):
+    """Evaluate distance objects over a grid with a persistent pool of worker processes.
+
+    The grid is split into slabs along x. The tree is pickled once per evaluation into
+    shared memory and unpickled from there once per worker, and the workers write their slabs straight into an array
+    in shared memory, so that no distances are copied back to the calling process.
+    Shared memory requires Python 3.8 or later, and an ImportError is raised on older versions.
+
+    Parameters
+    ----------
+    processes : int, optional
+        The number of worker processes. Defaults to the number of CPUs.
+    context : {'spawn', 'forkserver', 'fork'}, optional
+        The multiprocessing start method. Defaults to ``'spawn'``, since forking
+        a process that runs threads, e.g. those of a Numba kernel, may deadlock.
+
+    Examples
+    --------
+    >>> from compas.geometry import Frame
+    >>> from compas_vol.engine import Grid
+    >>> from compas_vol.microstructures import Lattice
+    >>> grid = Grid([(-20, 20), (-20, 20), (-20, 20)], resolution=128)
+    >>> with ProcessEvaluator(4) as evaluator:  # doctest: +SKIP
+    ...     with evaluator.evaluate(Lattice(5, 5.0, 0.5), grid) as d:
+    ...         d.array.min()
+    """
+
+    #: The number of slabs per worker process, to balance the load between workers.
+    slabs_per_process = 4
+
+    def __init__(self, processes=None, context='spawn'):
+        _shared_memory()
+        from multiprocessing import resource_tracker
+
+        self.processes = processes or os.cpu_count() or 1
+        # workers share the tracker of this process, which unlinks the blocks it created
+        resource_tracker.ensure_running()
+        self._pool = multiprocessing.get_context(context).Pool(self.processes)
+
+    def __repr__(self):
+        return 'ProcessEvaluator({})'.format(self.processes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Shut down the worker processes."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def chunk_shape(self, grid, memory_budget=None, tree=None):
+        """The shape of the slabs the grid is split into.
+
+        Parameters
+        ----------
+        grid : :class:`compas_vol.engine.Grid`
+            The grid to split.
+        memory_budget : int, optional
+            The number of bytes each worker may use for the evaluation of a slab.
+        tree : volumetric object, optional
+            The object that will be evaluated, to estimate its memory use.
+
+        Returns
+        -------
+        tuple of int
+            The shape of the slabs.
+        """
+        return grid.slab_shape(self.processes * self.slabs_per_process, memory_budget, tree)
+
+    def evaluate(self, tree, grid, out=None, chunk_shape=None, memory_budget=None):
+        """Evaluate the distance function of a tree over a grid.
+
+        Parameters
+        ----------
+        tree : volumetric object
+            The object to evaluate. It has to be picklable.
+        grid : :class:`compas_vol.engine.Grid`
+            The grid to evaluate the object over.
+        out : :class:`compas_vol.engine.SharedArray`, optional
+            The shared array to write the distances into.
+        chunk_shape : tuple of int, optional
+            The shape of the blocks handed to the workers.
+        memory_budget : int, optional
+            The number of bytes each worker may use for the evaluation of a block.
+
+        Returns
+        -------
+        :class:`compas_vol.engine.SharedArray`
+            The distances over the grid. Close the array to release the shared memory.
+        """
+        import numpy as np
+
+        if self._pool is None:
+            raise RuntimeError('The evaluator has been closed.')
+        created = out is None
+        if created:
+            out = SharedArray(grid.shape, grid.dtype)
+        elif out.shape != grid.shape or out.dtype != np.dtype(grid.dtype):
+            raise ValueError('Output {} does not match the grid {}.'.format(out, grid))
+        data = pickle.dumps(tree, pickle.HIGHEST_PROTOCOL)
+        key = hashlib.sha1(data).hexdigest()
+        if chunk_shape is None:
+            chunk_shape = self.chunk_shape(grid, memory_budget, tree)
+        payload = SharedArray((len(data),), 'uint8')
+        payload.array[:] = np.frombuffer(data, dtype='uint8')
+        tasks = [(key, payload.name, len(data), grid, out.name, block) for block in grid.chunks(chunk_shape)]
+        try:
+            self._pool.map(_evaluate_block, tasks, chunksize=1)
+        except Exception:
+            if created:
+                out.close()
+            raise
+        finally:
+            payload.close()
+        return out
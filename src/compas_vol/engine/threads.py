@@ -0,0 +1,132 @@
+from __future__ import division
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from compas_vol.utilities.bounds import culling
+from compas_vol.utilities.buffers import distance_into
+from compas_vol.utilities.structure import shared_subtrees
+from compas_vol.utilities.transforms import shared_transforms
+
+from .cache import get_cache
+from .compiler import compile
+
+
+__all__ = [
+    'ThreadEvaluator'
+]
+
+
+class ThreadEvaluator(object):
+    """Evaluate distance objects over a grid with a persistent pool of threads.
+
+    The grid is split into slabs along x, which are contiguous blocks of a C-ordered output.
+    Each thread evaluates its slabs with the fused kernel of :func:`compas_vol.engine.compile`
+    and writes them straight into the output. NumPy releases the GIL in large ufunc calls,
+    so the threads run in parallel without the pickling cost of processes.
+
+    The distance functions of all nodes are free of side effects, and an evaluator may be
+    shared between threads, so that several evaluations can run concurrently.
+
+    Parameters
+    ----------
+    threads : int, optional
+        The number of threads. Defaults to the number of CPUs.
+
+    Examples
+    --------
+    >>> from compas.geometry import Point, Sphere
+    >>> from compas_vol.engine import Grid
+    >>> from compas_vol.primitives import VolSphere
+    >>> grid = Grid([(-5, 5), (-5, 5), (-5, 5)], resolution=64)
+    >>> with ThreadEvaluator(4) as evaluator:
+    ...     d = evaluator.evaluate(VolSphere(Sphere(Point(0, 0, 0), 3)), grid)
+    >>> d.shape
+    (64, 64, 64)
+    """
+
+    #: The number of slabs per thread, to balance the load between threads.
+    slabs_per_thread = 4
+
+    def __init__(self, threads=None):
+        self.threads = threads or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(self.threads)
+
+    def __repr__(self):
+        return 'ThreadEvaluator({})'.format(self.threads)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Shut down the threads."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def evaluate(self, tree, grid, out=None, chunk_shape=None, memory_budget=None, compiled=True, cull=False):
+        """Evaluate the distance function of a tree over a grid.
+
+        Parameters
+        ----------
+        tree : volumetric object
+            The object to evaluate.
+        grid : :class:`compas_vol.engine.Grid`
+            The grid to evaluate the object over.
+        out : numpy array, optional
+            A preallocated or memory-mapped array of the shape of the grid to write the distances into.
+            The slabs of a :class:`numpy.memmap` are aligned to pages with :meth:`compas_vol.engine.Grid.page_aligned`.
+        chunk_shape : tuple of int, optional
+            The shape of the blocks handed to the threads.
+        memory_budget : int, optional
+            The number of bytes each thread may use for the evaluation of a block.
+        compiled : bool, optional
+            If False, blocks are evaluated with ``tree.get_distance_numpy`` instead of the fused kernel.
+        cull : bool, optional
+            If True, blocks are evaluated with ``tree.get_distance_numpy``, and the children of combinations
+            only near their bounding boxes, as in :meth:`compas_vol.engine.Grid.evaluate`.
+
+        Returns
+        -------
+        numpy array
+            The distances over the grid, or a copy-on-write memory map of the cached distances
+            inside :func:`compas_vol.engine.caching` if no output is given.
+        """
+        import numpy as np
+
+        if self._executor is None:
+            raise RuntimeError('The evaluator has been closed.')
+        if out is None:
+            cache = get_cache()
+            if cache is not None:
+                return cache.evaluate(tree, grid, lambda out: self.evaluate(tree, grid, out, chunk_shape, memory_budget, compiled, cull), cull)
+            out = grid.empty()
+        elif tuple(out.shape) != grid.shape:
+            raise ValueError('Output of shape {} does not match the grid shape {}.'.format(out.shape, grid.shape))
+        if chunk_shape is None:
+            chunk_shape = grid.slab_shape(self.threads * self.slabs_per_thread, memory_budget, tree)
+            if isinstance(out, np.memmap):
+                chunk_shape = grid.page_aligned(chunk_shape)
+        kernel = compile(tree) if compiled and not cull else None
+        margin = grid.cull_margin if cull else None
+        x, y, z = grid.axes()
+
+        def evaluate_block(block):
+            bx, by, bz = block
+            xb, yb, zb = x[bx, None, None], y[None, by, None], z[None, None, bz]
+            with shared_transforms(), shared_subtrees(tree), culling(margin):
+                if out.dtype != xb.dtype:
+                    out[block] = tree.get_distance_numpy(xb, yb, zb) if kernel is None else kernel(xb, yb, zb)
+                elif kernel is None:
+                    distance_into(tree, xb, yb, zb, out[block])
+                else:
+                    kernel(xb, yb, zb, out=out[block])
+
+        for future in [self._executor.submit(evaluate_block, block) for block in grid.chunks(chunk_shape)]:
+            future.result()
+        if hasattr(out, 'flush'):
+            out.flush()
+        return out
@@ -9,14 +9,38 @@ compas_vol.meshing
     :toctree: generated/
     :nosignatures:
 
-    OctNode
+    chunked_marching_cubes
+    dual_contour
+    morton_decode
+    morton_encode
     Octree
+    read_nrrd
+    save_volume
+    SparseGrid
+    VolumeFile
+    write_nrrd
 
 """
-from .octree import OctNode
+from .dualcontouring import dual_contour
+from .marching import chunked_marching_cubes
+from .morton import morton_decode
+from .morton import morton_encode
 from .octree import Octree
+from .sparse import SparseGrid
+from .volumefile import VolumeFile
+from .volumefile import read_nrrd
+from .volumefile import save_volume
+from .volumefile import write_nrrd
 
 __all__ = [
+    'chunked_marching_cubes',
+    'dual_contour',
+    'morton_decode',
+    'morton_encode',
     'Octree',
-    'OctNode'
+    'SparseGrid',
+    'VolumeFile',
+    'read_nrrd',
+    'save_volume',
+    'write_nrrd'
 ]
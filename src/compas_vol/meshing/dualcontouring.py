@@ -0,0 +1,262 @@
+from __future__ import division
+
+import itertools
+
+from .morton import morton_decode
+from .morton import morton_encode
+
+
+__all__ = [
+    'dual_contour'
+]
+
+
+#: The deepest octree dual contouring supports, so that edge keys fit in 64 bits.
+MAX_DEPTH = 19
+
+#: The ratio to the largest eigenvalue below which directions of a QEF are left at the mass point.
+QEF_CUTOFF = 0.02
+
+_CORNERS = list(itertools.product((0, 1), repeat=3))
+_EDGES = [(a, b, axis) for a, b in itertools.combinations(range(8), 2)
+          for axis in range(3) if sum(abs(p - q) for p, q in zip(_CORNERS[a], _CORNERS[b])) == 1 and _CORNERS[a][axis] != _CORNERS[b][axis]]
+
+
+def _support():
+    """The corners of a 3x3x3 sample block whose signs constrain the sign at each other sample.
+
+    The sample at the middle of an edge, a face or the cell has to agree with at least one
+    of the corners of that edge, face or cell, for the cell to be collapsed without changing
+    the topology of the surface.
+    """
+    points = list(itertools.product((0, 1, 2), repeat=3))
+    index = {p: i for i, p in enumerate(points)}
+    support = []
+    for p in points:
+        free = [i for i in range(3) if p[i] == 1]
+        if not free:
+            continue
+        corners = []
+        for values in itertools.product((0, 2), repeat=len(free)):
+            q = list(p)
+            for i, v in zip(free, values):
+                q[i] = v
+            corners.append(index[tuple(q)])
+        support.append((index[p], corners))
+    return points, support
+
+
+_SAMPLES, _SUPPORT = _support()
+
+
+class _QEF(object):
+    """Sums of quadratic error functions of a set of cells, as arrays."""
+
+    def __init__(self, ata, atb, btb, mass, count):
+        self.ata = ata
+        self.atb = atb
+        self.btb = btb
+        self.mass = mass
+        self.count = count
+
+    def reduce(self, index, n):
+        """Sum the functions of the cells into ``n`` groups."""
+        import numpy as np
+
+        parts = []
+        for a in (self.ata, self.atb, self.btb, self.mass, self.count):
+            out = np.zeros((n,) + a.shape[1:])
+            np.add.at(out, index, a)
+            parts.append(out)
+        return _QEF(*parts)
+
+    def take(self, index):
+        return _QEF(self.ata[index], self.atb[index], self.btb[index], self.mass[index], self.count[index])
+
+    def solve(self, lower, upper):
+        """The minimizers, clamped to boxes, and their mean squared errors."""
+        import numpy as np
+
+        center = self.mass / self.count[:, None]
+        w, v = np.linalg.eigh(self.ata)
+        inverse = np.where(w > QEF_CUTOFF * w[:, -1:], 1.0 / np.where(w > 0, w, 1.0), 0.0)
+        r = self.atb - np.einsum('nij,nj->ni', self.ata, center)
+        x = center + np.einsum('nij,nj->ni', v, inverse * np.einsum('nji,nj->ni', v, r))
+        x = np.clip(x, lower, upper)
+        error = np.einsum('ni,nij,nj->n', x, self.ata, x) - 2 * np.einsum('ni,ni->n', x, self.atb) + self.btb
+        return x, np.maximum(error, 0) / self.count
+
+
+def _crossings(obj, pa, pb, da, db, iterations=4):
+    """Find the points where the distances change sign on segments by regula falsi."""
+    import numpy as np
+    from compas_vol.engine import evaluate_points
+
+    ta, tb = np.zeros(len(pa)), np.ones(len(pa))
+    for _ in range(iterations):
+        t = ta + (tb - ta) * da / (da - db)
+        d = evaluate_points(obj, pa + t[:, None] * (pb - pa))
+        lower = (d < 0) == (da < 0)
+        ta, da = np.where(lower, t, ta), np.where(lower, d, da)
+        tb, db = np.where(lower, tb, t), np.where(lower, db, d)
+    t = ta + (tb - ta) * da / (da - db)
+    return pa + t[:, None] * (pb - pa)
+
+
+def dual_contour(octree, tolerance=None, min_level=0):
+    """Mesh the surface of the object of an octree by adaptive dual contouring.
+
+    The points where the distances change sign on the edges of the deepest active cells of the
+    octree are found by regula falsi, and their normals by :class:`compas_vol.analysis.Gradient`.
+    Each cell gets the vertex that minimizes the quadratic error function (QEF) of the planes
+    through these points, so that vertices lie on sharp edges and corners instead of cutting them.
+    Each sign-changing edge gives a quad between the vertices of its four cells.
+
+    The cells are then merged up the octree, level by level: the eight children of a cell
+    are replaced by one vertex if the summed QEF of their vertices has a root mean squared error
+    of at most ``tolerance``, if all of them could be merged, and if the signs at the middles
+    of the edges and faces and at the centre of the cell agree with those at their corners,
+    so that the topology of the surface is kept. Flat regions thus get few large triangles,
+    while curved regions, edges and corners keep the vertices of the deepest level.
+
+    Parameters
+    ----------
+    octree : :class:`compas_vol.meshing.Octree`
+        The octree, built if it has not been. Its depth is at most 19.
+    tolerance : float, optional
+        The root mean squared distance of merged vertices to the planes of their cells.
+        Defaults to a tenth of the edge length of the deepest cells.
+    min_level : int, optional
+        The coarsest level cells are merged to.
+
+    Returns
+    -------
+    tuple
+        The vertices as a numpy array of floats of shape (n, 3), and the triangles as
+        a numpy array of int of shape (m, 3), oriented with their normals pointing outside.
+
+    Examples
+    --------
+    >>> from compas.geometry import Box, Frame
+    >>> from compas_vol.primitives import VolBox
+    >>> octree = Octree(VolBox(Box(Frame.worldXY(), 6, 4, 2)), size=10.0, depth=5)
+    >>> vertices, faces = dual_contour(octree)
+    >>> len(faces) <= 12 * 4
+    True
+    """
+    import numpy as np
+    from compas_vol.analysis import Gradient
+    from compas_vol.engine import evaluate_points
+
+    if octree.depth > MAX_DEPTH:
+        raise ValueError('Dual contouring supports octrees of depth {} at most: {}'.format(MAX_DEPTH, octree.depth))
+    if octree.codes is None:
+        octree.build()
+    obj, depth = octree.obj, octree.depth
+    h = octree.cell_size(depth)
+    origin = np.asarray(octree.min)
+    if tolerance is None:
+        tolerance = 0.1 * h
+
+    cells = octree.codes[octree.active]
+    ijk = np.stack(morton_decode(cells), axis=-1).astype(np.int64)
+    m = len(cells)
+
+    # the distances at the corners of the cells
+    corners = ijk[:, None, :] + np.array(_CORNERS)
+    keys, inverse = np.unique(morton_encode(*corners.reshape(-1, 3).T), return_inverse=True)
+    corner_ijk = np.stack(morton_decode(keys), axis=-1).astype(np.int64)
+    corner_d = evaluate_points(obj, origin + corner_ijk * h)
+    inside = (corner_d < 0)[inverse.reshape(m, 8)]
+
+    # the edges along which the sign changes, each once
+    a, b, axes = (np.array(c) for c in zip(*_EDGES))
+    change = inside[:, a] != inside[:, b]
+    cell_index, edge = np.nonzero(change)
+    lower = ijk[cell_index] + np.array(_CORNERS)[a[edge]]
+    edge_keys = morton_encode(*lower.T) << np.uint64(2) | axes[edge].astype(np.uint64)
+    edge_keys, edge_index = np.unique(edge_keys, return_inverse=True)
+    first = np.zeros(len(edge_keys), dtype=np.int64)
+    first[edge_index] = np.arange(len(edge_index))
+    ca = inverse.reshape(m, 8)[cell_index[first], a[edge[first]]]
+    cb = inverse.reshape(m, 8)[cell_index[first], b[edge[first]]]
+    points = _crossings(obj, origin + corner_ijk[ca] * h, origin + corner_ijk[cb] * h, corner_d[ca], corner_d[cb])
+    normals = Gradient(obj, 0.05 * h).get_gradient_points(points)
+
+    # the QEFs of the cells, from the planes of the crossings on their edges
+    nb = np.einsum('ni,ni->n', normals, points)
+    qef = _QEF(np.einsum('ni,nj->nij', normals, normals), normals * nb[:, None], nb ** 2, points, np.ones(len(points)))
+    qef = qef.take(edge_index).reduce(cell_index, m)
+
+    # the quads around the edges, between the four cells sharing them
+    lower_ijk = np.stack(morton_decode(edge_keys >> np.uint64(2)), axis=-1).astype(np.int64)
+    axis = (edge_keys & np.uint64(3)).astype(np.int64)
+    u, v = (axis + 1) % 3, (axis + 2) % 3
+    quads = np.empty((len(edge_keys), 4), dtype=np.int64)
+    valid = np.ones(len(edge_keys), dtype=bool)
+    for i, (su, sv) in enumerate([(-1, -1), (0, -1), (0, 0), (-1, 0)]):
+        q = lower_ijk.copy()
+        q[np.arange(len(q)), u] += su
+        q[np.arange(len(q)), v] += sv
+        codes = morton_encode(*np.maximum(q, 0).T)
+        index = np.minimum(np.searchsorted(cells, codes), m - 1)
+        valid &= (q >= 0).all(axis=-1) & (cells[index] == codes)
+        quads[:, i] = index
+    flip = ~(corner_d[ca] < 0)
+    quads[flip] = quads[flip, ::-1]
+    quads = quads[valid]
+
+    # the cells with crossings on their edges get vertices, merged up the octree
+    has = qef.count > 0
+    quads = (np.cumsum(has) - 1)[quads]
+    cells, ijk, qef = cells[has], ijk[has], qef.take(np.nonzero(has)[0])
+    m = len(cells)
+    x, _ = qef.solve(origin + ijk * h, origin + (ijk + 1) * h)
+    positions = [x]
+    cluster = np.arange(m)
+    live = np.arange(m)
+    live_codes = cells
+    live_qef = qef
+    offset = m
+    samples = np.array(_SAMPLES)
+    for level in range(depth, min_level, -1):
+        if not len(live):
+            break
+        # cells with a child that could not be merged keep their children
+        frozen = np.ones(offset, dtype=bool)
+        frozen[live] = False
+        blocked = np.unique(cells[frozen[cluster]] >> np.uint64(3 * (depth - level + 1)))
+        parents, group = np.unique(live_codes >> np.uint64(3), return_inverse=True)
+        merged = live_qef.reduce(group, len(parents))
+        pijk = np.stack(morton_decode(parents), axis=-1).astype(np.int64)
+        s = 2 ** (depth - level + 1)
+        x, error = merged.solve(origin + pijk * s * h, origin + (pijk + 1) * s * h)
+        ok = (error <= tolerance ** 2) & ~np.isin(parents, blocked)
+        if ok.any():
+            # the signs at the corners and the middles of the edges, faces and cell have to agree
+            d = evaluate_points(obj, (origin + (pijk[ok, None, :] * s + samples * (s // 2)) * h).reshape(-1, 3)).reshape(-1, 27) < 0
+            safe = np.ones(len(d), dtype=bool)
+            for p, support in _SUPPORT:
+                same = (d[:, support] == d[:, support[:1]]).all(axis=-1)
+                safe &= ~same | (d[:, p] == d[:, support[0]])
+            ok[np.nonzero(ok)[0][~safe]] = False
+        if not ok.any():
+            break
+        new = np.full(len(parents), -1, dtype=np.int64)
+        new[ok] = offset + np.arange(ok.sum())
+        remap = np.arange(offset + ok.sum())
+        remap[live] = np.where(ok[group], new[group], live)
+        cluster = remap[cluster]
+        positions.append(x[ok])
+        offset += ok.sum()
+        live = new[ok]
+        live_codes = parents[ok]
+        live_qef = merged.take(np.nonzero(ok)[0])
+
+    # the triangles of the quads between the merged vertices
+    used, quads = np.unique(cluster[quads], return_inverse=True)
+    vertices = np.concatenate(positions)[used]
+    quads = quads.reshape(-1, 4)
+    faces = np.concatenate([quads[:, [0, 1, 2]], quads[:, [0, 2, 3]]])
+    degenerate = (faces[:, 0] == faces[:, 1]) | (faces[:, 1] == faces[:, 2]) | (faces[:, 2] == faces[:, 0])
+    return vertices, faces[~degenerate]
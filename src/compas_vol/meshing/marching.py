@@ -0,0 +1,178 @@
+from __future__ import division
+
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+
+from compas_vol.engine.cache import get_cache
+
+
+__all__ = [
+    'chunked_marching_cubes'
+]
+
+
+#: The number of samples along each side of the chunks of objects meshed by default.
+CHUNK_SIZE = 64
+
+
+def _chunk_volume(source, grid, block):
+    """The distances over a block of a grid, from an array or by evaluating a tree."""
+    import numpy as np
+    from compas_vol.utilities.buffers import distance_into
+    from compas_vol.utilities.structure import shared_subtrees
+    from compas_vol.utilities.transforms import shared_transforms
+
+    if hasattr(source, 'shape'):
+        return np.asarray(source[block])
+    x, y, z = grid.ogrid(block)
+    out = np.empty(tuple(s.stop - s.start for s in block), dtype=x.dtype)
+    with shared_transforms(), shared_subtrees(source):
+        return distance_into(source, x, y, z, out)
+
+
+def _edge_keys(vertices, start, shape):
+    """Key the vertices of a chunk by the grid edge, or the sample, they lie on.
+
+    Marching cubes puts every vertex on an edge between two samples, at most one of whose
+    coordinates is fractional. The integer sample below the vertex and the axis of the edge
+    are the same in every chunk that shares the edge, whatever the rounding of the positions.
+    """
+    import numpy as np
+
+    nearest = np.rint(vertices)
+    fractional = vertices != nearest
+    axis = np.where(fractional.any(axis=-1), np.argmax(fractional, axis=-1), 3)
+    below = np.where(fractional, np.floor(vertices), nearest).astype(np.int64) + start
+    _, ny, nz = shape
+    return ((below[:, 0] * ny + below[:, 1]) * nz + below[:, 2]) * 4 + axis
+
+
+def _mesh_chunk(source, grid, block, level):
+    """Mesh a block of a grid, extended by one sample towards the upper bounds."""
+    import numpy as np
+    from skimage.measure import marching_cubes
+
+    halo = tuple(slice(s.start, min(s.stop + 1, n)) for s, n in zip(block, grid.shape))
+    if any(s.stop - s.start < 2 for s in halo):
+        return None
+    volume = _chunk_volume(source, grid, halo)
+    if not (volume.min() <= level <= volume.max()):
+        return None
+    try:
+        vertices, faces, _, _ = marching_cubes(volume, level)
+    except (ValueError, RuntimeError):
+        return None
+    start = np.array([s.start for s in halo])
+    keys = _edge_keys(vertices, start, grid.shape)
+    return keys, vertices + start, faces
+
+
+def chunked_marching_cubes(source, grid, level=0.0, chunk_shape=None, workers=None, executor=None, callback=None):
+    """Mesh an iso-surface over a grid chunk by chunk, with the chunks meshed in parallel.
+
+    Each chunk of the grid is extended by one sample towards the upper bounds, so that
+    neighbouring chunks share a plane of samples and the cells between them are meshed once.
+    The chunks are evaluated, if ``source`` is a distance object, and meshed with
+    :func:`skimage.measure.marching_cubes` by a pool of threads, so that only the chunks in
+    flight are held in memory. Vertices on the shared planes are welded by the grid edge they
+    lie on, so that the result is the same closed mesh as that of a single call over the grid,
+    without duplicate vertices. Inside :func:`compas_vol.engine.caching`, trees are evaluated
+    through the cache and the chunks are read from its memory map.
+
+    Parameters
+    ----------
+    source : volumetric object or numpy array
+        The object to mesh, or its distances over the grid, e.g. a memory-mapped array.
+    grid : :class:`compas_vol.engine.Grid`
+        The grid.
+    level : float, optional
+        The iso-value of the surface.
+    chunk_shape : tuple of int, optional
+        The number of samples of the chunks along x, y and z. Defaults to cubes of :data:`CHUNK_SIZE`
+        samples for objects, and to as many samples in chunks of whole z-lines for arrays.
+    workers : int, optional
+        The number of threads. Defaults to the number of CPUs.
+    executor : :class:`concurrent.futures.Executor`, optional
+        A pool of threads to mesh the chunks with instead of a pool started for the call, e.g. the
+        persistent pool of a :class:`compas_vol.utilities.MeshServer`.
+    callback : callable, optional
+        A function called with the block of each chunk with a surface, its vertices in world coordinates and
+        its triangles, as soon as the chunk is meshed, e.g. to show partial geometry early.
+        The vertices on the faces of the chunk are welded only in the result.
+
+    Returns
+    -------
+    tuple
+        The vertices in world coordinates as a numpy array of floats of shape (n, 3),
+        and the triangles as a numpy array of int of shape (m, 3), in the order of the chunks.
+
+    Examples
+    --------
+    >>> from compas.geometry import Point, Sphere
+    >>> from compas_vol.engine import Grid
+    >>> from compas_vol.primitives import VolSphere
+    >>> grid = Grid([(-5, 5), (-5, 5), (-5, 5)], resolution=64)
+    >>> vertices, faces = chunked_marching_cubes(VolSphere(Sphere(Point(0, 0, 0), 3)), grid, chunk_shape=(16, 16, 16))
+    """
+    import numpy as np
+
+    pool = ThreadPoolExecutor(workers or os.cpu_count() or 1) if executor is None else None
+    try:
+        chunks = []
+        for i, block, chunk in _mesh_chunks(source, grid, level, chunk_shape, executor or pool):
+            if chunk is None:
+                continue
+            chunks.append((i, chunk))
+            if callback is not None:
+                callback(block, np.asarray(grid.min) + chunk[1] * np.asarray(grid.spacing), chunk[2])
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    # in the order of the chunks, whatever the order they were done in
+    chunks.sort(key=lambda c: c[0])
+    return _weld([c for _, c in chunks], grid)
+
+
+def _mesh_chunks(source, grid, level, chunk_shape, executor):
+    """Mesh the chunks of a grid with a pool of threads, yielding the index, block and mesh, or None, of each chunk as it is done."""
+    if hasattr(source, 'shape') and tuple(source.shape) != grid.shape:
+        raise ValueError('Volume of shape {} does not match the grid shape {}.'.format(source.shape, grid.shape))
+    if not hasattr(source, 'shape') and get_cache() is not None:
+        # mesh the memory map of the cached distances
+        source = grid.evaluate(source)
+    if chunk_shape is None and hasattr(source, 'shape'):
+        # whole z-lines, so that the chunks of a memory-mapped volume read contiguous runs of the file
+        side = max(2, int(math.sqrt(CHUNK_SIZE ** 3 / grid.shape[2])))
+        chunk_shape = (side, side, grid.shape[2])
+    elif chunk_shape is None:
+        chunk_shape = (CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE)
+    blocks = list(grid.chunks(chunk_shape))
+    futures = dict((executor.submit(_mesh_chunk, source, grid, block, level), i) for i, block in enumerate(blocks))
+    for future in as_completed(futures):
+        i = futures[future]
+        yield i, blocks[i], future.result()
+
+
+def _weld(chunks, grid):
+    """The mesh of the meshes of chunks, with the vertices of the same grid edge welded, in world coordinates."""
+    import numpy as np
+
+    if not chunks:
+        return np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int64)
+
+    keys = np.concatenate([k for k, _, _ in chunks])
+    positions = np.concatenate([v for _, v, _ in chunks])
+    offsets = np.cumsum([0] + [len(k) for k, _, _ in chunks])
+    faces = np.concatenate([f + o for (_, _, f), o in zip(chunks, offsets)])
+
+    # weld the vertices of the same edge, keeping their first position
+    keys, first, index = np.unique(keys, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    vertices = np.asarray(grid.min) + positions[first[order]] * np.asarray(grid.spacing)
+    faces = rank[index][faces]
+    degenerate = (faces[:, 0] == faces[:, 1]) | (faces[:, 1] == faces[:, 2]) | (faces[:, 2] == faces[:, 0])
+    return vertices, faces[~degenerate]
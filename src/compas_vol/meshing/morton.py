@@ -0,0 +1,83 @@
+from __future__ import division
+
+
+__all__ = [
+    'morton_encode',
+    'morton_decode'
+]
+
+
+#: The number of bits per axis of a 64-bit Morton code.
+MORTON_BITS = 21
+
+
+def _spread(v):
+    """Spread the lower 21 bits of integers to every third bit."""
+    import numpy as np
+
+    v = np.asarray(v, dtype=np.uint64) & np.uint64(0x1fffff)
+    v = (v | v << np.uint64(32)) & np.uint64(0x1f00000000ffff)
+    v = (v | v << np.uint64(16)) & np.uint64(0x1f0000ff0000ff)
+    v = (v | v << np.uint64(8)) & np.uint64(0x100f00f00f00f00f)
+    v = (v | v << np.uint64(4)) & np.uint64(0x10c30c30c30c30c3)
+    v = (v | v << np.uint64(2)) & np.uint64(0x1249249249249249)
+    return v
+
+
+def _compact(v):
+    """Gather every third bit of integers into their lower 21 bits."""
+    import numpy as np
+
+    v = np.asarray(v, dtype=np.uint64) & np.uint64(0x1249249249249249)
+    v = (v | v >> np.uint64(2)) & np.uint64(0x10c30c30c30c30c3)
+    v = (v | v >> np.uint64(4)) & np.uint64(0x100f00f00f00f00f)
+    v = (v | v >> np.uint64(8)) & np.uint64(0x1f0000ff0000ff)
+    v = (v | v >> np.uint64(16)) & np.uint64(0x1f00000000ffff)
+    v = (v | v >> np.uint64(32)) & np.uint64(0x1fffff)
+    return v
+
+
+def morton_encode(i, j, k):
+    """Interleave the bits of integer cell coordinates into Morton codes.
+
+    The bits of ``i`` take the lowest position of each triple of bits, followed by those of ``j`` and ``k``,
+    so that the codes of the eight children of a cell are the code of the cell shifted by three bits
+    plus ``0`` to ``7``, and sorting by code orders cells along a Z-order curve.
+
+    Parameters
+    ----------
+    i, j, k : int or numpy array of int
+        The cell coordinates along x, y and z, of at most 21 bits each.
+
+    Returns
+    -------
+    numpy array of uint64
+        The Morton codes.
+
+    Examples
+    --------
+    >>> int(morton_encode(1, 0, 0)), int(morton_encode(0, 1, 0)), int(morton_encode(1, 1, 1))
+    (1, 2, 7)
+    """
+    import numpy as np
+
+    return _spread(i) | (_spread(j) << np.uint64(1)) | (_spread(k) << np.uint64(2))
+
+
+def morton_decode(codes):
+    """Split Morton codes into integer cell coordinates.
+
+    Parameters
+    ----------
+    codes : int or numpy array of uint64
+        The Morton codes, as :func:`morton_encode`.
+
+    Returns
+    -------
+    tuple of numpy array of uint64
+        The cell coordinates along x, y and z.
+    """
+    import numpy as np
+
+    codes = np.asarray(codes, dtype=np.uint64)
+    return _compact(codes), _compact(codes >> np.uint64(1)), _compact(codes >> np.uint64(2))
@@ -1,51 +1,222 @@
+from __future__ import division
+
 from math import sqrt
-from compas.geometry import Point
+
+from .morton import MORTON_BITS
+from .morton import morton_decode
+from .morton import morton_encode
+
+
+__all__ = [
+    'Octree'
+]
 
 
 class Octree(object):
-    sq2 = sqrt(2.0)
-    sq3 = sqrt(3.0)
-
-    def __init__(self):
-        self._p = Point(0, 0, 0)
-        self._ws = 100.0  # world size
-        self._ml = 4      # max levels
-        self._rn = OctNode(0, 0, 0, self._ws, 0)
-        self._o = None
-
-    def divide(self, node):
-        if node.level < self._ml:
-            d = self._o.get_distance(node.pos.x, node.pos.y, node.pos.z)
-            if abs(d) < Octree.sq3 * node._el/2.0:
-                node.divide_node()
-                for b in node._branches:
-                    self.divide(b)
-
-
-class OctNode(object):
-    def __init__(self, x, y, z, e, level):
-        self._p = Point(x, y, z)
-        self._el = e
-        self._l = level
-        self._branches = None
+    """A linear octree of cells refined towards the surface of a distance object.
+
+    The cube of the octree is subdivided level by level. The centres of all cells of a level
+    are evaluated in one batched call of :func:`compas_vol.engine.evaluate_points`, and a cell is
+    only subdivided if the absolute distance at its centre is at most its half-diagonal plus a margin,
+    i.e. if the surface may pass through it or within the margin of it. The cells that are not subdivided are the leaves.
+    They are stored as flat arrays of Morton codes, levels and centre distances, sorted along
+    a Z-order curve, instead of as a tree of node objects.
+
+    The pruning assumes that the distances do not change faster than the distance to the surface,
+    as for true distance functions. Fields that change faster, such as that of a
+    :class:`compas_vol.microstructures.TPMS`, may lose parts of their surface.
+
+    Parameters
+    ----------
+    obj : volumetric object, optional
+        The object whose surface the octree is refined towards.
+    center : tuple of float, optional
+        The centre of the cube of the octree.
+    size : float, optional
+        The edge length of the cube of the octree.
+    depth : int, optional
+        The number of levels of subdivision, so that the smallest cells have an edge length of ``size / 2 ** depth``.
+    margin : float, optional
+        A distance to the surface within which cells are subdivided as well.
+
+    Attributes
+    ----------
+    codes : numpy array of uint64
+        The Morton codes of the leaves, as :func:`compas_vol.meshing.morton_encode` of their cell coordinates at their level.
+    levels : numpy array of uint8
+        The levels of the leaves.
+    distances : numpy array of float
+        The distances at the centres of the leaves.
+    evaluations : int
+        The number of distances evaluated by the last :meth:`build`.
+
+    Examples
+    --------
+    >>> from compas.geometry import Point, Sphere
+    >>> from compas_vol.primitives import VolSphere
+    >>> octree = Octree(VolSphere(Sphere(Point(0, 0, 0), 30)), size=100.0, depth=7).build()
+    >>> octree.evaluations < 128 ** 3 // 10
+    True
+    """
+
+    def __init__(self, obj=None, center=(0.0, 0.0, 0.0), size=100.0, depth=4, margin=0.0):
+        if not 0 <= depth <= MORTON_BITS:
+            raise ValueError('The depth of an octree is between 0 and {}: {}'.format(MORTON_BITS, depth))
+        self.obj = obj
+        self.center = tuple(float(c) for c in center)
+        self.size = float(size)
+        self.depth = int(depth)
+        self.margin = float(margin)
+        self.codes = None
+        self.levels = None
+        self.distances = None
+        self.evaluations = 0
+        self._keys = None
+
+    def __repr__(self):
+        return 'Octree({!r}, center={}, size={}, depth={})'.format(self.obj, self.center, self.size, self.depth)
+
+    def __len__(self):
+        return 0 if self.codes is None else len(self.codes)
+
+    @property
+    def min(self):
+        """tuple of float : The lower corner of the cube of the octree."""
+        return tuple(c - self.size / 2.0 for c in self.center)
+
+    def cell_size(self, level):
+        """The edge length of the cells of a level, or of an array of levels."""
+        return self.size / 2.0 ** level
+
+    def half_diagonal(self, level):
+        """Half the length of the diagonal of the cells of a level, or of an array of levels."""
+        return sqrt(3.0) / 2.0 * self.cell_size(level)
+
+    def cell_centers(self, codes, level):
+        """The centres of cells.
+
+        Parameters
+        ----------
+        codes : numpy array of uint64
+            The Morton codes of the cells.
+        level : int or numpy array of int
+            The level of the cells.
+
+        Returns
+        -------
+        numpy array of floats, shape (n, 3)
+            The centres.
+        """
+        import numpy as np
+
+        ijk = np.stack(morton_decode(codes), axis=-1).astype(float)
+        h = np.asarray(self.cell_size(np.asarray(level, dtype=float)))[..., None]
+        return np.asarray(self.min) + (ijk + 0.5) * h
+
+    # ==========================================================================
+    # construction
+    # ==========================================================================
+
+    def build(self, chunk_size=None):
+        """Subdivide the octree towards the surface of its object.
+
+        Parameters
+        ----------
+        chunk_size : int, optional
+            The number of cell centres evaluated at once, see :func:`compas_vol.engine.evaluate_points`.
+
+        Returns
+        -------
+        :class:`Octree`
+            The octree itself.
+        """
+        import numpy as np
+        from compas_vol.engine import evaluate_points
+
+        if self.obj is None:
+            raise ValueError('An octree needs an object to build.')
+        children = np.arange(8, dtype=np.uint64)
+        codes = np.zeros(1, dtype=np.uint64)
+        leaves = []
+        self.evaluations = 0
+        for level in range(self.depth + 1):
+            d = evaluate_points(self.obj, self.cell_centers(codes, level), chunk_size=chunk_size)
+            self.evaluations += len(codes)
+            if level == self.depth:
+                leaves.append((codes, level, d))
+                break
+            near = np.abs(d) <= self.half_diagonal(level) + self.margin
+            leaves.append((codes[~near], level, d[~near]))
+            codes = ((codes[near, None] << np.uint64(3)) | children).reshape(-1)
+            if not len(codes):
+                break
+        codes = np.concatenate([c for c, _, _ in leaves])
+        levels = np.concatenate([np.full(len(c), level, dtype=np.uint8) for c, level, _ in leaves])
+        return self.set_leaves(codes, levels, np.concatenate([d for _, _, d in leaves]))
+
+    def set_leaves(self, codes, levels, distances):
+        """Set the leaves of the octree, e.g. as read from a file, in the order of the Z-order curve.
+
+        Parameters
+        ----------
+        codes : numpy array of uint64
+            The Morton codes of the leaves.
+        levels : numpy array of uint8
+            The levels of the leaves.
+        distances : numpy array of float
+            The distances at the centres of the leaves.
+
+        Returns
+        -------
+        :class:`Octree`
+            The octree itself.
+        """
+        import numpy as np
+
+        codes, levels = np.asarray(codes, dtype=np.uint64), np.asarray(levels, dtype=np.uint8)
+        # the codes of the first cell of the deepest level inside each leaf order the leaves along the curve
+        keys = codes << (np.uint64(3) * (np.uint64(self.depth) - levels.astype(np.uint64)))
+        order = np.argsort(keys, kind='stable')
+        self.codes, self.levels, self.distances, self._keys = codes[order], levels[order], np.asarray(distances)[order], keys[order]
+        return self
+
+    # ==========================================================================
+    # leaves
+    # ==========================================================================
+
+    def centers(self):
+        """numpy array of floats, shape (n, 3) : The centres of the leaves."""
+        return self.cell_centers(self.codes, self.levels)
+
+    def sizes(self):
+        """numpy array of floats, shape (n,) : The edge lengths of the leaves."""
+        return self.cell_size(self.levels.astype(float))
 
     @property
-    def level(self):
-        return self._l
-
-    @level.setter
-    def level(self, level):
-        self._l = float(level)
-
-    def divide_node(self):
-        self._branches = []
-        qs = self._el/4.0
-        nl = self.level + 1
-        self._branches.append(OctNode(self._p.x-qs, self._p.y-qs, self._p.z-qs, qs*2, nl))
-        self._branches.append(OctNode(self._p.x+qs, self._p.y-qs, self._p.z-qs, qs*2, nl))
-        self._branches.append(OctNode(self._p.x-qs, self._p.y+qs, self._p.z-qs, qs*2, nl))
-        self._branches.append(OctNode(self._p.x+qs, self._p.y+qs, self._p.z-qs, qs*2, nl))
-        self._branches.append(OctNode(self._p.x-qs, self._p.y-qs, self._p.z+qs, qs*2, nl))
-        self._branches.append(OctNode(self._p.x+qs, self._p.y-qs, self._p.z+qs, qs*2, nl))
-        self._branches.append(OctNode(self._p.x-qs, self._p.y+qs, self._p.z+qs, qs*2, nl))
-        self._branches.append(OctNode(self._p.x+qs, self._p.y+qs, self._p.z+qs, qs*2, nl))
+    def active(self):
+        """numpy array of bool : Whether the surface may pass within the margin of each leaf, i.e. the leaves at the deepest level near it."""
+        return (self.levels == self.depth) & (abs(self.distances) <= self.half_diagonal(self.depth) + self.margin)
+
+    def locate(self, points):
+        """The leaves that contain points.
+
+        Parameters
+        ----------
+        points : numpy array of floats, shape (n, 3)
+            The points.
+
+        Returns
+        -------
+        numpy array of int, shape (n,)
+            The index of the leaf that contains each point, or -1 for points outside the cube of the octree.
+        """
+        import numpy as np
+
+        if self.codes is None:
+            raise ValueError('The octree has not been built.')
+        n = 2 ** self.depth
+        ijk = np.floor((np.asarray(points, dtype=float) - np.asarray(self.min)) / self.cell_size(self.depth))
+        inside = ((ijk >= 0) & (ijk < n)).all(axis=-1)
+        ijk = np.clip(ijk, 0, n - 1).astype(np.uint64)
+        index = np.searchsorted(self._keys, morton_encode(ijk[:, 0], ijk[:, 1], ijk[:, 2]), side='right') - 1
+        return np.where(inside, index, -1)
@@ -0,0 +1,227 @@
+from __future__ import division
+
+import math
+
+from .morton import morton_decode
+from .morton import morton_encode
+from .octree import Octree
+
+
+__all__ = [
+    'SparseGrid'
+]
+
+
+class SparseGrid(object):
+    """A regular grid of samples that stores only the tiles near the surface of a distance object.
+
+    The samples are grouped into cubic tiles of ``tile ** 3`` samples. The tiles within ``band``
+    of the surface are found with an :class:`Octree` whose deepest cells are the tiles, evaluated,
+    and stored in one array, indexed by the sorted Morton codes of their tile coordinates.
+    The distances of the stored tiles are clipped to ``[-band, band]``, and all other samples
+    read as the constant background ``-band`` inside or ``band`` outside, depending on the sign of
+    the octree leaf they fall in. The memory of the grid thus scales with the area of the surface
+    rather than with the volume of the grid.
+
+    Parameters
+    ----------
+    obj : volumetric object, optional
+        The object to sample.
+    bounds : list of tuple, optional
+        The bounds of the grid along x, y and z as ``(min, max)`` pairs.
+    spacing : float, optional
+        The distance between samples.
+    tile : int, optional
+        The number of samples along each side of a tile.
+    band : float, optional
+        The distance to the surface within which samples are stored. Defaults to three times the spacing.
+    dtype : str or numpy dtype, optional
+        The data type of the stored distances. Defaults to the precision set with :func:`compas_vol.utilities.precision`.
+
+    Attributes
+    ----------
+    shape : tuple of int
+        The number of samples along x, y and z.
+    keys : numpy array of uint64
+        The sorted Morton codes of the tile coordinates of the stored tiles.
+    data : numpy array, shape (n, tile, tile, tile)
+        The distances of the stored tiles.
+    octree : :class:`Octree`
+        The octree of tiles, whose leaves give the sign of the samples outside the stored tiles.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from compas.geometry import Point, Sphere
+    >>> from compas_vol.primitives import VolSphere
+    >>> grid = SparseGrid(VolSphere(Sphere(Point(0, 0, 0), 3)), [(-5, 5), (-5, 5), (-5, 5)], 0.1).build()
+    >>> grid.sample(np.array([[3.05, 0.0, 0.0], [0.0, 0.0, 0.0]]))
+    array([ 0.05, -0.3 ])
+    """
+
+    def __init__(self, obj=None, bounds=None, spacing=1.0, tile=8, band=None, dtype=None):
+        from compas_vol.utilities.precision import get_precision
+
+        self.obj = obj
+        self.spacing = float(spacing)
+        self.min = tuple(float(b[0]) for b in bounds) if bounds is not None else (0.0, 0.0, 0.0)
+        self.shape = tuple(int((b[1] - b[0]) / self.spacing + 1e-9) + 1 for b in bounds) if bounds is not None else (1, 1, 1)
+        self.tile = int(tile)
+        self.band = 3 * self.spacing if band is None else float(band)
+        self.dtype = dtype or get_precision()
+        self.keys = None
+        self.data = None
+        self.octree = None
+
+    def __repr__(self):
+        return 'SparseGrid({!r}, min={}, shape={}, spacing={}, tile={})'.format(self.obj, self.min, self.shape, self.spacing, self.tile)
+
+    def __len__(self):
+        return 0 if self.keys is None else len(self.keys)
+
+    def __iter__(self):
+        """Iterate over the stored tiles as pairs of the index of their first sample and their distances."""
+        for origin, block in zip(self.tile_origins(), self.data):
+            yield tuple(int(i) for i in origin), block
+
+    @property
+    def background(self):
+        """tuple of float : The distances of the samples outside the stored tiles, inside and outside the object."""
+        return -self.band, self.band
+
+    @property
+    def nbytes(self):
+        """int : The memory used by the tiles, their index and the octree leaves."""
+        if self.keys is None:
+            return 0
+        leaves = self.octree.codes.nbytes + self.octree.levels.nbytes + self.octree.distances.nbytes + self.octree._keys.nbytes
+        return self.data.nbytes + self.keys.nbytes + leaves
+
+    def tile_origins(self):
+        """numpy array of int, shape (n, 3) : The indices of the first samples of the stored tiles."""
+        import numpy as np
+
+        return np.stack(morton_decode(self.keys), axis=-1).astype(np.int64) * self.tile
+
+    # ==========================================================================
+    # construction
+    # ==========================================================================
+
+    def build(self, memory_budget=None):
+        """Evaluate the tiles of the grid within the band around the surface of its object.
+
+        Parameters
+        ----------
+        memory_budget : int, optional
+            The number of bytes the evaluation of a batch of tiles may use, see :func:`compas_vol.engine.evaluate_points`.
+
+        Returns
+        -------
+        :class:`SparseGrid`
+            The grid itself.
+        """
+        import numpy as np
+        from compas_vol.engine import evaluate_points
+        from compas_vol.engine.points import point_chunk_size
+
+        if self.obj is None:
+            raise ValueError('A sparse grid needs an object to build.')
+        t, h = self.tile, self.spacing
+        # the deepest cells of the octree span the samples of a tile and the gaps to the next tile
+        depth = max(0, int(math.ceil(math.log(max(-(-n // t) for n in self.shape), 2))))
+        size = 2 ** depth * t * h
+        center = [a + size / 2.0 for a in self.min]
+        self.octree = Octree(self.obj, center, size, depth, margin=self.band).build()
+        self.keys = self.octree.codes[self.octree.active]
+        self.data = np.empty((len(self.keys), t, t, t), dtype=self.dtype)
+
+        offsets = np.stack(np.meshgrid(*[np.arange(t)] * 3, indexing='ij'), axis=-1).reshape(-1, 3)
+        origins = self.tile_origins()
+        flat = self.data.reshape(len(self.keys), -1)
+        batch = max(1, point_chunk_size(self.obj, memory_budget=memory_budget) // t ** 3)
+        for start in range(0, len(self.keys), batch):
+            ijk = origins[start:start + batch, None, :] + offsets
+            points = np.asarray(self.min) + ijk.reshape(-1, 3) * h
+            d = evaluate_points(self.obj, points)
+            flat[start:start + batch] = d.reshape(-1, t ** 3)
+        np.clip(self.data, -self.band, self.band, out=self.data)
+        return self
+
+    # ==========================================================================
+    # queries
+    # ==========================================================================
+
+    def values(self, i, j, k):
+        """The distances at integer sample indices.
+
+        Parameters
+        ----------
+        i, j, k : numpy array of int
+            The broadcastable indices of the samples along x, y and z.
+
+        Returns
+        -------
+        numpy array
+            The stored distances, or the background for samples outside the stored tiles.
+            Samples beyond the tiles of the octree read as the outside background.
+        """
+        import numpy as np
+
+        if self.keys is None:
+            raise ValueError('The sparse grid has not been built.')
+        i, j, k = np.broadcast_arrays(*(np.asarray(c, dtype=np.int64) for c in (i, j, k)))
+        t = self.tile
+        n = 2 ** self.octree.depth
+        inside = (i >= 0) & (j >= 0) & (k >= 0) & (i < n * t) & (j < n * t) & (k < n * t)
+        ti, tj, tk = (np.clip(c // t, 0, n - 1) for c in (i, j, k))
+        out = np.full(i.shape, self.band, dtype=self.data.dtype)
+
+        codes = morton_encode(ti, tj, tk)
+        index = np.minimum(np.searchsorted(self.keys, codes), max(len(self.keys) - 1, 0))
+        stored = inside & (self.keys[index] == codes) if len(self.keys) else np.zeros(i.shape, dtype=bool)
+        out[stored] = self.data[index[stored], i[stored] % t, j[stored] % t, k[stored] % t]
+
+        rest = inside & ~stored
+        if rest.any():
+            # the centre of the tile, off the boundaries of the octree cells
+            centers = np.asarray(self.min) + (np.stack((ti[rest], tj[rest], tk[rest]), axis=-1) + 0.5) * t * self.spacing
+            leaves = self.octree.locate(centers)
+            out[rest] = np.where(self.octree.distances[leaves] < 0, -self.band, self.band)
+        return out
+
+    def sample(self, points):
+        """Interpolate the distances at points trilinearly.
+
+        Parameters
+        ----------
+        points : numpy array of floats, shape (n, 3)
+            The points.
+
+        Returns
+        -------
+        numpy array, shape (n,)
+            The interpolated distances.
+        """
+        import numpy as np
+
+        f = (np.asarray(points, dtype=float) - np.asarray(self.min)) / self.spacing
+        i0 = np.floor(f).astype(np.int64)
+        w = f - i0
+        out = np.zeros(len(f), dtype=float)
+        for corner in np.ndindex(2, 2, 2):
+            c = np.asarray(corner)
+            weight = np.prod(np.where(c, w, 1 - w), axis=-1)
+            out += weight * self.values(*(i0 + c).T)
+        return out.astype(self.data.dtype)
+
+    def to_dense(self):
+        """numpy array : The distances of all samples of the grid, as a dense array."""
+        import numpy as np
+
+        out = np.empty(self.shape, dtype=self.data.dtype)
+        j, k = np.arange(self.shape[1])[None, :, None], np.arange(self.shape[2])[None, None, :]
+        # one layer of tiles at a time, to bound the temporaries of the lookup
+        for start in range(0, self.shape[0], self.tile):
+            i = np.arange(start, min(start + self.tile, self.shape[0]))[:, None, None]
+            out[start:start + self.tile] = self.values(i, j, k)
+        return out
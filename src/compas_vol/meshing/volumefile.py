@@ -0,0 +1,686 @@
+from __future__ import division
+
+import gzip
+import json
+import operator
+import os
+import re
+import struct
+import zlib
+
+from .morton import morton_decode
+from .morton import morton_encode
+from .octree import Octree
+from .sparse import SparseGrid
+
+
+__all__ = [
+    'VolumeFile',
+    'save_volume',
+    'read_nrrd',
+    'write_nrrd'
+]
+
+
+#: The first bytes of a volume file.
+MAGIC = b'CVOL'
+
+#: The version of the volume file format, increased when it changes.
+FORMAT_VERSION = 1
+
+# the magic bytes, the format version and the length of the JSON header
+_PREFIX = struct.Struct('<4sIQ')
+
+# an entry of the index of the bricks: the Morton code of the tile, and the offset and length of the brick in the file
+_INDEX = [('code', '<u8'), ('offset', '<u8'), ('size', '<u8')]
+
+# the types of NRRD and their numpy equivalents
+_NRRD_TYPES = {
+    'signed char': 'i1', 'int8': 'i1', 'int8_t': 'i1',
+    'uchar': 'u1', 'unsigned char': 'u1', 'uint8': 'u1', 'uint8_t': 'u1',
+    'short': 'i2', 'short int': 'i2', 'signed short': 'i2', 'signed short int': 'i2', 'int16': 'i2', 'int16_t': 'i2',
+    'ushort': 'u2', 'unsigned short': 'u2', 'unsigned short int': 'u2', 'uint16': 'u2', 'uint16_t': 'u2',
+    'int': 'i4', 'signed int': 'i4', 'int32': 'i4', 'int32_t': 'i4',
+    'uint': 'u4', 'unsigned int': 'u4', 'uint32': 'u4', 'uint32_t': 'u4',
+    'longlong': 'i8', 'long long': 'i8', 'long long int': 'i8', 'signed long long': 'i8', 'signed long long int': 'i8', 'int64': 'i8', 'int64_t': 'i8',
+    'ulonglong': 'u8', 'unsigned long long': 'u8', 'unsigned long long int': 'u8', 'uint64': 'u8', 'uint64_t': 'u8',
+    'float': 'f4',
+    'double': 'f8'
+}
+
+_NRRD_NAMES = {'i1': 'int8', 'u1': 'uint8', 'i2': 'short', 'u2': 'ushort', 'i4': 'int', 'u4': 'uint', 'i8': 'longlong', 'u8': 'ulonglong', 'f4': 'float', 'f8': 'double'}
+
+
+# ==============================================================================
+# the compas_vol volume format
+# ==============================================================================
+
+
+def save_volume(filename, volume, grid=None, tree=None, compression=False, level=1, tile=32):
+    """Save a sampled field as a compas_vol volume file.
+
+    A volume file starts with the magic bytes ``CVOL``, the format version and a JSON header with
+    the shape, origin, spacing and data type of the grid, the tile size, the background distances,
+    the :func:`compas_vol.utilities.structural_digest` of the tree and the encoding of the bricks.
+    It is followed by an index of the bricks, i.e. the stored tiles, sorted by the Morton codes of their
+    tile coordinates, with their offsets and lengths in the file, by the heads of the bricks, by the leaves
+    of the octree that give the sign of the tiles that are not stored, and by the bricks, so that the bricks
+    of any region can be read on their own with :meth:`VolumeFile.read`.
+
+    A :class:`SparseGrid` stores only its tiles near the surface, and most samples of those are clipped
+    to the background. Its bricks are stored losslessly as a head of fixed length, a bit mask of the samples
+    within the band and a bit mask of the signs of all samples, and the values of the samples within the band only,
+    so that the file of a narrow-band field is a small fraction of a dense ``.npy``, and is written faster.
+    A dense array is stored as a brick of all samples of every tile. The bricks are optionally compressed
+    with zlib, after grouping the bytes of their values by significance, which halves them again at
+    the cost of compressing at tens of megabytes per second.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the file.
+    volume : :class:`SparseGrid` or numpy array
+        The field, a built sparse grid or a dense array of the shape of the grid, which may be a :class:`numpy.memmap`.
+    grid : :class:`compas_vol.engine.Grid`, optional
+        The grid of a dense array.
+    tree : volumetric object, optional
+        The tree the field was sampled from, whose digest is stored in the header. Defaults to the object of a sparse grid.
+    compression : bool, optional
+        Whether to compress the bricks with zlib.
+    level : int, optional
+        The zlib compression level, from 1, the fastest, to 9, the smallest.
+    tile : int, optional
+        The number of samples along each side of the bricks of a dense array.
+
+    Examples
+    --------
+    >>> import os, tempfile
+    >>> from compas.geometry import Point, Sphere
+    >>> from compas_vol.primitives import VolSphere
+    >>> sparse = SparseGrid(VolSphere(Sphere(Point(0, 0, 0), 3)), [(-5, 5), (-5, 5), (-5, 5)], 0.1).build()
+    >>> filename = os.path.join(tempfile.mkdtemp(), 'sphere.cvol')
+    >>> save_volume(filename, sparse)
+    >>> with VolumeFile(filename) as volume:
+    ...     bool((volume.read() == sparse.to_dense()).all())
+    True
+    """
+    import numpy as np
+    from compas_vol.utilities.structure import structural_digest
+
+    if isinstance(volume, SparseGrid):
+        if volume.keys is None:
+            raise ValueError('The sparse grid has not been built.')
+        t = volume.tile
+        shape, origin, spacing = volume.shape, volume.min, (volume.spacing,) * 3
+        dtype = volume.data.dtype
+        codes, bricks = volume.keys, volume.data
+        background = list(volume.background)
+        octree = volume.octree
+        if tree is None:
+            tree = volume.obj
+    else:
+        if grid is None:
+            raise ValueError('A dense volume needs its grid.')
+        if tuple(volume.shape) != tuple(grid.shape):
+            raise ValueError('Volume of shape {} does not match the grid shape {}.'.format(volume.shape, grid.shape))
+        t = int(tile)
+        shape, origin, spacing = grid.shape, grid.min, grid.spacing
+        dtype = volume.dtype
+        tiles = np.meshgrid(*[np.arange(-(-n // t)) for n in shape], indexing='ij')
+        codes = np.sort(morton_encode(*(c.ravel() for c in tiles)))
+        bricks = _dense_bricks(volume, codes, t)
+        background = None
+        octree = None
+    dtype = np.dtype(dtype).newbyteorder('<')
+
+    header = {
+        'shape': [int(n) for n in shape],
+        'min': [float(a) for a in origin],
+        'spacing': [float(s) for s in spacing],
+        'dtype': dtype.str,
+        'tile': int(t),
+        'background': background,
+        'tree': None if tree is None else structural_digest(tree),
+        'encoding': 'raw' if background is None else 'band',
+        'compression': 'zlib' if compression else None,
+        'bricks': int(len(codes)),
+        'octree': None if octree is None else {'center': list(octree.center), 'size': octree.size, 'depth': octree.depth, 'leaves': len(octree)},
+    }
+    text = json.dumps(header).encode('utf-8')
+    index = np.zeros(len(codes), dtype=_INDEX)
+    index['code'] = codes
+    heads = np.zeros((len(codes), 0 if background is None else _head_size(t)), dtype=np.uint8)
+    with open(filename, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(text)))
+        f.write(text)
+        start = f.tell()
+        # the index and the heads are written once the offsets of the bricks are known
+        f.write(index.tobytes())
+        f.write(heads.tobytes())
+        if octree is not None:
+            f.write(np.ascontiguousarray(octree.codes, dtype='<u8').tobytes())
+            f.write(np.ascontiguousarray(octree.levels, dtype='u1').tobytes())
+            f.write(np.ascontiguousarray(octree.distances, dtype='<f4').tobytes())
+        offset = f.tell()
+        i = 0
+        for batch in _batches(bricks, t, dtype):
+            head, data, sizes = _encode(batch, background, compression, level)
+            f.write(data)
+            heads[i:i + len(sizes)] = head
+            index['size'][i:i + len(sizes)] = sizes
+            index['offset'][i:i + len(sizes)] = offset + np.cumsum(sizes) - sizes
+            offset += int(sizes.sum())
+            i += len(sizes)
+        f.seek(start)
+        f.write(index.tobytes())
+        f.write(heads.tobytes())
+
+
+def _head_size(t):
+    """The number of bytes of the head of a band-encoded brick of ``t ** 3`` samples, two bit masks."""
+    return 2 * (-(-t ** 3 // 8))
+
+
+def _dense_bricks(volume, codes, t):
+    """The tiles of a dense array in the order of their codes, padded with their last samples to full tiles."""
+    import numpy as np
+
+    for i, j, k in zip(*(c.tolist() for c in morton_decode(codes))):
+        block = np.asarray(volume[i * t:(i + 1) * t, j * t:(j + 1) * t, k * t:(k + 1) * t])
+        if block.shape != (t, t, t):
+            block = np.pad(block, [(0, t - n) for n in block.shape], mode='edge')
+        yield block
+
+
+def _batches(bricks, t, dtype, size=4096):
+    """Arrays of up to ``size`` bricks of a type, from an array of bricks or an iterable of bricks."""
+    import numpy as np
+
+    if hasattr(bricks, 'shape'):
+        for start in range(0, len(bricks), size):
+            yield np.ascontiguousarray(bricks[start:start + size], dtype=dtype)
+        return
+    batch = []
+    for brick in bricks:
+        batch.append(brick)
+        if len(batch) == size:
+            yield np.stack(batch).astype(dtype, copy=False)
+            batch = []
+    if batch:
+        yield np.stack(batch).astype(dtype, copy=False)
+
+
+def _encode(batch, background, compression, level):
+    """The heads of the bricks of a batch, the bytes of their values and the lengths of those."""
+    import numpy as np
+
+    n = len(batch)
+    flat = batch.reshape(n, -1)
+    itemsize = flat.dtype.itemsize
+    if background is None:
+        heads = np.zeros((n, 0), dtype=np.uint8)
+        values, counts = flat.reshape(-1), np.full(n, flat.shape[1])
+    else:
+        band = flat.dtype.type(background[1])
+        inner = np.abs(flat) < band
+        # the signs of the samples within the band are those of their values, and are not needed
+        heads = np.concatenate((np.packbits(inner, axis=1), np.packbits(flat < 0, axis=1)), axis=1)
+        values, counts = flat[inner], np.count_nonzero(inner, axis=1)
+
+    if compression:
+        ends = np.cumsum(counts).tolist()
+        data = []
+        for a, b in zip([0] + ends[:-1], ends):
+            # the high bytes of nearby distances are alike, so that grouping them helps zlib a lot
+            shuffled = np.ascontiguousarray(values[a:b].view(np.uint8).reshape(-1, itemsize).T)
+            data.append(zlib.compress(shuffled.tobytes(), level))
+        return heads, b''.join(data), np.array([len(d) for d in data], dtype=np.int64)
+    # the values of the bricks follow each other, so that they are written at once
+    return heads, values, counts.astype(np.int64) * itemsize
+
+
+class VolumeFile(object):
+    """A volume file written by :func:`save_volume`, whose bricks are read on demand.
+
+    Opening a file reads only its header, the index of its bricks and the leaves of its octree.
+    :meth:`read` reads and decodes the bricks that overlap a region of the grid,
+    and fills the samples of the tiles that are not stored with the background distance.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the file.
+
+    Attributes
+    ----------
+    header : dict
+        The JSON header of the file.
+    shape : tuple of int
+        The number of samples along x, y and z.
+    min : tuple of float
+        The coordinates of the first sample.
+    spacing : tuple of float
+        The distance between samples along x, y and z.
+    dtype : numpy dtype
+        The data type of the samples.
+    tile : int
+        The number of samples along each side of a brick.
+    background : tuple of float or None
+        The distances inside and outside the object of the samples outside the stored bricks.
+    tree : str or None
+        The :func:`compas_vol.utilities.structural_digest` of the tree the field was sampled from.
+    encoding : {'band', 'raw'}
+        The encoding of the bricks, see :func:`save_volume`.
+    compression : {'zlib', None}
+        The compression of the bricks.
+    keys : numpy array of uint64
+        The sorted Morton codes of the tile coordinates of the stored bricks.
+    octree : :class:`Octree` or None
+        The octree whose leaves give the sign of the tiles that are not stored.
+    """
+
+    def __init__(self, filename):
+        import numpy as np
+
+        self.filename = filename
+        self._file = open(filename, 'rb')
+        try:
+            magic, version, length = _PREFIX.unpack(self._file.read(_PREFIX.size))
+            if magic != MAGIC:
+                raise ValueError('Not a compas_vol volume file: {}'.format(filename))
+            if version > FORMAT_VERSION:
+                raise ValueError('Volume file version {} is newer than the supported version {}.'.format(version, FORMAT_VERSION))
+            self.header = header = json.loads(self._file.read(length).decode('utf-8'))
+            self.shape = tuple(header['shape'])
+            self.min = tuple(header['min'])
+            self.spacing = tuple(header['spacing'])
+            self.dtype = np.dtype(header['dtype'])
+            self.tile = header['tile']
+            self.background = None if header['background'] is None else tuple(header['background'])
+            self.tree = header['tree']
+            self.encoding = header['encoding']
+            self.compression = header['compression']
+            n = header['bricks']
+            self._index = np.frombuffer(self._file.read(n * np.dtype(_INDEX).itemsize), dtype=_INDEX)
+            self.keys = self._index['code'].astype(np.uint64)
+            self._head = _head_size(self.tile) if self.encoding == 'band' else 0
+            self._heads = self._file.tell()
+            self._file.seek(self._heads + n * self._head)
+            self.octree = None
+            spec = header['octree']
+            if spec is not None:
+                m = spec['leaves']
+                codes = np.frombuffer(self._file.read(8 * m), dtype='<u8')
+                levels = np.frombuffer(self._file.read(m), dtype='u1')
+                distances = np.frombuffer(self._file.read(4 * m), dtype='<f4')
+                self.octree = Octree(None, spec['center'], spec['size'], spec['depth']).set_leaves(codes, levels, distances)
+        except Exception:
+            self._file.close()
+            raise
+
+    def __repr__(self):
+        return 'VolumeFile({!r}, shape={}, tile={}, bricks={})'.format(self.filename, self.shape, self.tile, len(self))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Close the file."""
+        self._file.close()
+
+    @property
+    def grid(self):
+        """:class:`compas_vol.engine.Grid` : The grid of the samples."""
+        from compas_vol.engine import Grid
+
+        dtype = self.dtype.name if self.dtype.kind == 'f' else None
+        return Grid([(a, a + (n - 1) * s, n) for a, s, n in zip(self.min, self.spacing, self.shape)], dtype=dtype)
+
+    def brick(self, index):
+        """The samples of the brick at a position of the index, as an array of shape ``(tile, tile, tile)``."""
+        _, offset, size = self._index[index]
+        self._file.seek(self._heads + int(index) * self._head)
+        head = self._file.read(self._head)
+        self._file.seek(int(offset))
+        return self._decode(head, self._file.read(int(size)))
+
+    def _values(self, data):
+        import numpy as np
+
+        if self.compression == 'zlib':
+            data = np.frombuffer(zlib.decompress(data), dtype=np.uint8)
+            return np.ascontiguousarray(data.reshape(self.dtype.itemsize, -1).T).reshape(-1).view(self.dtype)
+        return np.frombuffer(data, dtype=self.dtype)
+
+    def _decode(self, head, data):
+        return self._expand(head, self._values(data))[0]
+
+    def _expand(self, heads, values):
+        """The bricks of their heads and the values of their samples within the band, decoded at once."""
+        import numpy as np
+
+        t = self.tile
+        if self.encoding != 'band':
+            return values.reshape(-1, t, t, t).astype(self.dtype.newbyteorder('='))
+        heads = np.frombuffer(heads, dtype=np.uint8).reshape(-1, self._head)
+        inner = np.unpackbits(heads[:, :self._head // 2], axis=1, count=t ** 3).view(bool)
+        signs = np.unpackbits(heads[:, self._head // 2:], axis=1, count=t ** 3).view(bool)
+        out = np.where(signs, self.dtype.type(self.background[0]), self.dtype.type(self.background[1]))
+        out[inner] = values
+        return out.reshape(-1, t, t, t).astype(self.dtype.newbyteorder('='), copy=False)
+
+    def read(self, region=None):
+        """Read the samples of a region of the grid.
+
+        Parameters
+        ----------
+        region : tuple of slice or int, optional
+            The ranges of sample indices along x, y and z, with a step of one. Missing or None ranges span the whole axis.
+            An integer, which may be negative, selects a single plane and drops its axis, as in numpy.
+
+        Returns
+        -------
+        numpy array
+            The samples of the region, in the native byte order.
+        """
+        import numpy as np
+
+        region = tuple(region or ()) + (slice(None),) * (3 - len(region or ()))
+        if len(region) != 3:
+            raise IndexError('A region has at most three ranges: {}'.format(region))
+        ranges = []
+        planes = []
+        for axis, (s, n) in enumerate(zip(region, self.shape)):
+            if s is None:
+                s = slice(None)
+            if not isinstance(s, slice):
+                try:
+                    i = operator.index(s)
+                except TypeError:
+                    raise TypeError('The ranges of a region are slices or integers: {!r}'.format(s))
+                if not -n <= i < n:
+                    raise IndexError('Index {} is out of bounds for axis {} of size {}'.format(i, axis, n))
+                i %= n
+                s = slice(i, i + 1)
+                planes.append(axis)
+            start, stop, step = s.indices(n)
+            if step != 1:
+                raise ValueError('The ranges of a region have a step of one: {}'.format(region))
+            ranges.append((start, max(start, stop)))
+        out = np.empty([b - a for a, b in ranges], dtype=self.dtype.newbyteorder('='))
+        if out.size:
+            self._read_into(out, ranges)
+        return out.squeeze(axis=tuple(planes)) if planes else out
+
+    def _read_into(self, out, ranges):
+        """Read the samples within the ranges of indices along x, y and z into an array of their shape."""
+        import numpy as np
+
+        t = self.tile
+        tiles = [np.arange(a // t, (b - 1) // t + 1) for a, b in ranges]
+        ti, tj, tk = (c.ravel() for c in np.meshgrid(*tiles, indexing='ij'))
+        codes = morton_encode(ti, tj, tk)
+        index = np.minimum(np.searchsorted(self.keys, codes), max(len(self.keys) - 1, 0))
+        stored = self.keys[index] == codes if len(self.keys) else np.zeros(len(codes), dtype=bool)
+        fill = np.zeros(len(codes))
+        if not stored.all():
+            if self.octree is None:
+                raise ValueError('The volume file has no bricks and no background for some tiles of the region.')
+            h = np.asarray(self.spacing)
+            centers = np.asarray(self.min) + (np.stack((ti, tj, tk), axis=-1)[~stored] + 0.5) * t * h
+            inside = self.octree.distances[self.octree.locate(centers)] < 0
+            fill[~stored] = np.where(inside, self.background[0], self.background[1])
+        # the bricks are read in the order of the file
+        for n in np.argsort(np.where(stored, index, -1), kind='stable'):
+            origin = (ti[n] * t, tj[n] * t, tk[n] * t)
+            lower = [max(o, a) for o, (a, _) in zip(origin, ranges)]
+            upper = [min(o + t, b) for o, (_, b) in zip(origin, ranges)]
+            target = tuple(slice(lo - a, hi - a) for lo, hi, (a, _) in zip(lower, upper, ranges))
+            if stored[n]:
+                brick = self.brick(index[n])
+                out[target] = brick[tuple(slice(lo - o, hi - o) for lo, hi, o in zip(lower, upper, origin))]
+            else:
+                out[target] = fill[n]
+
+    def to_sparse(self):
+        """Read all bricks into a :class:`SparseGrid`.
+
+        Returns
+        -------
+        :class:`SparseGrid`
+            The grid, without an object.
+        """
+        import numpy as np
+
+        if self.octree is None:
+            raise ValueError('The volume file stores a dense field.')
+        if len(set(self.spacing)) != 1:
+            raise ValueError('A sparse grid has the same spacing along all axes: {}'.format(self.spacing))
+        t = self.tile
+        grid = SparseGrid(None, spacing=self.spacing[0], tile=t, band=self.background[1], dtype=self.dtype.newbyteorder('=').name)
+        grid.min, grid.shape = self.min, self.shape
+        grid.keys = self.keys.copy()
+        grid.data = np.empty((len(self), t, t, t), dtype=grid.dtype)
+        if len(self):
+            # the heads and the bricks follow each other in the order of the index, and are read at once
+            self._file.seek(self._heads)
+            heads = self._file.read(len(self) * self._head)
+            start = int(self._index['offset'][0])
+            self._file.seek(start)
+            data = self._file.read(int(self._index['offset'][-1] + self._index['size'][-1]) - start)
+            if self.compression == 'zlib':
+                values = [self._values(data[a - start:a - start + b]) for a, b in zip(self._index['offset'].tolist(), self._index['size'].tolist())]
+                data = np.concatenate(values).tobytes()
+            grid.data[...] = self._expand(heads, np.frombuffer(data, dtype=self.dtype))
+        grid.octree = self.octree
+        return grid
+
+
+# ==============================================================================
+# NRRD
+# ==============================================================================
+
+
+def write_nrrd(filename, volume, grid=None, encoding='raw'):
+    """Write a sampled field as NRRD, for slicers and other volume software.
+
+    A filename ending in ``.nhdr`` writes a detached header next to a file of the samples,
+    ``.raw`` or ``.raw.gz``, other filenames write a single ``.nrrd`` file with an attached header.
+    The samples are written in the order of the grid, with z varying fastest, so that the first axis of the
+    NRRD is z, and the space directions map the axes to the x, y and z of the right-anterior-superior space.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the file.
+    volume : numpy array or :class:`SparseGrid` or :class:`VolumeFile`
+        The field. Dense arrays may be :class:`numpy.memmap`, and all fields are written slab by slab.
+    grid : :class:`compas_vol.engine.Grid`, optional
+        The grid of a dense array.
+    encoding : {'raw', 'gzip'}, optional
+        The encoding of the samples.
+    """
+    import numpy as np
+
+    if isinstance(volume, SparseGrid):
+        shape, origin, spacing, dtype = volume.shape, volume.min, (volume.spacing,) * 3, volume.data.dtype
+    elif isinstance(volume, VolumeFile):
+        shape, origin, spacing, dtype = volume.shape, volume.min, volume.spacing, volume.dtype
+    else:
+        if grid is None:
+            raise ValueError('A dense volume needs its grid.')
+        if tuple(volume.shape) != tuple(grid.shape):
+            raise ValueError('Volume of shape {} does not match the grid shape {}.'.format(volume.shape, grid.shape))
+        shape, origin, spacing, dtype = grid.shape, grid.min, grid.spacing, volume.dtype
+    if encoding not in ('raw', 'gzip'):
+        raise ValueError('Unsupported NRRD encoding: {}'.format(encoding))
+    dtype = np.dtype(dtype).newbyteorder('<')
+    nx, ny, nz = shape
+    sx, sy, sz = spacing
+    lines = [
+        'NRRD0004',
+        '# written by compas_vol',
+        'type: {}'.format(_NRRD_NAMES[dtype.str[1:]]),
+        'dimension: 3',
+        'space: right-anterior-superior',
+        'sizes: {} {} {}'.format(nz, ny, nx),
+        'space directions: (0,0,{!r}) (0,{!r},0) ({!r},0,0)'.format(float(sz), float(sy), float(sx)),
+        'kinds: domain domain domain',
+        'endian: little',
+        'encoding: {}'.format(encoding),
+        'space origin: ({!r},{!r},{!r})'.format(*(float(a) for a in origin)),
+    ]
+    detached = filename.endswith('.nhdr')
+    if detached:
+        data = filename[:-len('.nhdr')] + ('.raw.gz' if encoding == 'gzip' else '.raw')
+        lines.append('data file: {}'.format(os.path.basename(data)))
+        with open(filename, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        f = open(data, 'wb')
+    else:
+        f = open(filename, 'wb')
+        f.write(('\n'.join(lines) + '\n\n').encode('ascii'))
+    with f:
+        target = gzip.GzipFile(fileobj=f, mode='wb', compresslevel=1) if encoding == 'gzip' else f
+        try:
+            for slab in _slabs(volume, shape):
+                target.write(np.ascontiguousarray(slab, dtype=dtype).tobytes())
+        finally:
+            if target is not f:
+                target.close()
+
+
+def _slabs(volume, shape):
+    """The samples of a field in slabs of whole yz-planes of about 16 MB."""
+    import numpy as np
+
+    nx, ny, nz = shape
+    step = max(1, (1 << 24) // max(1, ny * nz * 8))
+    j, k = np.arange(ny)[None, :, None], np.arange(nz)[None, None, :]
+    for start in range(0, nx, step):
+        stop = min(start + step, nx)
+        if isinstance(volume, SparseGrid):
+            yield volume.values(np.arange(start, stop)[:, None, None], j, k)
+        elif isinstance(volume, VolumeFile):
+            yield volume.read((slice(start, stop),))
+        else:
+            yield volume[start:stop]
+
+
+def read_nrrd(filename, mmap=True):
+    """Read a three-dimensional NRRD file with axis-aligned space directions.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the ``.nrrd`` file or of the detached ``.nhdr`` header.
+    mmap : bool, optional
+        Whether to memory-map the samples of raw files instead of reading them.
+
+    Returns
+    -------
+    tuple
+        The samples as an array indexed along x, y and z, and the :class:`compas_vol.engine.Grid` of the samples.
+        The array is a view of the file in the axis order of the file.
+
+    Examples
+    --------
+    >>> import os, tempfile
+    >>> from compas.geometry import Point, Sphere
+    >>> from compas_vol.engine import Grid
+    >>> from compas_vol.primitives import VolSphere
+    >>> grid = Grid([(-5, 5), (-4, 4), (-3, 3)], resolution=(30, 20, 10))
+    >>> d = grid.evaluate(VolSphere(Sphere(Point(0, 0, 0), 3)))
+    >>> filename = os.path.join(tempfile.mkdtemp(), 'sphere.nhdr')
+    >>> write_nrrd(filename, d, grid)
+    >>> a, g = read_nrrd(filename)
+    >>> bool((a == d).all()), g.shape, g.min
+    (True, (30, 20, 10), (-5.0, -4.0, -3.0))
+    """
+    import numpy as np
+    from compas_vol.engine import Grid
+
+    fields = {}
+    with open(filename, 'rb') as f:
+        magic = f.readline()
+        if not magic.startswith(b'NRRD'):
+            raise ValueError('Not a NRRD file: {}'.format(filename))
+        while True:
+            line = f.readline()
+            if not line or not line.strip():
+                break
+            line = line.decode('ascii').strip()
+            if line.startswith('#') or ':=' in line:
+                continue
+            key, _, value = line.partition(':')
+            fields[key.strip().lower()] = value.strip()
+        offset = f.tell()
+
+    if int(fields.get('dimension', 0)) != 3:
+        raise ValueError('Only three-dimensional NRRD files are supported: {}'.format(fields.get('dimension')))
+    sizes = [int(n) for n in fields['sizes'].split()]
+    dtype = np.dtype(_NRRD_TYPES[fields['type'].lower()])
+    if dtype.itemsize > 1:
+        dtype = dtype.newbyteorder('>' if fields.get('endian', 'little') == 'big' else '<')
+    encoding = fields.get('encoding', 'raw').lower()
+    if 'data file' in fields or 'datafile' in fields:
+        data = fields.get('data file', fields.get('datafile'))
+        if data.split()[0] == 'LIST' or '%' in data:
+            raise ValueError('NRRD files with several data files are not supported.')
+        data = os.path.join(os.path.dirname(os.path.abspath(filename)), data)
+        offset = 0
+    else:
+        data = filename
+    skip = int(fields.get('byte skip', 0))
+    count = sizes[0] * sizes[1] * sizes[2]
+    if encoding == 'raw':
+        if skip < 0:
+            skip = os.path.getsize(data) - offset - count * dtype.itemsize
+        if mmap:
+            array = np.memmap(data, dtype=dtype, mode='r', offset=offset + skip, shape=tuple(sizes[::-1]))
+        else:
+            with open(data, 'rb') as f:
+                f.seek(offset + skip)
+                array = np.fromfile(f, dtype=dtype, count=count).reshape(sizes[::-1])
+    elif encoding in ('gzip', 'gz'):
+        with open(data, 'rb') as f:
+            f.seek(offset)
+            with gzip.GzipFile(fileobj=f, mode='rb') as z:
+                z.read(max(skip, 0))
+                array = np.frombuffer(bytearray(z.read(count * dtype.itemsize)), dtype=dtype).reshape(sizes[::-1])
+    else:
+        raise ValueError('Unsupported NRRD encoding: {}'.format(encoding))
+
+    # the world axis and spacing of each axis of the file, whose first axis varies fastest
+    if 'space directions' in fields:
+        directions = [[float(c) for c in v.split(',')] for v in re.findall(r'\(([^)]*)\)', fields['space directions'])]
+    elif 'spacings' in fields:
+        directions = [[float(s) if a == b else 0.0 for b in range(3)] for a, s in enumerate(fields['spacings'].split())]
+    else:
+        directions = [[1.0 if a == b else 0.0 for b in range(3)] for a in range(3)]
+    origin = [float(c) for c in re.findall(r'[-+0-9.eE]+', fields.get('space origin', ''))] or [0.0, 0.0, 0.0]
+    if fields.get('space', '').lower() in ('left-posterior-superior', 'lps'):
+        directions = [[-d[0], -d[1], d[2]] for d in directions]
+        origin = [-origin[0], -origin[1], origin[2]]
+    axes = [max(range(3), key=lambda w: abs(d[w])) for d in directions]
+    if len(directions) != 3 or sorted(axes) != [0, 1, 2] or any(abs(d[w]) != sum(abs(c) for c in d) for d, w in zip(directions, axes)):
+        raise ValueError('Only axis-aligned space directions are supported: {}'.format(fields.get('space directions')))
+    array = array.transpose([2 - axes.index(w) for w in range(3)])
+    spacing = [0.0] * 3
+    for d, w in zip(directions, axes):
+        spacing[w] = d[w]
+    for w in range(3):
+        if spacing[w] < 0:
+            # flipped axes run from the far end of the grid
+            array = np.flip(array, axis=w)
+            origin[w] += (array.shape[w] - 1) * spacing[w]
+            spacing[w] = -spacing[w]
+    dtype = array.dtype.name if array.dtype.kind == 'f' else None
+    grid = Grid([(a, a + (n - 1) * s, n) for a, s, n in zip(origin, spacing, array.shape)], dtype=dtype)
+    return array, grid
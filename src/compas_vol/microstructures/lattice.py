@@ -1,12 +1,19 @@
 import math
 from compas.geometry import Frame
-from compas.geometry import Point
 from compas.geometry import matrix_from_frame
 from compas.geometry import matrix_inverse
 from compas import PRECISION
 
+from compas_vol.utilities import Observable
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import lipschitz_interval
+from compas_vol.utilities import transform_coordinates
+from compas_vol.utilities import transform_point
+from compas_vol.utilities import tree_to_data
 
-class Lattice(object):
+
+class Lattice(Observable):
     """A lattice is defined by it's type, size of a unit cell and its strut diameter.
     Optionally, a frame can be specified to modify orientation and origin.
 
@@ -136,19 +143,50 @@ class Lattice(object):
         types = [bigx, grid, star, cross, octagon, octet, vintile, dual, interlock, isotrop, hexgrid]
         return types
 
+    # ==========================================================================
+    # pickling
+    # ==========================================================================
+
+    def __getstate__(self):
+        """Return the state without the strut tables, which are rebuilt on unpickling."""
+        state = self.__dict__.copy()
+        del state['pointlist'], state['ltypes']
+        state['_frame'] = [list(v) for v in self.frame]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.pointlist = self.create_points()
+        self.ltypes = self.create_types()
+        self._frame = Frame(*state['_frame'])
+
+    @property
+    def data(self):
+        return {'ltype': self.ltype, 'unitcell': self.unitcell, 'thickness': self.thickness, 'frame': self.frame.data}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['ltype'], data['unitcell'], data['thickness'], Frame.from_data(data['frame']))
+
     def __repr__(self):
         return "Lattice({0},{1:.{4}f},{2:.{4}f},{3})".format(self.ltype, self.unitcell, self.thickness, str(self.frame), PRECISION[:1])
 
+    def get_distance_interval(self, box):
+        """
+        distance at the center of the queried box, give or take half its diagonal, as the distances to the struts
+        change at most as fast as the point, and no less than minus half the thickness
+        """
+        return tuple(lipschitz_interval(self, box, floor=-self.thickness / 2.0))
+
     def get_distance(self, point):
         """
         single point distance function
         """
-        if not isinstance(point, Point):
-            pt = Point(*point)
-        else:
-            pt = point
-
-        pt.transform(self.inversetransform)
+        pt = transform_point(self.inversetransform, point)
 
         up = [abs((p % self.unitcell) - self.unitcell/2) for p in pt]
         dmin = 9999999.
@@ -166,21 +204,22 @@ class Lattice(object):
             dmin = min(dmin, sum([(up[i]-p[i])**2 for i in range(3)]))
         return math.sqrt(dmin) - self.thickness/2.0
 
+    get_distance_points = distance_points
+
     def get_distance_numpy(self, x, y, z):
         """
         vectorized distance function
         """
         import numpy as np
 
-        p = np.array([x, y, z, 1], dtype=object)
-        md = np.dot(self.inversetransform, p)
-        mg = np.stack(([md[0], md[1], md[2]]), axis=-1)
+        md = transform_coordinates(self.inversetransform, x, y, z)
+        mg = np.stack(np.broadcast_arrays(*md), axis=-1)
         mg = abs((mg % self.unitcell) - self.unitcell/2)
 
         distances = []
         for ltype in self.ltypes[self.ltype]:
-            A = np.array([self.pointlist[ltype[0]][i] * self.unitcell for i in range(3)])
-            B = np.array([self.pointlist[ltype[1]][i] * self.unitcell for i in range(3)])
+            A = np.array([self.pointlist[ltype[0]][i] * self.unitcell for i in range(3)], dtype=mg.dtype)
+            B = np.array([self.pointlist[ltype[1]][i] * self.unitcell for i in range(3)], dtype=mg.dtype)
             d = np.linalg.norm(np.cross(B-A, mg-A), axis=-1)/np.linalg.norm(B-A)
             distances.append(d)
         return np.asarray(distances).min(axis=0) - self.thickness/2.0
@@ -1,12 +1,20 @@
 import math
 from compas.geometry import Frame
-from compas.geometry import Point
 from compas.geometry import matrix_from_frame
 from compas.geometry import matrix_inverse
 from compas import PRECISION
 
+from compas_vol.utilities import Observable
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import lipschitz_interval
+from compas_vol.utilities import transform_coordinates
+from compas_vol.utilities import transform_intervals
+from compas_vol.utilities import transform_point
+from compas_vol.utilities import tree_to_data
 
-class LatticePolar(object):
+
+class LatticePolar(Observable):
     """A lattice is defined by it's type, size of a unit cell and its strut diameter.
     Optionally, a frame can be specified to modify orientation and origin.
 
@@ -137,26 +145,64 @@ class LatticePolar(object):
         types = [bigx, grid, star, cross, octagon, octet, vintile, dual, interlock, isotrop, hexgrid]
         return types
 
+    # ==========================================================================
+    # pickling
+    # ==========================================================================
+
+    def __getstate__(self):
+        """Return the state without the strut tables, which are rebuilt on unpickling."""
+        state = self.__dict__.copy()
+        del state['pointlist'], state['ltypes']
+        state['_frame'] = [list(v) for v in self.frame]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.pointlist = self.create_points()
+        self.ltypes = self.create_types()
+        self._frame = Frame(*state['_frame'])
+
+    @property
+    def data(self):
+        return {'ltype': self.ltype, 'unitcell': self.unitcell, 'thickness': self.thickness, 'polarnumber': self.polarnumber, 'frame': self.frame.data}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['ltype'], data['unitcell'], data['thickness'], data['polarnumber'], Frame.from_data(data['frame']))
+
     def __repr__(self):
-        return "Lattice({0},{1:.{4}f},{2:.{4}f},{3})".format(self.ltype, self.unitcell, self.thickness, str(self.frame), PRECISION[:1])
+        return "LatticePolar({0},{1:.{5}f},{2:.{5}f},{3},{4})".format(self.ltype, self.unitcell, self.thickness, self.polarnumber, str(self.frame), PRECISION[:1])
+
+    def get_distance_interval(self, box):
+        """
+        distance at the center of the queried box, give or take the rate of change of the distances times half its diagonal,
+        clipped to the distances within a unit cell. The polar cells narrow towards the axis,
+        so that the rate grows without bound near it
+        """
+        xt, yt, _ = transform_intervals(self.inversetransform, box)
+        rho = (xt ** 2 + yt ** 2).sqrt().lo
+        # the angular coordinate changes by n u / (2 pi rho) per unit of length, without bound at the axis
+        lipschitz = max(1.0, self.polarnumber * self.unitcell / (2 * math.pi * rho)) if rho > 0 else math.inf
+        # the folded point and the struts lie in the cube [0, u/2]^3
+        ceiling = 3 ** 0.5 * self.unitcell / 2.0 - self.thickness / 2.0
+        return tuple(lipschitz_interval(self, box, lipschitz).clip(-self.thickness / 2.0, ceiling))
 
     def get_distance(self, point):
         """
         single point distance function
         """
-        if not isinstance(point, Point):
-            pt = Point(*point)
-        else:
-            pt = point
-
-        pt.transform(self.inversetransform)
+        pt = transform_point(self.inversetransform, point)
 
         radius = math.sqrt(pt.x * pt.x + pt.y * pt.y)
-        polx = abs(radius % self.unitcell) - self.unitcell/2
+        polx = abs((radius % self.unitcell) - self.unitcell/2)
         angle = (math.atan2(pt.y, pt.x) + math.pi) / (2 * math.pi)
         poly = (angle * self.polarnumber) % 1
         poly = abs((poly - 0.5) * self.unitcell)
-        polz = abs(pt.z % self.unitcell) - self.unitcell/2
+        polz = abs((pt.z % self.unitcell) - self.unitcell/2)
 
         up = [polx, poly, polz]
 
@@ -175,14 +221,15 @@ class LatticePolar(object):
             dmin = min(dmin, sum([(up[i]-p[i])**2 for i in range(3)]))
         return math.sqrt(dmin) - self.thickness/2.0
 
+    get_distance_points = distance_points
+
     def get_distance_numpy(self, x, y, z):
         """
         vectorized distance function
         """
         import numpy as np
 
-        p = np.array([x, y, z, 1], dtype=object)
-        md = np.dot(self.inversetransform, p)
+        md = transform_coordinates(self.inversetransform, x, y, z)
 
         radius = np.sqrt(md[0]**2 + md[1]**2)
         polx = abs((radius % self.unitcell) - self.unitcell/2)
@@ -190,12 +237,12 @@ class LatticePolar(object):
         poly = (angle * self.polarnumber) % 1
         poly = abs((poly - 0.5) * self.unitcell)
         polz = abs((md[2] % self.unitcell) - self.unitcell/2)
-        mg = np.stack(([polx, poly, polz]), axis=-1)
+        mg = np.stack(np.broadcast_arrays(polx, poly, polz), axis=-1)
 
         distances = []
         for ltype in self.ltypes[self.ltype]:
-            A = np.array([self.pointlist[ltype[0]][i] * self.unitcell for i in range(3)])
-            B = np.array([self.pointlist[ltype[1]][i] * self.unitcell for i in range(3)])
+            A = np.array([self.pointlist[ltype[0]][i] * self.unitcell for i in range(3)], dtype=mg.dtype)
+            B = np.array([self.pointlist[ltype[1]][i] * self.unitcell for i in range(3)], dtype=mg.dtype)
             d = np.linalg.norm(np.cross(B-A, mg-A), axis=-1)/np.linalg.norm(B-A)
             distances.append(d)
         return np.asarray(distances).min(axis=0) - self.thickness/2.0
\ No newline at end of file
@@ -1,8 +1,15 @@
 from math import pi, sin, cos
 from compas import PRECISION
 
+from compas_vol.utilities import Interval
+from compas_vol.utilities import Observable
+from compas_vol.utilities import box_intervals
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import tree_to_data
 
-class TPMS(object):
+
+class TPMS(Observable):
     """A triply periodic minimal surface (TPMS) is defined by a type and a wavelength.
 
     Parameters
@@ -54,6 +61,33 @@ class TPMS(object):
         self._wavelength = float(wavelength)
         self._factor = self.wavelength/pi
 
+    # ==========================================================================
+    # pickling
+    # ==========================================================================
+
+    def __getstate__(self):
+        """Return the state without the type name tables, which are rebuilt on unpickling."""
+        state = self.__dict__.copy()
+        del state['tpmstypes'], state['tpmstypesl']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.tpmstypes = ['Gyroid', 'SchwartzP', 'Diamond', 'Neovius', 'Lidinoid', 'FischerKoch']
+        self.tpmstypesl = [s.lower() for s in self.tpmstypes]
+
+    @property
+    def data(self):
+        return {'tpmstype': self.tpmstype, 'wavelength': self.wavelength}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['tpmstype'], data['wavelength'])
+
     def __repr__(self):
         return 'TPMS({0},{1:.{2}f})'.format(self.tpmstype, self.wavelength, PRECISION[:1])
 
@@ -61,6 +95,13 @@ class TPMS(object):
     # distance function
     # ==========================================================================
 
+    def get_distance_interval(self, box):
+        """
+        TPMS function evaluated with interval arithmetic over the box scaled by the wavelength
+        """
+        x, y, z = box_intervals(box)
+        return tuple(tpms_interval(self.tpmstype, x / self._factor, y / self._factor, z / self._factor))
+
     def get_distance(self, point):
         """
         single point distance function
@@ -98,6 +139,8 @@ class TPMS(object):
                  cos(2*pz) * sin(px) * cos(py))
         return d
 
+    get_distance_points = distance_points
+
     def get_distance_numpy(self, x, y, z):
         """
         vectorized distance function
@@ -141,4 +184,47 @@ class TPMS(object):
                  np.cos(2*py) * np.sin(pz) * np.cos(px) +
                  np.cos(2*pz) * np.sin(px) * np.cos(py))
         # IWP?
-        return d
\ No newline at end of file
+        return d
+
+
+def tpms_interval(tpmstype, px, py, pz):
+    """The interval of the function of a type of TPMS over intervals of its scaled coordinates.
+
+    Parameters
+    ----------
+    tpmstype : int
+        The index of the type, as :attr:`TPMS.tpmstype`.
+    px, py, pz : :class:`compas_vol.utilities.Interval`
+        The intervals of the coordinates, divided by the wavelength over pi.
+
+    Returns
+    -------
+    :class:`compas_vol.utilities.Interval`
+    """
+    d = Interval(0)
+    if tpmstype == 0:  # 'Gyroid':
+        d = px.sin() * py.cos() + py.sin() * pz.cos() + pz.sin() * px.cos()
+    elif tpmstype == 1:  # 'SchwartzP':
+        d = px.cos() + py.cos() + pz.cos()
+    elif tpmstype == 2:  # 'Diamond':
+        d = (
+            px.sin() * py.sin() * pz.sin() +
+            px.sin() * py.cos() * pz.cos() +
+            px.cos() * py.sin() * pz.cos() +
+            px.cos() * py.cos() * pz.sin()
+        )
+    elif tpmstype == 3:  # 'Neovius':
+        d = (3 * px.cos() + py.cos() + pz.cos() +
+             4 * px.cos() * py.cos() * pz.cos())
+    elif tpmstype == 4:  # 'Lidinoid':
+        d = (0.5 * ((2*px).sin() * py.cos() * pz.sin() +
+             (2*py).sin() * py.cos() * px.sin() +
+             (2*pz).sin() * px.cos() * pz.sin()) -
+             0.5 * ((2*px).cos() * (2*py).cos() +
+             (2*py).cos() * (2*pz).cos() +
+             (2*pz).cos() * (2*px).cos()) + 0.15)
+    elif tpmstype == 5:  # 'FischerKoch':
+        d = ((2*px).cos() * py.sin() * pz.cos() +
+             (2*py).cos() * pz.sin() * px.cos() +
+             (2*pz).cos() * px.sin() * py.cos())
+    return d
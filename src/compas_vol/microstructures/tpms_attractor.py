@@ -3,7 +3,14 @@ from compas import PRECISION
 from compas.geometry import Point
 from compas.utilities import remap_values
 
-class TPMSAttractor(object):
+from compas_vol.microstructures.tpms import tpms_interval
+from compas_vol.utilities import Observable
+from compas_vol.utilities import box_intervals
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import tree_to_data
+
+class TPMSAttractor(Observable):
     """
     """
 
@@ -17,10 +24,29 @@ class TPMSAttractor(object):
         self._factor = self.wavelength/pi
 
 
+    @property
+    def data(self):
+        return {'tpmstype': self.tpmstype, 'wavelength': self.wavelength}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['tpmstype'], data['wavelength'])
+
     # ==========================================================================
     # distance function
     # ==========================================================================
 
+    def get_distance_interval(self, box):
+        """
+        TPMS function evaluated with interval arithmetic over the box scaled by the wavelength
+        """
+        x, y, z = box_intervals(box)
+        return tuple(tpms_interval(self.tpmstype, x / self._factor, y / self._factor, z / self._factor))
+
     def get_distance(self, point):
         """
         single point distance function
@@ -37,6 +63,8 @@ class TPMSAttractor(object):
             d = cos(px) + cos(py) + cos(pz)
         return d
 
+    get_distance_points = distance_points
+
     def get_distance_numpy(self, x, y, z):
         """
         vectorized distance function
@@ -2,8 +2,16 @@ import math
 from compas_vol.microstructures import TPMS
 from compas import PRECISION
 
+from compas_vol.microstructures.tpms import tpms_interval
+from compas_vol.utilities import Interval
+from compas_vol.utilities import Observable
+from compas_vol.utilities import box_intervals
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import tree_to_data
 
-class TPMSPolar(object):
+
+class TPMSPolar(Observable):
     """
     --> To fill in
     --------
@@ -57,13 +65,55 @@ class TPMSPolar(object):
         self._wavelength = float(wavelength)
         # self._factor = self.wavelength/pi
 
+    # ==========================================================================
+    # pickling
+    # ==========================================================================
+
+    def __getstate__(self):
+        """Return the state without the type name tables, which are rebuilt on unpickling."""
+        state = self.__dict__.copy()
+        del state['tpmstypes'], state['tpmstypesl']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.tpmstypes = ['Gyroid', 'SchwartzP', 'Diamond', 'Neovius', 'Lidinoid', 'FischerKoch']
+        self.tpmstypesl = [s.lower() for s in self.tpmstypes]
+
+    @property
+    def data(self):
+        return {'tpmstype': self.TPMStype, 'wavelength': self.waveLength, 'thickness': self.thickness, 'polar': self.polar}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['tpmstype'], data['wavelength'], data['thickness'], data['polar'])
+
     def __repr__(self):
-        return 'TPMS({0},{1:.{2}f})'.format(self.TPMStype, self.wavelength, PRECISION[:1])
+        return 'TPMSPolar({0},{1:.{4}f},{2:.{4}f},{3:.{4}f})'.format(self.TPMStype, self.waveLength, self.thickness, self.polar, PRECISION[:1])
 
     # ==========================================================================
     # distance function
     # ==========================================================================
 
+    def get_distance_interval(self, box):
+        """
+        TPMS function evaluated with interval arithmetic over the polar coordinates of the box, minus half the thickness
+        """
+        x, y, z = box_intervals(box)
+        if x.lo <= 0 and y.lo <= 0 <= y.hi:
+            # the box touches the cut of the angle along the negative x axis
+            angle = Interval(-math.pi, math.pi)
+        else:
+            # the angle is continuous over the box, and extreme at its corners
+            angles = [math.atan2(b, a) for a in x for b in y]
+            angle = Interval(min(angles), max(angles))
+        px = (x ** 2 + y ** 2).sqrt()
+        return tuple(tpms_interval(self.TPMStype, px, angle * self.polar, z) - self.thickness / 2.0)
+
     def get_distance(self, point):
         """
         single point distance function
@@ -71,7 +121,7 @@ class TPMSPolar(object):
         x, y, z = point
 
         px = math.sqrt(x**2 + y**2)
-        py = math.arctan2(y, x)*self.polar
+        py = math.atan2(y, x)*self.polar
         pz = z
 
         d = 0
@@ -100,7 +150,9 @@ class TPMSPolar(object):
             d = (math.cos(2*px) * math.sin(py) * math.cos(pz) +
                  math.cos(2*py) * math.sin(pz) * math.cos(px) +
                  math.cos(2*pz) * math.sin(px) * math.cos(py))
-        return d
+        return d - self.thickness/2.0
+
+    get_distance_points = distance_points
 
     def get_distance_numpy(self, x, y, z):
         """
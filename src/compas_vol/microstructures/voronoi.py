@@ -1,10 +1,13 @@
 from compas.geometry import Point
 from compas.geometry import Vector
-from matplotlib.pyplot import axis
-from numpy.core.fromnumeric import argsort
 
+from compas_vol.utilities import Observable
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import tree_to_data
 
-class Voronoi(object):
+
+class Voronoi(Observable):
     """A Voronoi....
 
     Parameters
@@ -38,10 +41,71 @@ class Voronoi(object):
     def thickness(self, thickness):
         self._thickness = float(thickness)
 
+    # ==========================================================================
+    # pickling
+    # ==========================================================================
+
+    def __getstate__(self):
+        """Return the state with the seed points as plain coordinate lists."""
+        state = self.__dict__.copy()
+        if self.points is not None:
+            state['points'] = [list(p) for p in self.points]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.points is not None:
+            self.points = [Point(*p) for p in self.points]
+
+    @property
+    def data(self):
+        points = None if self.points is None else [[float(c) for c in p] for p in self.points]
+        return {'points': points, 'thickness': self.thickness, 'walls': self.walls}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        points = None if data['points'] is None else [Point(*p) for p in data['points']]
+        return cls(points, data['thickness'], data['walls'])
+
     # ==========================================================================
     # distance function
     # ==========================================================================
 
+    def get_distance_interval(self, box):
+        """
+        range of the distances to the walls between the seeds that can be closest to a point of the box,
+        each a linear function over the box, minus half the thickness
+        """
+        import numpy as np
+
+        lower, upper = (np.array(c, dtype=float) for c in box)
+        coords = np.array([[p.x, p.y, p.z] for p in self.points], dtype=float)
+        near = np.maximum(np.maximum(lower - coords, coords - upper), 0)
+        far = np.maximum(np.abs(coords - lower), np.abs(coords - upper))
+        dmin = np.sum(near ** 2, axis=-1)
+        dmax = np.sum(far ** 2, axis=-1)
+        # the closest and the second closest seeds of any point of the box are no further than
+        # the second smallest of the largest distances of the seeds
+        candidates = coords[dmin <= np.partition(dmax, 1)[1]]
+        i, j = np.nonzero(~np.eye(len(candidates), dtype=bool))
+        closest, second = candidates[i], candidates[j]
+        v2 = second - closest
+        length = np.linalg.norm(v2, axis=-1)
+        closest, second, v2 = closest[length > 0], second[length > 0], v2[length > 0] / length[length > 0, None]
+        d1 = np.sum(closest ** 2, axis=-1)
+        # the projection is linear over the box
+        center = np.sum(((lower + upper) / 2 - (closest + second) / 2) * v2, axis=-1)
+        extent = np.sum(np.abs(v2) * (upper - lower) / 2, axis=-1)
+        lo = np.minimum(d1, center - extent)
+        hi = np.minimum(d1, center + extent)
+        alo = np.where((lo <= 0) & (hi >= 0), 0, np.minimum(np.abs(lo), np.abs(hi)))
+        ahi = np.maximum(np.abs(lo), np.abs(hi))
+        return float(alo.min()) - self.thickness / 2, float(ahi.max()) - self.thickness / 2
+
     def get_distance(self, point):
         """
         single point distance function
@@ -66,23 +130,24 @@ class Voronoi(object):
         return abs(min(d1, d2)) - self.thickness/2
 
 
+    get_distance_points = distance_points
+
     def get_distance_numpy(self, x, y, z):
         """
         vectorized distance function
         """
         import numpy as np
 
-        p = np.reshape(np.repeat(np.stack((np.meshgrid(y, x, z)), axis=3), len(self.points), axis=2), 
-            (x.shape[0], y.shape[1], z.shape[2], len(self.points), 3))
-
-        coords = np.reshape(np.tile(np.array([[p.x, p.y, p.z] for p in self.points]), (x.size * y.size * z.size, 1)),
-                 (x.shape[0], y.shape[1], z.shape[2], len(self.points), 3))
-        coords = np.concatenate((coords, np.linalg.norm(p - coords, axis=4, keepdims=True)), axis=4)
-        closestPts = np.take_along_axis(coords, coords[:,:,:,:,-1].argsort()[..., None], axis=3)[:,:,:,:2,:3]
-
-        d1 = np.sum(closestPts[:,:,:,0]**2, axis=3)
-        v1 = np.stack((np.meshgrid(y, x, z)), axis=3) - (closestPts[:,:,:,0] + closestPts[:,:,:,1]) / 2
-        v2 = (closestPts[:,:,:,1] - closestPts[:,:,:,0]) / np.linalg.norm(closestPts[:,:,:,1] - closestPts[:,:,:,0], axis=3, keepdims=True)
-        d2 = np.sum(v1 * v2, axis=3)
+        x, y, z = np.broadcast_arrays(x, y, z)
+        coords = np.array([[p.x, p.y, p.z] for p in self.points], dtype=np.result_type(x, y, z, np.float32))
+        distances = np.stack([(x - cx)**2 + (y - cy)**2 + (z - cz)**2 for cx, cy, cz in coords])
+        order = np.argsort(distances, axis=0, kind='stable')
+        del distances
+        closest, second = coords[order[0]], coords[order[1]]
+
+        d1 = np.sum(closest**2, axis=-1)
+        v1 = np.stack((x, y, z), axis=-1) - (closest + second) / 2
+        v2 = (second - closest) / np.linalg.norm(second - closest, axis=-1, keepdims=True)
+        d2 = np.sum(v1 * v2, axis=-1)
 
         return np.abs(np.minimum(d1, d2)) - self.thickness / 2
\ No newline at end of file
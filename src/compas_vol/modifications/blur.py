@@ -1,4 +1,8 @@
-from scipy.ndimage.filters import gaussian_filter
+from __future__ import division
+
+import itertools
+
+from scipy.ndimage import gaussian_filter
 
 
 class Blur(object):
@@ -8,16 +12,88 @@ class Blur(object):
     Parameters
     ----------
     distance_matrix :class:`numpy.ndarray` of shape (nx, ny, nz)
-        the original distance matrix
+        the original distance matrix, which may be a :class:`numpy.memmap`
     radius : float
         radius of the Gaussian filter kernel
     """
+
+    #: The number of bytes a block of a chunked blur may use, with its margins and temporaries.
+    memory_budget = 1 << 27
+
+    #: The reach of the kernel of the Gaussian filter, in multiples of the radius.
+    truncate = 4.0
+
     def __init__(self, distance_matrix, radius=3.0):
         self.distance_matrix = distance_matrix
         self.radius = radius  # ev. pass sigma as argument to get_blurred?
 
-    def get_blurred(self):
+    @property
+    def margin(self):
+        """int : The number of samples the filter reaches, by which blocks of a chunked blur overlap."""
+        return int(self.truncate * float(self.radius) + 0.5)
+
+    def chunk_shape(self, memory_budget=None):
+        """
+        the shape of the blocks of a chunked blur, of whole z-lines where possible,
+        so that blocks of memory-mapped matrices read and write contiguous runs of their files
+        """
+        import numpy as np
+
+        if memory_budget is None:
+            memory_budget = self.memory_budget
+        nx, ny, nz = self.distance_matrix.shape
+        m = 2 * self.margin
+        # the block with its margins, a float copy and the filter output
+        voxels = max(1, int(memory_budget) // (3 * np.dtype(float).itemsize))
+        if (1 + m) * (ny + m) * (nz + m) <= voxels:
+            return max(1, min(nx, voxels // ((ny + m) * (nz + m)) - m)), ny, nz
+        side = 1
+        while side < max(ny, nz) and (side + 1 + m) ** 2 * (nz + m) <= voxels:
+            side += 1
+        if (side + m) ** 2 * (nz + m) <= voxels:
+            return side, min(ny, side), nz
+        side = max(1, int(voxels ** (1.0 / 3.0)) - m)
+        return side, side, side
+
+    def get_blurred(self, out=None, chunk_shape=None, memory_budget=None):
         """
         return a blurred copy of the distance matrix
+
+        If an output array or a chunk shape or budget is given, or if the distance matrix
+        is memory-mapped, the matrix is blurred block by block. Each block is read with a margin of
+        :attr:`margin` samples, the reach of the kernel, so that the result is that of a single filter.
+
+        Parameters
+        ----------
+        out : numpy array, optional
+            An array of the shape of the matrix to write into, e.g. a :class:`numpy.memmap`.
+        chunk_shape : tuple of int, optional
+            The shape of the blocks, see :meth:`chunk_shape`.
+        memory_budget : int, optional
+            The number of bytes a block may use, to pick the shape of the blocks.
         """
-        return gaussian_filter(self.distance_matrix, sigma=self.radius)
\ No newline at end of file
+        import numpy as np
+
+        matrix = self.distance_matrix
+        chunked = out is not None or chunk_shape is not None or memory_budget is not None or isinstance(matrix, np.memmap)
+        if not chunked:
+            return gaussian_filter(matrix, sigma=self.radius, truncate=self.truncate)
+        if out is None:
+            out = np.empty(matrix.shape, dtype=matrix.dtype)
+        elif tuple(out.shape) != tuple(matrix.shape):
+            raise ValueError('Output of shape {} does not match the matrix shape {}.'.format(out.shape, matrix.shape))
+        if chunk_shape is None:
+            chunk_shape = self.chunk_shape(memory_budget)
+        m = self.margin
+        ranges = [range(0, n, c) for n, c in zip(matrix.shape, chunk_shape)]
+        for start in itertools.product(*ranges):
+            stop = [min(i + c, n) for i, c, n in zip(start, chunk_shape, matrix.shape)]
+            lower = [max(i - m, 0) for i in start]
+            upper = [min(j + m, n) for j, n in zip(stop, matrix.shape)]
+            block = np.asarray(matrix[tuple(slice(a, b) for a, b in zip(lower, upper))], dtype=out.dtype)
+            blurred = gaussian_filter(block, sigma=self.radius, truncate=self.truncate)
+            inner = tuple(slice(i - a, j - a) for i, j, a in zip(start, stop, lower))
+            out[tuple(slice(i, j) for i, j in zip(start, stop))] = blurred[inner]
+        if hasattr(out, 'flush'):
+            out.flush()
+        return out
@@ -1,13 +1,54 @@
-class Factor(object):
+from compas_vol.utilities import Observable
+from compas_vol.utilities import bounding_box
+from compas_vol.utilities import culling
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_buffer
+from compas_vol.utilities import distance_interval
+from compas_vol.utilities import distance_into
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import tree_to_data
+
+
+class Factor(Observable):
     def __init__(self, o, f=1.0):
         self.o = o
         self.f = f
 
+    @property
+    def data(self):
+        return {'o': self.o, 'f': self.f}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['o'], data['f'])
+
     def __repr__(self):
-        return "Factor()"
+        return 'Factor({},{})'.format(str(self.o), self.f)
     
+    def get_bounding_box(self):
+        """
+        box of the object if the factor is at least one, or None,
+        as scaled down distances are no longer bounded by the distance to the box
+        """
+        return bounding_box(self.o) if self.f >= 1 else None
+
+    def get_distance_interval(self, box):
+        """
+        interval of the object scaled by the factor
+        """
+        return tuple(distance_interval(self.o, box) * self.f)
+
     def get_distance(self, point):
         return self.f * self.o.get_distance(point)
     
-    def get_distance_numpy(self, x, y, z):
-        return self.f * self.o.get_distance_numpy(x,y,z)
\ No newline at end of file
+    get_distance_points = distance_points
+
+    def get_distance_numpy(self, x, y, z, out=None):
+        with culling(None):
+            d = distance_into(self.o, x, y, z, distance_buffer(x, y, z, out))
+        d *= self.f
+        return d
@@ -1,16 +1,44 @@
 from compas import PRECISION
 
+from compas_vol.utilities import Observable
+from compas_vol.utilities import culling
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_buffer
+from compas_vol.utilities import distance_interval
+from compas_vol.utilities import distance_into
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import tree_to_data
 
-class MultiShell(object):
+
+class MultiShell(Observable):
 
     def __init__(self, obj, thickness=1.0, distance=3.0):
         self.o = obj
         self.thickness = thickness
         self.distance = distance
 
+    @property
+    def data(self):
+        return {'o': self.o, 'thickness': self.thickness, 'distance': self.distance}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['o'], data['thickness'], data['distance'])
+
     def __repr__(self):
         return 'MultiShell({0},{1:.{3}f},{2:.{3}f})'.format(str(self.o), self.thickness, self.distance, PRECISION[:1])
 
+    def get_distance_interval(self, box):
+        """
+        distance to the nearest shell of the remainder of the interval of the object by the distance between shells
+        """
+        d = distance_interval(self.o, box).remainder(self.distance)
+        return tuple(self.distance / 2.0 - self.thickness / 2.0 - abs(d - self.distance / 2.0))
+
     def get_distance(self, point):
         """
         single point distance function
@@ -20,16 +48,25 @@ class MultiShell(object):
         d = min(remainder, self.distance - remainder)
         return d - self.thickness / 2
 
-    def get_distance_numpy(self, x, y, z):
+    get_distance_points = distance_points
+
+    def get_distance_numpy(self, x, y, z, out=None):
         """
         vectorized distance function
+
+        The result is computed in place, into ``out`` if given.
+        Inside :func:`compas_vol.utilities.culling`, culling is switched off for the children.
         """
         import numpy as np
 
-        do = self.o.get_distance_numpy(x, y, z)
-        remainder = do % self.distance
-        d = np.minimum.reduce([remainder, remainder*-1 + self.distance])
-        return d - self.thickness / 2
+        with culling(None):
+            d = distance_into(self.o, x, y, z, distance_buffer(x, y, z, out))
+        np.remainder(d, self.distance, out=d)
+        # min(r, distance - r) = distance / 2 - |r - distance / 2|
+        d -= self.distance / 2
+        np.abs(d, out=d)
+        np.subtract(self.distance / 2 - self.thickness / 2, d, out=d)
+        return d
 
 
 # if __name__ == "__main__":
@@ -1,15 +1,42 @@
 from compas import PRECISION
 
+from compas_vol.utilities import Observable
+from compas_vol.utilities import culling
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_buffer
+from compas_vol.utilities import distance_interval
+from compas_vol.utilities import distance_into
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import tree_to_data
 
-class Overlay(object):
+
+class Overlay(Observable):
     def __init__(self, a=None, b=None, f=0.1):
         self.a = a
         self.b = b
         self.f = f
 
+    @property
+    def data(self):
+        return {'a': self.a, 'b': self.b, 'f': self.f}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['a'], data['b'], data['f'])
+
     def __repr__(self):
         return "Overlay({0},{1},{2:.{3}f})".format(str(self.a), str(self.b), self.f, PRECISION[:1])
 
+    def get_distance_interval(self, box):
+        """
+        interval of a plus the interval of b scaled by the factor
+        """
+        return tuple(distance_interval(self.a, box) + distance_interval(self.b, box) * self.f)
+
     def get_distance(self, point):
         """
         single point distance function
@@ -18,13 +45,21 @@ class Overlay(object):
         db = self.b.get_distance(point)
         return da + self.f * db
 
-    def get_distance_numpy(self, x, y, z):
+    get_distance_points = distance_points
+
+    def get_distance_numpy(self, x, y, z, out=None):
         """
         vectorized distance function
+
+        The result is computed in place, into ``out`` if given.
+        Inside :func:`compas_vol.utilities.culling`, culling is switched off for the children.
         """
-        da = self.a.get_distance_numpy(x, y, z)
-        db = self.b.get_distance_numpy(x, y, z)
-        return da + self.f * db
+        with culling(None):
+            da = distance_into(self.a, x, y, z, distance_buffer(x, y, z, out))
+            db = distance_into(self.b, x, y, z, distance_buffer(x, y, z))
+        db *= self.f
+        da += db
+        return da
 
 
 # if __name__ == "__main__":
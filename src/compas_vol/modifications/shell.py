@@ -1,7 +1,18 @@
 from compas import PRECISION
 
+from compas_vol.utilities import Observable
+from compas_vol.utilities import bounding_box
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_buffer
+from compas_vol.utilities import distance_interval
+from compas_vol.utilities import distance_into
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import expand_box
+from compas_vol.utilities import tree_to_data
+from compas_vol.utilities import widened
 
-class Shell(object):
+
+class Shell(Observable):
     """A shell object converts a solid volumetric object into a constant thickness boundary volume.
 
     Parameters
@@ -26,9 +37,34 @@ class Shell(object):
         self.thickness = thickness
         self.side = side
 
+    @property
+    def data(self):
+        return {'o': self.o, 'thickness': self.thickness, 'side': self.side}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['o'], data['thickness'], data['side'])
+
     def __repr__(self):
         return 'Shell({0},{1:.{3}f},{2:.{3}f})'.format(str(self.o), self.thickness, self.side, PRECISION[:1])
 
+    def get_bounding_box(self):
+        """
+        box of the object, grown by the part of the thickness of the shell outside of its surface
+        """
+        return expand_box(bounding_box(self.o), max((1 - self.side) * self.thickness, 0))
+
+    def get_distance_interval(self, box):
+        """
+        interval of the object, offset to the middle of the shell, folded about zero and lowered by half the thickness
+        """
+        d = distance_interval(self.o, box)
+        return tuple(abs(d + (self.side - 0.5) * self.thickness) - self.thickness / 2.0)
+
     def get_distance(self, point):
         """
         single point distance function
@@ -36,14 +72,23 @@ class Shell(object):
         do = self.o.get_distance(point)
         return abs(do + (self.side - 0.5) * self.thickness) - self.thickness/2.0
 
-    def get_distance_numpy(self, x, y, z):
+    get_distance_points = distance_points
+
+    def get_distance_numpy(self, x, y, z, out=None):
         """
         vectorized distance function
+
+        The result is computed in place, into ``out`` if given.
+        Inside :func:`compas_vol.utilities.culling`, the margin is grown by the thickness for the object.
         """
         import numpy as np
 
-        do = self.o.get_distance_numpy(x, y, z)
-        return np.abs(do + (self.side - 0.5) * self.thickness) - self.thickness/2.0
+        with widened(self.thickness):
+            d = distance_into(self.o, x, y, z, distance_buffer(x, y, z, out))
+        d += (self.side - 0.5) * self.thickness
+        np.abs(d, out=d)
+        d -= self.thickness / 2.0
+        return d
 
 
 # if __name__ == "__main__":
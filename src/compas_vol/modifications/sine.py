@@ -1,16 +1,47 @@
 from math import sin
 
-class Sine(object):
+from compas_vol.utilities import Observable
+from compas_vol.utilities import culling
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_buffer
+from compas_vol.utilities import distance_interval
+from compas_vol.utilities import distance_into
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import tree_to_data
+
+
+class Sine(Observable):
     def __init__(self, o):
         self.o = o
-        self.f = f
+
+    @property
+    def data(self):
+        return {'o': self.o}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['o'])
 
     def __repr__(self):
-        return "Sine()"
+        return 'Sine({})'.format(str(self.o))
     
+    def get_distance_interval(self, box):
+        """
+        sine of the interval of the object
+        """
+        return tuple(distance_interval(self.o, box).sin())
+
     def get_distance(self, point):
         return sin(self.o.get_distance(point))
     
-    def get_distance_numpy(self, x, y, z):
+    get_distance_points = distance_points
+
+    def get_distance_numpy(self, x, y, z, out=None):
         import numpy as np
-        return np.sin(self.o.get_distance_numpy(x,y,z))
\ No newline at end of file
+        with culling(None):
+            d = distance_into(self.o, x, y, z, distance_buffer(x, y, z, out))
+        return np.sin(d, out=d)
@@ -1,19 +1,57 @@
 from compas.geometry import Frame
-from compas.geometry import Point
 from compas.geometry import matrix_from_frame
 from compas.geometry import matrix_inverse
 
+from compas_vol.utilities import Observable
+from compas_vol.utilities import bounding_box
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_buffer
+from compas_vol.utilities import distance_interval
+from compas_vol.utilities import distance_into
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import transform_box
+from compas_vol.utilities import transform_coordinates
+from compas_vol.utilities import transform_point
+from compas_vol.utilities import tree_to_data
 
-class VolTransformation(object):
+
+class VolTransformation(Observable):
     def __init__(self, distobj=None, frame=Frame.worldXY()):
         self.distobj = distobj
         self.frame = frame
         transform = matrix_from_frame(self.frame)
         self.inversetransform = matrix_inverse(transform)
 
+    @property
+    def data(self):
+        return {'distobj': self.distobj, 'frame': self.frame.data}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['distobj'], Frame.from_data(data['frame']))
+
     def __repr__(self):
         return 'VolTransformation({},{})'.format(str(self.distobj), str(self.frame))
 
+    def get_bounding_box(self):
+        """
+        box of the corners of the box of the object moved into the frame, or None if the object is unbounded
+        """
+        box = bounding_box(self.distobj)
+        if box is None:
+            return None
+        return transform_box(matrix_from_frame(self.frame), *box)
+
+    def get_distance_interval(self, box):
+        """
+        interval of the object over the box of the corners of the box in the coordinates of the frame
+        """
+        return tuple(distance_interval(self.distobj, transform_box(self.inversetransform, *box)))
+
     def get_distance(self, point):
         """
         single point distance function
@@ -27,14 +65,12 @@ class VolTransformation(object):
         float
             The distance from the query point to the surface of the object.
         """
-        if not isinstance(point, Point):
-            p = Point(*point)
-        else:
-            p = point
-        p.transform(self.inversetransform)
+        p = transform_point(self.inversetransform, point)
         return self.distobj.get_distance(p)
 
-    def get_distance_numpy(self, x, y, z):
+    get_distance_points = distance_points
+
+    def get_distance_numpy(self, x, y, z, out=None):
         """
         vectorized distance function
 
@@ -48,10 +84,8 @@ class VolTransformation(object):
         numpy array of floats, shape (nx, ny, nz)
             The distances from the query points to the surface of the object.
         """
-        import numpy as np
-        p = np.array([x, y, z, 1])
-        xt, yt, zt, _ = np.dot(self.inversetransform, p)
-        return self.distobj.get_distance_numpy(xt, yt, zt)
+        xt, yt, zt = transform_coordinates(self.inversetransform, x, y, z)
+        return distance_into(self.distobj, xt, yt, zt, distance_buffer(xt, yt, zt, out))
 
 
 # from compas_vol.microstructures import TPMS
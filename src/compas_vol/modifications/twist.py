@@ -1,11 +1,22 @@
 from compas.geometry import Frame
 from compas.geometry import Plane
 from compas.geometry import distance_point_plane_signed
+from compas.geometry import matrix_from_frame
+from compas.geometry import matrix_inverse
 from compas.geometry import rotate_points
-from compas.geometry import matrix_from_axis_and_angle
 
+from compas_vol.utilities import Observable
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_buffer
+from compas_vol.utilities import distance_interval
+from compas_vol.utilities import distance_into
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import transform_box
+from compas_vol.utilities import transform_intervals
+from compas_vol.utilities import tree_to_data
 
-class Twist(object):
+
+class Twist(Observable):
     def __init__(self, obj, frame=Frame.worldXY(), angle=0.0):
         # needs a distance object to act on
         # ev. a plane? origin and normal
@@ -14,6 +25,29 @@ class Twist(object):
         self.frame = frame
         self.angle = angle
 
+    @property
+    def data(self):
+        return {'obj': self.obj, 'frame': self.frame.data, 'angle': self.angle}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['obj'], Frame.from_data(data['frame']), data['angle'])
+
+    def get_distance_interval(self, box):
+        """
+        interval of the object over the box of the cylinder about the normal of the frame that contains the box
+        """
+        # the rotation about the normal keeps the distances to the axis and to the plane of the frame,
+        # so that the rotated box lies in a cylinder about the axis
+        matrix = matrix_from_frame(self.frame)
+        xt, yt, zt = transform_intervals(matrix_inverse(matrix), box)
+        r = (abs(xt).hi ** 2 + abs(yt).hi ** 2) ** 0.5
+        return tuple(distance_interval(self.obj, transform_box(matrix, (-r, -r, zt.lo), (r, r, zt.hi))))
+
     def get_distance(self, point):
         """
         single point distance function
@@ -24,22 +58,25 @@ class Twist(object):
         d = self.obj.get_distance(pr[0])
         return d
 
-    def get_distance_numpy(self, x, y, z):
+    get_distance_points = distance_points
+
+    def get_distance_numpy(self, x, y, z, out=None):
         """
         vectorized distance function
         """
-        from compas.geometry import matrix_inverse
         import numpy as np
 
-        # plane = Plane(self.frame.point, self.frame.normal)
-        # vp = VolPlane(plane)
-        # dm = vp.get_distance_numpy(x, y, z)
-
-        m = matrix_from_axis_and_angle(self.frame.normal, 10, self.frame.point)
-        mi = matrix_inverse(m)
-        p = np.array([x, y, z, 1])
-        xt, yt, zt, _ = np.dot(mi, p)
-        return self.obj.get_distance_numpy(xt, yt, zt)
+        # rotate about the normal through the origin of the frame,
+        # by an angle proportional to the signed distance to its plane
+        kx, ky, kz = (float(c) for c in self.frame.normal)
+        cx, cy, cz = (float(c) for c in self.frame.point)
+        vx, vy, vz = x - cx, y - cy, z - cz
+        d = vx * kx + vy * ky + vz * kz
+        cos, sin = np.cos(d / 10), np.sin(d / 10)
+        xt = cx + vx * cos + (ky * vz - kz * vy) * sin + kx * d * (1 - cos)
+        yt = cy + vy * cos + (kz * vx - kx * vz) * sin + ky * d * (1 - cos)
+        zt = cz + vz * cos + (kx * vy - ky * vx) * sin + kz * d * (1 - cos)
+        return distance_into(self.obj, xt, yt, zt, distance_buffer(xt, yt, zt, out))
 
 
 # if __name__ == "__main__":
@@ -1,7 +1,14 @@
+import math
+
 from compas.geometry import Vector
 
+from compas_vol.utilities import Observable
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import tree_to_data
+
 
-class GDF(object):
+class GDF(Observable):
     """
     generalised distance function for euclidean polyhedra
     """
@@ -53,13 +60,34 @@ class GDF(object):
     def __init__(self):
         pass
 
+    @property
+    def data(self):
+        return {}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls()
+
     # ==========================================================================
     # distance function
     # ==========================================================================
 
+    def get_distance_interval(self, box):
+        """
+        unbounded, as the distances of a generic distance function are unknown,
+        so that culling by the bounds of the distances never prunes it
+        """
+        return -math.inf, math.inf
+
     def get_distance(self, x, y, z):
         raise NotImplementedError
     
+    get_distance_points = distance_points
+
     def get_distance_numpy(self, x, y, z):
         raise NotImplementedError
 
@@ -2,7 +2,15 @@ from compas.geometry import Frame
 from compas.geometry import matrix_from_frame
 from compas.geometry import matrix_inverse
 
-class Heart(object):
+from compas_vol.utilities import Observable
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import transform_coordinates
+from compas_vol.utilities import transform_intervals
+from compas_vol.utilities import transform_point
+from compas_vol.utilities import tree_to_data
+
+class Heart(Observable):
     """A volumetric heart is defined by its size and a compas.geometry frame
 
     Parameters
@@ -25,6 +33,28 @@ class Heart(object):
         self.frame = frame or Frame.worldXY()
         self.inversetransform = matrix_inverse(matrix_from_frame(self.frame))
 
+    @property
+    def data(self):
+        return {'size': self.size, 'frame': self.frame.data}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['size'], Frame.from_data(data['frame']))
+
+    def get_distance_interval(self, box):
+        """
+        implicit function of the heart evaluated with interval arithmetic over the box in the coordinates of its frame
+        """
+        xt, yt, zt = transform_intervals(self.inversetransform, box)
+        s = self.size * 0.43
+        sx, sy, sz = xt / s, yt / s, zt / s
+        d = ((-(sx ** 2) * sz ** 3 - sy ** 2 * sz ** 3 * (9 / 80.0)) + (sx ** 2 + sy ** 2 * (9 / 4.0) + sz ** 2 - 1) ** 3) * 320
+        return tuple(d)
+
     def get_distance(self, point):
         """
         single point distance function
@@ -38,7 +68,7 @@ class Heart(object):
         float
             The distance from the query point to the surface of the object.
         """
-        x, y, z = point
+        x, y, z = transform_point(self.inversetransform, point)
         x /= self.size * 0.43
         y /= self.size * 0.43
         z /= self.size * 0.43
@@ -46,6 +76,8 @@ class Heart(object):
                      (x**2 + 9*y**2/4 + z**2-1)**3)
         return res
 
+    get_distance_points = distance_points
+
     def get_distance_numpy(self, x, y, z):
         """
         vectorized distance function
@@ -60,14 +92,10 @@ class Heart(object):
         numpy array of floats, shape (nx, ny, nz)
             The distances from the query points to the surface of the object.
         """
-
-        import numpy as np
-
-        p = np.array([x, y, z, 1], dtype=object)
-        xt, yt, zt, _ = np.dot(self.inversetransform, p)
+        xt, yt, zt = transform_coordinates(self.inversetransform, x, y, z)
         
         sx, sy, sz = xt / (self.size * 0.43), yt / (self.size * 0.43), zt / (self.size * 0.43)
-        return np.full((x.shape[0], y.shape[1], z.shape[2]), 320 * ((-sx**2 * sz**3 - 9*sy**2 * sz**3/80) + (sx**2 + 9*sy**2/4 + sz**2-1)**3))
+        return 320 * ((-sx**2 * sz**3 - 9*sy**2 * sz**3/80) + (sx**2 + 9*sy**2/4 + sz**2-1)**3)
 
 
 
@@ -1,9 +1,18 @@
-from compas.geometry import Point, Vector, Frame
+from compas.geometry import Vector, Frame
 from compas.geometry import matrix_from_frame
 from compas.geometry import matrix_inverse
+
+from compas_vol.utilities import Observable
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import lipschitz_interval
+from compas_vol.utilities import transform_box
+from compas_vol.utilities import transform_coordinates
+from compas_vol.utilities import transform_point
+from compas_vol.utilities import tree_to_data
 from math import sqrt, tan, pi
 
-class PlatonicSolid(object):
+class PlatonicSolid(Observable):
     """A platonic solid, defined by radius and type.
 
     Parameters
@@ -32,12 +41,40 @@ class PlatonicSolid(object):
         self.sqrt3 = sqrt(3)
         self.tan30 = tan(pi/6)
     
+    @property
+    def data(self):
+        return {'radius': self.radius, 'type': self.type, 'frame': self.frame.data}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['radius'], data['type'], Frame.from_data(data['frame']))
+
+    def get_bounding_box(self):
+        """
+        box of the cube of the radius about the center, moved into the frame
+        """
+        r = self.radius
+        return transform_box(matrix_from_frame(self.frame), (-r, -r, -r), (r, r, r))
+
+    def get_distance_interval(self, box):
+        """
+        distance at the center of the queried box, give or take half its diagonal,
+        and no less than the distance at the center of the solid, where the distances are smallest
+        """
+        import numpy as np
+
+        # the distances are smallest at the center
+        center = [np.array([c], dtype=float) for c in self.frame.point]
+        floor = float(self.get_distance_numpy(*center)[0])
+        return tuple(lipschitz_interval(self, box, floor=floor))
+
     def get_distance(self, point):
 
-        if not isinstance(point, Point):
-            point = Point(*point)
-        point.transform(self.inversetransform)
-        x, y, z = point
+        x, y, z = transform_point(self.inversetransform, point)
         
         # Tetrahedron
         if self.type == 0:
@@ -83,11 +120,12 @@ class PlatonicSolid(object):
         else:
             return 0
         
+    get_distance_points = distance_points
+
     def get_distance_numpy(self, x, y, z):
         import numpy as np
 
-        p = np.array([x, y, z, 1], dtype=object)
-        xt, yt, zt, _ = np.dot(self.inversetransform, p)
+        xt, yt, zt = transform_coordinates(self.inversetransform, x, y, z)
 
         if self.type == 0:
             return (np.maximum(np.abs(xt + yt) - zt, np.abs(xt - yt) + zt) - self.radius) / self.sqrt3
@@ -96,25 +134,26 @@ class PlatonicSolid(object):
             return ((np.abs(xt) + np.abs(yt) + np.abs(zt)) - self.radius) * self.tan30
         
         elif self.type == 2:
-            v = np.array([(1 + np.sqrt(5)/2, 1, 0)])
-            v = np.reshape(np.tile(v / np.linalg.norm(v), xt.size), (*xt.shape, 3))
-            p = np.empty((*xt.shape, 3))
-            p[:,:,:,0], p[:,:,:,1], p[:,:,:,2] = np.abs(xt/self.radius), np.abs(yt/self.radius), np.abs(zt/self.radius)
-            return (np.maximum(np.maximum(np.sum(p * v, axis=3), np.sum(p * np.roll(v, 1, axis=3), axis=3)),
-                    np.sum(p * np.roll(v, 2, axis=3), axis=3)) - v[:,:,:,0]) * self.radius
-        
+            vx, vy, vz = Vector((1 + sqrt(5)) / 2, 1, 0).unitized()
+            px, py, pz = np.abs(xt / self.radius), np.abs(yt / self.radius), np.abs(zt / self.radius)
+            a = px * vx + py * vy + pz * vz
+            b = px * vz + py * vx + pz * vy
+            c = px * vy + py * vz + pz * vx
+            return (np.maximum(np.maximum(a, b), c) - vx) * self.radius
+
         elif self.type == 3:
             r = self.radius * 0.8506507174597755
-            v = np.array([(sqrt(5) + 3)/2, 1, 0])
-            v = np.reshape(np.tile(v / np.linalg.norm(v), xt.size), (*xt.shape, 3))
-            w = np.full((*xt.shape,3), np.sqrt(3)/3)
-            p = np.empty((*xt.shape, 3))
-            p[:,:,:,0], p[:,:,:,1], p[:,:,:,2] = np.abs(xt/r), np.abs(yt/r), np.abs(zt/r)
-            return np.maximum(np.maximum(np.maximum(np.sum(p * v, axis=3), np.sum(p * np.roll(v, 1, axis=3), axis=3)),
-                   np.sum(p * np.roll(v, 2, axis=3), axis=3)) - v[:,:,:,0], np.sum(p * w, axis=3) - v[:,:,:,0]) * r
-        
+            vx, vy, vz = Vector((sqrt(5) + 3) / 2, 1, 0).unitized()
+            w = sqrt(3) / 3
+            px, py, pz = np.abs(xt / r), np.abs(yt / r), np.abs(zt / r)
+            a = px * vx + py * vy + pz * vz
+            b = px * vz + py * vx + pz * vy
+            c = px * vy + py * vz + pz * vx
+            d = (px + py + pz) * w - vx
+            return np.maximum(np.maximum(np.maximum(a, b), c) - vx, d) * r
+
         else:
-            return np.zeros((*xt.shape,))
+            return np.zeros(np.broadcast(xt, yt, zt).shape, dtype=xt.dtype)
 
 
 if __name__=="__main__":
@@ -8,8 +8,17 @@ from compas.geometry import matrix_from_frame
 from compas.geometry import matrix_inverse
 from compas import PRECISION
 
+from compas_vol.utilities import Observable
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import lipschitz_interval
+from compas_vol.utilities import transform_box
+from compas_vol.utilities import transform_coordinates
+from compas_vol.utilities import transform_point
+from compas_vol.utilities import tree_to_data
 
-class VolBox(object):
+
+class VolBox(Observable):
     """A volumetric box is defined by a base box from `compas.geometry` and an optional fillet radius.
 
     The center of the volumetric box is positioned at the origin of the
@@ -82,8 +91,7 @@ class VolBox(object):
                 'radius': self.radius}
 
     def to_data(self):
-        return {'type': self.__class__.__name__,
-                'content': self.data}
+        return tree_to_data(self)
 
     @data.setter
     def data(self, data):
@@ -116,10 +124,27 @@ class VolBox(object):
         >>>
 
         """
+        data = data_content(data)
         box = Box.from_data(data['box'])
         vbox = cls(box, data['radius'])
         return vbox
 
+    def get_bounding_box(self):
+        """
+        box of the corners of the box
+        """
+        size = (self.box.xsize / 2.0, self.box.ysize / 2.0, self.box.zsize / 2.0)
+        return transform_box(matrix_from_frame(self.box.frame), tuple(-s for s in size), size)
+
+    def get_distance_interval(self, box):
+        """
+        distance at the center of the queried box, give or take half its diagonal,
+        and no less than minus half the smallest side of the box, the distance at its center
+        """
+        # the distances are smallest at the center
+        floor = -min(self.box.xsize, self.box.ysize, self.box.zsize) / 2.0
+        return tuple(lipschitz_interval(self, box, floor=floor))
+
     def get_distance(self, point):
         """
         single point distance function
@@ -133,12 +158,7 @@ class VolBox(object):
         float
             The distance from the query point to the surface of the object.
         """
-        if not isinstance(point, Point):
-            p = Point(*point)
-        else:
-            p = point
-
-        p.transform(self.inversetransform)
+        p = transform_point(self.inversetransform, point)
 
         dx = abs(p.x) - (self.box.xsize / 2.0 - self.radius)
         dy = abs(p.y) - (self.box.ysize / 2.0 - self.radius)
@@ -153,6 +173,8 @@ class VolBox(object):
             corner = sqrt(dx * dx + dy * dy + dz * dz) - self.radius
             return corner
 
+    get_distance_points = distance_points
+
     def get_distance_numpy(self, x, y, z):
         """
         vectorized distance function
@@ -169,8 +191,7 @@ class VolBox(object):
         """
         import numpy as np
 
-        p = np.array([x, y, z, 1], dtype=object)
-        xt, yt, zt, _ = np.dot(self.inversetransform, p)
+        xt, yt, zt = transform_coordinates(self.inversetransform, x, y, z)
 
         dx = np.abs(xt) - (self.box.xsize / 2.0 - self.radius)
         dy = np.abs(yt) - (self.box.ysize / 2.0 - self.radius)
@@ -2,8 +2,14 @@ from compas.geometry import Point
 from compas.geometry import closest_point_on_segment
 from compas import PRECISION
 
+from compas_vol.utilities import Observable
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import lipschitz_interval
+from compas_vol.utilities import tree_to_data
 
-class VolCapsule(object):
+
+class VolCapsule(Observable):
     """A volumetric capsule is defined by a line segment and a radius.
 
     Parameters
@@ -27,11 +33,11 @@ class VolCapsule(object):
 
     @property
     def data(self):
-        return {'segment': self.segment,
+        return {'segment': [[float(c) for c in p] for p in self.segment],
                 'radius': self.radius}
 
     def to_data(self):
-        return self.data
+        return tree_to_data(self)
 
     @data.setter
     def data(self, data):
@@ -40,14 +46,28 @@ class VolCapsule(object):
 
     @classmethod
     def from_data(cls, data):
+        data = data_content(data)
         segment = data['segment']
         radius = data['radius']
         vcapsule = cls(segment, radius)
         return vcapsule
 
     def __repr__(self):
-        segment = 'hallo'
-        return 'VolSegment({0},{1:.{2}f})'.format(segment, self.radius, PRECISION[:1])
+        return 'VolCapsule({0},{1:.{2}f})'.format(self.data['segment'], self.radius, PRECISION[:1])
+
+    def get_bounding_box(self):
+        """
+        box of the segment, grown by the radius
+        """
+        a, b = self.segment
+        return (tuple(min(i, j) - self.radius for i, j in zip(a, b)),
+                tuple(max(i, j) + self.radius for i, j in zip(a, b)))
+
+    def get_distance_interval(self, box):
+        """
+        distance at the center of the queried box, give or take half its diagonal, and no less than minus the radius
+        """
+        return tuple(lipschitz_interval(self, box, floor=-self.radius))
 
     def get_distance(self, point):
         """
@@ -58,27 +78,22 @@ class VolCapsule(object):
         p = closest_point_on_segment(point, self.segment)
         return point.distance_to_point(p) - self.radius
 
+    get_distance_points = distance_points
+
     def get_distance_numpy(self, x, y, z):
         """
         vectorized distance function
         """
         import numpy as np
 
-        A = np.array([*self.segment[0]])
-        B = np.array([*self.segment[1]])
-
-        pnt_vecs = np.array([x - A[0], y - A[1], z - A[2]])
-        line_vec = B - A
-        line_len = np.sqrt(np.sum(line_vec**2))
-        line_unitvec = line_vec/line_len
-        pnt_vec_scaled = pnt_vecs * 1/line_len
-        t = np.dot(line_unitvec, pnt_vec_scaled)
-        t = np.where(t < 0, 0, t)
-        t = np.where(t > 1, 1, t)
-        nearest = t[:, :, :, np.newaxis] * line_vec
-        ptmg = np.meshgrid(pnt_vecs[1], pnt_vecs[0], pnt_vecs[2])
-        pts = np.stack((ptmg), axis=-1)
-        dist = np.linalg.norm(nearest - pts, axis=-1)
+        ax, ay, az = (float(c) for c in self.segment[0])
+        bx, by, bz = (float(c) for c in self.segment[1])
+
+        vx, vy, vz = bx - ax, by - ay, bz - az
+        line_len2 = vx * vx + vy * vy + vz * vz
+        px, py, pz = x - ax, y - ay, z - az
+        t = np.clip((px * vx + py * vy + pz * vz) / line_len2, 0, 1)
+        dist = np.sqrt((px - t * vx)**2 + (py - t * vy)**2 + (pz - t * vz)**2)
         return dist - self.radius
         # return norm(cross(B-A, pnt-A), axis=-1)/norm(B-A) - self.radius
 
@@ -1,12 +1,20 @@
 from compas.geometry import Cone
 from compas.geometry import Frame
-from compas.geometry import Point
 from compas.geometry import length_vector_xy
 from compas.geometry import matrix_from_frame
 from compas.geometry import matrix_inverse
 
+from compas_vol.utilities import Observable
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import lipschitz_interval
+from compas_vol.utilities import transform_box
+from compas_vol.utilities import transform_coordinates
+from compas_vol.utilities import transform_point
+from compas_vol.utilities import tree_to_data
 
-class VolCone(object):
+
+class VolCone(Observable):
     """A volumetric cone is defined by a base cone from `compas.geometry`.
 
     Parameters
@@ -35,7 +43,7 @@ class VolCone(object):
         return self.cone.to_data()
 
     def to_data(self):
-        return self.data
+        return tree_to_data(self)
 
     @data.setter
     def data(self, data):
@@ -43,10 +51,27 @@ class VolCone(object):
 
     @classmethod
     def from_data(cls, data):
+        data = data_content(data)
         cone = Cone.from_data(data)
         vcone = cls(cone)
         return vcone
 
+    def get_bounding_box(self):
+        """
+        box of the corners of the cylinder around the cone, moved into its frame
+        """
+        r = self.cone.radius
+        h = self.cone.height / 2.0
+        return transform_box(self.matrix, (-r, -r, -h), (r, r, h))
+
+    def get_distance_interval(self, box):
+        """
+        distance at the center of the queried box, give or take half its diagonal times sqrt(1 + (r / h)^2),
+        as the radius shrinks by r / h along the axis, and no less than minus half the height
+        """
+        lipschitz = (1 + (self.cone.radius / self.cone.height) ** 2) ** 0.5
+        return tuple(lipschitz_interval(self, box, lipschitz, floor=-self.cone.height / 2.0))
+
     def get_distance(self, point):
         """
         single point distance function
@@ -60,10 +85,7 @@ class VolCone(object):
         float
             The distance from the query point to the surface of the object.
         """
-        if not isinstance(point, Point):
-            point = Point(*point)
-
-        point.transform(self.inversedmatrix)
+        point = transform_point(self.inversedmatrix, point)
 
         f = (point.z + self.cone.height / 2) / self.cone.height
         temprad = self.cone.radius - f * self.cone.radius
@@ -72,6 +94,8 @@ class VolCone(object):
         return max(dxy, abs(point.z) - self.cone.height / 2)
 
 
+    get_distance_points = distance_points
+
     def get_distance_numpy(self, x, y, z):
         """
         vectorized distance function
@@ -88,8 +112,7 @@ class VolCone(object):
         """
         import numpy as np
         
-        p = np.array([x, y, z, 1], dtype=object)
-        xt, yt, zt, _ = np.dot(self.inversedmatrix, p)
+        xt, yt, zt = transform_coordinates(self.inversedmatrix, x, y, z)
 
         f = (zt + self.cone.height / 2) / self.cone.height
 
@@ -1,12 +1,20 @@
 from compas.geometry import Cylinder
 from compas.geometry import Frame
-from compas.geometry import Point
 from compas.geometry import length_vector_xy
 from compas.geometry import matrix_inverse
 from compas.geometry import matrix_from_frame
 
+from compas_vol.utilities import Observable
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import lipschitz_interval
+from compas_vol.utilities import transform_box
+from compas_vol.utilities import transform_coordinates
+from compas_vol.utilities import transform_point
+from compas_vol.utilities import tree_to_data
 
-class VolCylinder(object):
+
+class VolCylinder(Observable):
     """A volumetric cylinder is defined by a base cylinder from `compas.geometry`.
 
     Parameters
@@ -35,7 +43,7 @@ class VolCylinder(object):
         return self.cylinder.data
 
     def to_data(self):
-        return self.data
+        return tree_to_data(self)
 
     @data.setter
     def data(self, data):
@@ -43,6 +51,7 @@ class VolCylinder(object):
 
     @classmethod
     def from_data(cls, data):
+        data = data_content(data)
         cylinder = Cylinder.from_data(data)
         vcylinder = cls(cylinder)
         return vcylinder
@@ -54,28 +63,42 @@ class VolCylinder(object):
     # distance functions
     # ==========================================================================
 
+    def get_bounding_box(self):
+        """
+        box of the corners of the cylinder, moved into the frame of its plane
+        """
+        r = self.cylinder.radius
+        h = self.cylinder.height / 2.0
+        return transform_box(matrix_from_frame(Frame.from_plane(self.cylinder.plane)), (-r, -r, -h), (r, r, h))
+
+    def get_distance_interval(self, box):
+        """
+        distance at the center of the queried box, give or take half its diagonal,
+        and no less than minus the smaller of the radius and half the height
+        """
+        floor = -min(self.cylinder.radius, self.cylinder.height / 2.0)
+        return tuple(lipschitz_interval(self, box, floor=floor))
+
     def get_distance(self, point):
         """
         single point distance function
         """
-        if not isinstance(point, Point):
-            point = Point(*point)
-
-        point.transform(self.inversetransform)
+        point = transform_point(self.inversetransform, point)
 
         dxy = length_vector_xy(point)  # distance_point_point_xy(self.cylinder.center, point)
         d = dxy - self.cylinder.radius
         d = max(d, abs(point.z) - self.cylinder.height / 2.0)
         return d
 
+    get_distance_points = distance_points
+
     def get_distance_numpy(self, x, y, z):
         """
         vectorized distance function
         """
         import numpy as np
 
-        p = np.array([x, y, z, 1], dtype=object)
-        xt, yt, zt, _ = np.dot(self.inversetransform, p)
+        xt, yt, zt = transform_coordinates(self.inversetransform, x, y, z)
 
         d = np.sqrt(xt * xt + yt * yt) - self.cylinder.radius
         out = np.maximum(d, np.abs(zt) - self.cylinder.height / 2.0)
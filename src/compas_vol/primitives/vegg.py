@@ -1,8 +1,16 @@
-from compas.geometry import Frame, Point
+from compas.geometry import Frame
 from compas.geometry import matrix_from_frame
 from compas.geometry import matrix_inverse
 
-class VolEgg (object):
+from compas_vol.utilities import Observable
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import transform_coordinates
+from compas_vol.utilities import transform_intervals
+from compas_vol.utilities import transform_point
+from compas_vol.utilities import tree_to_data
+
+class VolEgg (Observable):
     """A volumetric egg...
 
     Parameters
@@ -22,11 +30,30 @@ class VolEgg (object):
         self.matrix = matrix_from_frame(self.frame)
         self.inversedmatrix = matrix_inverse(self.matrix)
 
-    
+    @property
+    def data(self):
+        return {'radiusA': self.ra, 'radiusB': self.rb, 'k': self.k, 'frame': self.frame.data}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['radiusA'], data['radiusB'], data['k'], Frame.from_data(data['frame']))
+
     # ==========================================================================
     # distance functions
     # ==========================================================================
     
+    def get_distance_interval(self, box):
+        """
+        implicit function of the egg evaluated with interval arithmetic over the box in the coordinates of its frame
+        """
+        xt, yt, zt = transform_intervals(self.inversedmatrix, box)
+        d = zt ** 2 / (self.rb * self.rb) + yt ** 2 / (self.ra * self.ra) + xt ** 2 / (self.ra * self.ra) * (1 + zt * self.k) - 1
+        return tuple(d)
+
     def get_distance(self, point):
         """
         single point distance function
@@ -40,15 +67,14 @@ class VolEgg (object):
         float
             The distance from the query point to the surface of the object.
         """
-        if not isinstance(point, Point):
-            point = Point(*point)
-
-        point.transform(self.inversedmatrix)
+        point = transform_point(self.inversedmatrix, point)
 
         d = ((point.z * point.z) / (self.rb * self.rb)) + ((point.y *point.y) / (self.ra * self.ra)) + ((point.x * point.x) / (self.ra * self.ra)) * (1 + self.k * point.z) - 1
         return d
 
 
+    get_distance_points = distance_points
+
     def get_distance_numpy(self, x, y, z):
         """
         vectorized distance function
@@ -64,10 +90,7 @@ class VolEgg (object):
             The distances from the query points to the surface of the object.
         """
 
-        import numpy as np
-
-        p = np.array([x, y, z, 1], dtype=object)
-        xt, yt, zt, _ = np.dot(self.inversedmatrix, p)
+        xt, yt, zt = transform_coordinates(self.inversedmatrix, x, y, z)
 
         d = ((zt * zt) / (self.rb * self.rb)) + ((yt * yt) / (self.ra * self.ra)) + ((xt * xt) / (self.ra * self.ra)) * (1 + self.k * zt) - 1
         return d
\ No newline at end of file
@@ -1,12 +1,21 @@
-from compas.geometry import Point
 from compas.geometry import Frame
 from compas.geometry import Vector
 from compas.geometry import matrix_from_frame
 from compas.geometry import matrix_inverse
 from compas import PRECISION
 
+from compas_vol.utilities import Interval
+from compas_vol.utilities import Observable
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import transform_box
+from compas_vol.utilities import transform_coordinates
+from compas_vol.utilities import transform_intervals
+from compas_vol.utilities import transform_point
+from compas_vol.utilities import tree_to_data
 
-class VolEllipsoid(object):
+
+class VolEllipsoid(Observable):
     """A volumetric ellipsoid is defined by three radii along its axes x, y and z.
 
     Parameters
@@ -33,9 +42,43 @@ class VolEllipsoid(object):
         transform = matrix_from_frame(self.frame)
         self.inversetransform = matrix_inverse(transform)
 
+    @property
+    def data(self):
+        return {'radiusX': self.radiusX, 'radiusY': self.radiusY, 'radiusZ': self.radiusZ, 'frame': self.frame.data}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['radiusX'], data['radiusY'], data['radiusZ'], Frame.from_data(data['frame']))
+
     def __repr__(self):
         return 'VolEllipsoid({0:.{4}f},{1:.{4}f},{2:.{4}f},{3})'.format(self.radiusX, self.radiusY, self.radiusZ, str(self.frame), PRECISION[:1])
 
+    def get_bounding_box(self):
+        """
+        box of the corners of the radii, moved into the frame
+        """
+        size = (self.radiusX, self.radiusY, self.radiusZ)
+        return transform_box(matrix_from_frame(self.frame), tuple(-s for s in size), size)
+
+    def get_distance_interval(self, box):
+        """
+        bound k0 (k0 - 1) / k1 of the distances evaluated with interval arithmetic over the box in the coordinates of the frame,
+        where k0 / k1 lies between the smallest and the largest radius
+        """
+        xt, yt, zt = transform_intervals(self.inversetransform, box)
+        radii = [abs(r) for r in (self.radiusX, self.radiusY, self.radiusZ)]
+        k0 = ((xt / radii[0]) ** 2 + (yt / radii[1]) ** 2 + (zt / radii[2]) ** 2).sqrt()
+        # k0 * (k0 - 1) / k1, where k0 / k1 lies between the smallest and the largest radius
+        d = Interval(min(radii), max(radii)) * (k0 - 1)
+        if xt.contains(0) and yt.contains(0) and zt.contains(0):
+            # the distance at the center is -1
+            d = Interval(min(d.lo, -1), max(d.hi, -1))
+        return tuple(d)
+
     def get_distance(self, point):
         """
         single point distance function
@@ -49,12 +92,7 @@ class VolEllipsoid(object):
         float
             The distance from the query point to the surface of the object.
         """
-        if not isinstance(point, Point):
-            p = Point(*point)
-        else:
-            p = point
-
-        p.transform(self.inversetransform)
+        p = transform_point(self.inversetransform, point)
 
         k0 = Vector(p.x / self.radiusX, p.y / self.radiusY, p.z / self.radiusZ).length
         k1 = Vector(p.x / self.radiusX**2, p.y / self.radiusY**2, p.z / self.radiusZ**2).length
@@ -63,6 +101,8 @@ class VolEllipsoid(object):
         else:
             return k0 * (k0 - 1.0) / k1
 
+    get_distance_points = distance_points
+
     def get_distance_numpy(self, x, y, z):
         """
         vectorized distance function
@@ -79,8 +119,7 @@ class VolEllipsoid(object):
         """
         import numpy as np
 
-        p = np.array([x, y, z, 1])
-        xt, yt, zt, _ = np.dot(self.inversetransform, p)
+        xt, yt, zt = transform_coordinates(self.inversetransform, x, y, z)
         k0 = np.sqrt(np.square(xt/self.radiusX) + np.square(yt/self.radiusY) + np.square(zt/self.radiusZ))
         k1 = np.sqrt(np.square(xt/self.radiusX**2) + np.square(yt/self.radiusY**2) + np.square(zt/self.radiusZ**2))
         out = np.where(k1 == 0, -1, k0 * (k0 - 1.0) / k1)
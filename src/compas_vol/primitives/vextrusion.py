@@ -5,7 +5,16 @@ from compas.geometry import matrix_inverse
 from compas.geometry import closest_point_on_polyline_xy
 from compas.geometry import is_point_in_polygon_xy
 
-class VolExtrusion(object):
+from compas_vol.utilities import Observable
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import lipschitz_interval
+from compas_vol.utilities import transform_box
+from compas_vol.utilities import transform_coordinates
+from compas_vol.utilities import transform_point
+from compas_vol.utilities import tree_to_data
+
+class VolExtrusion(Observable):
     """A volumetric extrusion is defined by a polyline from `compas.geometry` and a height.
     Parameters
     ----------
@@ -24,6 +33,46 @@ class VolExtrusion(object):
         self.frame = frame or Frame.worldXY()
         self.inversetransform = matrix_inverse(matrix_from_frame(self.frame))
 
+    # ==========================================================================
+    # pickling
+    # ==========================================================================
+
+    def __getstate__(self):
+        """Return the state with the frame as plain coordinate lists."""
+        state = self.__dict__.copy()
+        state['frame'] = [list(v) for v in self.frame]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.frame = Frame(*state['frame'])
+
+    @property
+    def data(self):
+        return {'polyline': [[float(c) for c in p] for p in self.polyline], 'height': self.height, 'frame': self.frame.data}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(data['polyline'], data['height'], Frame.from_data(data['frame']))
+
+    def get_bounding_box(self):
+        """
+        box of the polyline over the height, moved into the frame
+        """
+        xs = [p[0] for p in self.polyline]
+        ys = [p[1] for p in self.polyline]
+        h = self.height / 2.0
+        return transform_box(matrix_from_frame(self.frame), (min(xs), min(ys), -h), (max(xs), max(ys), h))
+
+    def get_distance_interval(self, box):
+        """
+        distance at the center of the queried box, give or take half its diagonal, and no less than minus half the height
+        """
+        return tuple(lipschitz_interval(self, box, floor=-self.height / 2.0))
 
     def get_distance(self, point):
         """
@@ -39,10 +88,7 @@ class VolExtrusion(object):
             The distance from the query point to the surface of the object.
         """
 
-        if not isinstance(point, Point):
-            point = Point(*point)
-
-        point.transform(self.inversetransform)
+        point = transform_point(self.inversetransform, point)
 
         tp = Point(point[0], point[1], 0)
         cp = closest_point_on_polyline_xy(tp, self.polyline)
@@ -53,6 +99,8 @@ class VolExtrusion(object):
         return d
 
 
+    get_distance_points = distance_points
+
     def get_distance_numpy(self, x, y, z):
         """
         vectorized distance function
@@ -69,28 +117,19 @@ class VolExtrusion(object):
         """
 
         import numpy as np
-        l = len(self.polyline)-1
-        
-        p = np.array([x, y, z, 1], dtype=object)
-        xt, yt, zt, _ = np.dot(self.inversetransform, p)
-        _xyt = np.empty((*xt.shape, l, 2))
-        _xyt[:,:,:,:,0], _xyt[:,:,:,:,1] = np.reshape(np.repeat(xt, l), (*xt.shape, l)), np.reshape(np.repeat(yt, l), (*yt.shape, l))
-
-        v2D = np.empty((l, 3, 2))
-        for i in range(l):
-            v2D[i,0] = self.polyline[i][0], self.polyline[i][1]
-            v2D[i,1] = self.polyline[i+1][0], self.polyline[i+1][1]
-            v2D[i,2,0], v2D[i,2,1] = self.polyline[i+1][0] - self.polyline[i][0], self.polyline[i+1][1] - self.polyline[i][1]
-        v2D = np.reshape(np.tile(v2D, (xt.size, 1, 1)), (*xt.shape, l, 3, 2))
-
-        w = np.empty((*xt.shape,l,2))
-        w[:,:,:,:,0], w[:,:,:,:,1] = _xyt[:,:,:,:,0] - v2D[:,:,:,:,0,0], _xyt[:,:,:,:,1] - v2D[:,:,:,:,0,1]
-        b = w - v2D[:,:,:,:,2] * np.clip(np.sum(w * v2D[:,:,:,:,2], axis=4) / np.sum(v2D[:,:,:,:,2]**2, axis=4), 0, 1)[..., np.newaxis]
-
-        cond = np.empty((*xt.shape,l,3), dtype=bool)
-        cond[:,:,:,:,0] = _xyt[:,:,:,:,1] >= v2D[:,:,:,:,0,1]  
-        cond[:,:,:,:,1] = _xyt[:,:,:,:,1] < v2D[:,:,:,:,1,1]
-        cond[:,:,:,:,2] = v2D[:,:,:,:,2,0] * w[:,:,:,:,1] > v2D[:,:,:,:,2,1] * w[:,:,:,:,0]
-        s = np.where(np.sum(np.all(cond, axis=4) | np.all(~cond, axis=4), axis=3) %2 != 0, -1, np.ones((xt.shape)))
-
-        return np.maximum(s * np.sqrt(np.min(np.sum(b**2, axis=4), axis=3)), np.abs(zt) - self.height / 2.0)
\ No newline at end of file
+
+        xt, yt, zt = transform_coordinates(self.inversetransform, x, y, z)
+        shape = np.broadcast(xt, yt).shape
+        d2 = np.full(shape, np.inf, dtype=xt.dtype)
+        inside = np.zeros(shape, dtype=bool)
+        # one segment at a time, the squared distance to the polyline and the parity of crossings
+        for (ax, ay), (bx, by) in zip([p[:2] for p in self.polyline[:-1]], [p[:2] for p in self.polyline[1:]]):
+            ex, ey = float(bx - ax), float(by - ay)
+            wx, wy = xt - ax, yt - ay
+            t = np.clip((wx * ex + wy * ey) / (ex * ex + ey * ey), 0, 1)
+            np.minimum(d2, (wx - ex * t)**2 + (wy - ey * t)**2, out=d2)
+            c0, c1, c2 = yt >= ay, yt < by, ex * wy > ey * wx
+            inside ^= (c0 & c1 & c2) | ~(c0 | c1 | c2)
+        d = np.sqrt(d2, out=d2)
+        np.negative(d, out=d, where=inside)
+        return np.maximum(d, np.abs(zt) - self.height / 2.0)
\ No newline at end of file
@@ -1,8 +1,14 @@
 from compas.geometry import Plane
 from compas.geometry import distance_point_plane_signed
 
+from compas_vol.utilities import Observable
+from compas_vol.utilities import box_intervals
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import tree_to_data
 
-class VolPlane(object):
+
+class VolPlane(Observable):
     """A volumetric plane is defined by a base plane from `compas.geometry`.
 
     Parameters
@@ -25,7 +31,7 @@ class VolPlane(object):
         return self.plane.to_data()
 
     def to_data(self):
-        return self.data
+        return tree_to_data(self)
 
     @data.setter
     def data(self, data):
@@ -33,6 +39,7 @@ class VolPlane(object):
 
     @classmethod
     def from_data(cls, data):
+        data = data_content(data)
         plane = Plane.from_data(data)
         vplane = cls(plane)
         return vplane
@@ -40,12 +47,23 @@ class VolPlane(object):
     def __repr__(self):
         return 'VolPlane({})'.format(str(self.plane))
 
+    def get_distance_interval(self, box):
+        """
+        signed distances to the plane, linear over the box and evaluated with interval arithmetic
+        """
+        base, normal = self.plane
+        x, y, z = box_intervals(box)
+        d = (x - base.x) * float(normal[0]) + (y - base.y) * float(normal[1]) + (z - base.z) * float(normal[2])
+        return tuple(d)
+
     def get_distance(self, point):
         """
         single point distance function
         """
         return distance_point_plane_signed(point, self.plane)
 
+    get_distance_points = distance_points
+
     def get_distance_numpy(self, x, y, z):
         """
         vectorized distance function
@@ -53,11 +71,12 @@ class VolPlane(object):
         import numpy as np
 
         base, normal = self.plane
+        nx, ny, nz = (float(n) for n in normal)
         x = x-base.x
         y = y-base.y
         z = z-base.z
-        d = np.dot(np.array([x, y, z]), normal)
-        return d
+        d = x * nx + y * ny + z * nz
+        return np.asarray(d)
 
 
 # if __name__ == "__main__":
@@ -1,4 +1,14 @@
-class VolPolyhedron(object):
+from compas_vol.utilities import Observable
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_buffer
+from compas_vol.utilities import distance_interval
+from compas_vol.utilities import distance_into
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import interval_max
+from compas_vol.utilities import tree_to_data
+
+
+class VolPolyhedron(Observable):
     """
     Class for convex polyhedra delimited by a list of planes.
 
@@ -12,6 +22,24 @@ class VolPolyhedron(object):
         self.planes = planes or []
         # print(self.planes[-1].plane)
 
+    @property
+    def data(self):
+        return {'planes': self.planes}
+
+    def to_data(self):
+        return tree_to_data(self)
+
+    @classmethod
+    def from_data(cls, data):
+        data = data_content(data)
+        return cls(list(data['planes']))
+
+    def get_distance_interval(self, box):
+        """
+        maximum of the intervals of the planes
+        """
+        return tuple(interval_max(*(distance_interval(p, box) for p in self.planes)))
+
     def get_distance(self, point):
         """
         single point distance function
@@ -20,14 +48,23 @@ class VolPolyhedron(object):
         distances = [p.get_distance(point) for p in self.planes]
         return max(distances)
 
-    def get_distance_numpy(self, x, y, z):
+    get_distance_points = distance_points
+
+    def get_distance_numpy(self, x, y, z, out=None):
         """
         vectorized distance function
+
+        The planes are evaluated one at a time and reduced in place, into ``out`` if given,
+        so that only two arrays of distances are held whatever the number of planes.
         """
         import numpy as np
 
-        distances = ([p.get_distance_numpy(x, y, z) for p in self.planes])
-        return np.maximum.reduce((distances))
+        out = distance_into(self.planes[0], x, y, z, distance_buffer(x, y, z, out))
+        if len(self.planes) > 1:
+            scratch = distance_buffer(x, y, z)
+            for o in self.planes[1:]:
+                np.maximum(out, distance_into(o, x, y, z, scratch), out=out)
+        return out
 
 
 # if __name__ == "__main__":
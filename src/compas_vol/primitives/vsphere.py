@@ -1,8 +1,14 @@
 from compas.geometry import Point
 from compas.geometry import Sphere
 
+from compas_vol.utilities import Observable
+from compas_vol.utilities import box_intervals
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import tree_to_data
 
-class VolSphere(object):
+
+class VolSphere(Observable):
     """A volumetric sphere is defined by a base sphere from `compas.geometry`.
 
     Parameters
@@ -35,13 +41,14 @@ class VolSphere(object):
 
     @property
     def data(self):
-        return {'type': self.__class__.__name__,
-                'geom': self.sphere.data}
+        return {'geom': self.sphere.data}
 
     def to_data(self):
-        return self.data
+        return tree_to_data(self)
 
+    @classmethod
     def from_data(cls, data):
+        data = data_content(data)
         sphere = Sphere.from_data(data['geom'])
         vsphere = cls(sphere)
         return vsphere
@@ -49,12 +56,31 @@ class VolSphere(object):
     def __repr__(self):
         return 'VolSphere({})'.format(str(self.sphere))
 
+    def get_bounding_box(self):
+        """
+        box of the center, grown by the radius
+        """
+        c = self.sphere.point
+        r = self.sphere.radius
+        return tuple(a - r for a in c), tuple(a + r for a in c)
+
+    def get_distance_interval(self, box):
+        """
+        distance to the center evaluated with interval arithmetic over the box, minus the radius
+        """
+        x, y, z = box_intervals(box)
+        cx, cy, cz = self.sphere.point
+        d = ((x - cx) ** 2 + (y - cy) ** 2 + (z - cz) ** 2).sqrt() - self.sphere.radius
+        return tuple(d)
+
     def get_distance(self, point):
         if not isinstance(point, Point):
             point = Point(*point)
         d = point.distance_to_point(self.sphere.center)
         return d - self.sphere.radius
 
+    get_distance_points = distance_points
+
     def get_distance_numpy(self, x, y, z):
         import numpy as np
         d = np.sqrt((x - self.sphere.center.x)**2 +
@@ -1,14 +1,22 @@
 from math import sqrt
 
 from compas.geometry import Frame
-from compas.geometry import Point
 from compas.geometry import Torus
 from compas.geometry import length_vector_xy
 from compas.geometry import matrix_inverse
 from compas.geometry import matrix_from_frame
 
+from compas_vol.utilities import Observable
+from compas_vol.utilities import data_content
+from compas_vol.utilities import distance_points
+from compas_vol.utilities import lipschitz_interval
+from compas_vol.utilities import transform_box
+from compas_vol.utilities import transform_coordinates
+from compas_vol.utilities import transform_point
+from compas_vol.utilities import tree_to_data
 
-class VolTorus(object):
+
+class VolTorus(Observable):
     """A volumetric torus is defined by a base torus from `compas.geometry`.
 
     Parameters
@@ -36,7 +44,7 @@ class VolTorus(object):
         return self.torus.to_data()
 
     def to_data(self):
-        return self.data
+        return tree_to_data(self)
 
     @data.setter
     def data(self, data):
@@ -44,6 +52,7 @@ class VolTorus(object):
 
     @classmethod
     def from_data(cls, data):
+        data = data_content(data)
         torus = Torus.from_data(data)
         vtorus = cls(torus)
         return vtorus
@@ -51,27 +60,39 @@ class VolTorus(object):
     def __repr__(self):
         return 'VolTorus({})'.format(str(self.torus))
 
+    def get_bounding_box(self):
+        """
+        box of the outer radius in the plane of the torus and of the radius of the pipe along its normal
+        """
+        r = self.torus.radius_axis + self.torus.radius_pipe
+        h = self.torus.radius_pipe
+        return transform_box(matrix_from_frame(Frame.from_plane(self.torus.plane)), (-r, -r, -h), (r, r, h))
+
+    def get_distance_interval(self, box):
+        """
+        distance at the center of the queried box, give or take half its diagonal, and no less than minus the radius of the pipe
+        """
+        return tuple(lipschitz_interval(self, box, floor=-self.torus.radius_pipe))
+
     def get_distance(self, point):
         """
         single point distance function
         """
-        if not isinstance(point, Point):
-            point = Point(*point)
-
-        point.transform(self.inversetransform)
+        point = transform_point(self.inversetransform, point)
 
         dxy = length_vector_xy(point)  # distance_point_point_xy(self.torus.center, point)
         d2 = sqrt((dxy - self.torus.radius_axis)**2 + point.z**2)
         return d2 - self.torus.radius_pipe
 
+    get_distance_points = distance_points
+
     def get_distance_numpy(self, x, y, z):
         """
         vectorized distance function
         """
         import numpy as np
 
-        p = np.array([x, y, z, 1])
-        xt, yt, zt, _ = np.dot(self.inversetransform, p)
+        xt, yt, zt = transform_coordinates(self.inversetransform, x, y, z)
 
         # d = np.sqrt((xt - self.torus.center.x)**2 +
         #             (yt - self.torus.center.y)**2) - self.torus.radius_axis
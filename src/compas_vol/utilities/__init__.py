@@ -30,6 +30,88 @@ from .utils import (
     get_iso_vfs,
     bbox_edges
 )
+from .precision import (
+    precision,
+    get_precision,
+    set_precision
+)
+from .transforms import (
+    transform_coordinates,
+    transform_point,
+    shared_transforms
+)
+from .structure import (
+    structural_key,
+    structural_hash,
+    structural_digest,
+    structurally_equal,
+    shared_subtrees
+)
+from .buffers import (
+    distance_buffer,
+    distance_into
+)
+from .points import (
+    distance_points
+)
+from .bounds import (
+    culling,
+    widened,
+    bounding_box,
+    transform_box,
+    union_box,
+    intersection_box,
+    expand_box,
+    box_distance,
+    cull_block,
+    cull_union,
+    cull_intersection
+)
+from .intervals import (
+    Interval,
+    interval_min,
+    interval_max,
+    box_intervals,
+    transform_intervals,
+    distance_interval,
+    lipschitz_interval
+)
+from .memo import (
+    SubtreeCache,
+    subtree_caching,
+    get_subtree_cache,
+    set_subtree_cache
+)
+from .tracking import (
+    Observable,
+    notify_change,
+    observe,
+    unobserve
+)
+from .serialization import (
+    tree_to_data,
+    tree_from_data,
+    data_content,
+    serialize_tree,
+    deserialize_tree
+)
+from .coalescing import (
+    Coalescer,
+    coalesce,
+    request_key
+)
+from .server import (
+    MeshServer,
+    MeshClient
+)
+from .writers import (
+    PLYWriter,
+    STLWriter,
+    OBJWriter,
+    write_ply,
+    write_stl,
+    write_obj
+)
 
 #from .comm import get_vfs_from_tree
 
@@ -44,5 +126,61 @@ __all__ = [
     'get_iso_mesh',
     'get_iso_vfs',
     #'get_vfs_from_tree',
-    'bbox_edges'
+    'bbox_edges',
+    'precision',
+    'get_precision',
+    'set_precision',
+    'transform_coordinates',
+    'transform_point',
+    'shared_transforms',
+    'structural_key',
+    'structural_hash',
+    'structural_digest',
+    'structurally_equal',
+    'shared_subtrees',
+    'distance_buffer',
+    'distance_into',
+    'distance_points',
+    'culling',
+    'widened',
+    'bounding_box',
+    'transform_box',
+    'union_box',
+    'intersection_box',
+    'expand_box',
+    'box_distance',
+    'cull_block',
+    'cull_union',
+    'cull_intersection',
+    'Interval',
+    'interval_min',
+    'interval_max',
+    'box_intervals',
+    'transform_intervals',
+    'distance_interval',
+    'lipschitz_interval',
+    'SubtreeCache',
+    'subtree_caching',
+    'get_subtree_cache',
+    'set_subtree_cache',
+    'Observable',
+    'notify_change',
+    'observe',
+    'unobserve',
+    'tree_to_data',
+    'tree_from_data',
+    'data_content',
+    'serialize_tree',
+    'deserialize_tree',
+    'Coalescer',
+    'coalesce',
+    'request_key',
+    'MeshServer',
+    'MeshClient',
+    'PLYWriter',
+    'STLWriter',
+    'OBJWriter',
+    'write_ply',
+    'write_stl',
+    'write_obj'
 ]
@@ -0,0 +1,400 @@
+"""Bounds of the distances of objects.
+
+Objects may bound their distances in two ways:
+
+* ``get_bounding_box()`` returns the ``(xmin, ymin, zmin)`` and ``(xmax, ymax, zmax)`` corners of a box
+  in world coordinates outside of which the distances of the object are positive,
+  or None if there is no such box. :func:`culling` evaluates the children of combinations only near their boxes,
+  and the distance to the box along the axes, see :func:`box_distance`, stands in for the distances elsewhere,
+  so that it must be a lower bound of the distances outside of the box.
+* ``get_distance_interval(box)`` returns a lower and an upper bound of the distances of the object
+  at the points of an axis-aligned box, given by its corners, see :func:`compas_vol.utilities.distance_interval`.
+  The bounds may be loose, or infinite, but contain the distance at every point of the box.
+
+Both are optional. Each object documents how it derives its bounds, mostly from those of its children.
+"""
+import itertools
+import threading
+from contextlib import contextmanager
+
+from .buffers import distance_buffer
+from .buffers import distance_into
+
+
+__all__ = [
+    'culling',
+    'widened',
+    'bounding_box',
+    'transform_box',
+    'union_box',
+    'intersection_box',
+    'expand_box',
+    'box_distance',
+    'cull_block',
+    'cull_union',
+    'cull_intersection'
+]
+
+
+_LOCAL = threading.local()
+
+
+@contextmanager
+def culling(margin=0.0):
+    """Context manager evaluating the children of combinations only near their bounding boxes.
+
+    Inside the block, a :class:`compas_vol.combinations.Union`, :class:`compas_vol.combinations.Intersection`,
+    :class:`compas_vol.combinations.Subtraction` or one of their smooth variants evaluated on the
+    open mesh of a grid evaluates each child only on the sub-block its bounding box, grown by
+    ``margin`` and the smoothing radius, overlaps. Elsewhere the distances of the child are replaced
+    by the distance to its box along the axes, which is a lower bound of the distance to its surface,
+    so the sign of the field and the distances within ``margin`` of the surface are kept, while
+    distances further away are approximate. Smooth combinations and shells grow the margin for
+    their children with :func:`widened` by their reach. Nodes whose distances depend on those of
+    their children at any distance from the surface, such as a :class:`compas_vol.combinations.Addition`
+    or a :class:`compas_vol.modifications.MultiShell`, switch culling off for them with ``culling(None)``.
+    The culling assumes that the distances of bounded objects are no less than the distance to their surface,
+    as for true distance functions.
+
+    Parameters
+    ----------
+    margin : float, optional
+        The distance around the bounding boxes within which children are evaluated.
+        If None, culling is switched off inside the block.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from compas.geometry import Point, Sphere
+    >>> from compas_vol.combinations import Union
+    >>> from compas_vol.primitives import VolSphere
+    >>> union = Union([VolSphere(Sphere(Point(i, 0, 0), 0.5)) for i in range(-8, 9, 2)])
+    >>> x, y, z = np.ogrid[-10:10:100j, -10:10:100j, -10:10:100j]
+    >>> with culling(0.5):
+    ...     d = union.get_distance_numpy(x, y, z)
+    """
+    previous = getattr(_LOCAL, 'margin', None)
+    _LOCAL.margin = None if margin is None else float(margin)
+    try:
+        yield
+    finally:
+        _LOCAL.margin = previous
+
+
+@contextmanager
+def widened(distance):
+    """Context manager growing the margin of :func:`culling`, if it is active, by a distance.
+
+    Nodes whose distances depend on those of their children up to some distance
+    from the surface, such as smooth combinations or shells, evaluate their children inside it.
+
+    Parameters
+    ----------
+    distance : float
+        The distance to add to the margin.
+    """
+    margin = getattr(_LOCAL, 'margin', None)
+    if margin is None:
+        yield
+        return
+    _LOCAL.margin = margin + abs(distance)
+    try:
+        yield
+    finally:
+        _LOCAL.margin = margin
+
+
+def _culling_margin():
+    return getattr(_LOCAL, 'margin', None)
+
+
+# ==============================================================================
+# boxes
+# ==============================================================================
+
+
+def bounding_box(obj):
+    """The world-space bounding box of an object, if it reports one.
+
+    Parameters
+    ----------
+    obj : volumetric object
+        The object.
+
+    Returns
+    -------
+    tuple of tuple of float or None
+        The ``(xmin, ymin, zmin)`` and ``(xmax, ymax, zmax)`` corners of a box outside
+        of which the distances of the object are positive, or None if it is unbounded.
+    """
+    get_bounding_box = getattr(obj, 'get_bounding_box', None)
+    return None if get_bounding_box is None else get_bounding_box()
+
+
+def transform_box(matrix, lower, upper):
+    """The axis-aligned bounding box of a box in local coordinates after a transformation.
+
+    Parameters
+    ----------
+    matrix : list of list of float
+        The 4x4 transformation matrix from local to world coordinates, e.g. of ``matrix_from_frame``.
+    lower, upper : tuple of float
+        The lower and upper corners of the box in local coordinates.
+
+    Returns
+    -------
+    tuple of tuple of float
+        The lower and upper corners of the transformed box.
+    """
+    points = [[sum(a * c for a, c in zip(row[:3], corner)) + row[3] for row in matrix[:3]]
+              for corner in itertools.product(*zip(lower, upper))]
+    return tuple(min(p[i] for p in points) for i in range(3)), tuple(max(p[i] for p in points) for i in range(3))
+
+
+def union_box(boxes):
+    """The bounding box of several boxes, or None if any of them is None."""
+    boxes = list(boxes)
+    if not boxes or any(box is None for box in boxes):
+        return None
+    return (tuple(min(box[0][i] for box in boxes) for i in range(3)),
+            tuple(max(box[1][i] for box in boxes) for i in range(3)))
+
+
+def _overlap(boxes):
+    boxes = [box for box in boxes if box is not None]
+    if not boxes:
+        return None
+    return (tuple(max(box[0][i] for box in boxes) for i in range(3)),
+            tuple(min(box[1][i] for box in boxes) for i in range(3)))
+
+
+def intersection_box(boxes):
+    """The overlap of several boxes, ignoring those that are None.
+
+    Returns None if all boxes are None, and also if the boxes do not overlap,
+    since an empty box cannot bound the distances of an object.
+    """
+    box = _overlap(boxes)
+    if box is None or any(a > b for a, b in zip(*box)):
+        return None
+    return box
+
+
+def expand_box(box, distance):
+    """Grow a box by a distance on all sides, or return None for None."""
+    if box is None:
+        return None
+    return tuple(a - distance for a in box[0]), tuple(b + distance for b in box[1])
+
+
+def box_distance(box, x, y, z, out=None):
+    """The distance along the axes from coordinates to a box.
+
+    The largest distance along x, y or z to the box, zero inside it, is a lower bound
+    of the Euclidean distance to the box and to any object inside it.
+    For the coordinates of an open grid, only the last maximum spans the grid.
+
+    Parameters
+    ----------
+    box : tuple of tuple of float
+        The lower and upper corners of the box.
+    x,y,z: `numpy arrays, np.ogrid[]`
+        The coordinates.
+    out : numpy array, optional
+        An array of the broadcast shape of the coordinates to write the distances into.
+
+    Returns
+    -------
+    numpy array
+        The distances.
+    """
+    import numpy as np
+
+    out = distance_buffer(x, y, z, out)
+    terms = []
+    for c, a, b in zip((x, y, z), box[0], box[1]):
+        t = np.subtract(c, b, dtype=out.dtype)
+        np.maximum(t, np.subtract(a, c, dtype=out.dtype), out=t)
+        terms.append(np.maximum(t, 0, out=t))
+    terms.sort(key=np.size)
+    return np.maximum(np.maximum(terms[0], terms[1]), terms[2], out=out)
+
+
+# ==============================================================================
+# culling
+# ==============================================================================
+
+
+def _axes(x, y, z):
+    """The 1-D axes of the coordinates of an open grid, or None for other coordinates."""
+    axes = []
+    for i, c in enumerate((x, y, z)):
+        shape = getattr(c, 'shape', ())
+        if len(shape) != 3 or any(n != 1 for j, n in enumerate(shape) if j != i):
+            return None
+        a = c.reshape(-1)
+        if (a[1:] < a[:-1]).any():
+            return None
+        axes.append(a)
+    return axes
+
+
+def _slices(box, axes):
+    import numpy as np
+
+    return tuple(slice(int(np.searchsorted(a, lo, 'left')), int(np.searchsorted(a, hi, 'right')))
+                 for a, lo, hi in zip(axes, box[0], box[1]))
+
+
+def _ogrid(axes):
+    x, y, z = axes
+    return x[:, None, None], y[None, :, None], z[None, None, :]
+
+
+def _covers(slices, axes):
+    return all(s.start == 0 and s.stop == len(a) for s, a in zip(slices, axes))
+
+
+def _empty(slices):
+    return any(s.start >= s.stop for s in slices)
+
+
+def cull_block(box, lower, x, y, z, out, offset=0.0):
+    """Restrict the evaluation of a combination to the block of an open grid near a bounding box.
+
+    Parameters
+    ----------
+    box : tuple of tuple of float or None
+        The box outside of which, grown by the margin of :func:`culling`, the combination need not be evaluated.
+    lower : list of box or None
+        The boxes whose largest :func:`box_distance`, plus ``offset``, is a lower bound of the
+        combination outside the block. It is written into ``out``. If None, ``out`` is left as is.
+    x,y,z: `numpy arrays, np.ogrid[]`
+        The coordinates.
+    out : numpy array
+        The array of distances of the combination.
+    offset : float, optional
+        Added to the lower bound.
+
+    Returns
+    -------
+    tuple or None
+        None if the whole grid has to be evaluated, i.e. outside :func:`culling`, for coordinates
+        other than an open grid, or if the block covers the grid. Otherwise the index of the block
+        into ``out``, and the open mesh of coordinates of the block, or None if the block is empty.
+    """
+    import numpy as np
+
+    margin = getattr(_LOCAL, 'margin', None)
+    if margin is None or box is None:
+        return None
+    axes = _axes(x, y, z)
+    if axes is None:
+        return None
+    block = _slices(expand_box(box, margin), axes)
+    if _covers(block, axes):
+        return None
+    if lower is not None:
+        box_distance(lower[0], x, y, z, out)
+        if len(lower) > 1:
+            scratch = np.empty_like(out)
+            for other in lower[1:]:
+                np.maximum(out, box_distance(other, x, y, z, scratch), out=out)
+        if offset:
+            out += offset
+    if _empty(block):
+        return block, None
+    return block, _ogrid([a[s] for a, s in zip(axes, block)])
+
+
+def cull_intersection(objs, x, y, z, out):
+    """Restrict the evaluation of an intersection of objects to the block of an open grid near their overlap.
+
+    Outside the block, the largest distance to the bounding boxes of the objects is written into ``out``.
+
+    Parameters
+    ----------
+    objs : list of volumetric objects
+        The objects.
+    x,y,z: `numpy arrays, np.ogrid[]`
+        The coordinates.
+    out : numpy array
+        The array of distances of the intersection.
+
+    Returns
+    -------
+    tuple or None
+        As :func:`cull_block`.
+    """
+    boxes = [box for box in map(bounding_box, objs) if box is not None]
+    if not boxes:
+        return None
+    return cull_block(_overlap(boxes), boxes, x, y, z, out)
+
+
+def cull_union(objs, x, y, z, out):
+    """Evaluate the union of objects on an open grid, each only near its bounding box.
+
+    The bounded objects are split in two halves along the longest side of their bounding box,
+    recursively, and each half is evaluated on the block its box overlaps, so that each object
+    is evaluated on its own block and the lower bound is written about once per level of the split.
+    Objects without a bounding box are evaluated over the whole grid.
+
+    Parameters
+    ----------
+    objs : list of volumetric objects
+        The objects.
+    x,y,z: `numpy arrays, np.ogrid[]`
+        The coordinates.
+    out : numpy array
+        The array to write the distances into.
+
+    Returns
+    -------
+    numpy array or None
+        ``out``, or None if the union has to be evaluated without culling,
+        i.e. outside :func:`culling`, for coordinates other than an open grid,
+        or if none of the objects has a bounding box.
+    """
+    import numpy as np
+
+    margin = getattr(_LOCAL, 'margin', None)
+    if margin is None:
+        return None
+    axes = _axes(x, y, z)
+    if axes is None:
+        return None
+    items = [(o, bounding_box(o)) for o in objs]
+    bounded = [(o, box) for o, box in items if box is not None]
+    if not bounded:
+        return None
+    _union_into(bounded, axes, out, margin)
+    unbounded = [o for o, box in items if box is None]
+    if unbounded:
+        scratch = np.empty_like(out)
+        for o in unbounded:
+            np.minimum(out, distance_into(o, x, y, z, scratch), out=out)
+    return out
+
+
+def _union_into(items, axes, out, margin):
+    import numpy as np
+
+    box = union_box(box for _, box in items)
+    block = _slices(expand_box(box, margin), axes)
+    if not _covers(block, axes):
+        box_distance(box, *_ogrid(axes), out=out)
+        if _empty(block):
+            return
+        axes = [a[s] for a, s in zip(axes, block)]
+        out = out[block]
+    if len(items) == 1:
+        distance_into(items[0][0], *_ogrid(axes), out=out)
+        return
+    i = max(range(3), key=lambda i: box[1][i] - box[0][i])
+    items = sorted(items, key=lambda item: item[1][0][i] + item[1][1][i])
+    half = len(items) // 2
+    _union_into(items[:half], axes, out, margin)
+    scratch = np.empty_like(out)
+    _union_into(items[half:], axes, scratch, margin)
+    np.minimum(out, scratch, out=out)
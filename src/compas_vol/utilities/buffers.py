@@ -0,0 +1,89 @@
+import inspect
+
+from .memo import get_subtree_cache
+from .precision import float_type
+from .structure import _shared
+
+
+__all__ = [
+    'distance_buffer',
+    'distance_into'
+]
+
+
+_ACCEPTS_OUT = {}
+
+
+def distance_buffer(x, y, z, out=None):
+    """Allocate an array for the distances at coordinate arrays, unless one is given.
+
+    Parameters
+    ----------
+    x,y,z: `numpy arrays, np.ogrid[]`
+        The coordinates the distances will be computed at.
+    out : numpy array, optional
+        An array to return instead of allocating a new one.
+
+    Returns
+    -------
+    numpy array
+        An uninitialised array of the broadcast shape and floating point type of the coordinates, or ``out``.
+    """
+    if out is not None:
+        return out
+    import numpy as np
+
+    return np.empty(np.broadcast(x, y, z).shape, dtype=float_type(x, y, z))
+
+
+def distance_into(obj, x, y, z, out):
+    """Evaluate the distance function of an object into an existing array.
+
+    Objects whose ``get_distance_numpy`` takes an ``out`` argument write into the array
+    directly. The result of all other objects is copied into it.
+    Inside :func:`compas_vol.utilities.shared_subtrees`, subtrees that occur more than once
+    are evaluated once, and inside :func:`compas_vol.utilities.subtree_caching`, the distances
+    are looked up in the cache first.
+
+    Parameters
+    ----------
+    obj : volumetric object
+        The object to evaluate.
+    x,y,z: `numpy arrays, np.ogrid[]`
+        The coordinates to compute the distances at.
+    out : numpy array
+        The array to write the distances into, of the broadcast shape of the coordinates.
+
+    Returns
+    -------
+    numpy array
+        ``out``.
+    """
+    cache = get_subtree_cache()
+    if cache is not None:
+        return cache.into(obj, x, y, z, out, _evaluate_shared)
+    return _evaluate_shared(obj, x, y, z, out)
+
+
+def _evaluate_shared(obj, x, y, z, out):
+    shared = _shared()
+    if shared is not None:
+        key = shared.keys.get(id(obj))
+        if key is not None:
+            return shared.evaluate(obj, key, x, y, z, out, _evaluate_into)
+    return _evaluate_into(obj, x, y, z, out)
+
+
+def _evaluate_into(obj, x, y, z, out):
+    cls = type(obj)
+    accepts = _ACCEPTS_OUT.get(cls)
+    if accepts is None:
+        try:
+            accepts = 'out' in inspect.signature(obj.get_distance_numpy).parameters
+        except (TypeError, ValueError):
+            accepts = False
+        _ACCEPTS_OUT[cls] = accepts
+    if accepts:
+        return obj.get_distance_numpy(x, y, z, out=out)
+    out[...] = obj.get_distance_numpy(x, y, z)
+    return out
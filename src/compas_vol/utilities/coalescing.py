@@ -0,0 +1,110 @@
+import threading
+from concurrent.futures import Future
+
+from .structure import structural_digest
+
+
+__all__ = [
+    'Coalescer',
+    'coalesce',
+    'request_key'
+]
+
+
+class Coalescer(object):
+    """Share the result of a call between all threads that make the same call while it runs.
+
+    The first thread to call a function with a key runs it, and the threads that call it with
+    the same key before it returns wait for it and get the same result, or exception, instead
+    of running it again. Once it has returned, the next call with the key runs it again.
+
+    Examples
+    --------
+    >>> coalescer = Coalescer()
+    >>> coalescer.call('answer', lambda: 42)
+    42
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        #: The number of calls that waited for an identical call instead of running.
+        self.coalesced = 0
+
+    def __repr__(self):
+        return 'Coalescer({} in flight)'.format(len(self._calls))
+
+    def __len__(self):
+        return len(self._calls)
+
+    def call(self, key, function, *args, **kwargs):
+        """Call a function, or wait for the result of the call with the same key that is in flight.
+
+        Parameters
+        ----------
+        key : hashable
+            The key of the call, which identifies calls with the same result.
+        function : callable
+            The function.
+        *args, **kwargs
+            The arguments of the function.
+
+        Returns
+        -------
+        object
+            The result of the function, shared by all calls with the key in flight.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            owner = future is None
+            if owner:
+                future = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result()
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+_COALESCER = Coalescer()
+
+
+def coalesce(key, function, *args, **kwargs):
+    """Call a function through the coalescer shared by the remote procedure calls of :mod:`compas_vol.utilities`.
+
+    Results are shared between the callers with the same key, and should not be modified.
+    See :meth:`Coalescer.call`.
+    """
+    return _COALESCER.call(key, function, *args, **kwargs)
+
+
+def request_key(tree, grid, *extra):
+    """The key of a request for a result of a tree over a grid, of the digest of the tree and the specification of the grid.
+
+    Parameters
+    ----------
+    tree : volumetric object
+        The object.
+    grid : :class:`compas_vol.engine.Grid`
+        The grid.
+    *extra
+        Further parameters of the request, such as the iso-value of a mesh.
+
+    Returns
+    -------
+    tuple
+        The key.
+    """
+    import numpy as np
+
+    return (structural_digest(tree), grid.min, grid.max, grid.shape, np.dtype(grid.dtype).name) + extra
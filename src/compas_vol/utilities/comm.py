@@ -1,11 +1,9 @@
-from compas.geometry import *  # noqa: F401 F403
-from compas_vol.primitives import *  # noqa: F401 F403
-from compas_vol.modifications import *  # noqa: F401 F403
-from compas_vol.combinations import *  # noqa: F401 F403
-from compas_vol.microstructures import *  # noqa: F401 F403
+from skimage.measure import marching_cubes
 
-import numpy as np
-from skimage.measure import marching_cubes_lewiner
+from compas_vol.engine import Grid
+from compas_vol.utilities.coalescing import coalesce
+from compas_vol.utilities.coalescing import request_key
+from compas_vol.utilities.serialization import deserialize_tree
 
 
 __all__ = [
@@ -14,28 +12,30 @@ __all__ = [
 
 
 def get_vfs_from_tree(tree, bounds, res):
-    obj = eval(tree)
-    bx = bounds[0]
-    by = bounds[1]
-    bz = bounds[2]
-
-    # nx = (bx[1]-bx[0])/res
-
-    x, y, z = np.ogrid[bx[0]:bx[1]:bx[2]*1j, by[0]:by[1]:by[2]*1j, bz[0]:bz[1]:bz[2]*1j]
-    dm = obj.get_distance_numpy(x, y, z)
-
-    sx = (bx[1]-bx[0])/(bx[2]-1)
-    sy = (by[1]-by[0])/(by[2]-1)
-    sz = (bz[1]-bz[0])/(bz[2]-1)
-
-    verts, faces, norms, vals = marching_cubes_lewiner(dm, 0.0, spacing=(sx, sy, sz))
-    return (verts, faces)
-
-
-# if __name__ == "__main__":
-#     s = VolSphere(Sphere((1, 2, 3), 4))
-#     b = VolBox(Box(Frame.worldXY(), 2,3,4), 0.7)
-#     u = Union(s,b)
-#     print(u)
-#     n = eval(str(u))
-#     print(n.get_distance((5,4,3)))
+    """Mesh a serialized tree over a grid.
+
+    Parameters
+    ----------
+    tree : str or bytes or dict
+        The tree, serialized with :func:`compas_vol.utilities.serialize_tree` or as the data of
+        :func:`compas_vol.utilities.tree_to_data`. Repeated calls with the same tree reuse its construction.
+    bounds : list of tuple
+        The bounds of the grid along x, y and z, as ``(min, max, num)`` triples, or as ``(min, max)`` pairs.
+    res : int or tuple of int
+        The number of samples along each axis for bounds given as pairs.
+        Identical calls in flight at the same time share one computation and its result.
+
+    Returns
+    -------
+    tuple
+        The vertices and faces of the mesh.
+    """
+    obj = deserialize_tree(tree)
+    grid = Grid(bounds) if all(len(b) == 3 for b in bounds) else Grid(bounds, resolution=res)
+
+    def vfs():
+        dm = grid.evaluate(obj)
+        verts, faces, norms, vals = marching_cubes(dm, 0.0, spacing=grid.spacing)
+        return (verts, faces)
+
+    return coalesce(('get_vfs_from_tree',) + request_key(obj, grid), vfs)
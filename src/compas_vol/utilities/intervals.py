@@ -0,0 +1,280 @@
+import math
+
+
+__all__ = [
+    'Interval',
+    'interval_min',
+    'interval_max',
+    'box_intervals',
+    'transform_intervals',
+    'distance_interval',
+    'lipschitz_interval'
+]
+
+
+def _product(a, b):
+    # 0 * inf is 0 for the bounds of intervals
+    if a == 0 or b == 0:
+        return 0.0
+    return a * b
+
+
+class Interval(object):
+    """A closed interval of real numbers, with the operations of interval arithmetic.
+
+    The result of an operation contains the result of the operation on any numbers of the intervals,
+    so that an expression evaluated with intervals of coordinates bounds the expression over a box.
+    Bounds may be infinite.
+
+    Parameters
+    ----------
+    lo : float
+        The lower bound.
+    hi : float, optional
+        The upper bound. Defaults to the lower bound.
+
+    Examples
+    --------
+    >>> x = Interval(-1, 2)
+    >>> x * x
+    Interval(-2.0, 4.0)
+    >>> x ** 2
+    Interval(0.0, 4.0)
+    """
+
+    __slots__ = ('lo', 'hi')
+
+    def __init__(self, lo, hi=None):
+        self.lo = float(lo)
+        self.hi = self.lo if hi is None else float(hi)
+
+    def __repr__(self):
+        return 'Interval({!r}, {!r})'.format(self.lo, self.hi)
+
+    def __iter__(self):
+        yield self.lo
+        yield self.hi
+
+    def __eq__(self, other):
+        return isinstance(other, Interval) and self.lo == other.lo and self.hi == other.hi
+
+    def __hash__(self):
+        return hash((self.lo, self.hi))
+
+    @staticmethod
+    def coerce(value):
+        """An interval of an interval, a ``(lo, hi)`` pair or a number."""
+        if isinstance(value, Interval):
+            return value
+        if isinstance(value, (tuple, list)):
+            return Interval(*value)
+        return Interval(value)
+
+    @property
+    def width(self):
+        """float : The width of the interval."""
+        return self.hi - self.lo
+
+    def contains(self, value):
+        """Whether a number is in the interval."""
+        return self.lo <= value <= self.hi
+
+    # ==========================================================================
+    # arithmetic
+    # ==========================================================================
+
+    def __neg__(self):
+        return Interval(-self.hi, -self.lo)
+
+    def __pos__(self):
+        return self
+
+    def __add__(self, other):
+        other = Interval.coerce(other)
+        return Interval(self.lo + other.lo, self.hi + other.hi)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        other = Interval.coerce(other)
+        return Interval(self.lo - other.hi, self.hi - other.lo)
+
+    def __rsub__(self, other):
+        return Interval.coerce(other) - self
+
+    def __mul__(self, other):
+        other = Interval.coerce(other)
+        products = [_product(a, b) for a in self for b in other]
+        return Interval(min(products), max(products))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = Interval.coerce(other)
+        if other.lo <= 0 <= other.hi:
+            return Interval(-math.inf, math.inf)
+        return self * Interval(1.0 / other.hi, 1.0 / other.lo)
+
+    def __rtruediv__(self, other):
+        return Interval.coerce(other) / self
+
+    def __abs__(self):
+        if self.lo >= 0:
+            return self
+        if self.hi <= 0:
+            return -self
+        return Interval(0.0, max(-self.lo, self.hi))
+
+    def __pow__(self, n):
+        if n != int(n) or n < 0:
+            raise ValueError('Intervals are raised to non-negative integer powers only: {}'.format(n))
+        n = int(n)
+        if n % 2:
+            return Interval(self.lo ** n, self.hi ** n)
+        a = abs(self)
+        return Interval(a.lo ** n, a.hi ** n)
+
+    # ==========================================================================
+    # functions
+    # ==========================================================================
+
+    def sqrt(self):
+        """The square root, of the non-negative part of the interval."""
+        return Interval(math.sqrt(max(self.lo, 0.0)), math.sqrt(max(self.hi, 0.0)))
+
+    def sin(self):
+        """The sine."""
+        if not self.width < 2 * math.pi:
+            return Interval(-1.0, 1.0)
+        values = [math.sin(self.lo), math.sin(self.hi)]
+        # the extrema at pi / 2 + k pi inside the interval
+        k = math.ceil((self.lo - math.pi / 2) / math.pi)
+        while math.pi / 2 + k * math.pi <= self.hi:
+            values.append(-1.0 if k % 2 else 1.0)
+            k += 1
+        return Interval(min(values), max(values))
+
+    def cos(self):
+        """The cosine."""
+        return (self + math.pi / 2).sin()
+
+    def exp2(self):
+        """Two to the power of the interval."""
+        return Interval(_exp2(self.lo), _exp2(self.hi))
+
+    def log2(self):
+        """The base-2 logarithm, of the positive part of the interval."""
+        return Interval(_log2(self.lo), _log2(self.hi))
+
+    def remainder(self, m):
+        """The remainder of the division by a positive number, in ``[0, m)``, as :func:`numpy.remainder`."""
+        k = math.floor(self.lo / m)
+        if self.hi < (k + 1) * m:
+            return Interval(self.lo - k * m, self.hi - k * m)
+        return Interval(0.0, m)
+
+    def clip(self, lo, hi):
+        """The interval clipped to bounds."""
+        return Interval(min(max(self.lo, lo), hi), min(max(self.hi, lo), hi))
+
+
+def _exp2(value):
+    try:
+        return 2.0 ** value
+    except OverflowError:
+        return math.inf
+
+
+def _log2(value):
+    if value <= 0:
+        return -math.inf
+    if math.isinf(value):
+        return math.inf
+    return math.log(value, 2)
+
+
+def interval_min(*intervals):
+    """The interval of the minimum of numbers of several intervals."""
+    intervals = [Interval.coerce(i) for i in intervals]
+    return Interval(min(i.lo for i in intervals), min(i.hi for i in intervals))
+
+
+def interval_max(*intervals):
+    """The interval of the maximum of numbers of several intervals."""
+    intervals = [Interval.coerce(i) for i in intervals]
+    return Interval(max(i.lo for i in intervals), max(i.hi for i in intervals))
+
+
+# ==============================================================================
+# boxes
+# ==============================================================================
+
+
+def box_intervals(box):
+    """The intervals of the x, y and z coordinates of an axis-aligned box.
+
+    Parameters
+    ----------
+    box : tuple of tuple of float
+        The ``(xmin, ymin, zmin)`` and ``(xmax, ymax, zmax)`` corners of the box.
+
+    Returns
+    -------
+    tuple of :class:`Interval`
+    """
+    return tuple(Interval(a, b) for a, b in zip(*box))
+
+
+def transform_intervals(matrix, box):
+    """The intervals of the coordinates of an axis-aligned box after an affine transformation.
+
+    Parameters
+    ----------
+    matrix : list of list of float
+        The 4x4 transformation matrix, e.g. the inverse transformation of the frame of an object.
+    box : tuple of tuple of float
+        The corners of the box.
+
+    Returns
+    -------
+    tuple of :class:`Interval`
+        The intervals of the transformed x, y and z coordinates.
+    """
+    coordinates = box_intervals(box)
+    return tuple(sum((c * float(a) for a, c in zip(row[:3], coordinates) if a != 0), Interval(row[3]))
+                 for row in matrix[:3])
+
+
+def distance_interval(obj, box):
+    """The interval of the distances of an object over an axis-aligned box, as an :class:`Interval`."""
+    return Interval(*obj.get_distance_interval(box))
+
+
+def lipschitz_interval(obj, box, lipschitz=1.0, floor=-math.inf):
+    """Bound the distances of an object over a box by their rate of change.
+
+    The distances of an object whose gradient is at most ``lipschitz`` in magnitude differ
+    from the distance at the center of the box by at most ``lipschitz`` times half its diagonal.
+
+    Parameters
+    ----------
+    obj : volumetric object
+        The object.
+    box : tuple of tuple of float
+        The corners of the box.
+    lipschitz : float, optional
+        The bound of the magnitude of the gradient of the distances.
+    floor : float, optional
+        A lower bound of the distances of the object anywhere.
+
+    Returns
+    -------
+    :class:`Interval`
+    """
+    import numpy as np
+
+    lower, upper = box
+    center = [np.full((1, 1, 1), (a + b) / 2.0) for a, b in zip(lower, upper)]
+    d = float(np.asarray(obj.get_distance_numpy(*center)).reshape(-1)[0])
+    h = _product(lipschitz, 0.5 * math.sqrt(sum((b - a) ** 2 for a, b in zip(lower, upper))))
+    return Interval(max(d - h, floor), max(d + h, floor))
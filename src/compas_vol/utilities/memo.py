@@ -0,0 +1,218 @@
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from .structure import structural_key
+
+
+__all__ = [
+    'SubtreeCache',
+    'subtree_caching',
+    'get_subtree_cache',
+    'set_subtree_cache'
+]
+
+
+_DEFAULT = [None]
+_LOCAL = threading.local()
+
+
+class SubtreeCache(object):
+    """An in-memory cache of the distances of the subtrees of trees, evicted by size.
+
+    Inside :func:`subtree_caching`, every object evaluated through :func:`compas_vol.utilities.distance_into`,
+    i.e. the root of a grid evaluation and the children of all combinations and modifications,
+    is looked up by its :func:`compas_vol.utilities.structural_key` and the coordinates it is evaluated at.
+    When a parameter of one node changes between two evaluations, the keys of that node and of
+    its ancestors change, and only they are evaluated again, from the cached distances of their children.
+    The least recently used entries are evicted when their total size exceeds ``max_bytes``.
+
+    The coordinates are identified by a hash of their contents, computed once per coordinate array.
+    The fused kernels of :func:`compas_vol.engine.compile` evaluate a tree as a whole and do not use the cache.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        The total size of the cached distances above which entries are evicted.
+
+    Attributes
+    ----------
+    hits : int
+        The number of evaluations served from the cache.
+    misses : int
+        The number of evaluations that were not in the cache.
+    evictions : int
+        The number of entries evicted.
+
+    Examples
+    --------
+    >>> from compas.geometry import Box, Frame, Point, Sphere
+    >>> from compas_vol.combinations import SmoothUnion
+    >>> from compas_vol.engine import Grid
+    >>> from compas_vol.primitives import VolBox, VolSphere
+    >>> tree = SmoothUnion(VolSphere(Sphere(Point(5, 6, 0), 9)), VolBox(Box(Frame.worldXY(), 20, 15, 10), 2.5), 1.5)
+    >>> grid = Grid([(-15, 15), (-15, 15), (-15, 15)], resolution=40)
+    >>> cache = SubtreeCache()
+    >>> with subtree_caching(cache):
+    ...     d = grid.evaluate(tree)
+    ...     tree.r = 2.0
+    ...     d = grid.evaluate(tree)
+    >>> cache.hits, cache.misses
+    (2, 4)
+    """
+
+    def __init__(self, max_bytes=1 << 30):
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return 'SubtreeCache(max_bytes={}, entries={}, nbytes={})'.format(self.max_bytes, len(self), self.nbytes)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def stats(self):
+        """dict : The hits, misses, evictions, entries and size in bytes of the cache."""
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'entries': len(self), 'nbytes': self.nbytes}
+
+    def get(self, key):
+        """The cached distances of a key, or None, counted as a hit or a miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store a copy of distances under a key, evicting the least recently used entries to fit."""
+        if value.nbytes > self.max_bytes:
+            return
+        value = value.copy()
+        value.flags.writeable = False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous.nbytes
+            self._entries[key] = value
+            self.nbytes += value.nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self.evictions += 1
+
+    def into(self, obj, x, y, z, out, evaluate):
+        """Evaluate an object into an array, from the cache if it is in it.
+
+        Parameters
+        ----------
+        obj : volumetric object
+            The object.
+        x,y,z: `numpy arrays, np.ogrid[]`
+            The coordinates.
+        out : numpy array
+            The array to write the distances into.
+        evaluate : callable
+            The function evaluating the object into the array on a miss.
+
+        Returns
+        -------
+        numpy array
+            ``out``.
+        """
+        from .bounds import _culling_margin
+
+        depth = getattr(_LOCAL, 'depth', 0)
+        if depth == 0:
+            # the keys of a tree are computed once per evaluation of its root
+            _LOCAL.memo = {}
+        key = (structural_key(obj, _LOCAL.memo), _coordinates_key(x), _coordinates_key(y), _coordinates_key(z), _culling_margin())
+        value = self.get(key)
+        if value is not None:
+            out[...] = value
+            return out
+        _LOCAL.depth = depth + 1
+        try:
+            out = evaluate(obj, x, y, z, out)
+        finally:
+            _LOCAL.depth = depth
+        self.put(key, out)
+        return out
+
+    def clear(self):
+        """Remove all entries and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = self.hits = self.misses = self.evictions = 0
+
+
+# ==============================================================================
+# the active cache
+# ==============================================================================
+
+
+def get_subtree_cache():
+    """The subtree cache of the current thread set with :func:`subtree_caching`, or the default set with :func:`set_subtree_cache`."""
+    cache = getattr(_LOCAL, 'cache', None)
+    return _DEFAULT[0] if cache is None else cache
+
+
+def set_subtree_cache(cache):
+    """Set the default subtree cache of all threads, e.g. for the threads of an evaluator.
+
+    Parameters
+    ----------
+    cache : :class:`SubtreeCache` or None
+        The cache, or None to disable it.
+    """
+    _DEFAULT[0] = cache
+
+
+@contextmanager
+def subtree_caching(cache=None):
+    """Context manager caching the distances of subtrees evaluated by the current thread.
+
+    Parameters
+    ----------
+    cache : :class:`SubtreeCache`, optional
+        The cache, or any object with the method :meth:`SubtreeCache.into`. Defaults to a new cache.
+    """
+    if cache is None:
+        cache = SubtreeCache()
+    previous = getattr(_LOCAL, 'cache', None)
+    _LOCAL.cache = cache
+    try:
+        yield cache
+    finally:
+        _LOCAL.cache = previous
+
+
+def _coordinates_key(a):
+    """A key of the contents of a coordinate array, computed once per array."""
+    digests = getattr(_LOCAL, 'digests', None)
+    if digests is None:
+        digests = _LOCAL.digests = {}
+    entry = digests.get(id(a))
+    if entry is not None and entry[0]() is a:
+        return entry[1]
+    import numpy as np
+
+    a = np.asarray(a)
+    key = (a.dtype.str, a.shape, hashlib.blake2b(np.ascontiguousarray(a).view(np.uint8), digest_size=16).digest())
+    try:
+        if len(digests) > 1024:
+            digests.clear()
+        digests[id(a)] = (weakref.ref(a), key)
+    except TypeError:
+        pass
+    return key
@@ -0,0 +1,32 @@
+from __future__ import division
+
+
+__all__ = [
+    'distance_points'
+]
+
+
+def distance_points(obj, points, out=None):
+    """Vectorized distance function of an object at an array of points.
+
+    All objects share this function as their ``get_distance_points`` method. The points are
+    evaluated in chunks by :func:`compas_vol.engine.evaluate_points`, so that points and
+    distances may be memory-mapped arrays larger than memory.
+
+    Parameters
+    ----------
+    obj : volumetric object
+        The object to evaluate.
+    points : numpy array of floats, shape (n, 3)
+        The points to query.
+    out : numpy array, optional
+        An array of shape (n,) to write the distances into.
+
+    Returns
+    -------
+    numpy array of floats, shape (n,)
+        The distances from the query points to the surface of the object.
+    """
+    from compas_vol.engine import evaluate_points
+
+    return evaluate_points(obj, points, out=out)
@@ -0,0 +1,85 @@
+import threading
+from contextlib import contextmanager
+
+
+__all__ = [
+    'precision',
+    'get_precision',
+    'set_precision'
+]
+
+
+_DTYPES = ('float32', 'float64')
+_DEFAULT = ['float64']
+_LOCAL = threading.local()
+
+
+def _validate(dtype):
+    import numpy as np
+
+    name = np.dtype(dtype).name
+    if name not in _DTYPES:
+        raise ValueError('Unsupported precision: {}. Use one of {}.'.format(dtype, _DTYPES))
+    return name
+
+
+def get_precision():
+    """The floating point type in which coordinates and distances are computed.
+
+    Returns
+    -------
+    str
+        ``'float32'`` or ``'float64'``.
+    """
+    return getattr(_LOCAL, 'dtype', None) or _DEFAULT[0]
+
+
+def set_precision(dtype):
+    """Set the default floating point type of all threads.
+
+    Parameters
+    ----------
+    dtype : {'float32', 'float64'}
+        The floating point type.
+    """
+    _DEFAULT[0] = _validate(dtype)
+
+
+@contextmanager
+def precision(dtype):
+    """Context manager setting the floating point type for the current thread.
+
+    Grids created inside the context sample their coordinates in this type. All distance
+    functions keep the type of the coordinates they are called with, so that coordinates,
+    transformations and distances stay in single precision end-to-end with ``'float32'``.
+
+    Parameters
+    ----------
+    dtype : {'float32', 'float64'}
+        The floating point type.
+
+    Examples
+    --------
+    >>> from compas_vol.engine import Grid
+    >>> with precision('float32'):
+    ...     grid = Grid([(-5, 5), (-5, 5), (-5, 5)], resolution=10)
+    >>> grid.dtype
+    'float32'
+    """
+    previous = getattr(_LOCAL, 'dtype', None)
+    _LOCAL.dtype = _validate(dtype)
+    try:
+        yield
+    finally:
+        _LOCAL.dtype = previous
+
+
+def float_type(*arrays):
+    """The floating point type of a computation on coordinate arrays.
+
+    Single precision if all arrays are single precision, double precision otherwise.
+    Python scalars do not count.
+    """
+    import numpy as np
+
+    return np.result_type(*[a for a in arrays if hasattr(a, 'dtype')] + [np.float32])
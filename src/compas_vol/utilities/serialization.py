@@ -0,0 +1,361 @@
+import hashlib
+import json
+import struct
+import threading
+from collections import OrderedDict
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from .structure import _is_node
+
+
+__all__ = [
+    'tree_to_data',
+    'tree_from_data',
+    'data_content',
+    'serialize_tree',
+    'deserialize_tree'
+]
+
+
+#: The version of the schema of serialized trees, increased when it changes.
+SCHEMA_VERSION = 1
+
+#: The number of deserialized trees kept by :func:`deserialize_tree`.
+TREE_CACHE_SIZE = 128
+
+_TYPES = {}
+_TREES = OrderedDict()
+_LOCK = threading.Lock()
+
+
+# ==============================================================================
+# data
+# ==============================================================================
+
+
+def tree_to_data(obj):
+    """The data of an object and its children, in plain lists, dicts, strings and numbers.
+
+    Every object is represented as ``{'type': <class name>, 'content': <data>}``, where the content
+    is the ``data`` of the object, with its child objects represented in the same way.
+    All objects implement their ``to_data`` with this function.
+
+    Parameters
+    ----------
+    obj : volumetric object
+        The root of the tree.
+
+    Returns
+    -------
+    dict
+        The data of the tree, which can be written as JSON.
+
+    Examples
+    --------
+    >>> from compas.geometry import Point, Sphere
+    >>> from compas_vol.combinations import Union
+    >>> from compas_vol.primitives import VolSphere
+    >>> data = tree_to_data(Union(VolSphere(Sphere(Point(0, 0, 0), 3)), VolSphere(Sphere(Point(2, 0, 0), 2))))
+    >>> data['type'], [o['type'] for o in data['content']['objs']]
+    ('Union', ['VolSphere', 'VolSphere'])
+    """
+    return {'type': type(obj).__name__, 'content': _encode(obj.data)}
+
+
+def _encode(value):
+    if _is_node(value):
+        return value.to_data()
+    if isinstance(value, dict):
+        return dict((k, _encode(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if hasattr(value, 'tolist'):
+        # numpy arrays and scalars
+        return value.tolist()
+    if hasattr(value, 'data') and not isinstance(value, (bool, int, float, str)):
+        # geometry of compas
+        return _encode(value.data)
+    return value
+
+
+def _is_document(value):
+    return isinstance(value, dict) and len(value) == 2 and 'type' in value and 'content' in value
+
+
+def _node_types():
+    """The classes of all objects by name, including those of modules that their package does not export."""
+    if not _TYPES:
+        import importlib
+        import pkgutil
+
+        for package in ('primitives', 'combinations', 'modifications', 'microstructures'):
+            package = importlib.import_module('compas_vol.' + package)
+            for info in pkgutil.iter_modules(package.__path__):
+                module = importlib.import_module('{}.{}'.format(package.__name__, info.name))
+                for cls in vars(module).values():
+                    if isinstance(cls, type) and cls.__module__ == module.__name__ and _is_node(cls):
+                        _TYPES[cls.__name__] = cls
+    return _TYPES
+
+
+def tree_from_data(data):
+    """Construct a tree from the data of :func:`tree_to_data`.
+
+    Parameters
+    ----------
+    data : dict
+        The data of the tree.
+
+    Returns
+    -------
+    volumetric object
+        The root of the tree.
+    """
+    if not _is_document(data):
+        raise ValueError('The data of an object has a type and a content: {!r}'.format(data)[:200])
+    cls = _node_types().get(data['type'])
+    if cls is None:
+        raise ValueError('Unknown type of object: {}'.format(data['type']))
+    return cls.from_data(data)
+
+
+def data_content(data):
+    """The content of the data of an object, with the data of its children turned into objects.
+
+    All objects implement their ``from_data`` with this function, so that they accept both
+    the data of :func:`tree_to_data` and its content, the ``data`` of the object.
+
+    Parameters
+    ----------
+    data : dict
+        The data of an object, or its content.
+
+    Returns
+    -------
+    dict
+        The content.
+    """
+    if _is_document(data):
+        data = data['content']
+    return _decode(data, top=True)
+
+
+def _decode(value, top=False):
+    if isinstance(value, dict):
+        if not top and _is_document(value) and value['type'] in _node_types():
+            return tree_from_data(value)
+        return dict((k, _decode(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+# ==============================================================================
+# serialization
+# ==============================================================================
+
+
+def serialize_tree(tree, binary=False):
+    """Serialize a tree as compact JSON, or as binary MessagePack.
+
+    The document is ``{'compas_vol': <schema version>, 'tree': <data>}``, with the data of :func:`tree_to_data`.
+    MessagePack is written with the ``msgpack`` package if it is installed, and with a built-in encoder otherwise.
+
+    Parameters
+    ----------
+    tree : volumetric object
+        The root of the tree.
+    binary : bool, optional
+        Whether to write MessagePack instead of JSON.
+
+    Returns
+    -------
+    str or bytes
+        The JSON text, or the MessagePack bytes.
+    """
+    document = {'compas_vol': SCHEMA_VERSION, 'tree': tree_to_data(tree)}
+    if binary:
+        return msgpack.packb(document, use_bin_type=True) if msgpack is not None else _pack(document)
+    return json.dumps(document, separators=(',', ':'))
+
+
+def deserialize_tree(payload, cache=True):
+    """Construct a tree from the output of :func:`serialize_tree`, or from the data of :func:`tree_to_data`.
+
+    The trees are kept by a hash of their payload, so that repeated calls with the same payload,
+    as from remote procedure calls, return the same tree without parsing or constructing it again.
+    Trees returned from the cache are shared between the callers, and should not be modified.
+
+    Parameters
+    ----------
+    payload : str or bytes or dict
+        JSON text or bytes, MessagePack bytes, or the parsed document or data of a tree.
+    cache : bool, optional
+        Whether to look the tree up in and add it to the cache.
+
+    Returns
+    -------
+    volumetric object
+        The root of the tree.
+
+    Examples
+    --------
+    >>> from compas.geometry import Point, Sphere
+    >>> from compas_vol.primitives import VolSphere
+    >>> payload = serialize_tree(VolSphere(Sphere(Point(0, 0, 0), 3)))
+    >>> deserialize_tree(payload) is deserialize_tree(payload)
+    True
+    """
+    if isinstance(payload, dict):
+        raw = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    elif isinstance(payload, str):
+        raw = payload.encode('utf-8')
+    else:
+        raw = bytes(payload)
+    key = hashlib.blake2b(raw, digest_size=16).digest()
+    if cache:
+        with _LOCK:
+            tree = _TREES.get(key)
+            if tree is not None:
+                _TREES.move_to_end(key)
+                return tree
+
+    if isinstance(payload, dict):
+        document = payload
+    elif isinstance(payload, str) or raw.lstrip()[:1] == b'{':
+        document = json.loads(raw.decode('utf-8'))
+    else:
+        document = msgpack.unpackb(raw, raw=False) if msgpack is not None else _unpack(raw)
+    if 'tree' in document and not _is_document(document):
+        if document.get('compas_vol', SCHEMA_VERSION) > SCHEMA_VERSION:
+            raise ValueError('Schema version {} is newer than the supported version {}.'.format(document['compas_vol'], SCHEMA_VERSION))
+        document = document['tree']
+    tree = tree_from_data(document)
+
+    if cache:
+        with _LOCK:
+            _TREES[key] = tree
+            while len(_TREES) > TREE_CACHE_SIZE:
+                _TREES.popitem(last=False)
+    return tree
+
+
+# ==============================================================================
+# MessagePack
+# ==============================================================================
+
+
+def _pack(value, out=None):
+    """Encode plain data as MessagePack, for when the msgpack package is not installed."""
+    top = out is None
+    if top:
+        out = []
+    if value is None:
+        out.append(b'\xc0')
+    elif value is True or value is False:
+        out.append(b'\xc3' if value else b'\xc2')
+    elif isinstance(value, int):
+        if 0 <= value < 128:
+            out.append(struct.pack('B', value))
+        elif -32 <= value < 0:
+            out.append(struct.pack('b', value))
+        elif 0 <= value < 1 << 64:
+            out.append(b'\xcf' + struct.pack('>Q', value))
+        elif -(1 << 63) <= value < 0:
+            out.append(b'\xd3' + struct.pack('>q', value))
+        else:
+            raise ValueError('Integer out of the range of MessagePack: {}'.format(value))
+    elif isinstance(value, float):
+        out.append(b'\xcb' + struct.pack('>d', value))
+    elif isinstance(value, str):
+        data = value.encode('utf-8')
+        n = len(data)
+        out.append(struct.pack('B', 0xa0 | n) if n < 32 else b'\xd9' + struct.pack('B', n) if n < 256 else b'\xdb' + struct.pack('>I', n))
+        out.append(data)
+    elif isinstance(value, (bytes, bytearray)):
+        out.append(b'\xc6' + struct.pack('>I', len(value)))
+        out.append(bytes(value))
+    elif isinstance(value, (list, tuple)):
+        n = len(value)
+        out.append(struct.pack('B', 0x90 | n) if n < 16 else b'\xdd' + struct.pack('>I', n))
+        for v in value:
+            _pack(v, out)
+    elif isinstance(value, dict):
+        n = len(value)
+        out.append(struct.pack('B', 0x80 | n) if n < 16 else b'\xdf' + struct.pack('>I', n))
+        for k, v in value.items():
+            _pack(k, out)
+            _pack(v, out)
+    else:
+        raise TypeError('Cannot encode {!r} as MessagePack.'.format(type(value)))
+    return b''.join(out) if top else None
+
+
+_FIXED = {
+    0xcc: '>B', 0xcd: '>H', 0xce: '>I', 0xcf: '>Q',
+    0xd0: '>b', 0xd1: '>h', 0xd2: '>i', 0xd3: '>q',
+    0xca: '>f', 0xcb: '>d'
+}
+
+
+def _unpack(data):
+    """Decode MessagePack without extension types, for when the msgpack package is not installed."""
+    value, end = _unpack_from(memoryview(data), 0)
+    if end != len(data):
+        raise ValueError('Trailing bytes after the MessagePack document.')
+    return value
+
+
+def _unpack_from(data, i):
+    b = data[i]
+    i += 1
+    if b < 0x80:
+        return b, i
+    if b >= 0xe0:
+        return b - 0x100, i
+    if b <= 0x8f:
+        return _unpack_map(data, i, b & 0x0f)
+    if b <= 0x9f:
+        return _unpack_array(data, i, b & 0x0f)
+    if b <= 0xbf:
+        n = b & 0x1f
+        return str(data[i:i + n], 'utf-8'), i + n
+    if b == 0xc0:
+        return None, i
+    if b in (0xc2, 0xc3):
+        return b == 0xc3, i
+    if b in _FIXED:
+        fmt = _FIXED[b]
+        return struct.unpack_from(fmt, data, i)[0], i + struct.calcsize(fmt)
+    if b in (0xd9, 0xda, 0xdb, 0xc4, 0xc5, 0xc6):
+        fmt = {0xd9: '>B', 0xda: '>H', 0xdb: '>I', 0xc4: '>B', 0xc5: '>H', 0xc6: '>I'}[b]
+        n = struct.unpack_from(fmt, data, i)[0]
+        i += struct.calcsize(fmt)
+        chunk = data[i:i + n]
+        return (str(chunk, 'utf-8') if b >= 0xd9 else bytes(chunk)), i + n
+    if b in (0xdc, 0xdd, 0xde, 0xdf):
+        fmt = '>H' if b in (0xdc, 0xde) else '>I'
+        n = struct.unpack_from(fmt, data, i)[0]
+        i += struct.calcsize(fmt)
+        return (_unpack_array if b in (0xdc, 0xdd) else _unpack_map)(data, i, n)
+    raise ValueError('Unsupported MessagePack type: 0x{:02x}'.format(b))
+
+
+def _unpack_array(data, i, n):
+    out = []
+    for _ in range(n):
+        value, i = _unpack_from(data, i)
+        out.append(value)
+    return out, i
+
+
+def _unpack_map(data, i, n):
+    out = {}
+    for _ in range(n):
+        key, i = _unpack_from(data, i)
+        out[key], i = _unpack_from(data, i)
+    return out, i
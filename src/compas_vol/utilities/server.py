@@ -0,0 +1,550 @@
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .serialization import deserialize_tree
+from .serialization import serialize_tree
+from .structure import _is_node
+from .coalescing import request_key
+
+
+__all__ = [
+    'MeshServer',
+    'MeshClient'
+]
+
+
+#: The default port of :class:`MeshServer` and :class:`MeshClient`.
+PORT = 8765
+
+# the lengths of the JSON header and of the binary body of a message
+_PREFIX = struct.Struct('<IQ')
+
+
+# ==============================================================================
+# messages
+# ==============================================================================
+
+
+def _send(sock, header, buffers=()):
+    """Send a message of a JSON header and the bytes of buffers, without copying the buffers."""
+    views = [memoryview(b).cast('B') for b in buffers]
+    text = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    sock.sendall(_PREFIX.pack(len(text), sum(v.nbytes for v in views)) + text)
+    for view in views:
+        if view.nbytes:
+            sock.sendall(view)
+
+
+def _receive_into(sock, view):
+    i = 0
+    while i < len(view):
+        n = sock.recv_into(view[i:])
+        if not n:
+            raise ConnectionError('The connection closed in the middle of a message.')
+        i += n
+
+
+def _receive(sock, max_header=None, max_body=None):
+    """Receive a message as its header and its body, or None if the connection closed between messages.
+
+    The lengths of the prefix are checked against the limits before anything is allocated,
+    and a longer header or body raises a ValueError, with the rest of the message unread.
+    """
+    prefix = bytearray(_PREFIX.size)
+    n = sock.recv_into(prefix)
+    if not n:
+        return None
+    _receive_into(sock, memoryview(prefix)[n:])
+    length, size = _PREFIX.unpack(prefix)
+    if max_header is not None and length > max_header:
+        raise ValueError('The header of {} bytes exceeds the limit of {} bytes.'.format(length, max_header))
+    if max_body is not None and size > max_body:
+        raise ValueError('The body of {} bytes exceeds the limit of {} bytes.'.format(size, max_body))
+    text = bytearray(length)
+    _receive_into(sock, memoryview(text))
+    body = bytearray(size)
+    _receive_into(sock, memoryview(body))
+    return json.loads(text.decode('utf-8')), body
+
+
+def _mesh_buffers(vertices, faces):
+    """The header fields and buffers of a mesh, with the faces as 32-bit indices where they fit."""
+    import numpy as np
+
+    faces = np.ascontiguousarray(faces, dtype='<u4' if len(vertices) < 1 << 32 else '<u8')
+    vertices = np.ascontiguousarray(vertices, dtype=vertices.dtype.newbyteorder('<'))
+    header = {'vertices': [len(vertices), vertices.dtype.str], 'faces': [len(faces), faces.dtype.str]}
+    return header, (vertices, faces)
+
+
+def _mesh_arrays(header, body):
+    """The vertices and faces of a message, as arrays over its body."""
+    import numpy as np
+
+    (n, vtype), (m, ftype) = header['vertices'], header['faces']
+    vertices = np.frombuffer(body, dtype=vtype, count=3 * n).reshape(n, 3)
+    offset = vertices.nbytes
+    faces = np.frombuffer(body, dtype=ftype, count=3 * m, offset=offset).reshape(m, 3)
+    return vertices, faces
+
+
+# ==============================================================================
+# server
+# ==============================================================================
+
+
+class _Handler(socketserver.BaseRequestHandler):
+
+    def setup(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self):
+        # the connection stays open for any number of requests
+        owner = self.server.owner
+        while True:
+            try:
+                message = _receive(self.request, owner.max_header, owner.max_request)
+                if message is None:
+                    return
+                owner._respond(self.request, *message)
+            except ValueError as e:
+                # the rest of a message too large or malformed cannot be followed, so the connection is closed
+                try:
+                    _send(self.request, _error(e))
+                except OSError:
+                    pass
+                return
+            except OSError:
+                # the client went away
+                return
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class MeshServer(object):
+    """A long-lived local server that meshes serialized trees, for remote procedure calls from CAD software.
+
+    Each call of a function such as :func:`compas_vol.utilities.get_iso_mesh` over COMPAS RPC imports
+    the meshing modules, reconstructs the tree and returns the mesh as a string of Python literals.
+    A server keeps all of this warm instead: the modules are imported once, the trees are reconstructed by
+    :func:`compas_vol.utilities.deserialize_tree` with its cache, the chunks are meshed by a persistent pool of
+    threads with :func:`compas_vol.meshing.chunked_marching_cubes`, the distances are evaluated through a
+    :class:`compas_vol.engine.GridCache` if one is given, and the meshes of recent requests are kept in memory.
+    The vertices and faces are sent as raw little-endian buffers, which :class:`MeshClient` reads without copying.
+
+    Requests and responses are messages of a 4-byte length of a JSON header, an 8-byte length of a binary body,
+    the header and the body. A request ``{'method': 'mesh', 'bounds': ..., 'resolution': ..., 'level': ...}``
+    has the output of :func:`compas_vol.utilities.serialize_tree` as its body, and its response
+    ``{'status': 'ok', 'vertices': [n, dtype], 'faces': [m, dtype], 'cached': bool, 'time': seconds}``
+    has the vertices followed by the faces as its body. Failed requests get ``{'status': 'error', 'error': message}``.
+    Requests whose header or body is longer than ``max_header`` or ``max_request`` bytes get an error before
+    anything is allocated for them, and their connection is closed.
+
+    A request with the method ``'stream'`` gets a response for each chunk of the grid as soon as it is meshed,
+    ``{'status': 'ok', 'block': [[start, stop], ...], 'vertices': ..., 'faces': ...}``, so that clients can show
+    partial geometry early, followed by ``{'status': 'ok', 'done': True, 'chunks': count, 'time': seconds}``.
+    Requests for the same mesh, by the digest of the tree and the specification of the grid, that arrive while
+    it is being meshed share its computation, and streaming requests get the chunks done before they arrived at once.
+
+    Parameters
+    ----------
+    host : str, optional
+        The address to listen on. Defaults to the local host only.
+    port : int, optional
+        The port to listen on, or 0 for any free port.
+    workers : int, optional
+        The number of threads meshing chunks. Defaults to the number of CPUs.
+    cache : :class:`compas_vol.engine.GridCache` or str, optional
+        A cache of evaluated grids, or its directory, to evaluate the distances through.
+    max_bytes : int, optional
+        The number of bytes of the meshes kept in memory.
+    dtype : str, optional
+        The data type of the vertices sent.
+    max_header : int, optional
+        The number of bytes of the JSON header of a request accepted.
+    max_request : int, optional
+        The number of bytes of the body of a request, the serialized tree, accepted.
+
+    Examples
+    --------
+    >>> from compas.geometry import Point, Sphere
+    >>> from compas_vol.primitives import VolSphere
+    >>> with MeshServer(port=0).start() as server:
+    ...     with MeshClient(server.address) as client:
+    ...         vertices, faces = client.mesh(VolSphere(Sphere(Point(0, 0, 0), 3)), [(-5, 5, 40), (-5, 5, 40), (-5, 5, 40)])
+    >>> vertices.dtype.name, faces.shape[1]
+    ('float32', 3)
+    """
+
+    def __init__(self, host='127.0.0.1', port=PORT, workers=None, cache=None, max_bytes=1 << 30, dtype='float32',
+                 max_header=1 << 20, max_request=1 << 28):
+        from skimage.measure import marching_cubes  # noqa: F401
+        from compas_vol.engine import GridCache
+        from compas_vol.meshing import chunked_marching_cubes  # noqa: F401
+
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = GridCache(cache) if isinstance(cache, str) else cache
+        self.max_bytes = max_bytes
+        self.dtype = dtype
+        self.max_header = max_header
+        self.max_request = max_request
+        self._executor = ThreadPoolExecutor(self.workers)
+        self._meshes = OrderedDict()
+        self._jobs = {}
+        #: The number of requests that shared the mesh of an identical request in flight.
+        self.coalesced = 0
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._serving = threading.Event()
+        self._server = _TCPServer((host, port), _Handler)
+        self._server.owner = self
+
+    def __repr__(self):
+        return 'MeshServer({!r}, {})'.format(*self.address)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def address(self):
+        """tuple : The host and port the server listens on."""
+        return self._server.server_address[:2]
+
+    def serve_forever(self):
+        """Serve requests until :meth:`close` is called from another thread."""
+        self._serving.set()
+        self._server.serve_forever()
+
+    def start(self):
+        """Serve requests from a background thread.
+
+        Returns
+        -------
+        :class:`MeshServer`
+            The server.
+        """
+        self._serving.set()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        """Stop serving and shut down the threads."""
+        if self._serving.is_set():
+            self._server.shutdown()
+            self._serving.clear()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+        self._executor.shutdown()
+
+    def key(self, tree, grid, level=0.0):
+        """The key of the mesh of a tree over a grid, of the digest of the tree and the specification of the grid."""
+        return request_key(tree, grid, float(level), self.dtype)
+
+    def mesh(self, payload, bounds, resolution=None, level=0.0):
+        """Mesh a serialized tree over a grid, as for a request.
+
+        Parameters
+        ----------
+        payload : str or bytes or dict or volumetric object
+            The tree, serialized with :func:`compas_vol.utilities.serialize_tree`, or the tree itself.
+        bounds : list of tuple
+            The bounds of the grid along x, y and z, as ``(min, max, num)`` triples, or as ``(min, max)`` pairs.
+        resolution : int or tuple of int, optional
+            The number of samples along each axis, for bounds given as pairs.
+        level : float, optional
+            The iso-value of the surface.
+
+        Returns
+        -------
+        tuple
+            The vertices and the faces, as numpy arrays of shapes (n, 3) and (m, 3), and whether they were cached.
+        """
+        mesh, job = self._job(payload, bounds, resolution, level)
+        if mesh is not None:
+            return mesh + (True,)
+        return job.result() + (False,)
+
+    def stream(self, payload, bounds, resolution=None, level=0.0):
+        """Mesh a serialized tree over a grid, chunk by chunk, as for a streaming request.
+
+        The parameters are those of :meth:`mesh`. The vertices of neighbouring chunks are not welded,
+        and a cached mesh is yielded as a single chunk of the whole grid.
+
+        Yields
+        ------
+        tuple
+            The block of the chunk as a tuple of slices of sample indices, and its vertices and faces,
+            in the order the chunks are meshed in.
+        """
+        mesh, job = self._job(payload, bounds, resolution, level)
+        if mesh is not None:
+            yield (None,) + mesh
+            return
+        for chunk in job:
+            yield chunk
+
+    def _job(self, payload, bounds, resolution, level):
+        """The cached mesh of a request, or the job that meshes it, which requests for the same mesh share."""
+        from compas_vol.engine import Grid
+
+        tree = payload if _is_node(payload) else deserialize_tree(payload)
+        grid = Grid(bounds, resolution=resolution)
+        key = self.key(tree, grid, level)
+        with self._lock:
+            mesh = self._meshes.get(key)
+            if mesh is not None:
+                self._meshes.move_to_end(key)
+                return mesh, None
+            job = self._jobs.get(key)
+            if job is not None:
+                self.coalesced += 1
+                return None, job
+            job = self._jobs[key] = _Job()
+        # meshed by a thread of its own, so that it goes on for the other requests if the first one goes away
+        threading.Thread(target=self._run, args=(job, key, tree, grid, level), daemon=True).start()
+        return None, job
+
+    def _run(self, job, key, tree, grid, level):
+        from compas_vol.engine import caching
+        from compas_vol.meshing import chunked_marching_cubes
+
+        def add(block, vertices, faces):
+            job.add((block, vertices.astype(self.dtype), faces.astype(_index_type(len(vertices)))))
+
+        try:
+            if self.cache is not None:
+                with caching(self.cache):
+                    vertices, faces = chunked_marching_cubes(tree, grid, level, executor=self._executor, callback=add)
+            else:
+                vertices, faces = chunked_marching_cubes(tree, grid, level, executor=self._executor, callback=add)
+            mesh = (vertices.astype(self.dtype), faces.astype(_index_type(len(vertices))))
+            self._remember(key, mesh)
+            job.finish(mesh)
+        except Exception as e:
+            job.finish(error=e)
+        finally:
+            with self._lock:
+                del self._jobs[key]
+
+    def _remember(self, key, mesh):
+        nbytes = sum(a.nbytes for a in mesh)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._meshes:
+                return
+            self._meshes[key] = mesh
+            self._nbytes += nbytes
+            while self._nbytes > self.max_bytes:
+                _, old = self._meshes.popitem(last=False)
+                self._nbytes -= sum(a.nbytes for a in old)
+
+    def _respond(self, sock, header, body):
+        start = time.perf_counter()
+        try:
+            method = header.get('method')
+            if method == 'ping':
+                _send(sock, {'status': 'ok'})
+                return
+            if method == 'stream':
+                self._respond_stream(sock, header, body, start)
+                return
+            if method != 'mesh':
+                raise ValueError('Unknown method: {!r}'.format(method))
+            vertices, faces, cached = self.mesh(bytes(body), header['bounds'], header.get('resolution'), header.get('level', 0.0))
+        except Exception as e:
+            _send(sock, _error(e))
+            return
+        fields, buffers = _mesh_buffers(vertices, faces)
+        fields.update(status='ok', cached=cached, time=time.perf_counter() - start)
+        _send(sock, fields, buffers)
+
+    def _respond_stream(self, sock, header, body, start):
+        count = 0
+        for block, vertices, faces in self.stream(bytes(body), header['bounds'], header.get('resolution'), header.get('level', 0.0)):
+            fields, buffers = _mesh_buffers(vertices, faces)
+            fields.update(status='ok', block=None if block is None else [[b.start, b.stop] for b in block])
+            _send(sock, fields, buffers)
+            count += 1
+        _send(sock, {'status': 'ok', 'done': True, 'chunks': count, 'time': time.perf_counter() - start})
+
+
+def _index_type(n):
+    import numpy as np
+
+    return np.uint32 if n < 1 << 32 else np.uint64
+
+
+def _error(e):
+    return {'status': 'error', 'error': '{}: {}'.format(type(e).__name__, e)}
+
+
+class _Job(object):
+    """A mesh in the making, whose chunks and result are shared by all requests for it."""
+
+    def __init__(self):
+        self.chunks = []
+        self.mesh = None
+        self.error = None
+        self.done = False
+        self._condition = threading.Condition()
+
+    def add(self, chunk):
+        with self._condition:
+            self.chunks.append(chunk)
+            self._condition.notify_all()
+
+    def finish(self, mesh=None, error=None):
+        with self._condition:
+            self.mesh, self.error, self.done = mesh, error, True
+            self._condition.notify_all()
+
+    def result(self):
+        with self._condition:
+            self._condition.wait_for(lambda: self.done)
+        if self.error is not None:
+            raise self.error
+        return self.mesh
+
+    def __iter__(self):
+        # the chunks done so far, then the others as they are done
+        i = 0
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self.done or len(self.chunks) > i)
+                chunks, done = self.chunks[i:], self.done
+            for chunk in chunks:
+                yield chunk
+            i += len(chunks)
+            if done:
+                break
+        if self.error is not None:
+            raise self.error
+
+
+# ==============================================================================
+# client
+# ==============================================================================
+
+
+class MeshClient(object):
+    """A connection to a :class:`MeshServer`, which stays open for any number of requests.
+
+    Parameters
+    ----------
+    address : tuple, optional
+        The host and port of the server.
+    timeout : float, optional
+        The number of seconds to wait for a response.
+    """
+
+    def __init__(self, address=('127.0.0.1', PORT), timeout=None):
+        self.address = tuple(address)
+        self._sock = socket.create_connection(self.address, timeout=timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def __repr__(self):
+        return 'MeshClient({!r})'.format(self.address)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Close the connection."""
+        self._sock.close()
+
+    def _request(self, header, buffers=()):
+        _send(self._sock, header, buffers)
+        message = _receive(self._sock)
+        if message is None:
+            raise ConnectionError('The server closed the connection.')
+        header, body = message
+        if header['status'] != 'ok':
+            raise ValueError(header['error'])
+        return header, body
+
+    def ping(self):
+        """Check that the server responds."""
+        self._request({'method': 'ping'})
+
+    def mesh(self, tree, bounds, resolution=None, level=0.0, binary=True):
+        """Mesh a tree over a grid on the server.
+
+        Parameters
+        ----------
+        tree : volumetric object or str or bytes
+            The tree, or its serialization with :func:`compas_vol.utilities.serialize_tree`.
+        bounds : list of tuple
+            The bounds of the grid along x, y and z, as ``(min, max, num)`` triples, or as ``(min, max)`` pairs.
+        resolution : int or tuple of int, optional
+            The number of samples along each axis, for bounds given as pairs.
+        level : float, optional
+            The iso-value of the surface.
+        binary : bool, optional
+            Whether to send a tree as MessagePack instead of JSON.
+
+        Returns
+        -------
+        tuple
+            The vertices and the faces, as numpy arrays of shapes (n, 3) and (m, 3).
+        """
+        return _mesh_arrays(*self._request(*_mesh_request('mesh', tree, bounds, resolution, level, binary)))
+
+    def stream(self, tree, bounds, resolution=None, level=0.0, binary=True):
+        """Mesh a tree over a grid on the server, receiving the meshes of its chunks as soon as they are done.
+
+        The parameters are those of :meth:`mesh`. The vertices of neighbouring chunks are not welded.
+        Leaving the loop early reads and drops the remaining chunks, so that the connection can be used again.
+
+        Yields
+        ------
+        tuple
+            The vertices and the faces of a chunk, as numpy arrays of shapes (n, 3) and (m, 3).
+        """
+        _send(self._sock, *_mesh_request('stream', tree, bounds, resolution, level, binary))
+        done = False
+        try:
+            while not done:
+                message = _receive(self._sock)
+                if message is None:
+                    raise ConnectionError('The server closed the connection.')
+                header, body = message
+                if header['status'] != 'ok':
+                    done = True
+                    raise ValueError(header['error'])
+                done = header.get('done', False)
+                if not done:
+                    yield _mesh_arrays(header, body)
+        finally:
+            while not done:
+                message = _receive(self._sock)
+                done = message is None or message[0]['status'] != 'ok' or message[0].get('done', False)
+
+
+def _mesh_request(method, tree, bounds, resolution, level, binary):
+    if not isinstance(tree, (str, bytes, bytearray)):
+        tree = serialize_tree(tree, binary=binary)
+    if isinstance(tree, str):
+        tree = tree.encode('utf-8')
+    header = {'method': method, 'bounds': [list(b) for b in bounds], 'resolution': resolution, 'level': level}
+    return header, [tree]
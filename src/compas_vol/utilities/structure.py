@@ -0,0 +1,182 @@
+import hashlib
+import threading
+from contextlib import contextmanager
+
+
+__all__ = [
+    'children',
+    'structural_key',
+    'structural_hash',
+    'structural_digest',
+    'structurally_equal',
+    'shared_subtrees'
+]
+
+
+_LOCAL = threading.local()
+
+
+def _is_node(obj):
+    return hasattr(obj, 'get_distance_numpy')
+
+
+def _state(node):
+    getstate = getattr(node, '__getstate__', None)
+    state = getstate() if getstate is not None else None
+    return vars(node) if state is None else state
+
+
+def structural_key(obj, memo=None):
+    """A hashable key of an object made of its type and parameters, and those of its children.
+
+    Two trees of distance objects have the same key if they are made of the same types of objects
+    with the same parameters, whether or not they share objects. The parameters of an object
+    are its ``data`` if it has any, and otherwise the attributes that are pickled,
+    so that tables derived from the parameters are left out.
+    Geometry objects of ``compas`` are compared by their ``data``, and numbers to 12 significant digits.
+
+    Parameters
+    ----------
+    obj : volumetric object
+        The root of a tree of distance objects, or one of its parameters.
+    memo : dict, optional
+        Keys of the nodes already visited, by their ``id``, so that shared nodes are visited once.
+
+    Returns
+    -------
+    tuple
+        The key.
+    """
+    if isinstance(obj, float):
+        # round off the last bits, that copies of geometry may not reproduce
+        return float('{:.12g}'.format(obj))
+    if obj is None or isinstance(obj, (bool, int, str, bytes)):
+        return obj
+    if memo is None:
+        memo = {}
+    node = _is_node(obj)
+    if node and id(obj) in memo:
+        return memo[id(obj)]
+    if isinstance(obj, (list, tuple)):
+        key = tuple(structural_key(o, memo) for o in obj)
+    elif isinstance(obj, dict):
+        key = tuple(sorted((k, structural_key(v, memo)) for k, v in obj.items()))
+    elif node:
+        data = obj.data if hasattr(type(obj), 'data') else _state(obj)
+        key = (type(obj).__name__, structural_key(data, memo))
+    elif hasattr(obj, 'tobytes') and hasattr(obj, 'dtype'):
+        key = (str(obj.dtype), getattr(obj, 'shape', ()), obj.tobytes())
+    elif hasattr(obj, 'data'):
+        key = (type(obj).__name__, structural_key(obj.data, memo))
+    else:
+        key = repr(obj)
+    if node:
+        # nodes outlive the call, unlike the temporary containers of their state
+        memo[id(obj)] = key
+    return key
+
+
+def structural_hash(obj):
+    """The hash of the :func:`structural_key` of an object."""
+    return hash(structural_key(obj))
+
+
+def structural_digest(obj):
+    """The hexadecimal SHA-256 digest of the :func:`structural_key` of an object, stable across sessions."""
+    return hashlib.sha256(repr(structural_key(obj)).encode('utf-8')).hexdigest()
+
+
+def structurally_equal(a, b):
+    """Compare two objects by type and parameters, see :func:`structural_key`."""
+    if a is b:
+        return True
+    if type(a) is not type(b):
+        return False
+    return structural_key(a) == structural_key(b)
+
+
+class _SharedSubtrees(object):
+    """The subtrees of a tree that occur more than once, with their pending evaluations."""
+
+    def __init__(self, tree):
+        self.keys = {}
+        self.pending = {}
+        self.grids = {}
+        memo = {}
+        self._count(tree, memo)
+        # only subtrees requested more than once are memoized
+        self.keys = dict((i, k) for i, k in self.keys.items() if self.pending[k] > 1)
+
+    def _count(self, node, memo):
+        key = structural_key(node, memo)
+        self.keys[id(node)] = key
+        self.pending[key] = self.pending.get(key, 0) + 1
+        if self.pending[key] == 1:
+            for child in children(node):
+                self._count(child, memo)
+
+    def evaluate(self, node, key, x, y, z, out, evaluate):
+        self.pending[key] -= 1
+        entry = self.grids.get(key)
+        if entry is not None and entry[0][0] is x and entry[0][1] is y and entry[0][2] is z:
+            out[...] = entry[1]
+        else:
+            evaluate(node, x, y, z, out)
+            if self.pending[key] > 0:
+                self.grids[key] = ((x, y, z), out.copy())
+        if self.pending[key] <= 0:
+            # the last consumer is done
+            self.grids.pop(key, None)
+        return out
+
+
+def children(node):
+    """Iterate over the child nodes of a node of a tree of distance objects."""
+    for value in vars(node).values():
+        if _is_node(value):
+            yield value
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                if _is_node(item):
+                    yield item
+
+
+@contextmanager
+def shared_subtrees(tree):
+    """Context manager evaluating each unique subtree of a tree only once.
+
+    The tree is scanned for subtrees that occur more than once, by :func:`structural_key`.
+    While the tree is evaluated inside the block, the distances of such a subtree are kept
+    after its first evaluation and copied for the following ones, until its last consumer is done.
+    Subtrees are shared between consumers that evaluate them at the same coordinate arrays.
+    The evaluators of :mod:`compas_vol.engine` share subtrees within each block.
+
+    Parameters
+    ----------
+    tree : volumetric object
+        The root of the tree of distance objects that will be evaluated.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from compas.geometry import Box, Frame
+    >>> from compas_vol.combinations import Intersection
+    >>> from compas_vol.microstructures import TPMS
+    >>> from compas_vol.modifications import Shell
+    >>> from compas_vol.primitives import VolBox
+    >>> part = VolBox(Box(Frame.worldXY(), 20, 15, 10), 1.5)
+    >>> tree = Intersection(Shell(part, 1.0), Intersection(part, TPMS(0, 5.0)))
+    >>> x, y, z = np.ogrid[-15:15:50j, -15:15:50j, -15:15:50j]
+    >>> with shared_subtrees(tree):
+    ...     d = tree.get_distance_numpy(x, y, z)
+    """
+    previous = getattr(_LOCAL, 'shared', None)
+    _LOCAL.shared = _SharedSubtrees(tree)
+    try:
+        yield
+    finally:
+        _LOCAL.shared = previous
+
+
+def _shared():
+    return getattr(_LOCAL, 'shared', None)
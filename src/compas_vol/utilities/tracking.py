@@ -0,0 +1,98 @@
+import threading
+import weakref
+
+
+__all__ = [
+    'Observable',
+    'notify_change',
+    'observe',
+    'unobserve'
+]
+
+
+_OBSERVERS = weakref.WeakSet()
+_LOCAL = threading.local()
+
+
+def notify_change(node, name):
+    """Tell the observers that an attribute of a node was assigned.
+
+    All objects call this from the ``__setattr__`` of :class:`Observable`, once they are initialized.
+    Private attributes, whose names start with an underscore, hold derived state and are not reported.
+
+    Parameters
+    ----------
+    node : volumetric object
+        The object whose attribute was assigned.
+    name : str
+        The name of the attribute.
+    """
+    if not _OBSERVERS or name.startswith('_'):
+        return
+    for observer in list(_OBSERVERS):
+        observer.changed(node, name)
+
+
+def observe(observer):
+    """Register an observer of the changes of all objects, held by a weak reference.
+
+    Parameters
+    ----------
+    observer : object
+        An object with a method ``changed(node, name)``, such as a :class:`compas_vol.engine.IncrementalEvaluator`.
+    """
+    _OBSERVERS.add(observer)
+
+
+def unobserve(observer):
+    """Unregister an observer registered with :func:`observe`."""
+    _OBSERVERS.discard(observer)
+
+
+def _initializing():
+    pending = getattr(_LOCAL, 'pending', None)
+    if pending is None:
+        pending = _LOCAL.pending = set()
+    return pending
+
+
+class _ObservableType(type):
+    """Metaclass of :class:`Observable`, which keeps track of the objects whose ``__init__`` is running."""
+
+    def __call__(cls, *args, **kwargs):
+        obj = cls.__new__(cls, *args, **kwargs)
+        if isinstance(obj, cls):
+            pending = _initializing()
+            pending.add(id(obj))
+            try:
+                obj.__init__(*args, **kwargs)
+            finally:
+                pending.discard(id(obj))
+        return obj
+
+
+class Observable(object, metaclass=_ObservableType):
+    """Base class of objects that report assignments to their attributes with :func:`notify_change`.
+
+    Assignments made by ``__init__`` set up a new object rather than change it, and are not reported.
+
+    Examples
+    --------
+    >>> class Recorder(object):
+    ...     def changed(self, node, name):
+    ...         print(name)
+    >>> class Radius(Observable):
+    ...     def __init__(self, radius):
+    ...         self.radius = radius
+    >>> recorder = Recorder()
+    >>> observe(recorder)
+    >>> obj = Radius(1.0)
+    >>> obj.radius = 2.0
+    radius
+    >>> unobserve(recorder)
+    """
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if _OBSERVERS and id(self) not in _initializing():
+            notify_change(self, name)
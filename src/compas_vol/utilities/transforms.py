@@ -0,0 +1,137 @@
+import threading
+from contextlib import contextmanager
+
+
+__all__ = [
+    'transform_coordinates',
+    'transform_point',
+    'shared_transforms'
+]
+
+
+_LOCAL = threading.local()
+
+
+@contextmanager
+def shared_transforms(size=1):
+    """Context manager sharing transformed coordinates between the objects evaluated inside it.
+
+    Sibling objects with the same frame, evaluated at the same coordinate arrays,
+    then transform the coordinates only once. The most recent ``size`` transformations
+    of the current thread are kept until the outermost block is left.
+    The evaluators of :mod:`compas_vol.engine` share transformations within each block.
+
+    Parameters
+    ----------
+    size : int, optional
+        The number of transformations to keep.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from compas.geometry import Box, Frame, Point, Sphere
+    >>> from compas_vol.combinations import Union
+    >>> from compas_vol.primitives import VolBox
+    >>> frame = Frame((1, 2, 3), (1, 0.3, 0.1), (-0.4, 1, 0.3))
+    >>> union = Union(VolBox(Box(frame, 5, 6, 7), 1.0), VolBox(Box(frame, 8, 2, 2), 0.5))
+    >>> x, y, z = np.ogrid[-10:10:50j, -10:10:50j, -10:10:50j]
+    >>> with shared_transforms():
+    ...     d = union.get_distance_numpy(x, y, z)
+    """
+    outer = getattr(_LOCAL, 'cache', None) is None
+    if outer:
+        _LOCAL.cache = []
+        _LOCAL.size = size
+    try:
+        yield
+    finally:
+        if outer:
+            _LOCAL.cache = None
+
+
+def _transform(matrix, x, y, z):
+    from compas_vol.utilities.precision import float_type
+    import numpy as np
+
+    dtype = float_type(x, y, z)
+    coordinates = [np.asarray(c, dtype=dtype) for c in (x, y, z)]
+    result = []
+    for row in matrix[:3]:
+        # the terms of coordinates on the axes of an open grid are 1-D and cheap,
+        # only their sum spans the grid. Terms with a zero coefficient are skipped,
+        # so that axis-aligned frames keep 1-D coordinates.
+        terms = sorted((c * float(a) for a, c in zip(row[:3], coordinates) if a != 0), key=np.size)
+        if not terms:
+            result.append(np.full((1,) * coordinates[0].ndim, row[3], dtype=dtype))
+            continue
+        t = terms[0]
+        if row[3] != 0:
+            t += float(row[3])
+        for term in terms[1:]:
+            if t.shape == np.broadcast(t, term).shape:
+                t += term
+            else:
+                t = t + term
+        result.append(t)
+    return tuple(result)
+
+
+def transform_coordinates(matrix, x, y, z):
+    """Apply an affine transformation to arrays of coordinates.
+
+    Each transformed coordinate is computed as ``a * x + b * y + c * z + d`` from a row of the matrix,
+    in the floating point type of the coordinates, without an object array of the coordinates.
+    For the coordinates of an open grid, the terms are computed along their axes and summed
+    smallest first, and terms with zero coefficients are skipped. The transformed coordinates
+    therefore broadcast to the shape of the grid, but only span it where the frame mixes axes.
+    Inside :func:`shared_transforms`, the result is reused for other objects with the same matrix.
+
+    Parameters
+    ----------
+    matrix : list of list of float
+        The 4x4 transformation matrix.
+    x,y,z: `numpy arrays, np.ogrid[]`
+        The coordinates to transform. Any shapes that broadcast together are allowed.
+
+    Returns
+    -------
+    tuple of numpy array
+        The transformed x, y and z coordinates. They must not be modified in place.
+    """
+    cache = getattr(_LOCAL, 'cache', None)
+    if cache is None:
+        return _transform(matrix, x, y, z)
+    key = tuple(tuple(float(a) for a in row) for row in matrix[:3])
+    for k, coordinates, result in cache:
+        if k == key and coordinates[0] is x and coordinates[1] is y and coordinates[2] is z:
+            return result
+    result = _transform(matrix, x, y, z)
+    cache.insert(0, (key, (x, y, z), result))
+    del cache[_LOCAL.size:]
+    return result
+
+
+def transform_point(transformation, point):
+    """Transform a copy of a point.
+
+    The point functions of objects transform their query point to their local coordinates with it.
+    The point is always copied, never transformed in place, so that the caller's point is left as is
+    and the same point may be queried by several objects and threads at once.
+
+    Parameters
+    ----------
+    transformation : :class:`compas.geometry.Transformation` or list of list of float
+        The transformation, or its 4x4 matrix.
+    point : :class:`compas.geometry.Point` or tuple of float
+        The point.
+
+    Returns
+    -------
+    :class:`compas.geometry.Point`
+        The transformed copy of the point.
+    """
+    from compas.geometry import Point
+
+    p = Point(*point)
+    p.transform(transformation)
+    return p
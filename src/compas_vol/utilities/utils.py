@@ -17,70 +17,57 @@ __all__ = [
 
 def get_iso_mesh(distobj, bounds):
     # for RPC
-    from skimage.measure import marching_cubes_lewiner
-    import numpy as np
+    from skimage.measure import marching_cubes
+    from compas_vol.engine import Grid
     from compas_vol.primitives import VolBox
     from compas.geometry import Box
+    from compas_vol.utilities.coalescing import coalesce
+    from compas_vol.utilities.coalescing import request_key
 
-    bx = bounds[0]
-    by = bounds[1]
-    bz = bounds[2]
-    x, y, z = np.ogrid[bx[0]:bx[1]:bx[2]*1j, by[0]:by[1]:by[2]*1j, bz[0]:bz[1]:bz[2]*1j]
-    # x, y, z = np.ogrid[-30:30:60j, -30:30:60j, -30:30:60j]
-    # spacing: (max-min)/num (or num-1?)
-    sx = (bx[1]-bx[0])/(bx[2]-1)
-    sy = (by[1]-by[0])/(by[2]-1)
-    sz = (bz[1]-bz[0])/(bz[2]-1)
+    grid = Grid(bounds)
     b = Box.from_data(distobj['box'])
     vb = VolBox(b, distobj['radius'])
     vb.data = distobj
-    dm = vb.get_distance_numpy(x, y, z)
-    verts, faces, norms, vals = marching_cubes_lewiner(dm, 0.0, spacing=(sx, sy, sz))
-    mesh = get_compas_mesh(verts, faces)
-    # return str(mesh.number_of_vertices())
-    return str(mesh.to_data())
-    # return mesh.to_json()
-    # return verts, faces
+
+    def mesh():
+        dm = grid.evaluate(vb)
+        verts, faces, norms, vals = marching_cubes(dm, 0.0, spacing=grid.spacing)
+        mesh = get_compas_mesh(verts, faces)
+        # return str(mesh.number_of_vertices())
+        return str(mesh.to_data())
+        # return mesh.to_json()
+        # return verts, faces
+
+    # identical requests in flight share one computation
+    return coalesce(('get_iso_mesh',) + request_key(vb, grid), mesh)
 
 
 def get_iso_vfs(distobj, bounds):
-    from skimage.measure import marching_cubes_lewiner
     import numpy as np
+    from compas_vol.engine import Grid
+    from compas_vol.meshing import chunked_marching_cubes
     from compas_vol.primitives import VolBox
     from compas.geometry import Box
+    from compas_vol.utilities.coalescing import coalesce
+    from compas_vol.utilities.coalescing import request_key
 
-    bx = bounds[0]
-    by = bounds[1]
-    bz = bounds[2]
-    x, y, z = np.ogrid[bx[0]:bx[1]:bx[2]*1j, by[0]:by[1]:by[2]*1j, bz[0]:bz[1]:bz[2]*1j]
-    # x, y, z = np.ogrid[-30:30:60j, -30:30:60j, -30:30:60j]
-    # spacing: (max-min)/num (or num-1?)
-    sx = (bx[1]-bx[0])/(bx[2]-1)
-    sy = (by[1]-by[0])/(by[2]-1)
-    sz = (bz[1]-bz[0])/(bz[2]-1)
+    grid = Grid(bounds)
     b = Box.from_data(distobj['box'])
     vb = VolBox(b, distobj['radius'])
     vb.data = distobj
-    dm = vb.get_distance_numpy(x, y, z)
-    verts, faces, norms, vals = marching_cubes_lewiner(dm, 0.0, spacing=(sx, sy, sz))
-    return (verts, faces)
+
+    def vfs():
+        # meshed chunk by chunk, with the vertices relative to the first sample as before
+        verts, faces = chunked_marching_cubes(vb, grid)
+        return (verts - np.asarray(grid.min), faces)
+
+    return coalesce(('get_iso_vfs',) + request_key(vb, grid), vfs)
 
 
 def export_ski_mesh(vs, fs, ns=None, filename='ski_mesh.obj'):
-    ve = ['v {} {} {}'.format(v[0], v[1], v[2]) for v in vs]
-    if ns is not None:
-        ne = ['vn {} {} {}'.format(n[0], n[1], n[2]) for n in ns]
-        fe = ['f {0}//{0} {1}//{1} {2}//{2}'.format(f[0]+1, f[1]+1, f[2]+1) for f in fs]
-    else:
-        ne = None
-        fe = ['f {} {} {}'.format(f[0]+1, f[1]+1, f[2]+1) for f in fs]
-    with open(filename, 'w') as f:
-        f.write('\n'.join(ve))
-        f.write('\n')
-        if ne is not None:
-            f.write('\n'.join(ne))
-            f.write('\n')
-        f.write('\n'.join(fe))
+    from compas_vol.utilities.writers import write_obj
+
+    write_obj(filename, vs, fs, normals=ns)
 
 
 def export_ipv_mesh(mesh, filename='ipv_mesh.obj', colors=None):
@@ -90,18 +77,10 @@ def export_ipv_mesh(mesh, filename='ipv_mesh.obj', colors=None):
     """
 
     import numpy as np
+    from compas_vol.utilities.writers import write_obj
 
     vs = np.vstack((mesh.x, mesh.y, mesh.z)).T
-    # vs = ['v {:.4f} {:.4f} {:.4f}'.format(v[0], v[1], v[2]) for v in vs]
-    vs = ['v {} {} {}'.format(v[0], v[1], v[2]) for v in vs]
-    if colors is not None:
-        vs = [vs[i]+' {} {} {}'.format(c[0], c[1], c[2]) for i, c in enumerate(colors)]
-    fs = ['f {} {} {}'.format(v[0]+1, v[1]+1, v[2]+1) for v in mesh.triangles]
-
-    with open(filename, 'w') as f:
-        f.write('\n'.join(vs))
-        f.write('\n')
-        f.write('\n'.join(fs))
+    write_obj(filename, vs, np.asarray(mesh.triangles), colors=colors)
 
 
 def get_random_vector_2D():
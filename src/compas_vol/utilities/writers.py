@@ -0,0 +1,388 @@
+from __future__ import division
+
+import os
+import shutil
+import struct
+import tempfile
+
+
+__all__ = [
+    'PLYWriter',
+    'STLWriter',
+    'OBJWriter',
+    'write_ply',
+    'write_stl',
+    'write_obj'
+]
+
+
+#: The number of vertices or faces formatted at once by :class:`OBJWriter`.
+OBJ_CHUNK = 65536
+
+#: The size in bytes of the buffers of the writers.
+BUFFER_SIZE = 1 << 20
+
+_PLY_TYPES = {'float64': 'double', 'float32': 'float', 'int16': 'short'}
+
+
+def _colors(colors):
+    """Colors as an array of uint8 of shape (n, 3), from bytes or from floats between 0 and 1."""
+    import numpy as np
+
+    colors = np.asarray(colors)
+    if colors.dtype != np.uint8:
+        colors = np.clip(np.rint(colors * 255), 0, 255).astype(np.uint8)
+    return colors[:, :3]
+
+
+class _MeshWriter(object):
+    """Base class of the writers, which write meshes chunk by chunk to a file.
+
+    The faces of each chunk index its own vertices, and are offset by the number of vertices
+    of the previous chunks, so that the chunks of a chunked meshing can be written as they come.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.vertex_count = 0
+        self.face_count = 0
+        self._file = open(filename, 'wb', buffering=BUFFER_SIZE)
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self.filename)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def closed(self):
+        return self._file is None
+
+    def add(self, vertices, faces, normals=None, colors=None):
+        """Append a mesh to the file.
+
+        Parameters
+        ----------
+        vertices : numpy array of floats, shape (n, 3)
+            The vertices.
+        faces : numpy array of int, shape (m, 3)
+            The triangles, as indices into ``vertices``.
+        normals : numpy array of floats, shape (n, 3), optional
+            The normals of the vertices.
+        colors : numpy array, shape (n, 3), optional
+            The colors of the vertices, as bytes or as floats between 0 and 1.
+        """
+        import numpy as np
+
+        if self.closed:
+            raise ValueError('The writer of {} is closed.'.format(self.filename))
+        vertices = np.asarray(vertices).reshape(-1, 3)
+        faces = np.asarray(faces).reshape(-1, 3)
+        self._add(vertices, faces, normals, colors)
+        self.vertex_count += len(vertices)
+        self.face_count += len(faces)
+
+    def close(self):
+        """Finish the file."""
+        if self.closed:
+            return
+        try:
+            self._close()
+        finally:
+            self._file.close()
+            self._file = None
+
+
+class PLYWriter(_MeshWriter):
+    """Write triangle meshes to a binary little-endian PLY file, chunk by chunk.
+
+    The vertices are written as they are added, as one structured array per chunk.
+    The faces go to a temporary file in the same directory, which is appended on :meth:`close`,
+    since the PLY format stores all vertices before all faces. The element counts
+    of the header are reserved when the file is opened and filled in on :meth:`close`.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the file.
+    normals : bool, optional
+        If True, the vertices have normals, stored as floats.
+    colors : bool, optional
+        If True, the vertices have colors, stored as bytes.
+    dtype : {'float32', 'float64', 'int16'}, optional
+        The type of the stored positions. Positions of type ``int16`` are quantized over ``bounds``,
+        and the scale and offset to restore them are stored as a comment of the header.
+    bounds : list of tuple, optional
+        The bounds of the positions along x, y and z as ``(min, max)`` pairs, required for ``int16``.
+
+    Examples
+    --------
+    >>> import os, tempfile
+    >>> import numpy as np
+    >>> filename = os.path.join(tempfile.mkdtemp(), 'mesh.ply')
+    >>> with PLYWriter(filename) as writer:
+    ...     writer.add(np.eye(3), [[0, 1, 2]])
+    ...     writer.add(np.eye(3) + 1, [[0, 1, 2]])
+    >>> writer.vertex_count, writer.face_count
+    (6, 2)
+    """
+
+    def __init__(self, filename, normals=False, colors=False, dtype='float32', bounds=None):
+        import numpy as np
+
+        dtype = np.dtype(dtype).name
+        if dtype not in _PLY_TYPES:
+            raise ValueError('Positions are stored as one of {}: {}'.format(sorted(_PLY_TYPES), dtype))
+        self.normals = normals
+        self.colors = colors
+        self.dtype = dtype
+        self.scale = self.offset = None
+        if dtype == 'int16':
+            if bounds is None:
+                raise ValueError('Quantized positions need the bounds of the vertices.')
+            lower, upper = np.asarray(bounds, dtype=float).T
+            self.offset = (lower + upper) / 2
+            self.scale = np.maximum(upper - lower, 1e-300) / (2 * 32767)
+        fields = [(c, '<' + np.dtype(dtype).str[1:]) for c in 'xyz']
+        if normals:
+            fields += [(c, '<f4') for c in ('nx', 'ny', 'nz')]
+        if colors:
+            fields += [(c, 'u1') for c in ('red', 'green', 'blue')]
+        self._vertex = np.dtype(fields)
+        self._face = np.dtype([('n', 'u1'), ('v', '<i4', (3,))])
+        super(PLYWriter, self).__init__(filename)
+        self._faces = tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(filename)))
+        self._file.write(self._header(' ' * 12, ' ' * 12))
+
+    def _header(self, vertices, faces):
+        lines = ['ply', 'format binary_little_endian 1.0', 'comment compas_vol']
+        if self.scale is not None:
+            lines.append('comment quantized scale {} {} {} offset {} {} {}'.format(*(list(self.scale) + list(self.offset))))
+        lines.append('element vertex {}'.format(vertices))
+        lines += ['property {} {}'.format(_PLY_TYPES[self.dtype], c) for c in 'xyz']
+        if self.normals:
+            lines += ['property float {}'.format(c) for c in ('nx', 'ny', 'nz')]
+        if self.colors:
+            lines += ['property uchar {}'.format(c) for c in ('red', 'green', 'blue')]
+        lines += ['element face {}'.format(faces), 'property list uchar int vertex_indices', 'end_header', '']
+        return '\n'.join(lines).encode('ascii')
+
+    def _add(self, vertices, faces, normals, colors):
+        import numpy as np
+
+        if (normals is not None) != bool(self.normals) or (colors is not None) != bool(self.colors):
+            raise ValueError('The writer of {} expects normals={} and colors={}.'.format(self.filename, self.normals, self.colors))
+        data = np.empty(len(vertices), dtype=self._vertex)
+        if self.scale is not None:
+            vertices = np.clip(np.rint((vertices - self.offset) / self.scale), -32767, 32767)
+        for i, c in enumerate('xyz'):
+            data[c] = vertices[:, i]
+        if self.normals:
+            for i, c in enumerate(('nx', 'ny', 'nz')):
+                data[c] = np.asarray(normals)[:, i]
+        if self.colors:
+            colors = _colors(colors)
+            for i, c in enumerate(('red', 'green', 'blue')):
+                data[c] = colors[:, i]
+        self._file.write(data.tobytes())
+
+        records = np.empty(len(faces), dtype=self._face)
+        records['n'] = 3
+        records['v'] = faces + self.vertex_count
+        self._faces.write(records.tobytes())
+
+    def _close(self):
+        self._faces.seek(0)
+        shutil.copyfileobj(self._faces, self._file, BUFFER_SIZE)
+        self._faces.close()
+        self._file.seek(0)
+        self._file.write(self._header('{:>12}'.format(self.vertex_count), '{:>12}'.format(self.face_count)))
+
+
+class STLWriter(_MeshWriter):
+    """Write triangle meshes to a binary STL file, chunk by chunk.
+
+    Each triangle is stored with its three corners and its normal in single precision.
+    Vertex normals are not stored, since STL has one normal per triangle, computed from its corners.
+    Vertex colors are averaged per triangle and stored in the attribute of the triangle
+    as 5 bits per channel with the high bit set, as read by most slicers and viewers.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the file.
+
+    Examples
+    --------
+    >>> import os, tempfile
+    >>> import numpy as np
+    >>> filename = os.path.join(tempfile.mkdtemp(), 'mesh.stl')
+    >>> with STLWriter(filename) as writer:
+    ...     writer.add(np.eye(3), [[0, 1, 2]])
+    >>> os.path.getsize(filename)
+    134
+    """
+
+    def __init__(self, filename):
+        import numpy as np
+
+        self._triangle = np.dtype([('normal', '<f4', (3,)), ('vertices', '<f4', (3, 3)), ('attribute', '<u2')])
+        super(STLWriter, self).__init__(filename)
+        self._file.write(b'binary STL written by compas_vol'.ljust(80, b' '))
+        self._file.write(struct.pack('<I', 0))
+
+    def _add(self, vertices, faces, normals, colors):
+        import numpy as np
+
+        corners = vertices[faces]
+        n = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+        length = np.linalg.norm(n, axis=-1, keepdims=True)
+        data = np.zeros(len(faces), dtype=self._triangle)
+        data['normal'] = n / np.where(length > 0, length, 1)
+        data['vertices'] = corners
+        if colors is not None:
+            rgb = _colors(colors)[faces].mean(axis=1).astype(np.uint16) >> 3
+            data['attribute'] = 0x8000 | rgb[:, 0] << 10 | rgb[:, 1] << 5 | rgb[:, 2]
+        self._file.write(data.tobytes())
+
+    def _close(self):
+        if self.face_count >= 2 ** 32:
+            raise ValueError('Binary STL stores at most 2 ** 32 - 1 triangles: {}'.format(self.face_count))
+        self._file.seek(80)
+        self._file.write(struct.pack('<I', self.face_count))
+
+
+class OBJWriter(_MeshWriter):
+    """Write triangle meshes to a Wavefront OBJ file, chunk by chunk.
+
+    The lines are formatted for blocks of :data:`OBJ_CHUNK` vertices or faces at once,
+    with one format string per block, instead of one format call per vertex.
+    Colors are appended to the vertex lines, as read by MeshLab and most viewers,
+    and normals are written as ``vn`` lines with the index of their vertex.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the file.
+    digits : int, optional
+        The number of significant digits of the coordinates, 9 to restore single precision exactly.
+
+    Examples
+    --------
+    >>> import os, tempfile
+    >>> import numpy as np
+    >>> filename = os.path.join(tempfile.mkdtemp(), 'mesh.obj')
+    >>> write_obj(filename, np.eye(3), [[0, 1, 2]])
+    >>> print(open(filename).read())
+    v 1 0 0
+    v 0 1 0
+    v 0 0 1
+    f 1 2 3
+    <BLANKLINE>
+    """
+
+    def __init__(self, filename, digits=9):
+        self.digits = digits
+        super(OBJWriter, self).__init__(filename)
+
+    def _lines(self, fmt, rows):
+        for start in range(0, len(rows), OBJ_CHUNK):
+            block = rows[start:start + OBJ_CHUNK]
+            self._file.write(((fmt + '\n') * len(block) % tuple(block.ravel().tolist())).encode('ascii'))
+
+    def _add(self, vertices, faces, normals, colors):
+        import numpy as np
+
+        g = '%.{}g'.format(self.digits)
+        if colors is not None:
+            rows = np.concatenate([vertices, _colors(colors) / 255.0], axis=1)
+            self._lines('v ' + ' '.join([g] * 3) + ' %.4g %.4g %.4g', rows)
+        else:
+            self._lines('v ' + ' '.join([g] * 3), vertices)
+        faces = np.asarray(faces, dtype=np.int64) + self.vertex_count + 1
+        if normals is not None:
+            self._lines('vn %.6g %.6g %.6g', np.asarray(normals))
+            self._lines('f %d//%d %d//%d %d//%d', np.repeat(faces, 2, axis=1))
+        else:
+            self._lines('f %d %d %d', faces)
+
+    def _close(self):
+        pass
+
+
+# ==============================================================================
+# single meshes
+# ==============================================================================
+
+
+def write_ply(filename, vertices, faces, normals=None, colors=None, dtype='float32'):
+    """Write a triangle mesh to a binary PLY file.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the file.
+    vertices : numpy array of floats, shape (n, 3)
+        The vertices.
+    faces : numpy array of int, shape (m, 3)
+        The triangles.
+    normals : numpy array of floats, shape (n, 3), optional
+        The normals of the vertices.
+    colors : numpy array, shape (n, 3), optional
+        The colors of the vertices, as bytes or as floats between 0 and 1.
+    dtype : {'float32', 'float64', 'int16'}, optional
+        The type of the stored positions, see :class:`PLYWriter`.
+    """
+    import numpy as np
+
+    vertices = np.asarray(vertices, dtype=float).reshape(-1, 3)
+    bounds = None
+    if np.dtype(dtype) == np.int16 and len(vertices):
+        bounds = list(zip(vertices.min(axis=0), vertices.max(axis=0)))
+    elif np.dtype(dtype) == np.int16:
+        bounds = [(0, 1)] * 3
+    with PLYWriter(filename, normals is not None, colors is not None, dtype, bounds) as writer:
+        writer.add(vertices, faces, normals, colors)
+
+
+def write_stl(filename, vertices, faces, colors=None):
+    """Write a triangle mesh to a binary STL file.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the file.
+    vertices : numpy array of floats, shape (n, 3)
+        The vertices.
+    faces : numpy array of int, shape (m, 3)
+        The triangles.
+    colors : numpy array, shape (n, 3), optional
+        The colors of the vertices, averaged per triangle, see :class:`STLWriter`.
+    """
+    with STLWriter(filename) as writer:
+        writer.add(vertices, faces, colors=colors)
+
+
+def write_obj(filename, vertices, faces, normals=None, colors=None, digits=9):
+    """Write a triangle mesh to a Wavefront OBJ file.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the file.
+    vertices : numpy array of floats, shape (n, 3)
+        The vertices.
+    faces : numpy array of int, shape (m, 3)
+        The triangles.
+    normals : numpy array of floats, shape (n, 3), optional
+        The normals of the vertices.
+    colors : numpy array, shape (n, 3), optional
+        The colors of the vertices, as bytes or as floats between 0 and 1.
+    digits : int, optional
+        The number of significant digits of the coordinates.
+    """
+    with OBJWriter(filename, digits) as writer:
+        writer.add(vertices, faces, normals, colors)
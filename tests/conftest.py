@@ -0,0 +1,204 @@
+import numpy as np
+import pytest
+
+from compas.geometry import Box
+from compas.geometry import Circle
+from compas.geometry import Cone
+from compas.geometry import Cylinder
+from compas.geometry import Frame
+from compas.geometry import Plane
+from compas.geometry import Point
+from compas.geometry import Sphere
+from compas.geometry import Torus
+
+from compas_vol.combinations import Addition
+from compas_vol.combinations import Blend
+from compas_vol.combinations import Division
+from compas_vol.combinations import Intersection
+from compas_vol.combinations import Morph
+from compas_vol.combinations import Multiplication
+from compas_vol.combinations import SmoothIntersection
+from compas_vol.combinations import SmoothSubtraction
+from compas_vol.combinations import SmoothUnion
+from compas_vol.combinations import SmoothUnionList
+from compas_vol.combinations import Subtraction
+from compas_vol.combinations import Union
+from compas_vol.microstructures import Lattice
+from compas_vol.microstructures import LatticePolar
+from compas_vol.microstructures import TPMS
+from compas_vol.microstructures import TPMSPolar
+from compas_vol.microstructures import Voronoi
+from compas_vol.microstructures.tpms_attractor import TPMSAttractor
+from compas_vol.modifications import Factor
+from compas_vol.modifications import MultiShell
+from compas_vol.modifications import Overlay
+from compas_vol.modifications import Shell
+from compas_vol.modifications import Sine
+from compas_vol.modifications import Twist
+from compas_vol.modifications.transformation import VolTransformation
+from compas_vol.primitives import Heart
+from compas_vol.primitives import PlatonicSolid
+from compas_vol.primitives import VolBox
+from compas_vol.primitives import VolCapsule
+from compas_vol.primitives import VolCone
+from compas_vol.primitives import VolCylinder
+from compas_vol.primitives import VolEgg
+from compas_vol.primitives import VolEllipsoid
+from compas_vol.primitives import VolExtrusion
+from compas_vol.primitives import VolPlane
+from compas_vol.primitives import VolPolyhedron
+from compas_vol.primitives import VolSphere
+from compas_vol.primitives import VolTorus
+
+
+# ==============================================================================
+# objects
+# ==============================================================================
+
+
+def make_frame():
+    return Frame((1, 2, 3), (1, 0.3, 0.1), (-0.4, 1, 0.3))
+
+
+def make_plane():
+    return Plane((1, 2, 3), (0.2, 0.1, 1))
+
+
+def make_sphere(x=1, y=2, z=3, r=4):
+    return VolSphere(Sphere(Point(x, y, z), r))
+
+
+def make_box():
+    return VolBox(Box(make_frame(), 5, 6, 7), 1.0)
+
+
+def primitives():
+    frame, plane = make_frame(), make_plane()
+    return [
+        make_sphere(),
+        make_box(),
+        VolCylinder(Cylinder(Circle(plane, 3), 7)),
+        VolCone(Cone(Circle(plane, 3), 7)),
+        VolTorus(Torus(plane, 5, 2)),
+        VolCapsule(((1, 2, 3), (4, 5, -2)), 2.0),
+        VolEllipsoid(5, 4, 3, frame),
+        VolEgg(3, 4, 0.1, frame),
+        VolExtrusion([(0, 0, 0), (5, 0, 0), (5, 5, 0), (0, 0, 0)], 4, frame),
+        VolPlane(plane),
+        VolPolyhedron([VolPlane(Plane((0, 0, 4), (0, 0, 1))), VolPlane(Plane((0, 0, -4), (0, 0, -1))), VolPlane(Plane((3, 0, 0), (1, 1, 0)))]),
+        PlatonicSolid(5, 0, frame),
+        PlatonicSolid(5, 1, frame),
+        PlatonicSolid(5, 2, frame),
+        PlatonicSolid(5, 3, frame),
+        Heart(5.0, frame),
+    ]
+
+
+def combinations():
+    a, b, c = make_box(), make_sphere(3, 2, 3, 4), VolPlane(make_plane())
+    return [
+        Union(a, b),
+        Intersection(a, b),
+        Subtraction(a, b),
+        SmoothUnion(a, b, 2.0),
+        SmoothIntersection(a, b, 2.0),
+        SmoothSubtraction(a, b, 2.0),
+        SmoothUnionList([a, b, make_sphere(-3, 0, 0, 2)], 2.0),
+        Blend(a, b, c, 2.0),
+        Blend(a, b, c, 2.0, 1),
+        Morph(a, b, 0.3),
+        Addition(a, b),
+        Multiplication(a, b),
+        Division(a, make_sphere(20, 20, 20, 1)),
+    ]
+
+
+def modifications():
+    return [
+        Shell(make_box(), 1.5, 0.2),
+        MultiShell(make_sphere(), 0.5, 2.0),
+        Factor(make_box(), 0.5),
+        Overlay(make_box(), TPMS(0, 5.0), 0.5),
+        Sine(make_box()),
+        VolTransformation(make_box(), Frame((-3, 1, 0), (0, 1, 0.2), (-1, 0, 0.5))),
+        Twist(make_box(), Frame((1, 0, 0), (1, 0, 0), (0, 1, 0))),
+    ]
+
+
+def microstructures():
+    frame = make_frame()
+    return [
+        Lattice(5, 5.0, 0.5, frame),
+        LatticePolar(1, 4.0, 0.5, 6, frame),
+    ] + [TPMS(t, 5.0) for t in range(6)] + [
+        TPMSPolar(0, 5.0, 0.3, 2.0),
+        TPMSAttractor(0, 5.0),
+        Voronoi([Point(*p) for p in np.random.default_rng(2).uniform(-10, 10, (12, 3))], 1.0),
+    ]
+
+
+def name(obj):
+    return type(obj).__name__
+
+
+# ==============================================================================
+# fixtures
+# ==============================================================================
+
+
+@pytest.fixture
+def frame():
+    return make_frame()
+
+
+@pytest.fixture
+def plane():
+    return make_plane()
+
+
+@pytest.fixture
+def sphere():
+    return make_sphere()
+
+
+@pytest.fixture
+def box():
+    return make_box()
+
+
+@pytest.fixture(scope='module')
+def part():
+    """A rounded box with a sphere on one side, large enough to mesh."""
+    return Union(VolBox(Box(make_frame(), 50, 40, 30), 2.0), VolSphere(Sphere(Point(20, 0, 10), 15)))
+
+
+@pytest.fixture
+def tree():
+    """A small union of a sphere and a rounded box, quick to mesh."""
+    return Union(VolSphere(Sphere(Point(5, 6, 0), 9)), VolBox(Box(Frame.worldXY(), 20, 15, 10), 2.5))
+
+
+@pytest.fixture(params=primitives(), ids=name)
+def primitive(request):
+    return request.param
+
+
+@pytest.fixture(params=combinations(), ids=name)
+def combination(request):
+    return request.param
+
+
+@pytest.fixture(params=modifications(), ids=name)
+def modification(request):
+    return request.param
+
+
+@pytest.fixture(params=microstructures(), ids=name)
+def microstructure(request):
+    return request.param
+
+
+@pytest.fixture(params=primitives() + combinations() + modifications() + microstructures(), ids=name)
+def node(request):
+    """Every primitive, combination, modification and microstructure."""
+    return request.param
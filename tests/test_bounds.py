@@ -0,0 +1,169 @@
+import numpy as np
+import pytest
+
+from compas.geometry import Plane
+from compas.geometry import Point
+from compas.geometry import Sphere
+
+from compas_vol.combinations import Addition
+from compas_vol.combinations import Blend
+from compas_vol.combinations import Division
+from compas_vol.combinations import Intersection
+from compas_vol.combinations import Morph
+from compas_vol.combinations import Multiplication
+from compas_vol.combinations import SmoothIntersection
+from compas_vol.combinations import SmoothSubtraction
+from compas_vol.combinations import SmoothUnion
+from compas_vol.combinations import SmoothUnionList
+from compas_vol.combinations import Subtraction
+from compas_vol.combinations import Union
+from compas_vol.engine import Grid
+from compas_vol.microstructures import TPMS
+from compas_vol.modifications import Factor
+from compas_vol.modifications import MultiShell
+from compas_vol.modifications import Overlay
+from compas_vol.modifications import Shell
+from compas_vol.modifications import Sine
+from compas_vol.primitives import VolPlane
+from compas_vol.primitives import VolSphere
+from compas_vol.utilities import bounding_box
+from compas_vol.utilities import box_distance
+from compas_vol.utilities import culling
+
+
+X, Y, Z = np.ogrid[-15:15:61j, -15:15:61j, -15:15:61j]
+MARGIN = 1.0
+
+
+def spheres(count=60, seed=1):
+    rng = np.random.default_rng(seed)
+    return [VolSphere(Sphere(Point(*rng.uniform(-12, 12, 3)), rng.uniform(0.5, 1.5))) for _ in range(count)]
+
+
+def assert_box_contains(obj):
+    lower, upper = bounding_box(obj)
+    d = obj.get_distance_numpy(X, Y, Z)
+    assert (d < 0).any()
+    outside = box_distance((lower, upper), X, Y, Z) > 1e-9
+    assert (d[outside] > 0).all()
+
+
+def test_bounding_box_contains_the_object(node):
+    if bounding_box(node) is None:
+        pytest.skip('{} is unbounded'.format(type(node).__name__))
+    assert_box_contains(node)
+
+
+def test_bounding_box_contains_trees(box):
+    for obj in [
+        Union(spheres(5)),
+        Intersection(box, TPMS(2, 5.0)),
+        SmoothUnionList(spheres(4), 2.0),
+    ]:
+        assert_box_contains(obj)
+
+
+def test_unbounded_objects_have_no_box(plane):
+    for obj in [VolPlane(plane), TPMS(2, 5.0), Union(VolSphere(Sphere(Point(0, 0, 0), 1)), VolPlane(plane))]:
+        assert bounding_box(obj) is None
+
+
+def test_disjoint_intersection_has_no_box():
+    a = VolSphere(Sphere(Point(-5, 0, 0), 1))
+    b = VolSphere(Sphere(Point(5, 0, 0), 1))
+    assert bounding_box(Intersection(a, b)) is None
+
+
+def test_box_distance_is_a_lower_bound():
+    sphere = VolSphere(Sphere(Point(1, 2, 3), 4))
+    d = sphere.get_distance_numpy(X, Y, Z)
+    assert (box_distance(bounding_box(sphere), X, Y, Z) <= np.maximum(d, 0) + 1e-12).all()
+
+
+def culled_trees(box):
+    union = Union(spheres())
+    return [
+        union,
+        Union(spheres(20) + [TPMS(2, 5.0)]),
+        Intersection(union, box),
+        Intersection(VolSphere(Sphere(Point(-9, 0, 0), 2)), VolSphere(Sphere(Point(9, 0, 0), 2))),
+        Subtraction(box, union),
+        SmoothUnion(VolSphere(Sphere(Point(-6, 0, 0), 2)), box, 1.5),
+        SmoothIntersection(union, box, 1.5),
+        SmoothSubtraction(box, union, 1.5),
+        Shell(union, 1.5, 0.5),
+        MultiShell(union, 0.5, 2.0),
+        Sine(union),
+        Overlay(union, box, 0.5),
+        Factor(union, 0.5),
+        Addition(union, box),
+        Multiplication(union, box),
+        Division(union, box),
+        Morph(union, box, 0.3),
+        Blend(union, box, VolPlane(Plane((0, 0, 0), (0.2, 0.1, 1))), 2.0),
+        Blend(box, VolSphere(Sphere(Point(0, 0, 0), 6)), union, 4.0),
+        SmoothUnionList([union, box], 2.0),
+    ]
+
+
+def test_culling_keeps_signs_and_distances_near_the_surface(box):
+    for tree in culled_trees(box):
+        expected = tree.get_distance_numpy(X, Y, Z)
+        with culling(MARGIN):
+            d = tree.get_distance_numpy(X, Y, Z)
+        assert np.array_equal(np.sign(d), np.sign(expected)), type(tree).__name__
+        near = np.abs(expected) < MARGIN
+        assert np.allclose(d[near], expected[near], atol=1e-12), type(tree).__name__
+
+
+def test_grid_evaluate_cull_keeps_signs(box):
+    grid = Grid([(-15, 15), (-15, 15), (-15, 15)], resolution=48)
+    for tree in culled_trees(box):
+        expected = grid.evaluate(tree)
+        d = grid.evaluate(tree, cull=True)
+        assert np.array_equal(np.sign(d), np.sign(expected)), type(tree).__name__
+
+
+def test_culled_union_is_a_lower_bound():
+    union = Union(spheres())
+    expected = union.get_distance_numpy(X, Y, Z)
+    with culling(MARGIN):
+        d = union.get_distance_numpy(X, Y, Z)
+    assert (d <= expected + 1e-12).all()
+    assert not np.array_equal(d, expected)
+
+
+def test_culled_union_evaluates_children_on_their_blocks():
+    sizes = []
+
+    class Recorded(VolSphere):
+        def get_distance_numpy(self, x, y, z):
+            sizes.append(np.broadcast(x, y, z).size)
+            return VolSphere.get_distance_numpy(self, x, y, z)
+
+    union = Union([Recorded(s.sphere) for s in spheres()])
+    with culling(MARGIN):
+        union.get_distance_numpy(X, Y, Z)
+    assert len(sizes) == 60
+    assert max(sizes) < 0.05 * X.size * Y.size * Z.size
+
+
+def test_culling_is_off_outside_the_context_and_for_points():
+    union = Union(spheres())
+    expected = union.get_distance_numpy(X, Y, Z)
+    with culling(MARGIN):
+        with culling(None):
+            assert np.array_equal(union.get_distance_numpy(X, Y, Z), expected)
+        points = np.random.default_rng(0).uniform(-15, 15, (500, 3))
+        d = union.get_distance_numpy(points[:, 0], points[:, 1], points[:, 2])
+    assert np.allclose(d, [union.get_distance(p) for p in points])
+
+
+def test_grid_evaluate_cull():
+    union = Union(spheres())
+    grid = Grid([(-15, 15), (-15, 15), (-15, 15)], resolution=48)
+    expected = grid.evaluate(union)
+    d = grid.evaluate(union, chunk_shape=(16, 48, 48), cull=True)
+    assert np.array_equal(np.sign(d), np.sign(expected))
+    near = np.abs(expected) < grid.cull_margin
+    assert np.allclose(d[near], expected[near])
@@ -0,0 +1,101 @@
+import os
+
+import numpy as np
+import pytest
+
+from compas.geometry import Box
+from compas.geometry import Frame
+from compas.geometry import Point
+from compas.geometry import Sphere
+
+from compas_vol.combinations import Union
+from compas_vol.engine import Grid
+from compas_vol.engine import GridCache
+from compas_vol.engine import ThreadEvaluator
+from compas_vol.engine import caching
+from compas_vol.engine import get_cache
+from compas_vol.meshing import chunked_marching_cubes
+from compas_vol.primitives import VolSphere
+from compas_vol.utilities import get_iso_vfs
+
+
+def resized(part, radius):
+    """The part with a sphere of another radius."""
+    return Union(part.objs[0], VolSphere(Sphere(Point(20, 0, 10), radius)))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return GridCache(str(tmp_path / 'cache'))
+
+
+@pytest.fixture
+def grid():
+    return Grid([(-50, 50), (-50, 50), (-50, 50)], resolution=40)
+
+
+def test_hit_matches_evaluation(cache, grid, part):
+    expected = grid.evaluate(part)
+    with caching(cache):
+        a = grid.evaluate(part)
+        b = grid.evaluate(part)
+    assert (cache.hits, cache.misses, len(cache)) == (1, 1, 1)
+    assert isinstance(b, np.memmap)
+    assert np.array_equal(a, expected) and np.array_equal(b, expected)
+    b[0, 0, 0] = 1e9
+    assert np.array_equal(cache.get(part, grid), expected)
+    assert get_cache() is None
+
+
+def test_key(cache, grid, part):
+    key = cache.key(part, grid)
+    assert key == cache.key(part, Grid([(-50, 50), (-50, 50), (-50, 50)], resolution=40))
+    assert key != cache.key(resized(part, 16), grid)
+    assert key != cache.key(part, Grid([(-50, 50), (-50, 50), (-50, 50)], resolution=41))
+    assert key != cache.key(part, Grid([(-50, 50), (-50, 50), (-50, 50)], resolution=40, dtype='float32'))
+    assert key != cache.key(part, grid, cull=True)
+
+
+def test_atomic_entries(cache, grid, part):
+    def fail(out):
+        out[...] = 0
+        raise RuntimeError('interrupted')
+
+    with pytest.raises(RuntimeError):
+        cache.evaluate(part, grid, fail)
+    assert os.listdir(cache.directory) == []
+    assert cache.get(part, grid) is None
+
+
+def test_lru_eviction(tmp_path, grid, part):
+    cache = GridCache(str(tmp_path / 'cache'), max_bytes=int(2.5 * grid.nbytes))
+    with caching(cache):
+        for radius in (10, 11, 12):
+            grid.evaluate(resized(part, radius))
+            os.utime(cache.path(cache.key(resized(part, radius), grid)), (radius, radius))
+        grid.evaluate(resized(part, 10))
+        os.utime(cache.path(cache.key(resized(part, 10), grid)), (13, 13))
+        grid.evaluate(resized(part, 13))
+    assert len(cache) == 2
+    assert cache.get(resized(part, 10), grid) is not None and cache.get(resized(part, 13), grid) is not None
+    assert cache.nbytes <= cache.max_bytes
+
+
+def test_threads_and_meshing(cache, grid, part):
+    with ThreadEvaluator(2) as evaluator, caching(cache):
+        d = evaluator.evaluate(part, grid)
+        vertices, faces = chunked_marching_cubes(part, grid, chunk_shape=(16, 16, 16))
+    assert cache.misses == 1 and cache.hits == 1
+    assert np.allclose(d, grid.evaluate(part), atol=1e-9)
+    assert len(faces) == len(chunked_marching_cubes(part, grid, chunk_shape=(16, 16, 16))[1])
+
+
+def test_get_iso_vfs(cache):
+    box = Box(Frame.worldXY(), 6, 4, 2)
+    bounds = [(-5, 5, 21), (-5, 5, 21), (-5, 5, 21)]
+    expected = get_iso_vfs({'box': box.data, 'radius': 0.5}, bounds)
+    with caching(cache):
+        get_iso_vfs({'box': box.data, 'radius': 0.5}, bounds)
+        vertices, faces = get_iso_vfs({'box': box.data, 'radius': 0.5}, bounds)
+    assert cache.hits == 1
+    assert np.allclose(vertices, expected[0]) and np.array_equal(faces, expected[1])
@@ -0,0 +1,84 @@
+import tracemalloc
+
+import numpy as np
+
+from compas.geometry import Plane
+from compas.geometry import Point
+from compas.geometry import Sphere
+
+from compas_vol.combinations import Addition
+from compas_vol.combinations import SmoothUnionList
+from compas_vol.combinations import Union
+from compas_vol.modifications.transformation import VolTransformation
+from compas_vol.primitives import VolPlane
+from compas_vol.primitives import VolPolyhedron
+from compas_vol.primitives import VolSphere
+
+
+class Custom(object):
+    """An object without support for ``out``."""
+
+    def get_distance(self, point):
+        return point[0] + 0.5
+
+    def get_distance_numpy(self, x, y, z):
+        return x + 0 * y + 0 * z + 0.5
+
+
+def ogrid():
+    return np.ogrid[-10:10:21j, -9:9:19j, -8:8:17j]
+
+
+def assert_matches_get_distance(obj):
+    x, y, z = ogrid()
+    d = obj.get_distance_numpy(x, y, z)
+    expected = [obj.get_distance((a, b, c)) for a in x.ravel()[::4] for b in y.ravel()[::4] for c in z.ravel()[::4]]
+    assert np.allclose(d[::4, ::4, ::4].ravel(), expected)
+
+
+def assert_into_out(obj):
+    x, y, z = ogrid()
+    out = np.empty((21, 19, 17))
+    d = obj.get_distance_numpy(x, y, z, out=out)
+    assert d is out
+    assert np.allclose(out, obj.get_distance_numpy(x, y, z))
+
+
+def test_get_distance_numpy_matches_get_distance(node):
+    assert_matches_get_distance(node)
+
+
+def test_combinations_into_out(combination):
+    assert_into_out(combination)
+
+
+def test_modifications_into_out(modification):
+    assert_into_out(modification)
+
+
+def test_children_without_out(box, sphere, frame):
+    for obj in [
+        Union([box, sphere, Custom()]),
+        Addition([box, sphere, Custom()]),
+        SmoothUnionList([sphere, box, Custom()], 1.0),
+        VolTransformation(Union(box, sphere), frame),
+        VolPolyhedron([VolPlane(Plane((0, 0, 3), (0, 0, 1))), VolPlane(Plane((0, 0, -3), (0, 0, -1)))]),
+    ]:
+        assert_matches_get_distance(obj)
+        assert_into_out(obj)
+
+
+def test_union_reduces_in_place():
+    spheres = [VolSphere(Sphere(Point(i * 0.1, 0, 0), 2)) for i in range(200)]
+    union = Union(spheres)
+    x, y, z = np.ogrid[-5:5:64j, -5:5:64j, -5:5:64j]
+    nbytes = 64 ** 3 * 8
+    tracemalloc.start()
+    try:
+        d = union.get_distance_numpy(x, y, z)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # the output and one scratch array, plus the temporaries of a single sphere
+    assert peak < 8 * nbytes
+    assert np.allclose(d, np.minimum.reduce([s.get_distance_numpy(x, y, z) for s in spheres]))
@@ -0,0 +1,69 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from compas.geometry import Box
+from compas.geometry import Point
+from compas.geometry import Sphere
+
+from compas_vol.analysis import Gradient
+from compas_vol.combinations import Subtraction
+from compas_vol.meshing import Octree
+from compas_vol.meshing import dual_contour
+from compas_vol.primitives import VolBox
+from compas_vol.primitives import VolSphere
+
+
+@pytest.fixture
+def slab(frame):
+    return VolBox(Box(frame, 50, 40, 30), 0.0)
+
+
+def volume(vertices, faces):
+    v = vertices[faces]
+    return np.einsum('ij,ij->i', v[:, 0], np.cross(v[:, 1], v[:, 2])).sum() / 6.0
+
+
+def test_gradient_points():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-10, 10, (100, 3))
+    normals = Gradient(VolSphere(Sphere(Point(1, 2, 3), 4)), 0.001).get_gradient_points(points)
+    expected = points - [1, 2, 3]
+    assert np.allclose(normals, expected / np.linalg.norm(expected, axis=-1)[:, None], atol=1e-3)
+
+
+def test_box_keeps_its_corners_and_coarsens_its_faces(slab, frame):
+    octree = Octree(slab, size=100.0, depth=7)
+    vertices, faces = dual_contour(octree)
+    h = octree.cell_size(octree.depth)
+    assert np.abs(slab.get_distance_numpy(*vertices.T)).max() < 0.15 * h
+    for corner in itertools.product((-25, 25), (-20, 20), (-15, 15)):
+        point = np.array(frame.to_world_coordinates(Point(*corner)))
+        assert np.linalg.norm(vertices - point, axis=-1).min() < 0.2 * h
+    _, fine = dual_contour(octree, min_level=octree.depth)
+    assert 5 * len(faces) < len(fine)
+    assert volume(vertices, faces) == pytest.approx(50 * 40 * 30, rel=0.01)
+
+
+def test_sphere_is_closed_and_outward():
+    sphere = VolSphere(Sphere(Point(0, 0, 0), 30))
+    octree = Octree(sphere, size=100.0, depth=7)
+    vertices, faces = dual_contour(octree)
+    assert np.abs(sphere.get_distance_numpy(*vertices.T)).max() < 0.2 * octree.cell_size(octree.depth)
+    edges = np.sort(np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]]), axis=1)
+    _, counts = np.unique(edges, axis=0, return_counts=True)
+    assert (counts == 2).all()
+    assert volume(vertices, faces) == pytest.approx(4 / 3.0 * np.pi * 30 ** 3, rel=0.01)
+
+
+def test_tolerance_controls_the_coarsening(slab):
+    part = Subtraction(slab, VolSphere(Sphere(Point(20, 0, 10), 15)))
+    octree = Octree(part, size=100.0, depth=6).build()
+    counts = [len(dual_contour(octree, tolerance)[1]) for tolerance in (0.001, 0.05, 0.5)]
+    assert counts[0] > counts[1] > counts[2]
+
+
+def test_depth_limit(slab):
+    with pytest.raises(ValueError):
+        dual_contour(Octree(slab, depth=20))
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from compas.geometry import Circle
+from compas.geometry import Cone
+from compas.geometry import Cylinder
+from compas.geometry import Point
+from compas.geometry import Sphere
+
+from compas_vol.combinations import Blend
+from compas_vol.combinations import Intersection
+from compas_vol.combinations import SmoothUnion
+from compas_vol.combinations import Subtraction
+from compas_vol.combinations import Union
+from compas_vol.engine import compile
+from compas_vol.microstructures import TPMS
+from compas_vol.modifications import Shell
+from compas_vol.primitives import VolCone
+from compas_vol.primitives import VolCylinder
+from compas_vol.primitives import VolSphere
+
+
+def grid():
+    return np.ogrid[-10:10:20j, -10:10:21j, -10:10:22j]
+
+
+def test_compile_matches_get_distance_numpy(node):
+    x, y, z = grid()
+    expected = node.get_distance_numpy(x, y, z)
+    assert np.allclose(compile(node)(x, y, z), expected)
+
+
+def test_compile_matches_get_distance_numpy_of_nested_trees(box, sphere, plane):
+    cylinder = VolCylinder(Cylinder(Circle(plane, 3), 7))
+    cone = VolCone(Cone(Circle(plane, 3), 7))
+    x, y, z = grid()
+    for tree in [
+        Union([box, sphere, cylinder, cone]),
+        Intersection(box, TPMS(0, 5.0)),
+        Subtraction(cylinder, sphere),
+        Blend(box, sphere, cone, 2.0, 1),
+        Shell(SmoothUnion(Intersection(box, cone), Subtraction(cylinder, sphere), 1.5), 0.7, 0.2),
+    ]:
+        assert np.allclose(compile(tree)(x, y, z), tree.get_distance_numpy(x, y, z))
+
+
+def test_compile_matches_get_distance(primitive):
+    x, y, z = grid()
+    d = compile(primitive)(x, y, z)
+    for i, j, k in [(0, 0, 0), (3, 17, 9), (10, 10, 11), (19, 20, 21)]:
+        assert d[i, j, k] == pytest.approx(primitive.get_distance(Point(x[i, 0, 0], y[0, j, 0], z[0, 0, k])))
+
+
+def test_compile_buffers_do_not_grow_with_node_count():
+    spheres = [VolSphere(Sphere(Point(i, 0, 0), 2)) for i in range(50)]
+    kernel = compile(Union(spheres))
+    assert kernel.nbuffers <= 3
+
+
+def test_compile_cache(sphere, box):
+    u = Union(sphere, box)
+    kernel = compile(u)
+    assert compile(u) is kernel
+    sphere.sphere.radius = 2.0
+    x, y, z = grid()
+    assert compile(u) is not kernel
+    assert np.allclose(compile(u)(x, y, z), u.get_distance_numpy(x, y, z))
+
+
+def test_compile_does_not_keep_tree_alive():
+    import gc
+    import weakref
+
+    from compas_vol.engine import compiler
+
+    tree = Union(VolSphere(Sphere(Point(1, 2, 3), 4)), TPMS(0, 5.0))
+    kernel = compile(tree)
+    x, y, z = grid()
+    kernel(x, y, z)
+    assert kernel._pool is None
+    ref = weakref.ref(tree)
+    del tree
+    gc.collect()
+    assert ref() is None
+    assert not any(r() is None for r, _ in compiler._KERNELS.values())
+    with pytest.raises(ReferenceError):
+        kernel(x, y, z)
+
+
+def test_compile_cache_buffers(sphere, box):
+    kernel = compile(Union(sphere, box))
+    kernel.cache_buffers = True
+    x, y, z = grid()
+    kernel(x, y, z)
+    assert kernel._pool is not None
+    kernel.clear()
+    assert kernel._pool is None
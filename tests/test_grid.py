@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from compas.geometry import Box
+from compas.geometry import Frame
+from compas.geometry import Point
+from compas.geometry import Sphere
+
+from compas_vol.combinations import SmoothUnion
+from compas_vol.engine import Grid
+from compas_vol.microstructures import TPMS
+from compas_vol.modifications import Overlay
+from compas_vol.primitives import VolBox
+from compas_vol.primitives import VolSphere
+
+
+def tree():
+    box = VolBox(Box(Frame.worldXY(), 5, 6, 7), 1.0)
+    sphere = VolSphere(Sphere(Point(1, 2, 3), 4))
+    return Overlay(SmoothUnion(box, sphere, 2.0), TPMS(0, 3.0), 0.2)
+
+
+def test_grid_from_bounds():
+    grid = Grid([(-10, 10, 21), (-5, 5, 11), (0, 2, 3)])
+    assert grid.shape == (21, 11, 3)
+    assert grid.spacing == (1.0, 1.0, 1.0)
+    x, y, z = grid.ogrid()
+    ox, oy, oz = np.ogrid[-10:10:21j, -5:5:11j, 0:2:3j]
+    assert np.array_equal(x, ox) and np.array_equal(y, oy) and np.array_equal(z, oz)
+
+
+def test_grid_from_spacing():
+    grid = Grid([(0, 10), (0, 10), (0, 10.5)], spacing=0.5)
+    assert grid.shape == (21, 21, 22)
+    assert grid.max == (10.0, 10.0, 10.5)
+    with pytest.raises(ValueError):
+        Grid([(0, 10), (0, 10), (0, 10)])
+
+
+@pytest.mark.parametrize('chunk_shape', [(7, 30, 40), (5, 6, 7), (1, 1, 40), (30, 30, 40)])
+def test_evaluate_chunked_matches_monolithic(chunk_shape):
+    obj = tree()
+    grid = Grid([(-10, 10), (-10, 10), (-10, 10)], resolution=(30, 30, 40))
+    x, y, z = np.ogrid[-10:10:30j, -10:10:30j, -10:10:40j]
+    expected = obj.get_distance_numpy(x, y, z)
+    assert np.array_equal(grid.evaluate(obj, chunk_shape=chunk_shape), expected)
+
+
+def test_chunk_shape_fits_memory_budget():
+    grid = Grid([(0, 1), (0, 1), (0, 1)], resolution=(100, 64, 64))
+    assert grid.chunk_shape(1 << 40) == (100, 64, 64)
+    nx, ny, nz = grid.chunk_shape(64 * 64 * 8 * grid.temporaries * 10)
+    assert (nx, ny, nz) == (10, 64, 64)
+    nx, ny, nz = grid.chunk_shape(1000)
+    assert nx * ny * nz * 8 * grid.temporaries <= 1000
+
+
+def test_evaluate_into_memmap(tmp_path):
+    obj = tree()
+    grid = Grid([(-10, 10), (-10, 10), (-10, 10)], resolution=24, dtype='float32')
+    out = grid.memmap(str(tmp_path / 'distances.npy'))
+    d = grid.evaluate(obj, out=out, memory_budget=1 << 16)
+    assert d is out
+    del d, out
+    x, y, z = grid.ogrid()
+    stored = np.load(str(tmp_path / 'distances.npy'))
+    assert stored.dtype == np.float32
+    assert np.allclose(stored, obj.get_distance_numpy(x, y, z))
+    with pytest.raises(ValueError):
+        grid.evaluate(obj, out=np.empty((2, 2, 2)))
+
+
+def test_chunk_shape_accounts_for_tree():
+    from compas_vol.combinations import Union
+    from compas_vol.engine.grid import temporaries
+
+    spheres = [VolSphere(Sphere(Point(i, 0, 0), 2)) for i in range(200)]
+    union = Union(spheres)
+    assert temporaries(spheres[0]) == Grid.temporaries
+    # children are reduced in place, one at a time
+    assert temporaries(union) == Grid.temporaries + 3
+    grid = Grid([(0, 1), (0, 1), (0, 1)], resolution=(100, 64, 64))
+    budget = 64 * 64 * 8 * Grid.temporaries * 10
+    nx, ny, nz = grid.chunk_shape(budget, union)
+    assert nx * ny * nz * 8 * temporaries(union) <= budget
@@ -0,0 +1,106 @@
+import numpy as np
+
+from compas.geometry import Box
+from compas.geometry import Frame
+from compas.geometry import Point
+from compas.geometry import Sphere
+
+from compas_vol.combinations import Morph
+from compas_vol.combinations import SmoothUnion
+from compas_vol.combinations import Union
+from compas_vol.engine import Grid
+from compas_vol.engine import IncrementalEvaluator
+from compas_vol.modifications import Shell
+from compas_vol.modifications import Twist
+from compas_vol.primitives import VolBox
+from compas_vol.primitives import VolSphere
+from compas_vol.utilities import notify_change
+from compas_vol.utilities import observe
+from compas_vol.utilities import unobserve
+
+
+def grid():
+    return Grid([(-15, 15), (-15, 15), (-15, 15)], resolution=(30, 31, 32))
+
+
+def sphere(radius=9):
+    return VolSphere(Sphere(Point(5, 6, 0), radius))
+
+
+def box():
+    return VolBox(Box(Frame.worldXY(), 20, 15, 10), 2.5)
+
+
+class Recorder(object):
+    def __init__(self):
+        self.changes = []
+
+    def changed(self, node, name):
+        self.changes.append((node, name))
+
+
+def test_setters_notify():
+    recorder = Recorder()
+    observe(recorder)
+    shell = Shell(sphere(), 1.0)
+    shell.thickness = 2.0
+    shell._private = 1
+    notify_change(shell, 'o')
+    unobserve(recorder)
+    shell.thickness = 3.0
+    names = [name for node, name in recorder.changes if node is shell]
+    # assignments in __init__ are not reported
+    assert names == ['thickness', 'o']
+
+
+def test_dirty_path():
+    s, b = sphere(), box()
+    union = SmoothUnion(s, b, 1.5)
+    tree = Morph(Shell(union, 1.0), box(), 0.3)
+    evaluator = IncrementalEvaluator(tree, grid(), chunk_shape=(10, 31, 32))
+    assert np.allclose(evaluator.evaluate(), grid().evaluate(tree))
+    assert evaluator.evaluated == 6 and evaluator.reused == 0
+
+    evaluator.evaluate()
+    assert evaluator.evaluated == 0
+
+    union.r = 3.0
+    assert np.allclose(evaluator.evaluate(), grid().evaluate(tree))
+    assert evaluator.evaluated == 3 and evaluator.reused == 3
+
+    tree.f = 0.6
+    assert np.allclose(evaluator.evaluate(), grid().evaluate(tree))
+    assert evaluator.evaluated == 1 and evaluator.reused == 2
+    evaluator.close()
+    union.r = 2.0
+    assert evaluator.evaluate() is not None
+
+
+def test_touch_and_replaced_children():
+    s = sphere()
+    tree = Union(s, box())
+    evaluator = IncrementalEvaluator(tree, grid())
+    evaluator.evaluate()
+    s.sphere.radius = 5
+    evaluator.touch(s)
+    assert np.allclose(evaluator.evaluate(), grid().evaluate(Union(sphere(5), box())))
+    assert evaluator.evaluated == 2 and evaluator.reused == 1
+
+    tree.objs = [sphere(3), tree.objs[1]]
+    assert np.allclose(evaluator.evaluate(), grid().evaluate(Union(sphere(3), box())))
+    assert evaluator.evaluated == 2 and evaluator.reused == 1
+    assert evaluator.nbytes == 3 * grid().nbytes
+
+
+def test_shared_and_transformed_children():
+    s = sphere()
+    twist = Twist(Shell(s, 1.0), Frame.worldXY(), 0.05)
+    tree = Union(s, twist)
+    evaluator = IncrementalEvaluator(tree, grid())
+    assert np.allclose(evaluator.evaluate(), grid().evaluate(tree))
+    twist.angle = 0.1
+    assert np.allclose(evaluator.evaluate(), grid().evaluate(tree))
+    assert evaluator.reused == 1
+    s.sphere.radius = 4
+    evaluator.touch(s)
+    assert np.allclose(evaluator.evaluate(), grid().evaluate(tree))
@@ -0,0 +1,69 @@
+import math
+
+import numpy as np
+import pytest
+
+from compas.geometry import Point
+from compas.geometry import Sphere
+
+from compas_vol.combinations import Union
+from compas_vol.primitives import VolSphere
+from compas_vol.primitives.gdf import GDF
+from compas_vol.utilities import Interval
+from compas_vol.utilities import distance_interval
+from compas_vol.utilities import interval_max
+from compas_vol.utilities import interval_min
+
+
+def boxes(count=25, seed=0):
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        lower = rng.uniform(-12, 10, 3)
+        yield tuple(lower), tuple(lower + rng.uniform(0.01, 1, 3) * rng.choice([1, 4, 12]))
+
+
+def assert_bounds(obj):
+    for lower, upper in boxes():
+        lo, hi = obj.get_distance_interval((lower, upper))
+        assert lo <= hi
+        x, y, z = (np.linspace(a, b, 7) for a, b in zip(lower, upper))
+        d = obj.get_distance_numpy(x[:, None, None], y[None, :, None], z[None, None, :])
+        assert (d >= lo - 1e-9).all() and (d <= hi + 1e-9).all()
+
+
+def test_interval_bounds(node):
+    assert_bounds(node)
+
+
+def test_gdf_interval_is_unbounded():
+    assert GDF().get_distance_interval(((0, 0, 0), (1, 1, 1))) == (-math.inf, math.inf)
+
+
+def test_sphere_interval_is_exact():
+    lo, hi = VolSphere(Sphere(Point(0, 0, 0), 1)).get_distance_interval(((2, -1, -1), (3, 1, 1)))
+    assert lo == pytest.approx(1.0)
+    assert hi == pytest.approx(math.sqrt(11) - 1)
+
+
+def test_union_interval_of_distant_spheres():
+    union = Union(VolSphere(Sphere(Point(0, 0, 0), 1)), VolSphere(Sphere(Point(100, 0, 0), 1)))
+    assert distance_interval(union, ((0, 0, 0), (1, 1, 1))) == Interval(-1, math.sqrt(3) - 1)
+
+
+def test_interval_arithmetic():
+    x = Interval(-1, 2)
+    assert x * x == Interval(-2, 4)
+    assert x ** 2 == Interval(0, 4)
+    assert abs(Interval(-3, -1)) == Interval(1, 3)
+    assert 1 - x == Interval(-1, 2)
+    assert Interval(1, 2) / Interval(2, 4) == Interval(0.25, 1)
+    assert Interval(1) / x == Interval(-math.inf, math.inf)
+    assert Interval(0, math.inf) * Interval(0) == Interval(0)
+    assert Interval(0, math.pi).sin() == Interval(0, 1)
+    assert Interval(0, 2 * math.pi).cos() == Interval(-1, 1)
+    assert Interval(5, 6).remainder(4) == Interval(1, 2)
+    assert Interval(3, 6).remainder(4) == Interval(0, 4)
+    assert interval_min((0, 3), (1, 2)) == Interval(0, 2)
+    assert interval_max((0, 3), (1, 2)) == Interval(1, 3)
+    with pytest.raises(ValueError):
+        x ** 0.5
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from compas.geometry import Point
+from compas.geometry import Sphere
+
+from compas_vol.combinations import Union
+from compas_vol.engine import compile_points
+from compas_vol.engine import jit
+from compas_vol.microstructures import TPMS
+from compas_vol.microstructures import TPMSPolar
+from compas_vol.primitives import VolSphere
+
+
+requires_numba = pytest.mark.skipif(jit.numba is None, reason='numba is not installed')
+
+
+def points():
+    return np.random.default_rng(0).uniform(-10, 10, (100, 3))
+
+
+@requires_numba
+def test_numba_matches_get_distance(node):
+    if type(node) not in jit._LOWERINGS:
+        pytest.skip('{} has no point lowering'.format(type(node).__name__))
+    pts = points()
+    kernel = compile_points(node, backend='numba')
+    assert kernel.backend == 'numba'
+    expected = [node.get_distance(tuple(p)) for p in pts]
+    assert np.allclose(kernel(pts), expected)
+
+
+@requires_numba
+def test_numba_matches_get_distance_numpy():
+    obj = TPMSPolar(1, 0.5, 2.0, 10.0)
+    pts = points()
+    expected = obj.get_distance_numpy(pts[:, 0], pts[:, 1], pts[:, 2])
+    assert np.allclose(compile_points(obj, backend='numba')(pts), expected)
+
+
+def test_numpy_fallback_matches_get_distance(node):
+    pts = points()
+    kernel = compile_points(node, backend='numpy')
+    assert kernel.backend == 'numpy'
+    expected = [node.get_distance(tuple(p)) for p in pts]
+    assert np.allclose(kernel(pts), expected)
+
+
+def test_missing_numba_falls_back_to_numpy(monkeypatch):
+    monkeypatch.setattr(jit, 'numba', None)
+    obj = VolSphere(Sphere(Point(1, 2, 3), 4))
+    kernel = jit.PointKernel(obj)
+    assert kernel.backend == 'numpy'
+    union = Union(obj, TPMS(0, 3.0))
+    pts = points()
+    assert np.allclose(jit.PointKernel(union)(pts), union.get_distance_numpy(pts[:, 0], pts[:, 1], pts[:, 2]))
+    with pytest.raises(ImportError):
+        jit.PointKernel(obj, backend='numba')
+
+
+@requires_numba
+def test_numba_large_union():
+    spheres = [VolSphere(Sphere(Point(i, 0, 0), 2)) for i in range(40)]
+    obj = Union(spheres)
+    pts = points()
+    kernel = compile_points(obj)
+    assert kernel.backend == 'numba'
+    assert np.allclose(kernel(pts), [obj.get_distance(tuple(p)) for p in pts])
+
+
+@requires_numba
+def test_numba_compiles_once_for_all_trees():
+    pts = points()
+    compile_points(VolSphere(Sphere(Point(0, 0, 0), 1)))(pts)
+    signatures = len(jit._kernel.signatures)
+    spheres = [VolSphere(Sphere(Point(i, 0, 0), 2)) for i in range(10)]
+    obj = Union(spheres)
+    compile_points(obj)(pts)
+    spheres[0].sphere.radius = 3.0
+    kernel = compile_points(obj)
+    assert np.allclose(kernel(pts), [obj.get_distance(tuple(p)) for p in pts])
+    assert len(jit._kernel.signatures) == signatures
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from skimage.measure import marching_cubes
+
+from compas.geometry import Box
+from compas.geometry import Frame
+from compas.geometry import Point
+from compas.geometry import Sphere
+
+from compas_vol.engine import Grid
+from compas_vol.meshing import chunked_marching_cubes
+from compas_vol.primitives import VolSphere
+from compas_vol.utilities import get_iso_vfs
+
+
+def area(vertices, faces):
+    t = vertices[faces]
+    return 0.5 * np.linalg.norm(np.cross(t[:, 1] - t[:, 0], t[:, 2] - t[:, 0]), axis=-1).sum()
+
+
+@pytest.fixture
+def grid():
+    return Grid([(-50, 50), (-50, 50), (-50, 50)], resolution=(81, 70, 63))
+
+
+def test_matches_single_call(grid, part):
+    vertices, faces = chunked_marching_cubes(part, grid, chunk_shape=(16, 20, 13))
+    single, single_faces, _, _ = marching_cubes(grid.evaluate(part), 0.0, spacing=grid.spacing)
+    assert len(vertices) == len(single)
+    assert len(faces) == len(single_faces)
+    assert np.isclose(area(vertices, faces), area(single, single_faces))
+    assert np.allclose(vertices.min(axis=0), single.min(axis=0) + grid.min)
+
+
+def test_watertight_without_duplicates(grid, part):
+    vertices, faces = chunked_marching_cubes(part, grid, chunk_shape=(9, 9, 9), workers=3)
+    edges = np.sort(np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]]), axis=-1)
+    _, counts = np.unique(edges, axis=0, return_counts=True)
+    assert (counts == 2).all()
+    assert len(np.unique(vertices, axis=0)) == len(vertices)
+    assert len(np.unique(faces)) == len(vertices)
+
+
+def test_array_source(grid, part):
+    volume = grid.evaluate(part)
+    a = chunked_marching_cubes(part, grid, chunk_shape=(32, 32, 32))
+    b = chunked_marching_cubes(volume, grid, chunk_shape=(32, 32, 32))
+    assert np.allclose(a[0], b[0])
+    assert np.array_equal(a[1], b[1])
+    with pytest.raises(ValueError):
+        chunked_marching_cubes(volume[1:], grid)
+
+
+def test_empty():
+    grid = Grid([(-5, 5), (-5, 5), (-5, 5)], resolution=20)
+    vertices, faces = chunked_marching_cubes(VolSphere(Sphere(Point(20, 0, 0), 1)), grid)
+    assert vertices.shape == (0, 3) and faces.shape == (0, 3)
+
+
+def test_get_iso_vfs():
+    box = Box(Frame.worldXY(), 6, 4, 2)
+    vertices, faces = get_iso_vfs({'box': box.data, 'radius': 0.5}, [(-5, 5, 41), (-5, 5, 41), (-5, 5, 41)])
+    assert isinstance(vertices, np.ndarray) and isinstance(faces, np.ndarray)
+    assert np.allclose(vertices.max(axis=0) - vertices.min(axis=0), [6, 4, 2], atol=0.3)
+    assert np.allclose((vertices.max(axis=0) + vertices.min(axis=0)) / 2, [5, 5, 5], atol=0.1)
@@ -0,0 +1,94 @@
+import numpy as np
+
+from compas.geometry import Box
+from compas.geometry import Frame
+from compas.geometry import Point
+from compas.geometry import Sphere
+
+from compas_vol.combinations import SmoothUnion
+from compas_vol.combinations import Union
+from compas_vol.engine import Grid
+from compas_vol.modifications import Shell
+from compas_vol.primitives import VolBox
+from compas_vol.primitives import VolSphere
+from compas_vol.utilities import SubtreeCache
+from compas_vol.utilities import get_subtree_cache
+from compas_vol.utilities import subtree_caching
+
+
+class Counted(object):
+    """A sphere that counts its evaluations."""
+
+    def __init__(self, radius):
+        self.sphere = VolSphere(Sphere(Point(5, 0, 0), radius))
+        self.calls = 0
+
+    def __getstate__(self):
+        return {'radius': self.sphere.sphere.radius}
+
+    def get_distance_numpy(self, x, y, z):
+        self.calls += 1
+        return self.sphere.get_distance_numpy(x, y, z)
+
+
+def tree(leaf):
+    return Shell(SmoothUnion(leaf, VolBox(Box(Frame.worldXY(), 20, 15, 10), 2.5), 1.5), 1.0)
+
+
+def grid():
+    return Grid([(-15, 15), (-15, 15), (-15, 15)], resolution=30)
+
+
+def test_parent_change_reevaluates_parent():
+    leaf = Counted(9)
+    t = tree(leaf)
+    expected = grid().evaluate(t).copy()
+    with subtree_caching() as cache:
+        assert np.array_equal(grid().evaluate(t), expected)
+        assert cache.misses == 4 and leaf.calls == 2
+        t.o.r = 2.0
+        a = grid().evaluate(t).copy()
+        assert (cache.hits, cache.misses, leaf.calls) == (2, 6, 2)
+        t.thickness = 2.0
+        b = grid().evaluate(t)
+        assert (cache.hits, cache.misses, leaf.calls) == (3, 7, 2)
+    assert get_subtree_cache() is None
+    assert np.array_equal(a, grid().evaluate(Shell(SmoothUnion(Counted(9), t.o.b, 2.0), 1.0)))
+    assert np.allclose(b, grid().evaluate(Shell(SmoothUnion(Counted(9), t.o.b, 2.0), 2.0)))
+
+
+def test_leaf_change_keeps_siblings():
+    leaf = Counted(9)
+    t = Union(leaf, VolBox(Box(Frame.worldXY(), 20, 15, 10), 2.5))
+    with subtree_caching() as cache:
+        grid().evaluate(t)
+        leaf.sphere.sphere.radius = 8
+        d = grid().evaluate(t)
+        assert (cache.hits, cache.misses) == (1, 5)
+    assert np.array_equal(d, grid().evaluate(Union(Counted(8), t.objs[1])))
+
+
+def test_coordinates_and_culling_are_part_of_the_key():
+    t = Union(VolSphere(Sphere(Point(10, 0, 0), 3)), VolBox(Box(Frame.worldXY(), 6, 5, 4), 0.5))
+    culled = grid().evaluate(t, cull=True)
+    with subtree_caching() as cache:
+        full = grid().evaluate(t).copy()
+        Grid([(-15, 15), (-15, 15), (-15, 16)], resolution=30).evaluate(t)
+        assert cache.hits == 0
+        assert np.array_equal(grid().evaluate(t, cull=True), culled)
+        assert np.array_equal(grid().evaluate(t), full)
+    assert not np.array_equal(culled, full)
+
+
+def test_eviction_by_bytes():
+    size = grid().nbytes
+    cache = SubtreeCache(max_bytes=int(2.5 * size))
+    with subtree_caching(cache):
+        for radius in (7, 8, 9):
+            grid().evaluate(tree(Counted(radius)))
+    assert len(cache) == 2 and cache.nbytes == 2 * size
+    assert cache.evictions == 10
+    # the box of each tree is evicted by the combinations above it before the next tree
+    assert cache.stats == {'hits': 0, 'misses': 12, 'evictions': 10, 'entries': 2, 'nbytes': 2 * size}
+    cache.clear()
+    assert cache.stats['nbytes'] == 0 and len(cache) == 0
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from compas.geometry import Point
+from compas.geometry import Sphere
+
+from compas_vol.meshing import Octree
+from compas_vol.meshing import morton_decode
+from compas_vol.meshing import morton_encode
+from compas_vol.primitives import VolSphere
+
+
+def test_morton_roundtrip():
+    rng = np.random.default_rng(0)
+    i, j, k = (rng.integers(0, 2 ** 21, 1000, dtype=np.uint64) for _ in range(3))
+    codes = morton_encode(i, j, k)
+    for a, b in zip(morton_decode(codes), (i, j, k)):
+        assert np.array_equal(a, b)
+    assert [int(morton_encode(*ijk)) for ijk in [(1, 0, 0), (0, 1, 0), (0, 0, 1), (1, 1, 1), (2, 0, 0)]] == [1, 2, 4, 7, 8]
+
+
+def test_leaves_partition_the_cube(part):
+    octree = Octree(part, center=(1, 2, 3), size=100.0, depth=6).build()
+    assert np.isclose((octree.sizes() ** 3).sum(), 100.0 ** 3)
+    centers = octree.centers()
+    assert np.array_equal(octree.locate(centers), np.arange(len(octree)))
+    assert np.allclose(octree.distances, part.get_distance_numpy(*centers.T))
+
+
+def test_pruned_leaves_are_off_the_surface(part):
+    octree = Octree(part, size=100.0, depth=6).build()
+    coarse = octree.levels < octree.depth
+    assert coarse.any()
+    assert (np.abs(octree.distances[coarse]) > octree.half_diagonal(octree.levels[coarse].astype(float))).all()
+
+
+def test_surface_points_are_in_active_leaves(part):
+    octree = Octree(part, size=100.0, depth=7).build()
+    rng = np.random.default_rng(1)
+    points = rng.uniform(-50, 50, (200000, 3))
+    near = np.abs(part.get_distance_numpy(*points.T)) < 0.1
+    assert near.sum() > 100
+    leaves = octree.locate(points[near])
+    assert (leaves >= 0).all()
+    assert octree.active[leaves].all()
+
+
+def test_locate_outside():
+    octree = Octree(VolSphere(Sphere(Point(0, 0, 0), 3)), size=10.0, depth=3).build()
+    assert list(octree.locate(np.array([[6.0, 0, 0], [0, 0, -5.5], [4.9, 4.9, 4.9]]))[:2]) == [-1, -1]
+
+
+def test_evaluations_are_a_fraction_of_the_grid():
+    octree = Octree(VolSphere(Sphere(Point(0, 0, 0), 30)), size=100.0, depth=8).build()
+    assert octree.evaluations * 20 < 256 ** 3
+
+
+def test_depth_bounds():
+    with pytest.raises(ValueError):
+        Octree(depth=22)
+    with pytest.raises(ValueError):
+        Octree().build()
@@ -0,0 +1,102 @@
+import subprocess
+import sys
+import textwrap
+
+import numpy as np
+import pytest
+
+from compas.geometry import Point
+from compas.geometry import Sphere
+
+from compas_vol.engine import Grid
+from compas_vol.engine import ThreadEvaluator
+from compas_vol.meshing import chunked_marching_cubes
+from compas_vol.modifications import Blur
+from compas_vol.primitives import VolSphere
+
+
+def test_page_aligned():
+    grid = Grid([(-5, 5), (-5, 5), (-5, 5)], resolution=(100, 30, 30), dtype='float32')
+    # a yz-plane of 3600 bytes ends on a page boundary every 1024 planes
+    assert grid.page_aligned((70, 30, 30), 4096) == (70, 30, 30)
+    grid = Grid([(-5, 5), (-5, 5), (-5, 5)], resolution=(100, 16, 32), dtype='float32')
+    assert grid.page_aligned((71, 16, 32), 4096) == (70, 16, 32)
+    grid = Grid([(-5, 5), (-5, 5), (-5, 5)], resolution=(100, 64, 32), dtype='float32')
+    assert grid.page_aligned((1, 40, 32), 4096) == (1, 32, 32)
+    assert grid.page_aligned((1, 20, 32), 4096) == (1, 20, 32)
+    assert grid.page_aligned((10, 10, 10), 4096) == (10, 10, 10)
+
+
+def test_evaluate_into_aligned_memmap(tmp_path):
+    grid = Grid([(-5, 5), (-5, 5), (-5, 5)], resolution=(50, 32, 32), dtype='float32')
+    sphere = VolSphere(Sphere(Point(0, 0, 0), 3))
+    out = grid.evaluate(sphere, out=grid.memmap(str(tmp_path / 'a.npy')), memory_budget=32 * 32 * 4 * 8 * 70)
+    assert np.allclose(out, grid.evaluate(sphere))
+    with ThreadEvaluator(2) as evaluator:
+        out = evaluator.evaluate(sphere, grid, out=grid.memmap(str(tmp_path / 'b.npy')))
+    assert np.allclose(out, grid.evaluate(sphere))
+
+
+def test_chunked_blur(tmp_path):
+    rng = np.random.default_rng(0)
+    matrix = rng.normal(size=(40, 33, 27))
+    expected = Blur(matrix, 1.5).get_blurred()
+    assert np.allclose(Blur(matrix, 1.5).get_blurred(chunk_shape=(7, 9, 11)), expected, atol=1e-12)
+    source = np.lib.format.open_memmap(str(tmp_path / 'm.npy'), mode='w+', dtype=float, shape=matrix.shape)
+    source[...] = matrix
+    out = np.lib.format.open_memmap(str(tmp_path / 'b.npy'), mode='w+', dtype=float, shape=matrix.shape)
+    assert Blur(source, 1.5).get_blurred(out=out, memory_budget=200000) is out
+    assert np.allclose(out, expected, atol=1e-12)
+
+
+def test_mesh_memmap_by_rows(tmp_path):
+    grid = Grid([(-5, 5), (-5, 5), (-5, 5)], resolution=40)
+    sphere = VolSphere(Sphere(Point(0, 0, 0), 3))
+    volume = grid.evaluate(sphere, out=grid.memmap(str(tmp_path / 'a.npy')))
+    vertices, faces = chunked_marching_cubes(np.load(str(tmp_path / 'a.npy'), mmap_mode='r'), grid)
+    expected = chunked_marching_cubes(np.asarray(volume), grid, chunk_shape=(40, 40, 40))
+    assert np.allclose(vertices, expected[0]) and np.array_equal(faces, expected[1])
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='limits the data segment with RLIMIT_DATA')
+def test_grid_larger_than_memory(tmp_path):
+    # the volume is larger than the limit of the private memory of the process, and only ever mapped from its file
+    script = textwrap.dedent('''
+        import resource
+        import sys
+        import numpy as np
+        from compas.geometry import Point, Sphere
+        from compas_vol.engine import Grid
+        from compas_vol.meshing import chunked_marching_cubes
+        from compas_vol.modifications import Blur
+        from compas_vol.primitives import VolSphere
+
+        # the data segment after the imports, and 160 MiB more
+        used = int(open('/proc/self/status').read().split('VmData:')[1].split()[0]) * 1024
+        limit = used + 160 * 2 ** 20
+        resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+        try:
+            np.ones(limit // 8)
+        except MemoryError:
+            pass
+        else:
+            sys.exit('the limit does not apply')
+
+        folder = sys.argv[1]
+        grid = Grid([(-5, 5), (-5, 5), (-5, 5)], resolution=(880, 440, 440), dtype='float32')
+        assert grid.nbytes > limit
+        # a small sphere, since the mesh itself is kept in memory
+        sphere = VolSphere(Sphere(Point(0, 0, 0), 2.5))
+        d = grid.evaluate(sphere, out=grid.memmap(folder + '/d.npy'), memory_budget=2 ** 24)
+        b = Blur(d, 1.0).get_blurred(out=grid.memmap(folder + '/b.npy'), memory_budget=2 ** 24)
+        del d, b
+        b = np.load(folder + '/b.npy', mmap_mode='r')
+        vertices, faces = chunked_marching_cubes(b, grid, workers=2)
+        r = np.linalg.norm(vertices, axis=-1)
+        assert abs(r.mean() - 2.5) < 0.05, r.mean()
+        assert abs(float(b[440, 220, 220]) + 2.5) < 0.05
+        print(len(faces))
+    ''')
+    result = subprocess.run([sys.executable, '-c', script, str(tmp_path)], capture_output=True, text=True, timeout=600)
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert int(result.stdout.split()[-1]) > 100000
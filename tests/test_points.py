@@ -0,0 +1,69 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from compas.geometry import Point
+from compas.geometry import Sphere
+
+from compas_vol.combinations import Union
+from compas_vol.engine import evaluate_points
+from compas_vol.primitives import VolSphere
+from compas_vol.primitives.gdf import GDF
+from compas_vol.utilities import distance_points
+
+
+def points(n=500):
+    return np.random.default_rng(0).uniform(-10, 10, (n, 3))
+
+
+def test_get_distance_points_matches_get_distance(node):
+    pts = points()
+    d = node.get_distance_points(pts)
+    assert d.shape == (len(pts),)
+    assert np.allclose(d, [node.get_distance(tuple(p)) for p in pts])
+
+
+def test_all_objects_share_distance_points(node):
+    assert type(node).get_distance_points is distance_points
+    assert GDF.get_distance_points is distance_points
+
+
+def test_evaluate_points_in_chunks(node):
+    pts = points()
+    expected = node.get_distance_points(pts)
+    assert np.allclose(evaluate_points(node, pts, chunk_size=7), expected)
+    d = evaluate_points(node, pts.astype('float32'), chunk_size=64)
+    assert d.dtype == np.float32
+    assert np.allclose(d, expected, rtol=1e-5, atol=1e-4)
+
+
+def test_evaluate_points_memmap(tmp_path, sphere, box):
+    obj = Union([sphere, box])
+    src = np.lib.format.open_memmap(str(tmp_path / 'points.npy'), mode='w+', dtype='float32', shape=(10000, 3))
+    src[:] = points(10000)
+    out = np.lib.format.open_memmap(str(tmp_path / 'distances.npy'), mode='w+', dtype='float32', shape=(10000,))
+    assert obj.get_distance_points(src, out=out) is out
+    del out
+    assert np.allclose(np.load(str(tmp_path / 'distances.npy')), obj.get_distance_points(np.array(src)))
+
+
+def test_evaluate_points_memory_is_bounded():
+    obj = Union([VolSphere(Sphere(Point(i, 0, 0), 2)) for i in range(10)])
+    pts = points(1000000)
+    out = np.empty(len(pts))
+    tracemalloc.start()
+    try:
+        evaluate_points(obj, pts, out=out, memory_budget=1 << 20)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < 4 << 20
+
+
+def test_evaluate_points_checks_shapes():
+    obj = VolSphere(Sphere(Point(1, 2, 3), 4))
+    with pytest.raises(ValueError):
+        evaluate_points(obj, np.zeros((10, 2)))
+    with pytest.raises(ValueError):
+        evaluate_points(obj, np.zeros((10, 3)), out=np.zeros(11))
@@ -0,0 +1,89 @@
+import threading
+
+import numpy as np
+import pytest
+
+from compas.geometry import matrix_from_frame
+
+from compas_vol.combinations import Union
+from compas_vol.engine import Grid
+from compas_vol.engine import ThreadEvaluator
+from compas_vol.utilities import get_precision
+from compas_vol.utilities import precision
+from compas_vol.utilities import set_precision
+from compas_vol.utilities import transform_coordinates
+
+
+def ogrid(dtype):
+    # the sample points avoid the axes of the polar microstructures, where they are discontinuous
+    x, y, z = np.ogrid[-10:10:31j, -9:9:29j, -8:8:27j]
+    return x.astype(dtype), y.astype(dtype), z.astype(dtype)
+
+
+def test_float32_error_is_bounded(node):
+    d64 = node.get_distance_numpy(*ogrid('float64'))
+    d32 = node.get_distance_numpy(*ogrid('float32'))
+    assert d32.dtype == np.float32
+    assert d32.shape == d64.shape
+    # a few units in the last place of single precision, relative to the extent of the grid
+    assert np.allclose(d32, d64, rtol=1e-5, atol=1e-4)
+
+
+def test_precision_sets_grid_dtype():
+    assert Grid([(-5, 5), (-5, 5), (-5, 5)], resolution=10).dtype == 'float64'
+    with precision('float32'):
+        assert get_precision() == 'float32'
+        grid = Grid([(-5, 5), (-5, 5), (-5, 5)], resolution=10)
+    assert get_precision() == 'float64'
+    assert grid.dtype == 'float32'
+    assert all(a.dtype == np.float32 for a in grid.axes())
+
+
+def test_precision_is_local_to_thread():
+    seen = []
+    with precision('float32'):
+        thread = threading.Thread(target=lambda: seen.append(get_precision()))
+        thread.start()
+        thread.join()
+    assert seen == ['float64']
+
+
+def test_set_precision():
+    try:
+        set_precision('float32')
+        assert get_precision() == 'float32'
+        with precision('float64'):
+            assert get_precision() == 'float64'
+        assert get_precision() == 'float32'
+    finally:
+        set_precision('float64')
+
+
+def test_precision_rejects_other_types():
+    with pytest.raises(ValueError):
+        with precision('int32'):
+            pass
+
+
+def test_transform_coordinates(frame):
+    matrix = matrix_from_frame(frame)
+    x, y, z = ogrid('float32')
+    xt, yt, zt = transform_coordinates(matrix, x, y, z)
+    assert xt.dtype == yt.dtype == zt.dtype == np.float32
+    p = np.stack(np.broadcast_arrays(x, y, z, 1.0)).reshape(4, -1).astype('float64')
+    expected = np.dot(np.array(matrix), p)[:3].reshape((3,) + xt.shape)
+    assert np.allclose(np.stack((xt, yt, zt)), expected, atol=1e-5)
+
+
+@pytest.mark.parametrize('compiled', [True, False])
+def test_float32_grid_evaluation(compiled, sphere, box):
+    obj = Union([sphere, box])
+    bounds = [(-10, 10), (-10, 10), (-10, 10)]
+    with precision('float32'):
+        grid = Grid(bounds, resolution=24)
+    expected = Grid(bounds, resolution=24).evaluate(obj)
+    with ThreadEvaluator(2) as evaluator:
+        d = evaluator.evaluate(obj, grid, compiled=compiled)
+    assert d.dtype == np.float32
+    assert np.allclose(d, expected, atol=1e-4)
+    assert np.allclose(grid.evaluate(obj), expected, atol=1e-4)
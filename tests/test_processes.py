@@ -0,0 +1,80 @@
+import pickle
+import sys
+
+import numpy as np
+import pytest
+
+from compas.geometry import Box
+from compas.geometry import Frame
+
+from compas_vol.combinations import Intersection
+from compas_vol.combinations import Union
+from compas_vol.engine import Grid
+from compas_vol.engine import ProcessEvaluator
+from compas_vol.engine import SharedArray
+from compas_vol.microstructures import Lattice
+from compas_vol.microstructures import TPMS
+from compas_vol.microstructures import TPMSPolar
+from compas_vol.microstructures import Voronoi
+from compas_vol.primitives import VolBox
+
+
+def assert_pickle_roundtrip(obj):
+    copy = pickle.loads(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))
+    for point in [(0.5, 0.2, 0.1), (3.0, -2.0, 1.5), (-4.0, 6.0, -3.0)]:
+        assert copy.get_distance(point) == pytest.approx(obj.get_distance(point))
+
+
+def test_pickle_roundtrip(node):
+    assert_pickle_roundtrip(node)
+
+
+def test_pickle_roundtrip_of_microstructures_in_a_union():
+    assert_pickle_roundtrip(Union([TPMS(0, 3.0), Lattice(1, 4.0, 0.3)]))
+
+
+def test_pickle_default_voronoi():
+    copy = pickle.loads(pickle.dumps(Voronoi()))
+    assert copy.points is None
+
+
+def test_pickle_roundtrip_numpy():
+    obj = TPMSPolar(1, 0.5, 2.0, 10.0)
+    copy = pickle.loads(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))
+    x, y, z = np.ogrid[-5:5:10j, -5:5:10j, -5:5:10j]
+    assert np.array_equal(copy.get_distance_numpy(x, y, z), obj.get_distance_numpy(x, y, z))
+
+
+def test_shared_array():
+    with SharedArray((4, 5, 6), 'float32') as a:
+        a.array[:] = 1.0
+        b = SharedArray(a.shape, a.dtype, name=a.name)
+        b.array[0] = 2.0
+        b.close()
+        assert a.array.sum() == 4 * 5 * 6 + 5 * 6
+        assert np.asarray(a) is a.array
+
+
+def test_process_evaluator_matches_grid():
+    tree = Intersection(VolBox(Box(Frame.worldXY(), 30, 30, 30), 1.0), Lattice(1, 5.0, 0.6))
+    grid = Grid([(-20, 20), (-20, 20), (-20, 20)], resolution=(40, 30, 20))
+    expected = grid.evaluate(tree)
+    with ProcessEvaluator(2) as evaluator:
+        for _ in range(2):
+            with evaluator.evaluate(tree, grid) as d:
+                assert np.array_equal(d.array, expected)
+        with SharedArray(grid.shape) as out:
+            evaluator.evaluate(tree, grid, out=out, chunk_shape=(7, 30, 20))
+            assert np.array_equal(out.array, expected)
+        with SharedArray((2, 2, 2)) as out:
+            with pytest.raises(ValueError):
+                evaluator.evaluate(tree, grid, out=out)
+
+
+def test_shared_memory_missing(monkeypatch):
+    # as on Python 3.6 and 3.7, before multiprocessing.shared_memory
+    monkeypatch.setitem(sys.modules, 'multiprocessing.shared_memory', None)
+    with pytest.raises(ImportError, match='Python 3.8'):
+        ProcessEvaluator(1)
+    with pytest.raises(ImportError, match='Python 3.8'):
+        SharedArray((2, 2))
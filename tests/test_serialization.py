@@ -0,0 +1,121 @@
+import json
+
+import numpy as np
+import pytest
+
+from compas.geometry import Box
+from compas.geometry import Circle
+from compas.geometry import Cone
+from compas.geometry import Frame
+from compas.geometry import Plane
+from compas.geometry import Point
+from compas.geometry import Sphere
+from compas.geometry import Torus
+
+from compas_vol.combinations import Blend
+from compas_vol.combinations import Division
+from compas_vol.combinations import SmoothUnion
+from compas_vol.combinations import SmoothUnionList
+from compas_vol.combinations import Union
+from compas_vol.microstructures import Lattice
+from compas_vol.microstructures import TPMS
+from compas_vol.microstructures import Voronoi
+from compas_vol.modifications import Factor
+from compas_vol.modifications import Shell
+from compas_vol.modifications import Sine
+from compas_vol.modifications import Twist
+from compas_vol.modifications.transformation import VolTransformation
+from compas_vol.primitives import VolBox
+from compas_vol.primitives import VolCapsule
+from compas_vol.primitives import VolCone
+from compas_vol.primitives import VolExtrusion
+from compas_vol.primitives import VolSphere
+from compas_vol.primitives import VolTorus
+from compas_vol.utilities import data_content
+from compas_vol.utilities import deserialize_tree
+from compas_vol.utilities import serialize_tree
+from compas_vol.utilities import structural_key
+from compas_vol.utilities import tree_from_data
+from compas_vol.utilities import tree_to_data
+from compas_vol.utilities.serialization import _pack
+from compas_vol.utilities.serialization import _unpack
+
+FRAME = Frame((1, 2, 3), (1, 0.2, 0), (0, 1, 0.3))
+SPHERE = VolSphere(Sphere(Point(1, 2, 3), 4))
+BOX = VolBox(Box(FRAME, 4, 5, 6), 0.5)
+
+TREES = [
+    SPHERE,
+    BOX,
+    VolCapsule(([0, 0, 0], [1, 2, 3]), 1.5),
+    VolCone(Cone(Circle(Plane((0, 0, 0), (0, 0, 1)), 2), 5)),
+    VolTorus(Torus(Plane((0, 0, 0), (0, 0, 1)), 5, 1)),
+    VolExtrusion([[0, 0, 0], [3, 0, 0], [3, 3, 0], [0, 0, 0]], 2.0, FRAME),
+    Lattice(1, 3.0, 0.2, FRAME),
+    TPMS(1, 4.0),
+    Voronoi([Point(0, 0, 0), Point(1, 2, 3)], 0.5),
+    Union(SPHERE, BOX),
+    SmoothUnionList([SPHERE, BOX], 2.0),
+    Blend(SPHERE, BOX, TPMS(0, 3.0), 1.0),
+    Shell(SmoothUnion(SPHERE, BOX, 1.5), 1.0, 0.5),
+    Factor(Sine(SPHERE), 2.0),
+    VolTransformation(Twist(BOX, FRAME, 0.3), FRAME),
+]
+
+
+@pytest.mark.parametrize('tree', TREES, ids=lambda t: type(t).__name__)
+@pytest.mark.parametrize('binary', [False, True])
+def test_round_trip(tree, binary):
+    payload = serialize_tree(tree, binary=binary)
+    copy = deserialize_tree(payload, cache=False)
+    assert type(copy) is type(tree) and copy is not tree
+    assert structural_key(copy) == structural_key(tree)
+    x, y, z = np.ogrid[-8:8:12j, -8:8:12j, -8:8:12j]
+    assert np.allclose(copy.get_distance_numpy(x, y, z), tree.get_distance_numpy(x, y, z))
+
+
+def test_to_data_is_json():
+    tree = Shell(Union(SPHERE, BOX), 1.0)
+    data = tree_to_data(tree)
+    assert data == tree.to_data() == json.loads(json.dumps(data))
+    assert data['type'] == 'Shell' and data['content']['o']['type'] == 'Union'
+    assert type(tree_from_data(data)) is Shell
+    # from_data takes the data of an object or its content
+    content = data_content(data)
+    assert type(content['o']) is Union and structural_key(Shell.from_data(data['content'])) == structural_key(tree)
+    with pytest.raises(ValueError):
+        tree_from_data({'type': 'Unknown', 'content': {}})
+
+
+def test_deserialize_cache():
+    payload = serialize_tree(Union(SPHERE, BOX))
+    tree = deserialize_tree(payload)
+    assert deserialize_tree(payload) is tree
+    assert deserialize_tree(payload.encode('utf-8')) is tree
+    assert deserialize_tree(payload, cache=False) is not tree
+    assert structural_key(deserialize_tree(json.loads(payload))) == structural_key(tree)
+    with pytest.raises(ValueError):
+        deserialize_tree("Union([VolSphere(Sphere(Point(1, 2, 3), 4))])")
+
+
+def test_messagepack():
+    values = [None, True, False, 0, 127, 128, -1, -32, -33, 1 << 40, -(1 << 40), 0.5, '', 'x' * 31, 'y' * 300, b'\x00\x01',
+              list(range(20)), dict(('k{}'.format(i), i) for i in range(20)), {'a': [1.5, {'b': None}]}]
+    for value in values:
+        assert _unpack(_pack(value)) == value
+    assert _pack({'a': 1}) == b'\x81\xa1a\x01'
+
+
+def test_reprs():
+    assert repr(SmoothUnionList([SPHERE, BOX], 2.0)).startswith('SmoothUnionList([VolSphere(')
+    assert repr(Factor(SPHERE, 2.0)) == 'Factor({},2.0)'.format(SPHERE)
+    assert repr(Sine(SPHERE)) == 'Sine({})'.format(SPHERE)
+    assert repr(Division(SPHERE, BOX)) == 'Division({},{})'.format(SPHERE, BOX)
+
+
+def test_get_vfs_from_tree():
+    from compas_vol.utilities.comm import get_vfs_from_tree
+
+    vertices, faces = get_vfs_from_tree(serialize_tree(SPHERE), [(-5, 7, 30), (-4, 8, 30), (-3, 9, 30)], None)
+    assert len(vertices) and len(faces)
+    assert np.allclose(np.linalg.norm(vertices + (-5, -4, -3) - (1, 2, 3), axis=1), 4, atol=0.1)
@@ -0,0 +1,186 @@
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from compas.geometry import Point
+from compas.geometry import Sphere
+
+from compas_vol.engine import Grid
+from compas_vol.meshing import chunked_marching_cubes
+from compas_vol.primitives import VolSphere
+from compas_vol.utilities import Coalescer
+from compas_vol.utilities import MeshClient
+from compas_vol.utilities import MeshServer
+from compas_vol.utilities import serialize_tree
+from compas_vol.utilities.server import _PREFIX
+from compas_vol.utilities.server import _receive
+
+
+BOUNDS = [(-15, 15, 48), (-12, 12, 40), (-10, 10, 32)]
+
+
+@pytest.fixture
+def server(tmp_path):
+    with MeshServer(port=0, workers=4, cache=str(tmp_path / 'cache')).start() as server:
+        yield server
+
+
+@pytest.mark.parametrize('binary', [True, False])
+def test_mesh_matches_chunked_marching_cubes(server, tree, binary):
+    vertices, faces = chunked_marching_cubes(tree, Grid(BOUNDS))
+    with MeshClient(server.address) as client:
+        client.ping()
+        v, f = client.mesh(serialize_tree(tree, binary=binary), BOUNDS)
+    assert v.dtype == np.float32 and f.dtype == np.uint32
+    assert np.allclose(v, vertices, atol=1e-5) and np.array_equal(f, faces)
+
+
+def test_repeated_requests_are_cached(server, tree):
+    payload = serialize_tree(tree)
+    _, _, cached = server.mesh(payload, [b[:2] for b in BOUNDS], resolution=[b[2] for b in BOUNDS])
+    assert not cached
+    # the same tree over the same grid, serialized differently and with the grid given as triples
+    v, f, cached = server.mesh(serialize_tree(tree, binary=True), BOUNDS)
+    assert cached
+    with MeshClient(server.address) as client:
+        a, b = client.mesh(tree, BOUNDS)
+        c, d = client.mesh(tree, BOUNDS, level=1.0)
+    assert np.array_equal(a, v) and np.array_equal(b, f)
+    assert len(c) != len(a)
+    assert len(server.cache) == 1
+
+
+def test_errors_keep_the_connection(server, tree):
+    with MeshClient(server.address) as client:
+        with pytest.raises(ValueError):
+            client.mesh('{"compas_vol":1,"tree":{"type":"Nothing","content":{}}}', BOUNDS)
+        with pytest.raises(ValueError):
+            client._request({'method': 'evaluate'})
+        v, f = client.mesh(tree, BOUNDS)
+    assert len(v) and len(f)
+
+
+def test_messages_beyond_the_limits_close_the_connection(tree):
+    with MeshServer(port=0, max_header=1000, max_request=100000).start() as server:
+        for prefix in (_PREFIX.pack(1 << 31, 0), _PREFIX.pack(10, 1 << 62)):
+            with socket.create_connection(server.address) as sock:
+                sock.sendall(prefix)
+                header, _ = _receive(sock)
+                assert header['status'] == 'error' and 'exceeds the limit' in header['error']
+                assert _receive(sock) is None
+        with MeshClient(server.address) as client:
+            v, f = client.mesh(tree, BOUNDS, binary=True)
+    assert len(v) and len(f)
+
+
+def test_concurrent_clients(server, tree):
+    def mesh(i):
+        with MeshClient(server.address) as client:
+            return client.mesh(VolSphere(Sphere(Point(0, 0, 0), 4 + i % 3)), BOUNDS)
+
+    with ThreadPoolExecutor(6) as executor:
+        meshes = list(executor.map(mesh, range(12)))
+    for i, (v, f) in enumerate(meshes):
+        assert np.array_equal(v, meshes[i % 3][0]) and np.array_equal(f, meshes[i % 3][1])
+        assert np.allclose(np.linalg.norm(v, axis=1), 4 + i % 3, atol=0.1)
+
+
+def test_memory_of_meshes_is_bounded():
+    with MeshServer(port=0, max_bytes=200000) as server:
+        for r in (4, 5, 6, 7):
+            server.mesh(VolSphere(Sphere(Point(0, 0, 0), r)), BOUNDS)
+        assert 0 < server._nbytes <= 200000 and len(server._meshes) < 4
+
+
+class Gated(object):
+    """A sphere whose distances wait for a gate to open."""
+
+    def __init__(self, gate, r=6.0):
+        self.gate = gate
+        self.r = r
+
+    @property
+    def data(self):
+        return {'r': self.r}
+
+    def get_distance_numpy(self, x, y, z):
+        self.gate.wait()
+        return (x ** 2 + y ** 2 + z ** 2) ** 0.5 - self.r
+
+
+def wait_for(condition):
+    for _ in range(1000):
+        if condition():
+            return
+        time.sleep(0.005)
+    raise AssertionError('timed out')
+
+
+def test_stream_chunks(server, tree):
+    bounds = [(-15, 15, 130), (-12, 12, 100), (-10, 10, 90)]
+    vertices, faces = chunked_marching_cubes(tree, Grid(bounds))
+    with MeshClient(server.address) as client:
+        chunks = list(client.stream(tree, bounds))
+        assert len(chunks) > 4
+        assert sum(len(f) for _, f in chunks) >= len(faces)
+        assert sum(len(v) for v, _ in chunks) > len(vertices)
+        points = np.concatenate([v for v, _ in chunks])
+        assert np.allclose(np.unique(points.round(3), axis=0), np.unique(vertices.astype(np.float32).round(3), axis=0), atol=2e-3)
+        # the mesh is cached now, and streamed as one chunk
+        (v, f), = list(client.stream(tree, bounds))
+        assert len(v) == len(vertices) and len(f) == len(faces)
+        assert np.allclose(np.sort(v, axis=0), np.sort(vertices, axis=0), atol=1e-5)
+        # leaving a stream early keeps the connection usable
+        for _ in client.stream(tree, bounds, level=0.5):
+            break
+        client.ping()
+        with pytest.raises(ValueError):
+            list(client.stream('{"compas_vol":1,"tree":{"type":"Nothing","content":{}}}', bounds))
+        client.ping()
+
+
+def test_identical_requests_in_flight_are_coalesced():
+    gate = threading.Event()
+    with MeshServer(port=0, workers=2) as server:
+        with ThreadPoolExecutor(3) as executor:
+            first = executor.submit(server.mesh, Gated(gate), BOUNDS)
+            wait_for(lambda: len(server._jobs) == 1)
+            second = executor.submit(server.mesh, Gated(gate), BOUNDS)
+            streamed = executor.submit(lambda: list(server.stream(Gated(gate), BOUNDS)))
+            wait_for(lambda: server.coalesced == 2)
+            gate.set()
+            (a, b, cached), (c, d, _) = first.result(), second.result()
+        assert not cached and a is c and b is d and len(streamed.result()) == 1
+        assert not server._jobs
+        assert server.mesh(Gated(gate), BOUNDS)[2]
+
+
+def test_coalescer():
+    coalescer = Coalescer()
+    gate = threading.Event()
+    calls = []
+
+    def compute(x):
+        calls.append(x)
+        gate.wait()
+        if x < 0:
+            raise ValueError(x)
+        return [x]
+
+    with ThreadPoolExecutor(6) as executor:
+        same = [executor.submit(coalescer.call, 'a', compute, 1) for _ in range(3)]
+        failing = [executor.submit(coalescer.call, 'b', compute, -1) for _ in range(2)]
+        other = executor.submit(coalescer.call, 'c', compute, 2)
+        wait_for(lambda: coalescer.coalesced == 3)
+        gate.set()
+        results = [f.result() for f in same]
+        assert all(r is results[0] for r in results) and other.result() == [2]
+        for f in failing:
+            with pytest.raises(ValueError):
+                f.result()
+    assert sorted(calls) == [-1, 1, 2] and len(coalescer) == 0
+    assert coalescer.call('a', compute, 3) == [3]
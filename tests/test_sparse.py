@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+
+from compas_vol.engine import Grid
+from compas_vol.meshing import SparseGrid
+
+
+BOUNDS = [(-50, 50), (-50, 50), (-50, 50)]
+
+
+@pytest.fixture(scope='module')
+def grid(part):
+    return SparseGrid(part, BOUNDS, 0.5).build()
+
+
+def test_sparse_grid_matches_the_clipped_dense_grid(grid, part):
+    dense = Grid(BOUNDS, resolution=grid.shape).evaluate(part)
+    assert np.allclose(grid.to_dense(), np.clip(dense, -grid.band, grid.band))
+
+
+def test_sparse_grid_stores_a_fraction_of_the_samples(grid):
+    assert len(grid) * grid.tile ** 3 < 0.1 * np.prod(grid.shape)
+    assert grid.nbytes < 0.15 * np.prod(grid.shape) * 8
+
+
+def test_memory_scales_with_area(part):
+    small = SparseGrid(part, BOUNDS, 1.0).build()
+    fine = SparseGrid(part, BOUNDS, 0.5).build()
+    # halving the spacing multiplies the samples by 8, and the tiles near the surface by about 4
+    assert 3 < len(fine) / len(small) < 5
+
+
+def test_iterating_over_tiles(grid):
+    tiles = list(grid)
+    assert len(tiles) == len(grid)
+    origin, block = tiles[0]
+    i, j, k = (np.arange(o, o + grid.tile) for o in origin)
+    assert np.array_equal(block, grid.values(i[:, None, None], j[None, :, None], k[None, None, :]))
+    assert all(o % grid.tile == 0 for origin, _ in tiles for o in origin)
+    assert (np.abs(np.concatenate([b.ravel() for _, b in tiles])) <= grid.band).all()
+
+
+def test_background_values(grid):
+    inside, outside = grid.background
+    assert grid.sample(np.array([[1.0, 2.0, 3.0]]))[0] == inside
+    assert grid.sample(np.array([[-45.0, -45.0, -45.0]]))[0] == outside
+    assert grid.sample(np.array([[80.0, 0.0, 0.0]]))[0] == outside
+
+
+def test_trilinear_sampling_near_the_surface(grid, part):
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-50, 50, (100000, 3))
+    d = part.get_distance_numpy(*points.T)
+    near = np.abs(d) < 0.5
+    assert near.sum() > 100
+    assert np.allclose(grid.sample(points[near]), d[near], atol=0.1)
+    grid_points = np.asarray(grid.min) + rng.integers(0, 200, (50, 3)) * grid.spacing
+    assert np.allclose(grid.sample(grid_points), grid.values(*np.rint((grid_points - grid.min) / grid.spacing).astype(int).T))
@@ -0,0 +1,122 @@
+import copy
+
+import numpy as np
+
+from compas.geometry import Box
+from compas.geometry import Frame
+from compas.geometry import Point
+from compas.geometry import Sphere
+
+from compas_vol.combinations import Intersection
+from compas_vol.combinations import SmoothUnion
+from compas_vol.combinations import Union
+from compas_vol.engine import Grid
+from compas_vol.microstructures import Lattice
+from compas_vol.microstructures import TPMS
+from compas_vol.microstructures import Voronoi
+from compas_vol.modifications import Shell
+from compas_vol.modifications.transformation import VolTransformation
+from compas_vol.primitives import PlatonicSolid
+from compas_vol.primitives import VolBox
+from compas_vol.primitives import VolExtrusion
+from compas_vol.primitives import VolSphere
+from compas_vol.utilities import shared_subtrees
+from compas_vol.utilities import structural_hash
+from compas_vol.utilities import structural_key
+from compas_vol.utilities import structurally_equal
+from compas_vol.utilities import structure
+
+
+class Counted(object):
+    """A sphere that counts its evaluations."""
+
+    calls = []
+
+    def __init__(self, radius):
+        self.radius = radius
+
+    def get_distance(self, point):
+        return (point[0]**2 + point[1]**2 + point[2]**2)**0.5 - self.radius
+
+    def get_distance_numpy(self, x, y, z):
+        Counted.calls.append(self.radius)
+        return np.sqrt(x**2 + y**2 + z**2) - self.radius
+
+
+def test_copies_are_structurally_equal(node):
+    c = copy.deepcopy(node)
+    assert c is not node
+    assert structurally_equal(c, node) and structural_hash(c) == structural_hash(node)
+
+
+def test_objects_compare_by_identity(sphere):
+    c = copy.deepcopy(sphere)
+    assert sphere == sphere and c != sphere
+    assert len({sphere, c}) == 2
+    before = hash(sphere)
+    sphere.sphere.radius += 1
+    assert hash(sphere) == before
+
+
+def test_structural_inequality(box, sphere, frame):
+    for a, b in [
+        (box, VolBox(Box(frame, 5, 6, 7), 1.5)),
+        (sphere, VolSphere(Sphere(Point(1, 2, 3), 5))),
+        (PlatonicSolid(5, 0, frame), PlatonicSolid(5, 1, frame)),
+        (VolExtrusion([(0, 0, 0), (5, 0, 0), (5, 5, 0)], 4, frame), VolExtrusion([(0, 0, 0), (5, 0, 0), (5, 6, 0)], 4, frame)),
+        (Lattice(5, 5.0, 0.5, frame), Lattice(5, 5.0, 0.5)),
+        (TPMS(2, 5.0), TPMS(1, 5.0)),
+        (Voronoi([Point(1, 2, 3), Point(-3, 2, 1)], 1.0), Voronoi([Point(1, 2, 3), Point(-3, 2, 2)], 1.0)),
+        (Union([box, sphere]), Union([sphere, box])),
+        (SmoothUnion(box, sphere, 2.0), SmoothUnion(box, sphere, 1.0)),
+        (Shell(box, 1.0, 0.3), Shell(sphere, 1.0, 0.3)),
+        (VolTransformation(sphere, frame), VolTransformation(sphere, Frame.worldXY())),
+    ]:
+        assert not structurally_equal(a, b)
+        assert len({structural_key(o) for o in (a, copy.deepcopy(a), b)}) == 2
+
+
+def test_shared_nodes_and_copies_are_equal(box):
+    assert structurally_equal(Union([box, box]), Union([box, copy.deepcopy(box)]))
+    assert structural_key(Union([box, box])) != structural_key(Intersection([box, box]))
+
+
+def tree(part):
+    return Intersection(Shell(part, 1.0), Intersection(Union([part, copy.deepcopy(part)]), TPMS(0, 5.0)))
+
+
+def test_shared_subtrees_are_evaluated_once():
+    obj = tree(Counted(3.0))
+    x, y, z = np.ogrid[-5:5:20j, -5:5:20j, -5:5:20j]
+    del Counted.calls[:]
+    expected = obj.get_distance_numpy(x, y, z)
+    assert len(Counted.calls) == 3
+    del Counted.calls[:]
+    with shared_subtrees(obj):
+        d = obj.get_distance_numpy(x, y, z)
+        # the last consumer has freed the distances
+        assert not structure._shared().grids
+    assert len(Counted.calls) == 1
+    assert np.allclose(d, expected)
+
+
+def test_grid_shares_subtrees_per_block():
+    obj = tree(Counted(3.0))
+    grid = Grid([(-5, 5), (-5, 5), (-5, 5)], resolution=20)
+    del Counted.calls[:]
+    d = grid.evaluate(obj, chunk_shape=(10, 20, 20))
+    assert len(Counted.calls) == 2
+    x, y, z = grid.ogrid()
+    assert np.allclose(d, obj.get_distance_numpy(x, y, z))
+
+
+def test_subtrees_are_not_shared_across_coordinates(frame):
+    part = Counted(3.0)
+    obj = Union([part, VolTransformation(part, frame)])
+    x, y, z = np.ogrid[-5:5:20j, -5:5:20j, -5:5:20j]
+    expected = obj.get_distance_numpy(x, y, z)
+    del Counted.calls[:]
+    with shared_subtrees(obj):
+        d = obj.get_distance_numpy(x, y, z)
+    assert len(Counted.calls) == 2
+    assert np.allclose(d, expected)
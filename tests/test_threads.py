@@ -0,0 +1,50 @@
+import threading
+
+import numpy as np
+import pytest
+
+from compas.geometry import Point
+
+from compas_vol.combinations import SmoothUnion
+from compas_vol.engine import Grid
+from compas_vol.engine import ThreadEvaluator
+from compas_vol.microstructures import TPMS
+from compas_vol.modifications import Overlay
+
+
+@pytest.fixture
+def overlay(box, sphere):
+    return Overlay(SmoothUnion(box, sphere, 2.0), TPMS(0, 3.0), 0.2)
+
+
+def test_get_distance_does_not_modify_point(node):
+    point = Point(3.0, -2.0, 1.5)
+    d = node.get_distance(point)
+    assert list(point) == [3.0, -2.0, 1.5]
+    assert node.get_distance(point) == d
+
+
+@pytest.mark.parametrize('compiled', [True, False])
+def test_thread_evaluator_matches_grid(compiled, overlay):
+    grid = Grid([(-10, 10), (-10, 10), (-10, 10)], resolution=(30, 20, 25))
+    expected = grid.evaluate(overlay)
+    with ThreadEvaluator(3) as evaluator:
+        assert np.allclose(evaluator.evaluate(overlay, grid, compiled=compiled), expected)
+        out = np.empty(grid.shape, dtype='float32')
+        evaluator.evaluate(overlay, grid, out=out, chunk_shape=(4, 7, 25), compiled=compiled)
+        assert np.allclose(out, expected, atol=1e-5)
+
+
+def test_thread_evaluator_concurrent_calls(overlay):
+    grid = Grid([(-10, 10), (-10, 10), (-10, 10)], resolution=24)
+    expected = grid.evaluate(overlay)
+    results = [None] * 6
+    with ThreadEvaluator(2) as evaluator:
+        def run(i):
+            results[i] = evaluator.evaluate(overlay, grid)
+        threads = [threading.Thread(target=run, args=(i, )) for i in range(len(results))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    assert all(np.allclose(r, expected) for r in results)
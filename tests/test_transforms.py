@@ -0,0 +1,68 @@
+import numpy as np
+
+from compas.geometry import Box
+from compas.geometry import Frame
+from compas.geometry import Point
+from compas.geometry import Transformation
+from compas.geometry import matrix_from_frame
+
+from compas_vol.combinations import Union
+from compas_vol.engine import Grid
+from compas_vol.primitives import VolBox
+from compas_vol.utilities import shared_transforms
+from compas_vol.utilities import transform_coordinates
+from compas_vol.utilities import transform_point
+from compas_vol.utilities import transforms
+
+
+def dense(matrix, x, y, z):
+    p = np.stack(np.broadcast_arrays(x, y, z, 1.0)).reshape(4, -1)
+    return np.dot(np.array(matrix), p)[:3].reshape((3,) + np.broadcast(x, y, z).shape)
+
+
+def test_transform_matches_matrix_product(frame):
+    x, y, z = np.ogrid[-10:10:21j, -9:9:19j, -8:8:17j]
+    for f in [frame, Frame((1, 2, 3), (1, 0, 0), (0, 1, 0)), Frame((0, 0, 0), (0.6, 0.8, 0), (-0.8, 0.6, 0))]:
+        matrix = matrix_from_frame(f)
+        result = transform_coordinates(matrix, x, y, z)
+        assert np.allclose(np.stack(np.broadcast_arrays(*result)), dense(matrix, x, y, z))
+    points = np.random.default_rng(0).uniform(-10, 10, (3, 100))
+    matrix = matrix_from_frame(frame)
+    assert np.allclose(np.stack(transform_coordinates(matrix, *points)), dense(matrix, *points))
+
+
+def test_transform_point_copies(frame):
+    matrix = matrix_from_frame(frame)
+    point = Point(1, 2, 3)
+    for transformation in (matrix, Transformation.from_frame(frame)):
+        p = transform_point(transformation, point)
+        assert p is not point and point == Point(1, 2, 3)
+        assert np.allclose(list(p), dense(matrix, 1, 2, 3).ravel())
+        assert np.allclose(list(transform_point(transformation, (1, 2, 3))), list(p))
+
+
+def test_transform_stays_separable():
+    x, y, z = np.ogrid[-10:10:21j, -9:9:19j, -8:8:17j]
+    xt, yt, zt = transform_coordinates(matrix_from_frame(Frame((1, 2, 3), (1, 0, 0), (0, 1, 0))), x, y, z)
+    assert (xt.shape, yt.shape, zt.shape) == ((21, 1, 1), (1, 19, 1), (1, 1, 17))
+    xt, yt, zt = transform_coordinates(matrix_from_frame(Frame((0, 0, 0), (0.6, 0.8, 0), (-0.8, 0.6, 0))), x, y, z)
+    assert (xt.shape, yt.shape, zt.shape) == ((21, 19, 1), (21, 19, 1), (1, 1, 17))
+
+
+def test_siblings_share_transformed_coordinates(monkeypatch, frame, box, sphere):
+    calls = []
+    transform = transforms._transform
+    monkeypatch.setattr(transforms, '_transform', lambda *args: calls.append(args[0]) or transform(*args))
+    union = Union([box, VolBox(Box(frame, 8, 2, 2), 0.5), sphere])
+    x, y, z = np.ogrid[-10:10:21j, -9:9:19j, -8:8:17j]
+    expected = union.get_distance_numpy(x, y, z)
+    assert len(calls) == 2
+    del calls[:]
+    with shared_transforms():
+        d = union.get_distance_numpy(x, y, z)
+    assert len(calls) == 1
+    assert np.allclose(d, expected)
+    del calls[:]
+    Grid([(-10, 10), (-9, 9), (-8, 8)], resolution=(21, 19, 17)).evaluate(union)
+    assert len(calls) == 1
+    assert transforms._LOCAL.cache is None
@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+from compas.geometry import Point
+from compas.geometry import Sphere
+
+from compas_vol.engine import Grid
+from compas_vol.meshing import SparseGrid
+from compas_vol.meshing import VolumeFile
+from compas_vol.meshing import read_nrrd
+from compas_vol.meshing import save_volume
+from compas_vol.meshing import write_nrrd
+from compas_vol.primitives import VolSphere
+from compas_vol.utilities import structural_digest
+
+
+@pytest.mark.parametrize('compression', [True, False])
+def test_sparse_round_trip(tmp_path, tree, compression):
+    sparse = SparseGrid(tree, [(-15, 15), (-15, 15), (-15, 15)], 0.25, tile=8).build()
+    filename = str(tmp_path / 'tree.cvol')
+    save_volume(filename, sparse, compression=compression)
+    with VolumeFile(filename) as volume:
+        assert volume.shape == sparse.shape and volume.tile == 8 and len(volume) == len(sparse)
+        assert volume.tree == structural_digest(tree)
+        assert volume.background == sparse.background
+        dense = sparse.to_dense()
+        assert np.array_equal(volume.read(), dense)
+        region = (slice(13, 61), slice(40, 41), slice(None))
+        assert np.array_equal(volume.read(region), dense[region])
+        loaded = volume.to_sparse()
+    assert np.array_equal(loaded.keys, sparse.keys) and np.array_equal(loaded.data, sparse.data)
+    points = np.random.default_rng(0).uniform(-14, 14, (500, 3))
+    assert np.array_equal(loaded.sample(points), sparse.sample(points))
+
+
+def test_dense_round_trip(tmp_path, tree):
+    grid = Grid([(-15, 15), (-12, 12), (-10, 10)], resolution=(50, 37, 29))
+    d = grid.evaluate(tree)
+    filename = str(tmp_path / 'dense.cvol')
+    save_volume(filename, d, grid, tree=tree, tile=16)
+    with VolumeFile(filename) as volume:
+        assert volume.background is None and volume.octree is None
+        assert volume.grid.shape == grid.shape and np.allclose(volume.grid.spacing, grid.spacing)
+        assert np.array_equal(volume.read(), d)
+        assert np.array_equal(volume.read((slice(10, 20), slice(30, None))), d[10:20, 30:])
+        with pytest.raises(ValueError):
+            volume.to_sparse()
+
+
+def test_read_integer_indices(tmp_path, tree):
+    grid = Grid([(-15, 15), (-12, 12), (-10, 10)], resolution=(50, 37, 29))
+    d = grid.evaluate(tree)
+    filename = str(tmp_path / 'dense.cvol')
+    save_volume(filename, d, grid, tree=tree, tile=16)
+    with VolumeFile(filename) as volume:
+        for region in [(5,), (-1,), (slice(None), slice(None), -1), (slice(10, 20), 36, np.int64(3)), (-50, -37, -29)]:
+            assert np.array_equal(volume.read(region), d[region])
+        with pytest.raises(IndexError):
+            volume.read((50,))
+        with pytest.raises(IndexError):
+            volume.read((slice(None), -38))
+        with pytest.raises(TypeError):
+            volume.read((1.5,))
+
+
+def test_narrow_band_smaller_than_npy(tmp_path):
+    sphere = VolSphere(Sphere(Point(0, 0, 0), 30))
+    sparse = SparseGrid(sphere, [(-40, 40), (-40, 40), (-40, 40)], 0.25, dtype='float32').build()
+    np.save(str(tmp_path / 'dense.npy'), sparse.to_dense())
+    save_volume(str(tmp_path / 'sparse.cvol'), sparse)
+    save_volume(str(tmp_path / 'compressed.cvol'), sparse, compression=True)
+
+    size = (tmp_path / 'dense.npy').stat().st_size
+    assert size / (tmp_path / 'sparse.cvol').stat().st_size > 10
+    assert size / (tmp_path / 'compressed.cvol').stat().st_size > 20
+    for name in ('sparse.cvol', 'compressed.cvol'):
+        with VolumeFile(str(tmp_path / name)) as volume:
+            assert np.array_equal(volume.to_sparse().data, sparse.data)
+
+
+@pytest.mark.parametrize('name', ['field.nrrd', 'field.nhdr'])
+@pytest.mark.parametrize('encoding', ['raw', 'gzip'])
+def test_nrrd_round_trip(tmp_path, tree, name, encoding):
+    grid = Grid([(-15, 15), (-12, 12), (-10, 10)], resolution=(40, 30, 20))
+    d = grid.evaluate(tree)
+    filename = str(tmp_path / name)
+    write_nrrd(filename, d, grid, encoding=encoding)
+    a, g = read_nrrd(filename)
+    assert np.array_equal(a, d)
+    assert g.shape == grid.shape and np.allclose(g.min, grid.min) and np.allclose(g.max, grid.max)
+
+
+def test_nrrd_of_sparse_and_volume_file(tmp_path, tree):
+    sparse = SparseGrid(tree, [(-15, 15), (-15, 15), (-15, 15)], 0.5, tile=8).build()
+    write_nrrd(str(tmp_path / 'sparse.nhdr'), sparse)
+    save_volume(str(tmp_path / 'sparse.cvol'), sparse)
+    with VolumeFile(str(tmp_path / 'sparse.cvol')) as volume:
+        write_nrrd(str(tmp_path / 'volume.nrrd'), volume)
+    a, _ = read_nrrd(str(tmp_path / 'sparse.nhdr'))
+    b, _ = read_nrrd(str(tmp_path / 'volume.nrrd'), mmap=False)
+    assert np.array_equal(a, sparse.to_dense()) and np.array_equal(b, sparse.to_dense())
+
+
+def test_read_nrrd_lps_fastest_x(tmp_path):
+    # a file as written by slicers: x varies fastest, in left-posterior-superior space
+    a = np.arange(4 * 3 * 2, dtype='<i2').reshape(2, 3, 4)
+    filename = str(tmp_path / 'lps.nrrd')
+    header = '\n'.join([
+        'NRRD0004',
+        'type: short',
+        'dimension: 3',
+        'space: left-posterior-superior',
+        'sizes: 4 3 2',
+        'space directions: (-0.5,0,0) (0,-1,0) (0,0,2)',
+        'endian: little',
+        'encoding: raw',
+        'space origin: (1,2,3)',
+    ])
+    with open(filename, 'wb') as f:
+        f.write((header + '\n\n').encode('ascii'))
+        f.write(a.tobytes())
+    b, grid = read_nrrd(filename)
+    assert b.shape == (4, 3, 2) and grid.spacing == (0.5, 1.0, 2.0)
+    assert grid.min == (-1.0, -2.0, 3.0)
+    assert np.array_equal(b, a.transpose(2, 1, 0))
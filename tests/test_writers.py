@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+from compas_vol.utilities import OBJWriter
+from compas_vol.utilities import PLYWriter
+from compas_vol.utilities import export_ski_mesh
+from compas_vol.utilities import write_obj
+from compas_vol.utilities import write_ply
+from compas_vol.utilities import write_stl
+
+
+@pytest.fixture
+def mesh():
+    rng = np.random.default_rng(0)
+    vertices = rng.uniform(-10, 10, (500, 3))
+    faces = rng.integers(0, 500, (900, 3))
+    return vertices, faces
+
+
+def read_ply(filename):
+    with open(filename, 'rb') as f:
+        lines = []
+        while not lines or lines[-1] != 'end_header':
+            lines.append(f.readline().decode('ascii').strip())
+        data = f.read()
+    types = {'float': '<f4', 'double': '<f8', 'short': '<i2', 'uchar': 'u1'}
+    counts = {}
+    fields = []
+    for line in lines:
+        words = line.split()
+        if words[0] == 'element':
+            counts[words[1]] = int(words[2])
+        elif words[0] == 'property' and words[1] != 'list':
+            fields.append((words[2], types[words[1]]))
+    vertices = np.frombuffer(data, dtype=np.dtype(fields), count=counts['vertex'])
+    faces = np.frombuffer(data, dtype=np.dtype([('n', 'u1'), ('v', '<i4', (3,))]), offset=vertices.nbytes)
+    assert len(faces) == counts['face'] and (faces['n'] == 3).all()
+    return lines, vertices, faces['v']
+
+
+def test_ply(tmp_path, mesh):
+    vertices, faces = mesh
+    normals = vertices / np.linalg.norm(vertices, axis=-1, keepdims=True)
+    colors = np.abs(normals)
+    write_ply(str(tmp_path / 'mesh.ply'), vertices, faces, normals, colors)
+    _, data, f = read_ply(str(tmp_path / 'mesh.ply'))
+    assert np.allclose(np.stack([data[c] for c in 'xyz'], axis=-1), vertices, atol=1e-5)
+    assert np.allclose(np.stack([data[c] for c in ('nx', 'ny', 'nz')], axis=-1), normals, atol=1e-6)
+    assert np.allclose(np.stack([data[c] for c in ('red', 'green', 'blue')], axis=-1), colors * 255, atol=0.51)
+    assert np.array_equal(f, faces)
+
+
+def test_ply_quantized(tmp_path, mesh):
+    vertices, faces = mesh
+    write_ply(str(tmp_path / 'mesh.ply'), vertices, faces, dtype='int16')
+    header, data, _ = read_ply(str(tmp_path / 'mesh.ply'))
+    words = [line for line in header if line.startswith('comment quantized')][0].split()
+    scale, offset = np.array(words[3:6], dtype=float), np.array(words[7:10], dtype=float)
+    assert data.dtype['x'] == np.int16
+    restored = np.stack([data[c] for c in 'xyz'], axis=-1) * scale + offset
+    assert np.abs(restored - vertices).max() <= scale.max() / 2 + 1e-9
+    with pytest.raises(ValueError):
+        PLYWriter(str(tmp_path / 'other.ply'), dtype='int16')
+
+
+def test_ply_streaming(tmp_path, mesh):
+    vertices, faces = mesh
+    with PLYWriter(str(tmp_path / 'mesh.ply'), dtype='float64') as writer:
+        for start in range(0, len(faces), 200):
+            used, local = np.unique(faces[start:start + 200], return_inverse=True)
+            writer.add(vertices[used], local.reshape(-1, 3))
+    _, data, f = read_ply(str(tmp_path / 'mesh.ply'))
+    assert len(data) == writer.vertex_count and len(f) == len(faces)
+    v = np.stack([data[c] for c in 'xyz'], axis=-1)
+    assert np.array_equal(v[f], vertices[faces])
+    with pytest.raises(ValueError):
+        writer.add(vertices, faces)
+
+
+def test_stl(tmp_path, mesh):
+    vertices, faces = mesh
+    write_stl(str(tmp_path / 'mesh.stl'), vertices, faces, colors=np.ones((500, 3)))
+    raw = (tmp_path / 'mesh.stl').read_bytes()
+    assert len(raw) == 84 + 50 * len(faces)
+    assert int(np.frombuffer(raw, '<u4', 1, 80)[0]) == len(faces)
+    data = np.frombuffer(raw, np.dtype([('normal', '<f4', (3,)), ('vertices', '<f4', (3, 3)), ('attribute', '<u2')]), offset=84)
+    assert np.allclose(data['vertices'], vertices[faces], atol=1e-5)
+    assert (data['attribute'] == 0xFFFF).all()
+    n = np.cross(vertices[faces[:, 1]] - vertices[faces[:, 0]], vertices[faces[:, 2]] - vertices[faces[:, 0]])
+    assert np.allclose(np.einsum('ni,ni->n', data['normal'], n), np.linalg.norm(n, axis=-1), rtol=1e-4)
+
+
+def test_obj(tmp_path, mesh):
+    vertices, faces = mesh
+    filename = str(tmp_path / 'mesh.obj')
+    with OBJWriter(filename, digits=17) as writer:
+        writer.add(vertices[:250], faces[(faces < 250).all(axis=-1)])
+        writer.add(vertices[250:], faces[(faces >= 250).all(axis=-1)] - 250)
+    lines = open(filename).read().splitlines()
+    v = np.array([line.split()[1:] for line in lines if line.startswith('v ')], dtype=float)
+    f = np.array([line.split()[1:] for line in lines if line.startswith('f ')], dtype=int) - 1
+    assert np.array_equal(v, vertices)
+    assert np.array_equal(np.sort(f, axis=0), np.sort(faces[(faces < 250).all(axis=-1) | (faces >= 250).all(axis=-1)], axis=0))
+
+
+def test_obj_normals_and_colors(tmp_path, mesh):
+    vertices, faces = mesh
+    filename = str(tmp_path / 'mesh.obj')
+    write_obj(filename, vertices, faces, normals=vertices, colors=np.full((500, 3), 255, dtype=np.uint8))
+    lines = open(filename).read().splitlines()
+    assert lines[0].endswith(' 1 1 1')
+    assert sum(line.startswith('vn ') for line in lines) == len(vertices)
+    a, b, c = faces[0] + 1
+    assert 'f {0}//{0} {1}//{1} {2}//{2}'.format(a, b, c) in lines
+
+
+def test_export_ski_mesh(tmp_path, mesh):
+    vertices, faces = mesh
+    export_ski_mesh(vertices, faces, filename=str(tmp_path / 'mesh.obj'))
+    lines = open(str(tmp_path / 'mesh.obj')).read().splitlines()
+    assert len(lines) == len(vertices) + len(faces)
+    assert np.allclose([float(x) for x in lines[0].split()[1:]], vertices[0])